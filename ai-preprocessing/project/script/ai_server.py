@@ -0,0 +1,27 @@
+"""
+전처리 스크립트에서 ai-server의 app.utils 모듈을 import할 수 있도록 sys.path에 ai-server 프로젝트 경로 추가
+
+벡터 DB 옆에 저장하는 스냅샷(키워드 인덱스, docstore)과 index_meta.json, 지식 그래프 CSR 스냅샷 / 좌표 색인은
+ai-server가 읽는 포맷이므로 전처리에서도 따로 구현하지 않고 ai-server의 구현을 그대로 사용합니다.
+docker-compose는 ai-server/project/app 을 ai-preprocessing 컨테이너의 /server/app 에 읽기 전용으로 마운트하고
+AI_SERVER_PROJECT_DIR=/server 로 설정합니다. 저장소에서 직접 실행하면 ../../ai-server/project 를 사용합니다.
+
+사용법 (다른 스크립트에서):
+    import ai_server  # noqa: F401  (app.utils import 전에)
+    from app.utils.vectordb import build_keyword_index
+"""
+import os
+import sys
+from pathlib import Path
+
+AI_SERVER_PROJECT_DIR = Path(
+    os.getenv("AI_SERVER_PROJECT_DIR") or Path(__file__).resolve().parent.parent.parent.parent / "ai-server" / "project"
+)
+
+if not (AI_SERVER_PROJECT_DIR / "app" / "utils").is_dir():
+    raise ImportError(
+        f"ai-server 프로젝트를 찾을 수 없습니다: {AI_SERVER_PROJECT_DIR} "
+        "(docker-compose 볼륨 마운트 또는 AI_SERVER_PROJECT_DIR 설정을 확인하세요)"
+    )
+if str(AI_SERVER_PROJECT_DIR) not in sys.path:
+    sys.path.append(str(AI_SERVER_PROJECT_DIR))
@@ -0,0 +1,114 @@
+"""
+FAISS 인덱스 종류별 recall / 지연 시간 비교 리포트
+
+저장된 벡터 DB(평면 인덱스)의 벡터로 Flat, IVF-Flat, IVF-PQ, HNSW 인덱스를 만들고
+평면 인덱스의 정확한 검색 결과를 기준으로 recall@k와 쿼리당 지연 시간을 비교합니다.
+nprobe / efSearch를 바꿔가며 측정하므로 ai-server의 FAISS_NPROBE / FAISS_EF_SEARCH 값을 고르는 데 사용합니다.
+
+쿼리는 API 호출 없이 인덱스 벡터 중 일부를 샘플링하고 약간의 잡음을 더해 만듭니다.
+서버와 같이 쿼리 하나씩, 단일 스레드로 검색합니다.
+
+사용법 (ai-preprocessing/project 에서 실행):
+    python script/benchmark_faiss_index.py restaurant_finder
+    python script/benchmark_faiss_index.py --synthetic 200000 --dim 1536
+"""
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+from faiss_index_builder import DEFAULT_TRAIN_SIZE, INDEX_TYPES, apply_search_params, build_index, extract_vectors, index_spec
+
+NPROBE_SWEEP = (1, 4, 8, 16, 32, 64)
+EF_SEARCH_SWEEP = (16, 32, 64, 128, 256)
+
+
+def load_vectors(index_name: str) -> np.ndarray:
+    vectordb_path = Path(__file__).parent.parent / "vectordb" / index_name
+    return extract_vectors(faiss.read_index(str(vectordb_path / "index.faiss")))
+
+
+def synthetic_vectors(num_vectors: int, dim: int, seed: int = 0) -> np.ndarray:
+    """군집 구조가 있는 정규화 벡터 (실제 임베딩처럼 균일하지 않은 분포)"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(1, num_vectors // 500), dim)).astype(np.float32)
+    vectors = centers[rng.integers(len(centers), size=num_vectors)] + 0.5 * rng.standard_normal((num_vectors, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def make_queries(vectors: np.ndarray, num_queries: int, noise: float, seed: int = 1) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    queries = vectors[rng.choice(len(vectors), min(num_queries, len(vectors)), replace=False)].copy()
+    queries += noise * rng.standard_normal(queries.shape).astype(np.float32) * np.linalg.norm(queries, axis=1, keepdims=True) / np.sqrt(queries.shape[1])
+    return np.ascontiguousarray(queries, dtype=np.float32)
+
+
+def measure(index, queries: np.ndarray, ground_truth: np.ndarray, k: int) -> tuple:
+    """쿼리 하나씩 검색한 지연 시간(ms) 목록과 recall@k"""
+    latencies, hits = [], 0
+    for i in range(len(queries)):
+        start = time.perf_counter()
+        _, labels = index.search(queries[i:i + 1], k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += len(set(labels[0].tolist()) & set(ground_truth[i].tolist()))
+    return latencies, hits / ground_truth.size
+
+
+def index_size_mb(index) -> float:
+    return faiss.serialize_index(index).nbytes / 1024 / 1024
+
+
+def main(args) -> None:
+    faiss.omp_set_num_threads(1)
+    vectors = synthetic_vectors(args.synthetic, args.dim) if args.synthetic else load_vectors(args.index_name)
+    queries = make_queries(vectors, args.queries, args.noise)
+    num_vectors, dim = vectors.shape
+
+    flat, _ = build_index(vectors, index_spec("flat", dim, num_vectors))
+    _, ground_truth = flat.search(queries, args.k)
+
+    rows = []
+    for index_type in args.types:
+        spec = index_spec(index_type, dim, num_vectors, nlist=args.nlist)
+        start = time.perf_counter()
+        index, spec = (flat, spec) if index_type == "flat" else build_index(vectors, spec, train_size=args.train_size)
+        build_seconds = time.perf_counter() - start
+        if index_type == "hnsw":
+            sweep = [("efSearch", v) for v in EF_SEARCH_SWEEP]
+        elif index_type.startswith("ivf"):
+            sweep = [("nprobe", v) for v in NPROBE_SWEEP if v <= spec["nlist"]]
+        else:
+            sweep = [("-", None)]
+        for name, value in sweep:
+            if value is not None:
+                apply_search_params(index, {"nprobe": value} if name == "nprobe" else {"ef_search": value})
+            latencies, recall = measure(index, queries, ground_truth, args.k)
+            latencies.sort()
+            rows.append((
+                spec["factory"], f"{name}={value}" if value is not None else "-", build_seconds, index_size_mb(index),
+                statistics.median(latencies), latencies[int(len(latencies) * 0.99) - 1], recall,
+            ))
+
+    print("=" * 100)
+    print(f"벡터 {num_vectors}개 x {dim}차원, 쿼리 {len(queries)}개, recall@{args.k} (평면 인덱스 정확 검색 기준), 단일 스레드")
+    print(f"{'index':<22} {'param':<14} {'build(s)':>9} {'size(MB)':>9} {'p50(ms)':>9} {'p99(ms)':>9} {'recall':>8}")
+    for factory, param, build_seconds, size_mb, p50, p99, recall in rows:
+        print(f"{factory:<22} {param:<14} {build_seconds:>9.1f} {size_mb:>9.1f} {p50:>9.3f} {p99:>9.3f} {recall:>8.3f}")
+    print("=" * 100)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="FAISS 인덱스 종류별 recall / 지연 시간 비교")
+    parser.add_argument("index_name", nargs="?", default="restaurant_finder", help="비교할 벡터 DB 이름 (평면 인덱스)")
+    parser.add_argument("--synthetic", type=int, default=0, help="합성 벡터 수 (0이면 벡터 DB 사용)")
+    parser.add_argument("--dim", type=int, default=1536, help="합성 벡터 차원")
+    parser.add_argument("--types", nargs="+", default=list(INDEX_TYPES), choices=INDEX_TYPES, help="비교할 인덱스 종류")
+    parser.add_argument("--queries", type=int, default=500, help="쿼리 수")
+    parser.add_argument("--noise", type=float, default=0.3, help="쿼리 잡음 크기 (벡터 노름 대비)")
+    parser.add_argument("--k", type=int, default=10, help="recall@k의 k")
+    parser.add_argument("--nlist", type=int, default=None, help="IVF 클러스터 수 (기본값: 약 4*sqrt(N))")
+    parser.add_argument("--train-size", type=int, default=DEFAULT_TRAIN_SIZE, help="IVF 학습 샘플 최대 벡터 수")
+    main(parser.parse_args())
@@ -0,0 +1,270 @@
+"""
+지식 그래프 빌드 시간 비교와 그래프 동일성 검사 (행 단위 iterrows 방식 vs 열 단위 + 프로세스 풀 방식)
+
+같은 CSV로 기존 방식(행마다 safe_get / normalize_text / has_node / has_edge)과
+create_knowledge_graph.build_graph(열 단위, workers=1 / 자동)를 각각 실행하여
+- 빌드 시간 (CSV 읽기 포함, 초)
+- 노드 / 엣지 순서, 속성 값과 타입, 선행 노드(pred) 순서까지 같은지, gpickle 크기
+를 출력합니다. (pickle은 같은 문자열 객체를 한 번만 쓰므로, 내용이 같아도 객체 공유 방식에 따라 바이트는 다를 수 있습니다.) --reference로 기존 방식으로 저장해 둔 knowledge_graph.gpickle을 주면 그 그래프와도 비교합니다.
+data/ 에 CSV가 없으면(또는 --synthetic) 같은 컬럼 구조의 합성 CSV(식당당 메뉴 여러 행, 결측, 공백 / 특수 문자,
+'부산광역시 ' 접두사, 파일 간 중복 식당, RSTR_ID 없는 행 포함)를 만들어 측정합니다.
+
+사용법 (ai-preprocessing 컨테이너의 /project 에서 실행):
+    python script/benchmark_knowledge_graph_build.py
+    python script/benchmark_knowledge_graph_build.py --reference graphdb/knowledge_graph.gpickle
+    python script/benchmark_knowledge_graph_build.py --synthetic 300000 --workers 1 3
+"""
+import argparse
+import math
+import os
+import pickle
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import networkx as nx
+import pandas as pd
+
+import create_knowledge_graph as kg
+
+PROJECT_DIR = Path(__file__).parent.parent
+AREAS = ["해운대구", "수영구", "부산진구", "중구", "동구", "서구", "남구", "북구", "사하구", "사상구", "금정구", "연제구", "동래구", "강서구", "영도구", "기장군"]
+CATEGORIES = ["한식", "일식", "중식", "양식", "분식", "카페"]
+
+
+# --- 기존 방식 (행 단위) ---
+
+def legacy_safe_get(data, key, default=None):
+    """기존 create_knowledge_graph.safe_get"""
+    val = data.get(key, default)
+    if isinstance(val, float) and math.isnan(val):
+        return default
+    if pd.isna(val):
+        return default
+    return val
+
+
+def legacy_add_node_if_not_exists(graph, node_id, **attrs):
+    if not graph.has_node(node_id):
+        graph.add_node(node_id, **attrs)
+
+
+def legacy_add_edge_if_not_exists(graph, u_of_edge, v_of_edge, **attrs):
+    if not graph.has_edge(u_of_edge, v_of_edge):
+        graph.add_edge(u_of_edge, v_of_edge, **attrs)
+
+
+def legacy_process_attraction_data(graph, file_path):
+    """기존 create_knowledge_graph.py의 관광지 처리 부분"""
+    attraction_df = kg.read_csv(file_path)
+    for index, row in attraction_df.iterrows():
+        attraction_id = f"attraction_{legacy_safe_get(row, 'UC_SEQ')}"
+        area_name = kg.normalize_text(legacy_safe_get(row, 'GUGUN_NM'))
+        area_id = f"area_{area_name}" if area_name else None
+        legacy_add_node_if_not_exists(graph, attraction_id,
+                                      type='Attraction',
+                                      name=legacy_safe_get(row, 'MAIN_TITLE'),
+                                      address=legacy_safe_get(row, 'ADDR1'),
+                                      latitude=legacy_safe_get(row, 'LAT'),
+                                      longitude=legacy_safe_get(row, 'LNG'),
+                                      description=legacy_safe_get(row, 'ITEMCNTNTS'),
+                                      contact=legacy_safe_get(row, 'CNTCT_TEL'),
+                                      traffic_info=legacy_safe_get(row, 'TRFC_INFO'))
+        if area_id:
+            legacy_add_node_if_not_exists(graph, area_id, type='Area', name=area_name)
+            legacy_add_edge_if_not_exists(graph, attraction_id, area_id, type='LOCATED_IN')
+
+
+def legacy_process_restaurant_data(graph, file_path):
+    """기존 create_knowledge_graph.process_restaurant_data"""
+    df = kg.read_csv(file_path)
+    for index, row in df.iterrows():
+        rstr_id_val = legacy_safe_get(row, 'RSTR_ID')
+        if rstr_id_val is None: continue
+        restaurant_id = f"restaurant_{int(rstr_id_val)}"
+
+        raw_area_name = legacy_safe_get(row, 'AREA_NM')
+        cleaned_area_name = raw_area_name.replace('부산광역시', '').strip() if isinstance(raw_area_name, str) else None
+        normalized_area_name = kg.normalize_text(cleaned_area_name)
+        area_id = f"area_{normalized_area_name}" if normalized_area_name else None
+
+        raw_menu_name = legacy_safe_get(row, 'MENU_NM')
+        normalized_menu_name = kg.normalize_text(raw_menu_name)
+        menu_id = f"menu_{normalized_menu_name}" if normalized_menu_name else None
+
+        raw_landmark_name = legacy_safe_get(row, 'CRCMF_LDMARK_NM')
+        normalized_landmark_name = kg.normalize_text(raw_landmark_name)
+        landmark_id = f"landmark_{normalized_landmark_name}" if normalized_landmark_name else None
+
+        legacy_add_node_if_not_exists(graph, restaurant_id,
+                                      type='Restaurant',
+                                      name=legacy_safe_get(row, 'RSTR_NM'),
+                                      address=legacy_safe_get(row, 'RSTR_RDNMADR'),
+                                      latitude=legacy_safe_get(row, 'RSTR_LA'),
+                                      longitude=legacy_safe_get(row, 'RSTR_LO'),
+                                      category=legacy_safe_get(row, 'BSNS_STATM_BZCND_NM'),
+                                      rating=legacy_safe_get(row, 'NAVER_GRAD'),
+                                      description=legacy_safe_get(row, 'RSTR_INTRCN_CONT'),
+                                      hours=legacy_safe_get(row, 'BSNS_TM_CN'),
+                                      closed_days=legacy_safe_get(row, 'RESTDY_INFO_CN'))
+        if area_id:
+            legacy_add_node_if_not_exists(graph, area_id, type='Area', name=cleaned_area_name)
+            legacy_add_edge_if_not_exists(graph, restaurant_id, area_id, type='LOCATED_IN')
+        if menu_id:
+            legacy_add_node_if_not_exists(graph, menu_id,
+                                          type='Menu',
+                                          name=raw_menu_name,
+                                          category=legacy_safe_get(row, 'MENU_CTGRY_LCLAS_NM'),
+                                          sub_category=legacy_safe_get(row, 'MENU_CTGRY_SCLAS_NM'),
+                                          description=legacy_safe_get(row, 'MENU_DSCRN'))
+            legacy_add_edge_if_not_exists(graph, restaurant_id, menu_id,
+                                          type='SERVES_MENU',
+                                          price=legacy_safe_get(row, 'MENU_PRICE'))
+        if landmark_id:
+            legacy_add_node_if_not_exists(graph, landmark_id, type='Landmark', name=raw_landmark_name)
+            legacy_add_edge_if_not_exists(graph, restaurant_id, landmark_id,
+                                          type='NEARBY_LANDMARK',
+                                          distance=legacy_safe_get(row, 'CRCMF_LDMARK_DIST'))
+        features = {
+            '주차가능': legacy_safe_get(row, 'PRKG_POS_YN') == 'Y',
+            '와이파이가능': legacy_safe_get(row, 'WIFI_OFR_YN') == 'Y',
+            '애견동반가능': legacy_safe_get(row, 'PET_ENTRN_POSBL_YN') == 'Y',
+        }
+        for feature_name, has_feature in features.items():
+            if has_feature:
+                feature_id = f"feature_{kg.normalize_text(feature_name)}"
+                legacy_add_node_if_not_exists(graph, feature_id, type='Feature', name=feature_name)
+                legacy_add_edge_if_not_exists(graph, restaurant_id, feature_id, type='HAS_FEATURE')
+
+
+def legacy_build_graph(sources) -> nx.DiGraph:
+    graph = nx.DiGraph()
+    for kind, path in sources:
+        if kind == "attraction":
+            legacy_process_attraction_data(graph, path)
+        else:
+            legacy_process_restaurant_data(graph, path)
+    return graph
+
+
+# --- 합성 CSV ---
+
+def write_synthetic_csvs(directory: Path, num_rows: int, seed: int) -> list:
+    """create_knowledge_graph.py가 읽는 컬럼 구조의 관광지 / 식당(7B, BFTS) CSV"""
+    rng = random.Random(seed)
+
+    def maybe(value, missing=0.1):
+        return None if rng.random() < missing else value
+
+    attractions = []
+    for i in range(max(50, num_rows // 100)):
+        attractions.append({
+            "UC_SEQ": i if rng.random() > 0.01 else None,
+            "MAIN_TITLE": f"관광지 {i}", "GUGUN_NM": maybe(rng.choice(AREAS + [" 해운대구 ", "수영구!"])),
+            "ADDR1": f"부산광역시 관광로 {i}", "LAT": maybe(35.0 + rng.random() * 0.3), "LNG": maybe(128.9 + rng.random() * 0.4),
+            "ITEMCNTNTS": maybe(f"관광지 {i} 설명"), "CNTCT_TEL": maybe("051-000-0000"), "TRFC_INFO": maybe("지하철 2호선"),
+        })
+    menus = [f"메뉴 {i}" for i in range(max(100, num_rows // 30))] + ["  김치 찌개 ", "Pasta!", "파스타", "(대)족발"]
+    landmarks = [f"랜드마크 {i}" for i in range(max(20, num_rows // 300))] + ["서면역", "서면 역"]
+    restaurants = []
+    num_restaurants = max(20, num_rows // 3)
+    for i in range(num_restaurants):
+        # 식당마다 메뉴 수만큼 행 (식당 속성은 반복, 가격 / 메뉴만 다름)
+        base = {
+            "RSTR_ID": i if rng.random() > 0.005 else None, "RSTR_NM": f"맛집 {i}", "RSTR_RDNMADR": f"부산광역시 맛집로 {i}",
+            "RSTR_LA": maybe(35.0 + rng.random() * 0.3), "RSTR_LO": maybe(128.9 + rng.random() * 0.4),
+            "AREA_NM": maybe(rng.choice([f"부산광역시 {area}" for area in AREAS] + ["부산광역시", "부산광역시  해운대 구"])),
+            "BSNS_STATM_BZCND_NM": rng.choice(CATEGORIES), "NAVER_GRAD": maybe(round(rng.uniform(3, 5), 1)),
+            "RSTR_INTRCN_CONT": maybe(f"맛집 {i} 소개"), "BSNS_TM_CN": maybe("11:00~21:00"), "RESTDY_INFO_CN": maybe("월요일", 0.5),
+            "CRCMF_LDMARK_NM": maybe(rng.choice(landmarks)), "CRCMF_LDMARK_DIST": maybe(float(rng.randint(50, 3000))),
+            "PRKG_POS_YN": maybe(rng.choice("YN")), "WIFI_OFR_YN": maybe(rng.choice("YN")), "PET_ENTRN_POSBL_YN": maybe(rng.choice("YN")),
+        }
+        for menu in rng.sample(menus, rng.randint(1, 5)):
+            restaurants.append(dict(base, MENU_NM=maybe(menu, 0.02), MENU_PRICE=maybe(float(rng.randrange(5000, 50000, 500))),
+                                    MENU_CTGRY_LCLAS_NM=rng.choice(CATEGORIES), MENU_CTGRY_SCLAS_NM=maybe(rng.choice(CATEGORIES)),
+                                    MENU_DSCRN=maybe(f"{menu} 설명", 0.5)))
+            if len(restaurants) >= num_rows:
+                break
+        if len(restaurants) >= num_rows:
+            break
+
+    paths = {"attraction": directory / "attraction.csv", "7B": directory / "7B.csv", "BFTS": directory / "BFTS.csv"}
+    pd.DataFrame(attractions).to_csv(paths["attraction"], index=False)
+    # 두 식당 파일은 일부 식당이 겹침 (BFTS 쪽은 뒤 절반 + 앞쪽 일부)
+    split = len(restaurants) * 2 // 3
+    pd.DataFrame(restaurants[:split]).to_csv(paths["7B"], index=False)
+    pd.DataFrame(restaurants[split // 2:]).to_csv(paths["BFTS"], index=False, encoding="cp949", errors="replace")
+    return [("attraction", str(paths["attraction"])), ("restaurant", str(paths["7B"])), ("restaurant", str(paths["BFTS"]))]
+
+
+# --- 비교 ---
+
+def graph_differences(expected: nx.DiGraph, actual: nx.DiGraph) -> list:
+    """노드 / 엣지 순서, 속성 값과 타입, 선행 노드 순서 비교 (다른 항목 설명 목록)"""
+    def typed(attrs):
+        return [(key, value, type(value).__name__) for key, value in attrs.items()]
+
+    differences = []
+    if list(expected.nodes) != list(actual.nodes):
+        differences.append(f"노드 순서/집합 ({expected.number_of_nodes()} vs {actual.number_of_nodes()})")
+    elif any(typed(expected.nodes[node]) != typed(actual.nodes[node]) for node in expected.nodes):
+        differences.append("노드 속성")
+    expected_edges = [(u, v, typed(data)) for u, v, data in expected.edges(data=True)]
+    actual_edges = [(u, v, typed(data)) for u, v, data in actual.edges(data=True)]
+    if expected_edges != actual_edges:
+        differences.append(f"엣지 순서/속성 ({expected.number_of_edges()} vs {actual.number_of_edges()})")
+    if [list(expected.pred[node]) for node in expected.nodes] != [list(actual.pred[node]) for node in expected.nodes if node in actual]:
+        differences.append("선행 노드 순서")
+    return differences
+
+
+def pickle_size(graph: nx.DiGraph) -> float:
+    return len(pickle.dumps(graph, pickle.HIGHEST_PROTOCOL)) / 1024 / 1024
+
+
+def main(args) -> None:
+    data_dir = PROJECT_DIR
+    sources = [
+        ("attraction", str(data_dir / kg.ATTRACTION_DATA_PATH)),
+        ("restaurant", str(data_dir / kg.RESTAURANT_7B_DATA_PATH)),
+        ("restaurant", str(data_dir / kg.RESTAURANT_BFTS_DATA_PATH)),
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.synthetic or not all(os.path.exists(path) for _, path in sources):
+            sources = write_synthetic_csvs(Path(tmp), args.synthetic or 100000, args.seed)
+            print(f"합성 CSV 사용: 식당 행 {args.synthetic or 100000}개")
+
+        start = time.perf_counter()
+        legacy = legacy_build_graph(sources)
+        legacy_seconds = time.perf_counter() - start
+
+        results = []
+        for workers in args.workers:
+            start = time.perf_counter()
+            graph = kg.build_graph(sources, workers)
+            results.append((workers, time.perf_counter() - start, graph_differences(legacy, graph), pickle_size(graph)))
+
+    print("=" * 90)
+    print(f"그래프: 노드 {legacy.number_of_nodes()}개, 엣지 {legacy.number_of_edges()}개, CPU {os.cpu_count()}개")
+    print(f"{'방식':<28} {'시간(s)':>9} {'속도':>7} {'gpickle(MB)':>12}  기존 방식과 동일")
+    print(f"{'행 단위 (iterrows)':<28} {legacy_seconds:>9.2f} {1.0:>6.1f}x {pickle_size(legacy):>12.1f}")
+    for workers, seconds, differences, size in results:
+        label = f"열 단위 (workers={workers or '자동'})"
+        same = "예" if not differences else "아니오 - " + ", ".join(differences)
+        print(f"{label:<28} {seconds:>9.2f} {legacy_seconds / seconds:>6.1f}x {size:>12.1f}  {same}")
+    if args.reference:
+        with open(args.reference, "rb") as f:
+            reference = pickle.load(f)
+        differences = graph_differences(reference, graph)
+        print(f"--reference {args.reference}: " + ("동일" if not differences else "다름 - " + ", ".join(differences)))
+    print("=" * 90)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="지식 그래프 빌드 시간 / 그래프 동일성 비교")
+    parser.add_argument("--synthetic", type=int, default=0, help="합성 CSV 식당 행 수 (0이면 data/ 의 CSV, 없으면 100000)")
+    parser.add_argument("--reference", default=None, help="기존 방식으로 만든 knowledge_graph.gpickle (같은 CSV로 만든 것)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 0], help="비교할 프로세스 수 (0이면 자동)")
+    parser.add_argument("--seed", type=int, default=0, help="합성 CSV 난수 시드")
+    main(parser.parse_args())
@@ -1,9 +1,32 @@
-import pandas as pd
-import networkx as nx
+"""
+관광지 / 식당 CSV로 지식 그래프(knowledge_graph.gpickle) 생성
+
+CSV 파일(관광지, 식당 7B, 식당 BFTS)마다 프로세스 풀에서 열 단위로 노드 / 엣지 표를 만들고
+(이름 정규화는 고유값에만 pandas 문자열 연산, 중복 제거는 drop_duplicates), 메인 프로세스에서 파일 순서대로 합쳐
+add_nodes_from / add_edges_from으로 한 번에 그래프를 만듭니다.
+노드 / 엣지는 CSV 행 순서대로 처음 나온 값이 남으므로, 행마다 has_node / has_edge를 확인하며 추가하던 방식과
+노드 순서, 속성, 엣지 순서까지 같은 그래프가 만들어집니다.
+
+사용법 (ai-preprocessing 컨테이너의 /project 에서 실행):
+    python script/create_knowledge_graph.py
+    python script/create_knowledge_graph.py --workers 1
+"""
+import argparse
 import os
-import re
-import math
 import pickle
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+import ai_server  # noqa: F401
+from app.utils.compact_graph import CompactKnowledgeGraph
+from app.utils.geo_index import GEO_INDEX_DIRNAME, write_geo_index
+from app.utils.knowledge_graph_loader import build_compact_graph_snapshot
 
 # --- Configuration ---
 # 데이터 파일 경로 (컨테이너 /project 기준 상대 경로 - 볼륨 마운트 후)
@@ -16,6 +39,16 @@ GRAPH_OUTPUT_DIR = "graphdb" # /project/graphdb 에 저장
 GRAPH_OUTPUT_FILENAME = "knowledge_graph.gpickle"
 GRAPH_OUTPUT_PATH = os.path.join(GRAPH_OUTPUT_DIR, GRAPH_OUTPUT_FILENAME)
 
+# 식당 Feature 노드 이름 → CSV 컬럼 ('Y'이면 연결, 필요시 다른 Feature 추가 (예: DCRN_YN - 장애인 편의시설))
+FEATURE_COLUMNS = {
+    '주차가능': 'PRKG_POS_YN',
+    '와이파이가능': 'WIFI_OFR_YN',
+    '애견동반가능': 'PET_ENTRN_POSBL_YN',
+}
+
+# 노드 / 엣지 표: 노드는 (node_id, attrs), 엣지는 (source, target, attrs) 컬럼의 DataFrame
+Tables = Tuple[pd.DataFrame, pd.DataFrame]
+
 # --- Helper Functions ---
 
 def normalize_text(text):
@@ -27,191 +60,289 @@ def normalize_text(text):
         text = re.sub(r'[^\w\sㄱ-힣]', '', text) # 특수 문자 제거 (옵션)
     return text
 
-def safe_get(data, key, default=None):
-    """딕셔너리 또는 Series에서 안전하게 값 가져오기 (NaN 처리 포함)"""
-    val = data.get(key, default)
-    if isinstance(val, float) and math.isnan(val):
-        return default
-    if pd.isna(val):
-        return default
-    return val
-
-def add_node_if_not_exists(graph, node_id, **attrs):
-    """그래프에 노드가 없으면 추가"""
-    if not graph.has_node(node_id):
-        graph.add_node(node_id, **attrs)
-        # print(f"Added node: {node_id} ({attrs.get('type', '')})") # 로그 출력 필요시 활성화
-    # else:
-        # print(f"Node already exists: {node_id}") # 로그 출력 필요시 활성화
-
-
-def add_edge_if_not_exists(graph, u_of_edge, v_of_edge, **attrs):
-    """그래프에 엣지가 없으면 추가"""
-    if not graph.has_edge(u_of_edge, v_of_edge):
-        graph.add_edge(u_of_edge, v_of_edge, **attrs)
-        # print(f"Added edge: {u_of_edge} -> {v_of_edge} ({attrs.get('type', '')})") # 로그 출력 필요시 활성화
-    # else:
-        # print(f"Edge already exists: {u_of_edge} -> {v_of_edge}") # 로그 출력 필요시 활성화
 
-# --- Main Script ---
+def map_unique(values: pd.Series, transform) -> pd.Series:
+    """고유값에만 transform(Series → Series)을 적용하여 행으로 펼침 (지역 / 메뉴 / 랜드마크 이름은 행마다 반복됨, 결측은 None)"""
+    codes, uniques = pd.factorize(values)
+    mapped = transform(pd.Series(uniques, dtype=object)).astype(object).tolist()
+    return pd.Series(np.asarray(mapped + [None], dtype=object)[codes], index=values.index, dtype=object)
 
-print("Knowledge Graph 생성 시작...")
 
-# 그래프 객체 생성 (방향성 그래프)
-G = nx.DiGraph()
+def _normalize_unique(values: pd.Series) -> pd.Series:
+    is_text = values.map(lambda value: isinstance(value, str)).astype(bool)
+    normalized = (
+        values.where(is_text).str.strip().str.lower()
+        .str.replace(r'\s+', '', regex=True)
+        .str.replace(r'[^\w\sㄱ-힣]', '', regex=True)
+    )
+    return normalized.where(is_text, values)
 
-# 1. 관광지 데이터 처리
-print(f"관광지 데이터 로딩: {ATTRACTION_DATA_PATH}")
-try:
-    # 다양한 인코딩 시도
+
+def normalize_column(values: pd.Series) -> pd.Series:
+    """normalize_text의 열 단위 버전 (문자열이 아닌 값은 그대로 둠)"""
+    return map_unique(values, _normalize_unique)
+
+
+def _strip_city(values: pd.Series) -> pd.Series:
+    is_text = values.map(lambda value: isinstance(value, str)).astype(bool)
+    return values.where(is_text).str.replace('부산광역시', '', regex=False).str.strip().where(is_text, None)
+
+
+def column(df: pd.DataFrame, key: str) -> pd.Series:
+    """CSV 컬럼 값 (파이썬 객체, NaN은 None, 컬럼이 없으면 모두 None)"""
+    if key not in df:
+        return pd.Series([None] * len(df), index=df.index, dtype=object)
+    values = df[key].astype(object)
+    return values.where(df[key].notna(), None)
+
+
+def read_csv(file_path: str) -> pd.DataFrame:
+    """다양한 인코딩 시도"""
     try:
-        attraction_df = pd.read_csv(ATTRACTION_DATA_PATH, encoding='utf-8')
+        return pd.read_csv(file_path, encoding='utf-8', low_memory=False)
     except UnicodeDecodeError:
-        attraction_df = pd.read_csv(ATTRACTION_DATA_PATH, encoding='cp949')
-
-    print(f"관광지 데이터 {len(attraction_df)}개 처리 시작...")
-    for index, row in attraction_df.iterrows():
-        # 노드 ID 정의
-        attraction_id = f"attraction_{safe_get(row, 'UC_SEQ')}"
-        area_name = normalize_text(safe_get(row, 'GUGUN_NM'))
-        area_id = f"area_{area_name}" if area_name else None
-
-        # Attraction 노드 추가
-        add_node_if_not_exists(G, attraction_id,
-                               type='Attraction',
-                               name=safe_get(row, 'MAIN_TITLE'),
-                               address=safe_get(row, 'ADDR1'),
-                               latitude=safe_get(row, 'LAT'),
-                               longitude=safe_get(row, 'LNG'),
-                               description=safe_get(row, 'ITEMCNTNTS'),
-                               contact=safe_get(row, 'CNTCT_TEL'),
-                               traffic_info=safe_get(row, 'TRFC_INFO'))
-
-        # Area 노드 추가 및 엣지 연결
-        if area_id:
-            add_node_if_not_exists(G, area_id, type='Area', name=area_name)
-            add_edge_if_not_exists(G, attraction_id, area_id, type='LOCATED_IN')
-
-        # (향후 확장) Feature, Landmark 노드 및 엣지 추가 로직
-        # 예: ITEMCNTNTS 파싱하여 관련 정보 추출
-
-    print("관광지 데이터 처리 완료.")
-
-except FileNotFoundError:
-    print(f"오류: 관광지 데이터 파일을 찾을 수 없습니다 - {ATTRACTION_DATA_PATH}")
-except Exception as e:
-    print(f"오류: 관광지 데이터 처리 중 예외 발생 - {e}")
-
-
-# 2. 식당 데이터 처리 (공통 함수)
-def process_restaurant_data(graph, file_path):
-    print(f"식당 데이터 로딩: {file_path}")
-    try:
-        # 다양한 인코딩 시도
-        try:
-            df = pd.read_csv(file_path, encoding='utf-8', low_memory=False)
-        except UnicodeDecodeError:
-            df = pd.read_csv(file_path, encoding='cp949', low_memory=False)
-
-        print(f"식당 데이터 {len(df)}개 처리 시작...")
-        for index, row in df.iterrows():
-            # 기본 정보 추출 및 ID 정의
-            rstr_id_val = safe_get(row, 'RSTR_ID')
-            if rstr_id_val is None: continue # 식당 ID 없으면 건너뛰기
-            restaurant_id = f"restaurant_{int(rstr_id_val)}" # ID는 정수형으로 변환 후 사용
-
-            raw_area_name = safe_get(row, 'AREA_NM')
-            # '부산광역시 ' 제거 및 정규화
-            cleaned_area_name = raw_area_name.replace('부산광역시', '').strip() if isinstance(raw_area_name, str) else None
-            normalized_area_name = normalize_text(cleaned_area_name)
-            area_id = f"area_{normalized_area_name}" if normalized_area_name else None
-
-            raw_menu_name = safe_get(row, 'MENU_NM')
-            normalized_menu_name = normalize_text(raw_menu_name)
-            menu_id = f"menu_{normalized_menu_name}" if normalized_menu_name else None
-
-            raw_landmark_name = safe_get(row, 'CRCMF_LDMARK_NM')
-            normalized_landmark_name = normalize_text(raw_landmark_name)
-            landmark_id = f"landmark_{normalized_landmark_name}" if normalized_landmark_name else None
-
-            # Restaurant 노드 추가
-            add_node_if_not_exists(graph, restaurant_id,
-                                   type='Restaurant',
-                                   name=safe_get(row, 'RSTR_NM'),
-                                   address=safe_get(row, 'RSTR_RDNMADR'),
-                                   category=safe_get(row, 'BSNS_STATM_BZCND_NM'),
-                                   rating=safe_get(row, 'NAVER_GRAD'),
-                                   description=safe_get(row, 'RSTR_INTRCN_CONT'),
-                                   hours=safe_get(row, 'BSNS_TM_CN'),
-                                   closed_days=safe_get(row, 'RESTDY_INFO_CN'))
-
-            # Area 노드 추가 및 엣지 연결
-            if area_id:
-                add_node_if_not_exists(graph, area_id, type='Area', name=cleaned_area_name) # 정규화 전 이름 저장
-                add_edge_if_not_exists(graph, restaurant_id, area_id, type='LOCATED_IN')
-
-            # Menu 노드 추가 및 엣지 연결
-            if menu_id:
-                add_node_if_not_exists(graph, menu_id,
-                                       type='Menu',
-                                       name=raw_menu_name, # 정규화 전 이름 저장
-                                       category=safe_get(row, 'MENU_CTGRY_LCLAS_NM'),
-                                       sub_category=safe_get(row, 'MENU_CTGRY_SCLAS_NM'),
-                                       description=safe_get(row, 'MENU_DSCRN'))
-                add_edge_if_not_exists(graph, restaurant_id, menu_id,
-                                       type='SERVES_MENU',
-                                       price=safe_get(row, 'MENU_PRICE'))
-
-            # Landmark 노드 추가 및 엣지 연결
-            if landmark_id:
-                add_node_if_not_exists(graph, landmark_id, type='Landmark', name=raw_landmark_name) # 정규화 전 이름 저장
-                add_edge_if_not_exists(graph, restaurant_id, landmark_id,
-                                       type='NEARBY_LANDMARK',
-                                       distance=safe_get(row, 'CRCMF_LDMARK_DIST'))
-
-            # Feature 노드 추가 및 엣지 연결
-            features = {
-                '주차가능': safe_get(row, 'PRKG_POS_YN') == 'Y',
-                '와이파이가능': safe_get(row, 'WIFI_OFR_YN') == 'Y',
-                '애견동반가능': safe_get(row, 'PET_ENTRN_POSBL_YN') == 'Y',
-                # 필요시 다른 Feature 추가 (예: DCRN_YN - 장애인 편의시설)
-            }
-            for feature_name, has_feature in features.items():
-                if has_feature:
-                    feature_id = f"feature_{normalize_text(feature_name)}"
-                    add_node_if_not_exists(graph, feature_id, type='Feature', name=feature_name)
-                    add_edge_if_not_exists(graph, restaurant_id, feature_id, type='HAS_FEATURE')
-
-        print(f"{os.path.basename(file_path)} 처리 완료.")
+        return pd.read_csv(file_path, encoding='cp949', low_memory=False)
+
 
+def make_ids(prefix: str, values: pd.Series) -> pd.Series:
+    """f"{prefix}{value}" 형식의 노드 ID"""
+    return prefix + values.map(str)
+
+
+def attribute_records(index: pd.Index, attrs: dict) -> list:
+    """index 행의 속성 사전 목록 (attrs 순서, 상수 값은 모든 행이 같은 객체를 공유)"""
+    columns = [value.loc[index].tolist() if isinstance(value, pd.Series) else [value] * len(index) for value in attrs.values()]
+    return [dict(zip(attrs, values)) for values in zip(*columns)]
+
+
+def node_table(row: pd.Series, slot: int, node_ids: pd.Series, attrs: dict) -> pd.DataFrame:
+    """
+    한 종류 노드의 표 (같은 ID는 처음 나온 행만 유지).
+
+    Args:
+        row (pd.Series): CSV 행 순서
+        slot (int): 한 행 안에서 노드를 추가하는 순서
+        node_ids (pd.Series): 노드 ID
+        attrs (dict): 속성 이름 → 값(Series 또는 상수). 사전 순서가 노드 속성 순서
+    """
+    frame = pd.DataFrame({'row': row, 'node_id': node_ids}).drop_duplicates('node_id')
+    frame['slot'] = slot
+    frame['attrs'] = attribute_records(frame.index, attrs)
+    return frame
+
+
+def edge_table(row: pd.Series, slot: int, sources: pd.Series, targets: pd.Series, attrs: dict) -> pd.DataFrame:
+    """한 종류 엣지의 표 (같은 (source, target)은 처음 나온 행만 유지, 인자는 node_table과 같음)"""
+    frame = pd.DataFrame({'row': row, 'source': sources, 'target': targets}).drop_duplicates(['source', 'target'])
+    frame['slot'] = slot
+    frame['attrs'] = attribute_records(frame.index, attrs)
+    return frame
+
+
+def ordered(frames: List[pd.DataFrame], key: List[str]) -> pd.DataFrame:
+    """(행 순서, 행 안의 추가 순서)로 정렬하고 같은 키는 처음 나온 것만 유지"""
+    frames = [frame for frame in frames if len(frame)]
+    if not frames:
+        return pd.DataFrame(columns=key + ['attrs'])
+    merged = pd.concat(frames, ignore_index=True).sort_values(['row', 'slot'], kind='stable')
+    return merged.drop_duplicates(key)[key + ['attrs']].reset_index(drop=True)
+
+
+def valid_ids(normalized: pd.Series) -> pd.Series:
+    """정규화한 이름이 비어 있지 않은 행 (None / 빈 문자열 제외)"""
+    return normalized.map(bool).astype(bool)
+
+
+# --- Tables ---
+
+def attraction_tables(df: pd.DataFrame) -> Tables:
+    """관광지 CSV → 노드 / 엣지 표"""
+    row = pd.Series(range(len(df)), index=df.index)
+    attraction_ids = make_ids('attraction_', column(df, 'UC_SEQ'))
+    area_names = normalize_column(column(df, 'GUGUN_NM'))
+    has_area = valid_ids(area_names)
+    area_ids = make_ids('area_', area_names[has_area])
+
+    nodes = [
+        node_table(row, 0, attraction_ids, {
+            'type': 'Attraction',
+            'name': column(df, 'MAIN_TITLE'),
+            'address': column(df, 'ADDR1'),
+            'latitude': column(df, 'LAT'),
+            'longitude': column(df, 'LNG'),
+            'description': column(df, 'ITEMCNTNTS'),
+            'contact': column(df, 'CNTCT_TEL'),
+            'traffic_info': column(df, 'TRFC_INFO'),
+        }),
+        node_table(row[has_area], 1, area_ids, {'type': 'Area', 'name': area_names[has_area]}),
+    ]
+    edges = [edge_table(row[has_area], 0, attraction_ids[has_area], area_ids, {'type': 'LOCATED_IN'})]
+    # (향후 확장) Feature, Landmark 노드 및 엣지 추가 로직
+    # 예: ITEMCNTNTS 파싱하여 관련 정보 추출
+    return ordered(nodes, ['node_id']), ordered(edges, ['source', 'target'])
+
+
+def restaurant_tables(df: pd.DataFrame) -> Tables:
+    """식당 CSV → 노드 / 엣지 표 (식당 ID가 없는 행은 건너뜀)"""
+    rstr_ids = pd.to_numeric(column(df, 'RSTR_ID'), errors='coerce')
+    keep = rstr_ids.notna()
+    df = df[keep]
+    row = pd.Series(range(len(keep)), index=keep.index)[keep]
+    # ID는 정수형으로 변환 후 사용
+    restaurant_ids = make_ids('restaurant_', rstr_ids[keep].astype('int64'))
+
+    # '부산광역시 ' 제거 및 정규화 (노드 이름은 정규화 전 이름 저장)
+    cleaned_area_names = map_unique(column(df, 'AREA_NM'), _strip_city)
+    normalized_area_names = normalize_column(cleaned_area_names)
+    has_area = valid_ids(normalized_area_names)
+    area_ids = make_ids('area_', normalized_area_names[has_area])
+
+    raw_menu_names = column(df, 'MENU_NM')
+    normalized_menu_names = normalize_column(raw_menu_names)
+    has_menu = valid_ids(normalized_menu_names)
+    menu_ids = make_ids('menu_', normalized_menu_names[has_menu])
+
+    raw_landmark_names = column(df, 'CRCMF_LDMARK_NM')
+    normalized_landmark_names = normalize_column(raw_landmark_names)
+    has_landmark = valid_ids(normalized_landmark_names)
+    landmark_ids = make_ids('landmark_', normalized_landmark_names[has_landmark])
+
+    # 한 행 안에서는 식당 → 지역 → 메뉴 → 랜드마크 → 특징 순서로 추가
+    nodes = [
+        node_table(row, 0, restaurant_ids, {
+            'type': 'Restaurant',
+            'name': column(df, 'RSTR_NM'),
+            'address': column(df, 'RSTR_RDNMADR'),
+            'latitude': column(df, 'RSTR_LA'),
+            'longitude': column(df, 'RSTR_LO'),
+            'category': column(df, 'BSNS_STATM_BZCND_NM'),
+            'rating': column(df, 'NAVER_GRAD'),
+            'description': column(df, 'RSTR_INTRCN_CONT'),
+            'hours': column(df, 'BSNS_TM_CN'),
+            'closed_days': column(df, 'RESTDY_INFO_CN'),
+        }),
+        node_table(row[has_area], 1, area_ids, {'type': 'Area', 'name': cleaned_area_names[has_area]}),
+        node_table(row[has_menu], 2, menu_ids, {
+            'type': 'Menu',
+            'name': raw_menu_names[has_menu],
+            'category': column(df, 'MENU_CTGRY_LCLAS_NM'),
+            'sub_category': column(df, 'MENU_CTGRY_SCLAS_NM'),
+            'description': column(df, 'MENU_DSCRN'),
+        }),
+        node_table(row[has_landmark], 3, landmark_ids, {'type': 'Landmark', 'name': raw_landmark_names[has_landmark]}),
+    ]
+    edges = [
+        edge_table(row[has_area], 0, restaurant_ids[has_area], area_ids, {'type': 'LOCATED_IN'}),
+        edge_table(row[has_menu], 1, restaurant_ids[has_menu], menu_ids, {'type': 'SERVES_MENU', 'price': column(df, 'MENU_PRICE')}),
+        edge_table(row[has_landmark], 2, restaurant_ids[has_landmark], landmark_ids, {'type': 'NEARBY_LANDMARK', 'distance': column(df, 'CRCMF_LDMARK_DIST')}),
+    ]
+    for offset, (feature_name, feature_column) in enumerate(FEATURE_COLUMNS.items()):
+        has_feature = column(df, feature_column) == 'Y'
+        feature_id = f"feature_{normalize_text(feature_name)}"
+        feature_ids = pd.Series(feature_id, index=df.index)[has_feature]
+        nodes.append(node_table(row[has_feature], 4 + offset, feature_ids, {'type': 'Feature', 'name': feature_name}))
+        edges.append(edge_table(row[has_feature], 3 + offset, restaurant_ids[has_feature], feature_ids, {'type': 'HAS_FEATURE'}))
+    return ordered(nodes, ['node_id']), ordered(edges, ['source', 'target'])
+
+
+def load_source_tables(kind: str, file_path: str) -> Optional[Tables]:
+    """CSV 파일 하나의 노드 / 엣지 표 (프로세스 풀 작업 단위, 실패하면 None)"""
+    label = '관광지' if kind == 'attraction' else '식당'
+    print(f"{label} 데이터 로딩: {file_path}")
+    try:
+        df = read_csv(file_path)
+        print(f"{label} 데이터 {len(df)}개 처리 시작...")
+        tables = attraction_tables(df) if kind == 'attraction' else restaurant_tables(df)
+        print(f"{os.path.basename(file_path)} 처리 완료. (노드 {len(tables[0])}개, 엣지 {len(tables[1])}개)")
+        return tables
     except FileNotFoundError:
-        print(f"오류: 식당 데이터 파일을 찾을 수 없습니다 - {file_path}")
+        print(f"오류: {label} 데이터 파일을 찾을 수 없습니다 - {file_path}")
     except Exception as e:
-        print(f"오류: 식당 데이터 처리 중 예외 발생 ({os.path.basename(file_path)}) - {e}")
+        print(f"오류: {label} 데이터 처리 중 예외 발생 ({os.path.basename(file_path)}) - {e}")
+    return None
 
 
-# 식당 데이터 파일 처리 실행
-process_restaurant_data(G, RESTAURANT_7B_DATA_PATH)
-process_restaurant_data(G, RESTAURANT_BFTS_DATA_PATH)
+def build_graph(sources: List[Tuple[str, str]], workers: int = 0) -> nx.DiGraph:
+    """
+    CSV 파일들로 지식 그래프를 만듭니다. 파일은 프로세스 풀에서 병렬로 읽고, 결과는 sources 순서로 합칩니다.
+    (먼저 나온 파일 / 행의 노드 / 엣지 속성이 남음)
 
+    Args:
+        sources (List[Tuple[str, str]]): ("attraction" 또는 "restaurant", CSV 경로) 목록
+        workers (int): 프로세스 수 (0이면 파일 수와 CPU 수 중 작은 값, 1이면 현재 프로세스에서 처리)
 
-# 3. 그래프 저장
-print("그래프 파일 저장 시작...")
-try:
-    # 저장 디렉토리 생성 (없으면)
-    os.makedirs(GRAPH_OUTPUT_DIR, exist_ok=True)
-    # nx.write_gpickle(G, GRAPH_OUTPUT_PATH) # 제거된 함수
+    Returns:
+        nx.DiGraph: 지식 그래프
+    """
+    workers = workers or min(len(sources), os.cpu_count() or 1)
+    if workers <= 1:
+        results = [load_source_tables(kind, path) for kind, path in sources]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(load_source_tables, *zip(*sources)))
+
+    node_frames = [tables[0] for tables in results if tables is not None]
+    edge_frames = [tables[1] for tables in results if tables is not None]
+    graph = nx.DiGraph()
+    if node_frames:
+        nodes = pd.concat(node_frames, ignore_index=True).drop_duplicates('node_id')
+        graph.add_nodes_from(zip(nodes['node_id'], nodes['attrs']))
+    if edge_frames:
+        edges = pd.concat(edge_frames, ignore_index=True).drop_duplicates(['source', 'target'])
+        graph.add_edges_from(zip(edges['source'], edges['target'], edges['attrs']))
+    return graph
+
+
+def save_graph(graph: nx.DiGraph, graph_path: str = GRAPH_OUTPUT_PATH) -> None:
     """
-    - NetworkX 3.0 이상에서는 그래프 객체를 파일로 저장하고 읽기 위해 Python의 내장 pickle 모듈을 사용
-        - 저장 : nx.write_gpickle(G, path) 대신 pickle.dump(G, open(path, 'wb')) 사용
-        - 읽기 : nx.read_gpickle(path) 대신 pickle.load(open(path, 'rb')) 사용
+    gpickle과, ai-server가 언피클 없이 mmap으로 여는 CSR 스냅샷(graphdb/knowledge_graph)과
+    관광지 / 식당 좌표 색인(graphdb/knowledge_graph/geo)을 저장합니다.
+    스냅샷은 ai-server의 knowledge_graph_loader / geo_index 구현으로 저장하므로, 서버는 스냅샷이 없거나
+    gpickle과 맞지 않을 때만 첫 로드에서 다시 만듭니다.
     """
-    with open(GRAPH_OUTPUT_PATH, 'wb') as f:
-        pickle.dump(G, f, pickle.HIGHEST_PROTOCOL)
-    print(f"그래프 저장 완료: {GRAPH_OUTPUT_PATH}")
-    print(f"  - 노드 수: {G.number_of_nodes()}")
-    print(f"  - 엣지 수: {G.number_of_edges()}")
-except Exception as e:
-    print(f"오류: 그래프 파일 저장 중 예외 발생 - {e}")
-
-print("Knowledge Graph 생성 완료.")
+    print("그래프 파일 저장 시작...")
+    try:
+        # 저장 디렉토리 생성 (없으면)
+        os.makedirs(os.path.dirname(graph_path) or ".", exist_ok=True)
+        # nx.write_gpickle(G, GRAPH_OUTPUT_PATH) # 제거된 함수
+        """
+        - NetworkX 3.0 이상에서는 그래프 객체를 파일로 저장하고 읽기 위해 Python의 내장 pickle 모듈을 사용
+            - 저장 : nx.write_gpickle(G, path) 대신 pickle.dump(G, open(path, 'wb')) 사용
+            - 읽기 : nx.read_gpickle(path) 대신 pickle.load(open(path, 'rb')) 사용
+        """
+        with open(graph_path, 'wb') as f:
+            pickle.dump(graph, f, pickle.HIGHEST_PROTOCOL)
+        print(f"그래프 저장 완료: {graph_path}")
+        print(f"  - 노드 수: {graph.number_of_nodes()}")
+        print(f"  - 엣지 수: {graph.number_of_edges()}")
+    except Exception as e:
+        print(f"오류: 그래프 파일 저장 중 예외 발생 - {e}")
+        return
+
+    try:
+        compact_path = build_compact_graph_snapshot(Path(graph_path), graph)
+        print(f"CSR 지식 그래프 스냅샷 저장 완료: {compact_path}")
+        compact_graph = CompactKnowledgeGraph(compact_path)
+        write_geo_index(compact_graph.directory / GEO_INDEX_DIRNAME, compact_graph)
+        print(f"좌표 색인 저장 완료: {compact_path / GEO_INDEX_DIRNAME}")
+    except Exception as e:
+        print(f"CSR 지식 그래프 스냅샷 / 좌표 색인 저장 실패 (ai-server가 첫 로드 때 다시 만듭니다): {e}")
+
+
+# --- Main Script ---
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="관광지 / 식당 CSV로 지식 그래프 생성")
+    parser.add_argument("--workers", type=int, default=0, help="CSV 파일을 병렬로 처리할 프로세스 수 (0이면 자동, 1이면 병렬 처리 안 함)")
+    args = parser.parse_args()
+
+    print("Knowledge Graph 생성 시작...")
+    start = time.perf_counter()
+    G = build_graph([
+        ("attraction", ATTRACTION_DATA_PATH),
+        ("restaurant", RESTAURANT_7B_DATA_PATH),
+        ("restaurant", RESTAURANT_BFTS_DATA_PATH),
+    ], args.workers)
+    print(f"그래프 생성 완료 ({time.perf_counter() - start:.2f}s)")
+    save_graph(G)
+    print("Knowledge Graph 생성 완료.")
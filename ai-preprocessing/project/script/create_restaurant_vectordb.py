@@ -1,13 +1,16 @@
+import argparse
 import os
-import sys
 from tqdm import tqdm
 from pathlib import Path
 from dotenv import load_dotenv
 from langchain_community.document_loaders.csv_loader import CSVLoader
 from langchain_community.vectorstores import FAISS
-from langchain_openai import OpenAIEmbeddings
 from langchain.schema import Document
 import pandas as pd
+import ai_server  # noqa: F401
+from app.utils.embeddings import EMBEDDING_PROVIDERS, create_embeddings, describe_embeddings, read_index_meta, write_index_meta
+from app.utils.vectordb import assign_document_ids, build_keyword_index, write_docstore_snapshot
+from faiss_index_builder import INDEX_TYPES, DEFAULT_TRAIN_SIZE, convert_vectorstore_index, to_flat_index
 
 # 환경변수 로드
 load_dotenv()
@@ -54,8 +57,20 @@ def prepare_restaurant_documents(docs):
     return restaurant_docs
 
 
-def create_vectordb(data_path: str | Path, index_name: str, encoding: str = "utf-8") -> None:
-    """벡터 DB를 생성하고 저장"""
+def create_vectordb(
+    data_path: str | Path,
+    index_name: str,
+    encoding: str = "utf-8",
+    embedding_provider: str = "openai",
+    embedding_model: str | None = None,
+    embedding_dim: int | None = None,
+    index_type: str = "flat",
+    index_options: dict | None = None,
+) -> None:
+    """
+    벡터 DB를 생성하고 사용한 임베딩 정보와 인덱스 종류를 index_meta.json에 함께 저장
+    index_type이 flat이 아니면 모든 문서를 추가한 뒤 근사 인덱스(ivf_flat, ivf_pq, hnsw)로 변환합니다.
+    """
     project_root = Path(__file__).parent.parent
     data_path = project_root / data_path
 
@@ -65,14 +80,25 @@ def create_vectordb(data_path: str | Path, index_name: str, encoding: str = "utf
     vectordb_path = project_root / "vectordb" / index_name
     vectordb_path.parent.mkdir(exist_ok=True, parents=True)
 
-    # 기존 벡터DB 로드 (이미 있는 경우)
-    embeddings = OpenAIEmbeddings()
+    embeddings = create_embeddings(embedding_provider, embedding_model, embedding_dim)
+    embedding_info = describe_embeddings(embedding_provider, embeddings, embedding_dim)
     vectorstore = None
 
+    # 기존 벡터DB 로드 (이미 있는 경우). 다른 임베딩으로 만든 벡터와는 병합할 수 없음
     if vectordb_path.exists():
+        recorded = (read_index_meta(vectordb_path) or {}).get("embedding")
+        if recorded is None and embedding_provider != "openai":
+            raise ValueError(f"{vectordb_path}는 OpenAI 임베딩으로 만든 기존 벡터DB입니다. 다른 이름을 사용하세요.")
+        if recorded is not None and (recorded["provider"], recorded.get("model")) != (embedding_info["provider"], embedding_info["model"]):
+            raise ValueError(
+                f"{vectordb_path}는 {recorded['provider']}/{recorded.get('model')} 임베딩으로 만들어졌습니다. "
+                f"{embedding_info['provider']}/{embedding_info['model']} 임베딩과 병합할 수 없습니다."
+            )
         print("기존 벡터DB를 로드합니다...")
         try:
             vectorstore = FAISS.load_local(str(vectordb_path), embeddings, allow_dangerous_deserialization=True)
+            # 근사 인덱스에는 merge_from으로 문서를 추가할 수 없으므로 평면 인덱스로 되돌린 뒤 마지막에 다시 변환
+            vectorstore.index = to_flat_index(vectorstore.index)
         except Exception as e:
             print(f"벡터DB 로드 실패: {e}")
             vectorstore = None
@@ -97,7 +123,7 @@ def create_vectordb(data_path: str | Path, index_name: str, encoding: str = "utf
 
         # FAISS 벡터DB 생성
         new_vectorstore = FAISS.from_documents(
-            documents=processed_docs, embedding=OpenAIEmbeddings()
+            documents=processed_docs, embedding=embeddings
         )
         # new_vectorstore = FAISS.from_embeddings(
         #     texts=[doc.page_content for doc, _ in embedded_documents],  # ✅ 문서 텍스트 추가
@@ -117,20 +143,53 @@ def create_vectordb(data_path: str | Path, index_name: str, encoding: str = "utf
 
     # 벡터DB 저장
     if vectorstore:
+        # 병합이 끝난 최종 벡터 위치를 정수 문서 ID(metadata["doc_id"])로 기록 (merge_from 후 위치가 바뀌므로 저장 직전)
+        assign_document_ids(vectorstore)
+        index_info = convert_vectorstore_index(vectorstore, index_type, **(index_options or {}))
         vectorstore.save_local(str(vectordb_path))
-        print(f"벡터 DB 저장 완료: {vectordb_path}")
+        print(f"벡터 DB 저장 완료: {vectordb_path} ({index_info['factory']})")
+
+        # ai-server가 같은 임베딩으로 쿼리를 만들고 불일치를 거부할 수 있도록 임베딩 정보와 인덱스 종류 기록
+        embedding_info["dim"] = embedding_info["dim"] or vectorstore.index.d
+        write_index_meta(
+            vectordb_path,
+            {"embedding": embedding_info, "index": index_info, "num_vectors": vectorstore.index.ntotal},
+        )
+
+        # ai-server가 시작 시 BM25 인덱스를 다시 만들지 않도록 키워드 인덱스 스냅샷도 함께 저장 (ai-server와 같은 구현)
+        build_keyword_index(vectordb_path, vectorstore)
+        # 워커들이 index.pkl을 언피클하지 않고 mmap으로 문서를 공유하도록 docstore 스냅샷도 저장
+        write_docstore_snapshot(vectordb_path, vectorstore)
     else:
         print("⚠️ 벡터DB 저장할 데이터가 없습니다!")
 
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("⚠️ 파일 이름을 입력해주세요")
-        exit(1)
-    if len(sys.argv) < 3:
-        print("⚠️ 저장될 벡터저장소 이름을 입력해주세요")
-        exit(1)
-    
-    data_path = sys.argv[1]
-    index_name = sys.argv[2]
-    create_vectordb(data_path=data_path, index_name=index_name)
+    parser = argparse.ArgumentParser(description="식당 CSV로 FAISS 벡터 DB 생성")
+    parser.add_argument("data_path", help="project 기준 CSV 파일 경로")
+    parser.add_argument("index_name", help="저장될 벡터저장소 이름")
+    parser.add_argument("--embedding-provider", default="openai", choices=EMBEDDING_PROVIDERS, help="임베딩 제공자")
+    parser.add_argument("--embedding-model", default=None, help="임베딩 모델 이름 (기본값: 제공자 기본 모델)")
+    parser.add_argument("--embedding-dim", type=int, default=None, help="hashing 임베딩 차원 (기본값: 384)")
+    parser.add_argument("--index-type", default="flat", choices=INDEX_TYPES, help="FAISS 인덱스 종류")
+    parser.add_argument("--nlist", type=int, default=None, help="IVF 클러스터 수 (기본값: 약 4*sqrt(N))")
+    parser.add_argument("--pq-m", type=int, default=None, help="IVF-PQ 부분 공간 수 (기본값: 차원에 맞춰 최대 64)")
+    parser.add_argument("--hnsw-m", type=int, default=32, help="HNSW 노드당 연결 수")
+    parser.add_argument("--train-size", type=int, default=DEFAULT_TRAIN_SIZE, help="IVF 학습 샘플 최대 벡터 수")
+    args = parser.parse_args()
+
+    index_options = {"train_size": args.train_size}
+    if args.index_type in ("ivf_flat", "ivf_pq"):
+        index_options.update(nlist=args.nlist, pq_m=args.pq_m if args.index_type == "ivf_pq" else None)
+    if args.index_type == "hnsw":
+        index_options["hnsw_m"] = args.hnsw_m
+
+    create_vectordb(
+        data_path=args.data_path,
+        index_name=args.index_name,
+        embedding_provider=args.embedding_provider,
+        embedding_model=args.embedding_model,
+        embedding_dim=args.embedding_dim,
+        index_type=args.index_type,
+        index_options=index_options,
+    )
@@ -0,0 +1,159 @@
+"""
+근사 FAISS 인덱스(IVF-Flat, IVF-PQ, HNSW) 생성
+
+FAISS.from_documents가 만드는 평면(Flat) 인덱스는 쿼리마다 전체 벡터를 비교하므로 문서 수에 비례해 느려집니다.
+평면 인덱스의 벡터를 꺼내 지정한 종류의 인덱스를 학습(샘플)하고 같은 순서로 다시 추가하므로
+index_to_docstore_id(벡터 위치 → 문서) 매핑은 그대로 유지됩니다.
+인덱스 종류와 기본 검색 파라미터는 index_meta.json의 "index" 항목에 기록되며,
+ai-server는 로드 시 FAISS_NPROBE / FAISS_EF_SEARCH 설정(없으면 기록된 기본값)을 적용합니다.
+"""
+import math
+import time
+
+import faiss
+import numpy as np
+
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw")
+
+DEFAULT_TRAIN_SIZE = 50000
+DEFAULT_NPROBE = 16
+DEFAULT_HNSW_M = 32
+DEFAULT_EF_CONSTRUCTION = 80
+DEFAULT_EF_SEARCH = 64
+
+
+def default_nlist(num_vectors: int) -> int:
+    """IVF 클러스터 수: 약 4*sqrt(N), 클러스터당 학습 벡터가 39개 이상 되도록 제한"""
+    return max(1, min(int(4 * math.sqrt(num_vectors)), num_vectors // 39))
+
+
+def default_pq_m(dim: int) -> int:
+    """PQ 부분 공간 수: dim의 약수 중 64 이하이면서 부분 공간당 4차원 이상인 가장 큰 값"""
+    return max(m for m in range(1, min(64, max(1, dim // 4)) + 1) if dim % m == 0)
+
+
+def index_spec(
+    index_type: str,
+    dim: int,
+    num_vectors: int,
+    nlist: int | None = None,
+    pq_m: int | None = None,
+    hnsw_m: int = DEFAULT_HNSW_M,
+) -> dict:
+    """
+    인덱스 종류와 벡터 수로 faiss.index_factory 문자열과 파라미터를 정합니다.
+
+    Returns:
+        dict: {"type", "factory", 종류별 파라미터, 기본 검색 파라미터}
+    """
+    if index_type == "flat":
+        return {"type": "flat", "factory": "Flat"}
+    if index_type == "hnsw":
+        return {
+            "type": "hnsw",
+            "factory": f"HNSW{hnsw_m},Flat",
+            "hnsw_m": hnsw_m,
+            "ef_construction": DEFAULT_EF_CONSTRUCTION,
+            "ef_search": DEFAULT_EF_SEARCH,
+        }
+    nlist = nlist or default_nlist(num_vectors)
+    spec = {"type": index_type, "nlist": nlist, "nprobe": min(DEFAULT_NPROBE, nlist)}
+    if index_type == "ivf_flat":
+        spec["factory"] = f"IVF{nlist},Flat"
+        return spec
+    if index_type == "ivf_pq":
+        pq_m = pq_m or default_pq_m(dim)
+        if dim % pq_m:
+            raise ValueError(f"PQ 부분 공간 수({pq_m})는 벡터 차원({dim})의 약수여야 합니다.")
+        # 코드북 학습에는 2^nbits개 이상의 벡터가 필요하므로 작은 코퍼스에서는 비트 수를 줄임
+        nbits = max(1, min(8, int(math.log2(max(2, num_vectors)))))
+        spec.update({"factory": f"IVF{nlist},PQ{pq_m}x{nbits}", "pq_m": pq_m, "pq_nbits": nbits})
+        return spec
+    raise ValueError(f"지원하지 않는 인덱스 종류입니다: {index_type} (가능: {', '.join(INDEX_TYPES)})")
+
+
+def extract_vectors(index) -> np.ndarray:
+    """
+    인덱스의 모든 벡터를 추가된 순서대로 꺼냅니다.
+    평면/HNSW는 그대로, IVF-Flat은 direct map을 만든 뒤 복원합니다. IVF-PQ는 손실 압축이라 복원할 수 없습니다.
+    """
+    if index.ntotal == 0:
+        return np.zeros((0, index.d), dtype=np.float32)
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        if not isinstance(faiss.downcast_index(ivf), faiss.IndexIVFFlat):
+            raise ValueError("IVF-PQ 인덱스는 원본 벡터를 복원할 수 없습니다. 원본 데이터로 다시 생성하세요.")
+        ivf.make_direct_map()
+    return index.reconstruct_n(0, index.ntotal)
+
+
+def to_flat_index(index):
+    """기존 인덱스에 문서를 추가(merge_from)할 수 있도록 평면 인덱스로 되돌립니다."""
+    if isinstance(index, faiss.IndexFlat):
+        return index
+    # langchain FAISS가 만드는 새 인덱스(IndexFlatL2/IP)와 같은 클래스여야 merge_from이 가능함
+    flat = faiss.IndexFlatIP(index.d) if index.metric_type == faiss.METRIC_INNER_PRODUCT else faiss.IndexFlatL2(index.d)
+    flat.add(extract_vectors(index))
+    return flat
+
+
+def build_index(vectors: np.ndarray, spec: dict, metric: int = faiss.METRIC_L2, train_size: int = DEFAULT_TRAIN_SIZE, seed: int = 0):
+    """
+    spec에 따라 인덱스를 만들고 샘플로 학습한 뒤 모든 벡터를 같은 순서로 추가합니다.
+
+    Args:
+        vectors (np.ndarray): (N, dim) float32 벡터
+        spec (dict): index_spec 결과
+        metric (int): 거리 척도 (langchain FAISS 기본값과 같은 L2)
+        train_size (int): 학습 샘플 최대 벡터 수
+        seed (int): 샘플링 시드
+
+    Returns:
+        Tuple[faiss.Index, dict]: (인덱스, 학습/추가 시간 등이 추가된 spec)
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    index = faiss.index_factory(vectors.shape[1], spec["factory"], metric)
+    if spec["type"] == "hnsw":
+        index.hnsw.efConstruction = spec["ef_construction"]
+
+    spec = dict(spec)
+    start = time.perf_counter()
+    if not index.is_trained:
+        rng = np.random.default_rng(seed)
+        sample_size = min(train_size, len(vectors))
+        sample = vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))]
+        index.train(sample)
+        spec["train_size"] = int(sample_size)
+    spec["train_seconds"] = round(time.perf_counter() - start, 3)
+
+    start = time.perf_counter()
+    index.add(vectors)
+    spec["add_seconds"] = round(time.perf_counter() - start, 3)
+    apply_search_params(index, spec)
+    return index, spec
+
+
+def apply_search_params(index, spec: dict) -> None:
+    """nprobe(IVF) / efSearch(HNSW) 검색 파라미터를 적용합니다."""
+    params = faiss.ParameterSpace()
+    if spec.get("nprobe") is not None:
+        params.set_index_parameter(index, "nprobe", int(spec["nprobe"]))
+    if spec.get("ef_search") is not None:
+        params.set_index_parameter(index, "efSearch", int(spec["ef_search"]))
+
+
+def convert_vectorstore_index(vectorstore, index_type: str, train_size: int = DEFAULT_TRAIN_SIZE, **kwargs) -> dict:
+    """
+    langchain FAISS 벡터스토어의 평면 인덱스를 지정한 종류로 교체합니다 (문서 매핑은 유지).
+
+    Returns:
+        dict: index_meta.json의 "index" 항목으로 기록할 spec
+    """
+    if index_type == "flat":
+        vectorstore.index = to_flat_index(vectorstore.index)
+        return index_spec("flat", vectorstore.index.d, vectorstore.index.ntotal)
+    vectors = extract_vectors(vectorstore.index)
+    spec = index_spec(index_type, vectors.shape[1], len(vectors), **kwargs)
+    vectorstore.index, spec = build_index(vectors, spec, metric=vectorstore.index.metric_type, train_size=train_size)
+    print(f"{spec['factory']} 인덱스 생성: 학습 {spec['train_seconds']}s, 추가 {spec['add_seconds']}s")
+    return spec
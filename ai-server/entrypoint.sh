@@ -32,5 +32,6 @@ if [ "$ENV" = "test" ]; then
 else
   # 프로덕션 모드 실행
   echo "Running in PRODUCTION mode"
-  uvicorn app.main:app --host 0.0.0.0 --port 8000
+  # 벡터 DB는 mmap으로 로드되므로 워커를 늘려도 인덱스/문서 메모리는 페이지 캐시 한 벌을 공유함
+  uvicorn app.main:app --host 0.0.0.0 --port 8000 --workers "${UVICORN_WORKERS:-1}"
 fi
\ No newline at end of file
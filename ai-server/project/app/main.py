@@ -6,6 +6,8 @@ from app.routers import restaurant, attraction, query_router, other_service
 from app.routers import restaurant_graph_rag_router
 from app.routers import attraction_graph_rag_router
 from app.utils import knowledge_graph_loader
+from app.utils.resource_registry import get_resource_registry
+from app.routers.query_router import create_chatbot_services
 
 # Lifespan 이벤트 핸들러 정의
 @asynccontextmanager
@@ -21,8 +23,16 @@ async def lifespan(app: FastAPI):
         print("지식 그래프가 성공적으로 로드되었습니다.")
     else:
         print("경고: 지식 그래프 로드에 실패했습니다. 일부 기능이 제한될 수 있습니다.")
+
+    # /chatbot 경로의 서비스들을 한 번만 생성하여 요청 간에 재사용
+    # (지식 그래프 로드 이후에 생성해야 GraphRAGEnhancer가 그래프를 참조할 수 있음)
+    print("챗봇 서비스 초기화를 시작합니다.")
+    app.state.query_router_service, app.state.chatbot_services = create_chatbot_services()
+    print("챗봇 서비스 초기화 완료.")
     yield
     # 애플리케이션 종료 시 실행 (필요시 정리 로직 추가)
+    for chatbot_service in app.state.chatbot_services.values():
+        chatbot_service.close()
     print("애플리케이션 종료.")
 
 app = FastAPI(title="Agentic AI Busan API", lifespan=lifespan)
@@ -59,3 +69,13 @@ async def graph_status():
     if graph:
         return {"status": "loaded", "nodes": graph.number_of_nodes(), "edges": graph.number_of_edges()}
     return {"status": "not_loaded_or_failed"}
+
+
+@app.get("/resources") # 공유 검색 리소스(벡터 DB, BM25, 리랭커) 상태 확인용 엔드포인트
+async def resources_status():
+    resources = get_resource_registry().stats()
+    total_bytes = sum(r["size_bytes"] for r in resources)
+    return {
+        "resources": resources,
+        "total_size_mb": round(total_bytes / 1024 / 1024, 2)
+    }
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request
 from pydantic import BaseModel, Field
 from typing import List, Tuple, Dict, Any
 
+from ..services.base import BaseService
 from ..services.query_router import QueryRouterService
 from ..services.restaurant_chatbot_service import RestaurantChatbotService
 from ..services.attraction_chatbot_service import AttractionChatbotService
@@ -9,17 +10,38 @@ from ..services.general_chatbot_service import GeneralChatbotService
 
 router = APIRouter()
 
-def get_query_router_service() -> QueryRouterService:
-    """의존성 주입을 위한 QueryRouterService 인스턴스 생성 함수"""
-    try:
-        # 필요시 여기에 서비스 생성 관련 로직 추가 가능
-        service_instance = QueryRouterService()
-        print("QueryRouterService 인스턴스 생성") # 생성 시점 확인용 로그
-        return service_instance
-    except Exception as e:
-        print(f"오류: QueryRouterService 인스턴스 생성 실패 - {e}")
+def create_chatbot_services() -> Tuple[QueryRouterService, Dict[str, BaseService]]:
+    """
+    /chatbot 경로에서 사용할 서비스들을 생성합니다.
+    main.py의 lifespan에서 애플리케이션 시작 시 한 번만 호출되어 app.state에 저장됩니다.
+
+    Returns:
+        Tuple[QueryRouterService, Dict[str, BaseService]]: 라우터 서비스와 카테고리별 챗봇 서비스
+    """
+    query_router_service = QueryRouterService()
+    chatbot_services = {
+        "restaurant": RestaurantChatbotService(),
+        "attraction": AttractionChatbotService(),
+        "general": GeneralChatbotService(),
+    }
+    return query_router_service, chatbot_services
+
+def get_query_router_service(request: Request) -> QueryRouterService:
+    """의존성 주입을 위한 QueryRouterService 싱글톤 조회 함수 (lifespan에서 생성)"""
+    service_instance = getattr(request.app.state, "query_router_service", None)
+    if service_instance is None:
+        print("오류: QueryRouterService가 초기화되지 않았습니다.")
         # 서비스 생성 실패 시 503 Service Unavailable 오류 발생
         raise HTTPException(status_code=503, detail="Query Router Service unavailable")
+    return service_instance
+
+def get_chatbot_services(request: Request) -> Dict[str, BaseService]:
+    """의존성 주입을 위한 카테고리별 챗봇 서비스 싱글톤 조회 함수 (lifespan에서 생성)"""
+    chatbot_services = getattr(request.app.state, "chatbot_services", None)
+    if not chatbot_services:
+        print("오류: 챗봇 서비스가 초기화되지 않았습니다.")
+        raise HTTPException(status_code=503, detail="Chatbot Service unavailable")
+    return chatbot_services
 
 # 요청 본문 모델 정의 (POST 방식 사용 시)
 class RouteRequest(BaseModel):
@@ -37,7 +59,8 @@ class RouteResponse(BaseModel):
 @router.post("/chatbot", response_model=RouteResponse)
 async def test_routing_post(
     request: RouteRequest,
-    service: QueryRouterService = Depends(get_query_router_service) # 서비스 주입
+    service: QueryRouterService = Depends(get_query_router_service), # 서비스 주입
+    chatbot_services: Dict[str, BaseService] = Depends(get_chatbot_services)
 ):
     """
     POST 방식으로 사용자 쿼리와 대화 기록을 받아 라우팅 결과를 반환하는 테스트 엔드포인트.
@@ -49,13 +72,11 @@ async def test_routing_post(
         # 1. 먼저 카테고리 라우팅
         category = await service.route(query=request.query, chat_history=request.chat_history)
         
-        # 2. 카테고리에 따라 적절한 서비스 호출
-        if category == "restaurant":
-            chatbot_service = RestaurantChatbotService()
-        elif category == "attraction":
-            chatbot_service = AttractionChatbotService()
+        # 2. 카테고리에 따라 적절한 서비스 선택 (요청마다 새로 만들지 않고 lifespan 싱글톤 재사용)
+        if category in ("restaurant", "attraction"):
+            chatbot_service = chatbot_services[category]
         else:  # general_chat 또는 기타
-            chatbot_service = GeneralChatbotService()
+            chatbot_service = chatbot_services["general"]
         
         # 3. 선택된 서비스로 쿼리 처리
         result = await chatbot_service.process_query(
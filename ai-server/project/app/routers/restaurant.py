@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException
 from typing import Dict, Any
 from app.services.restaurant import RestaurantService, RestaurantResponse
+from app.utils.metadata_filter import SearchFilters, features_from_text
 from pydantic import BaseModel, validator
 from datetime import datetime, date
 from typing import Union
@@ -66,6 +67,17 @@ class RestaurantSearchRequest(BaseModel):
         query += f"\n위 조건들을 고려하여 {days_count * 3}개의 장소를 추천해주세요. "
         query += "각 장소에 대해 간단한 설명과 함께, 해당 장소가 왜 추천되는지 이유도 함께 알려주세요."
         return query
+    
+    def create_filters(self) -> SearchFilters:
+        """
+        검색 사전 필터 생성 (지역, 요구사항에 명시한 주차 등 특징, 기피 음식)
+        교통수단은 선호일 뿐이므로 필터로 쓰지 않고 create_query()의 쿼리 문장으로만 순위에 반영합니다.
+        """
+        return SearchFilters(
+            areas=(self.city,),
+            features=features_from_text(self.requirement),
+            excluded_categories=(self.dislikedFood,) if self.dislikedFood else ()
+        )
 
 @router.post("/search", response_model=RestaurantResponse)
 async def search_restaurants(request: RestaurantSearchRequest) -> Dict[str, Any]:
@@ -76,7 +88,7 @@ async def search_restaurants(request: RestaurantSearchRequest) -> Dict[str, Any]
         print("="*100)
         print(f"request.create_query(): {request.create_query()}")
         print("="*100)
-        result = await restaurant_service.search_restaurants(request.create_query())
+        result = await restaurant_service.search_restaurants(request.create_query(), filters=request.create_filters())
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
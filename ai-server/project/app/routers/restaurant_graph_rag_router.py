@@ -28,7 +28,7 @@ async def search_restaurants_with_graph_rag(
         if not query_to_search:
             raise HTTPException(status_code=400, detail="검색 쿼리를 생성할 수 없습니다. 입력값을 확인해주세요.")
             
-        result = await restaurant_service.search_restaurants_with_graph_rag(query_to_search)
+        result = await restaurant_service.search_restaurants_with_graph_rag(query_to_search, filters=request.create_filters())
         return result
     except Exception as e:
         print(f"Restaurant Graph RAG search_restaurants API 오류: {e}")
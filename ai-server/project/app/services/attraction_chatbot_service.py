@@ -1,6 +1,7 @@
 from typing import Dict, Any, List, Tuple
 from .base import BaseService
 from ..utils.graph_rag_enhancer import GraphRAGEnhancer
+from ..utils.docstore import public_metadata
 
 class AttractionChatbotService(BaseService):
     """
@@ -99,7 +100,7 @@ class AttractionChatbotService(BaseService):
 
             return {
                 "response": response.content,
-                "sources": [doc.metadata for doc in docs],
+                "sources": [public_metadata(doc) for doc in docs],  # 내부 doc_id 제외
                 "category": "attraction_chat"
             }
 
@@ -1,9 +1,10 @@
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from langchain_openai import ChatOpenAI
 from langchain.callbacks.tracers.langchain import wait_for_all_tracers
-from app.utils.vectordb import load_vectordb
+from app.utils.resource_registry import get_resource_registry, get_shared_vectordb, get_shared_bm25, get_shared_metadata_filter, get_shared_graph_retriever
 from app.utils.advanced_rag import create_advanced_rag_retriever
 from app.utils.hybrid_search import create_hybrid_search
+from app.utils.metadata_filter import SearchFilters
 from langchain_core.retrievers import BaseRetriever
 from langchain_core.documents import Document
 import traceback
@@ -43,19 +44,20 @@ class HybridSearchRetriever(BaseRetriever):
             print(f"스택 트레이스: {traceback.format_exc()}")
             raise
     
-    def _get_relevant_documents(self, query: str) -> List[Document]:
+    def _get_relevant_documents(self, query: str, filters: Optional[SearchFilters] = None) -> List[Document]:
         """
         주어진 쿼리에 대해 관련 문서를 검색합니다.
 
         Args:
             query (str): 검색 쿼리
+            filters (SearchFilters, optional): 메타데이터 사전 필터 (invoke(query, filters=...)로 전달)
 
         Returns:
             List[Document]: 관련 문서 리스트
         """
         try:
             print(f"하이브리드 검색 실행: 쿼리='{query}'")
-            documents = self.hybrid_search_obj.search(query)
+            documents = self.hybrid_search_obj.search(query, filters=filters)
             print(f"하이브리드 검색 완료: {len(documents)}개 문서 발견")
             return documents
         except Exception as e:
@@ -64,26 +66,71 @@ class HybridSearchRetriever(BaseRetriever):
             # 실패 시 빈 목록 반환
             return []
     
-    async def _aget_relevant_documents(self, query: str) -> List[Document]:
+    async def _aget_relevant_documents(self, query: str, filters: Optional[SearchFilters] = None) -> List[Document]:
         """
         주어진 쿼리에 대해 비동기적으로 관련 문서를 검색합니다.
-        현재는 동기 메서드를 호출합니다.
+        벡터 검색과 키워드 검색을 검색 스레드 풀에서 동시에 실행하여 이벤트 루프를 막지 않습니다.
 
         Args:
             query (str): 검색 쿼리
+            filters (SearchFilters, optional): 메타데이터 사전 필터 (ainvoke(query, filters=...)로 전달)
 
         Returns:
             List[Document]: 관련 문서 리스트
         """
-        # 현재는 동기 메서드를 호출
         try:
-            return self._get_relevant_documents(query)
+            print(f"비동기 하이브리드 검색 실행: 쿼리='{query}'")
+            documents = await self.hybrid_search_obj.asearch(query, filters=filters)
+            print(f"비동기 하이브리드 검색 완료: {len(documents)}개 문서 발견")
+            return documents
         except Exception as e:
+            print(f"비동기 하이브리드 검색 중 오류 발생: {e}")
             print(f"스택 트레이스: {traceback.format_exc()}")
             # 실패 시 빈 목록 반환
             return []
 
 
+    def get_relevant_documents_with_scores(
+        self, query: str, filters: Optional[SearchFilters] = None
+    ) -> List[Tuple[Document, float]]:
+        """
+        관련 문서를 하이브리드 점수와 함께 검색합니다. (캐스케이드 리랭킹의 1단계 점수로 사용)
+
+        Args:
+            query (str): 검색 쿼리
+            filters (SearchFilters, optional): 메타데이터 사전 필터
+
+        Returns:
+            List[Tuple[Document, float]]: (문서, 하이브리드 점수) 리스트 (점수 내림차순)
+        """
+        try:
+            return self.hybrid_search_obj.search_with_scores(query, filters=filters)
+        except Exception as e:
+            print(f"하이브리드 검색(점수 포함) 중 오류 발생: {e}")
+            print(f"스택 트레이스: {traceback.format_exc()}")
+            return []
+    
+    async def aget_relevant_documents_with_scores(
+        self, query: str, filters: Optional[SearchFilters] = None
+    ) -> List[Tuple[Document, float]]:
+        """
+        get_relevant_documents_with_scores의 비동기 버전.
+
+        Args:
+            query (str): 검색 쿼리
+            filters (SearchFilters, optional): 메타데이터 사전 필터
+
+        Returns:
+            List[Tuple[Document, float]]: (문서, 하이브리드 점수) 리스트 (점수 내림차순)
+        """
+        try:
+            return await self.hybrid_search_obj.asearch_with_scores(query, filters=filters)
+        except Exception as e:
+            print(f"비동기 하이브리드 검색(점수 포함) 중 오류 발생: {e}")
+            print(f"스택 트레이스: {traceback.format_exc()}")
+            return []
+
+
 class BaseService:
     def __init__(
         self, 
@@ -109,6 +156,9 @@ class BaseService:
             initial_k (int): 초기 검색에서 가져올 문서 수
             final_k (int): 최종 반환할 문서 수
         """
+        # 레지스트리에서 획득한 공유 리소스 목록 (close 시 참조 해제)
+        self._shared_resources = []
+
         # 벡터 DB가 None인 경우 (일반 챗봇 등) 기본 검색기만 초기화
         if vectordb_name is None:
             self.vectorstore = None
@@ -116,8 +166,9 @@ class BaseService:
             self.llm = ChatOpenAI(model_name=model_name, temperature=temperature, max_tokens=8192)
             return
 
-        # 벡터 DB가 있는 경우 기존 로직 실행
-        self.vectorstore = load_vectordb(vectordb_name)
+        # 벡터 DB가 있는 경우 기존 로직 실행 (같은 인덱스는 모든 서비스가 공유)
+        self.vectorstore = get_shared_vectordb(vectordb_name)
+        self._shared_resources.append(("vectordb", vectordb_name))
         
         # 기본 벡터 검색기 설정
         self.base_retriever = self.vectorstore.as_retriever(search_kwargs={"k": initial_k})
@@ -125,17 +176,26 @@ class BaseService:
         # 검색기 설정: 하이브리드 검색 > 리랭커 > 기본 검색 순으로 시도
         if use_hybrid:
             try:
-                # 벡터 DB에서 문서 추출
-                docs = self.vectorstore.similarity_search(
-                    query="", k=1000  # 모든 문서 가져오기 위해 빈 쿼리 사용
-                )
+                # 키워드 인덱스 스냅샷 로드 또는 docstore 전체로 BM25 엔진 생성 (인덱스별로 한 번만 생성하여 공유)
+                shared_bm25 = get_shared_bm25(vectordb_name, self.vectorstore)
+                self._shared_resources.append(("bm25", vectordb_name))
+                
+                # 지식 그래프 엣지로 만든 지역 / 특징 / 카테고리 비트맵 (그래프가 없으면 None, 필터 미사용)
+                shared_filter_index = get_shared_metadata_filter(vectordb_name, self.vectorstore)
+                self._shared_resources.append(("metadata_filter", vectordb_name))
+                
+                # 쿼리의 지역 / 랜드마크 / 메뉴 / 특징에서 시작하는 그래프 다중 홉 검색 (GRAPH_RETRIEVAL_ENABLED일 때만, 아니면 None)
+                shared_graph_retriever = get_shared_graph_retriever(vectordb_name, self.vectorstore)
+                self._shared_resources.append(("graph_retrieval", vectordb_name))
                 
                 # 하이브리드 검색기 생성
                 hybrid_search_obj = create_hybrid_search(
                     vectordb=self.vectorstore,
-                    documents=docs,
                     alpha=hybrid_alpha,
-                    top_k=initial_k
+                    top_k=initial_k,
+                    keyword_index=shared_bm25,
+                    filter_index=shared_filter_index,
+                    graph_retriever=shared_graph_retriever
                 )
                 
                 # 하이브리드 검색 래퍼 생성
@@ -204,6 +264,20 @@ class BaseService:
 
     async def process_query(self, query: str, prompt_template: str) -> Dict[str, Any]:
         raise NotImplementedError
+
+    def close(self) -> None:
+        """레지스트리에서 획득한 공유 리소스(리랭커 모델, 그래프 공간 색인 / 스니펫 포함)의 참조를 해제합니다."""
+        registry = get_resource_registry()
+        for kind, name in self._shared_resources:
+            registry.release(kind, name)
+        self._shared_resources = []
+        # 리랭커와 GraphRAGEnhancer는 각자 획득한 리소스를 해제
+        reranker = getattr(getattr(self, "retriever", None), "reranker", None)
+        if reranker is not None:
+            reranker.close()
+        graph_rag_enhancer = getattr(self, "graph_rag_enhancer", None)
+        if graph_rag_enhancer is not None:
+            graph_rag_enhancer.close()
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         # 비동기 컨텍스트 관리자 종료 시 모든 트레이서가 완료될 때까지 대기
@@ -1,7 +1,8 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from langchain_core.prompts import PromptTemplate
 from langchain_core.tracers.context import collect_runs
 from .base import BaseService
+from app.utils.metadata_filter import SearchFilters
 import re
 
 from langchain_core.prompts import ChatPromptTemplate
@@ -99,12 +100,13 @@ class RestaurantService(BaseService):
                 print(f"VectorDB 문서 내용 : {head_line[2:]}")
                 print(f"LLM 응답 내용      : {rec.get('name')}\n")
 
-    async def search_restaurants(self, query: str) -> Dict[str, Any]:
+    async def search_restaurants(self, query: str, filters: Optional[SearchFilters] = None) -> Dict[str, Any]:
         """
         사용자 쿼리를 받아 관련 레스토랑을 검색하고 추천합니다.
         
         Args:
             query (str): 사용자 검색 쿼리
+            filters (SearchFilters, optional): 지역 / 특징 / 기피 음식 사전 필터 (검색 단계에서 적용)
             
         Returns:
             Dict[str, Any]: 답변 및 관련 레스토랑 ID 목록
@@ -113,7 +115,7 @@ class RestaurantService(BaseService):
         with collect_runs():
             try:
                 # Advanced RAG 검색기로 관련 문서 검색 (Reranker 적용됨)
-                docs = await self.retriever.aretrieve(query)
+                docs = await self.retriever.aretrieve(query, filters=filters)
                 
                 # 각 정보 앞에 docs의 순서에 맞는 인덱스 번호 부여
                 context = ""
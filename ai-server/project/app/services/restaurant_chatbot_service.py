@@ -1,6 +1,7 @@
 from typing import Dict, Any, List, Tuple
 from .base import BaseService
 from ..utils.graph_rag_enhancer import GraphRAGEnhancer
+from ..utils.docstore import public_metadata
 
 class RestaurantChatbotService(BaseService):
     """
@@ -100,7 +101,7 @@ class RestaurantChatbotService(BaseService):
 
             return {
                 "response": response.content,
-                "sources": [doc.metadata for doc in docs], # 소스는 기존 문서 메타데이터 유지
+                "sources": [public_metadata(doc) for doc in docs], # 소스는 기존 문서 메타데이터 유지 (내부 doc_id 제외)
                 "category": "restaurant_chat"
             }
 
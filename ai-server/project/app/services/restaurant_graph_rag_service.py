@@ -1,4 +1,4 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from langchain_core.tracers.context import collect_runs
@@ -6,6 +6,7 @@ from langchain_core.tracers.context import collect_runs
 from app.services.base import BaseService # BaseService는 그대로 사용
 from app.services.restaurant import Recommendation, RestaurantResponse # 스키마를 기존 서비스 파일에서 가져옴
 from app.utils.graph_rag_enhancer import GraphRAGEnhancer
+from app.utils.metadata_filter import SearchFilters
 
 class RestaurantGraphRAGService(BaseService):
     def __init__(
@@ -83,15 +84,16 @@ class RestaurantGraphRAGService(BaseService):
         response_ids = response.get("restaurant_ids", [])
         print(f"[GraphRAG Validation] LLM 응답 restaurant_ids (인덱스 리스트): {response_ids}")
 
-    async def search_restaurants_with_graph_rag(self, query: str) -> Dict[str, Any]:
+    async def search_restaurants_with_graph_rag(self, query: str, filters: Optional[SearchFilters] = None) -> Dict[str, Any]:
         """
         사용자 쿼리를 받아 관련 레스토랑을 검색하고, 그래프 정보로 강화하여 추천합니다.
+        filters가 있으면 지역 / 특징 / 기피 음식 조건을 검색 단계에서 먼저 적용합니다.
         """
         print(f"[RestaurantGraphRAGService] search_restaurants_with_graph_rag 호출: query='{query}'")
         with collect_runs(): # LangSmith 추적
             try:
                 # 1. 초기 문서 검색 (기존 BaseService의 retriever 사용)
-                docs = await self.retriever.aretrieve(query)
+                docs = await self.retriever.aretrieve(query, filters=filters)
                 print(f"[RestaurantGraphRAGService] 초기 문서 검색 완료: {len(docs)}개 문서")
                 
                 # 2. 기존 컨텍스트 생성 (인덱스 번호 부여)
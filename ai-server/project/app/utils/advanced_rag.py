@@ -1,9 +1,17 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from langchain_core.documents import Document
 from langchain_core.retrievers import BaseRetriever
 from .reranker import KoreanReranker, create_korean_reranker
+import os
 import traceback
 
+# 캐스케이드 리랭킹 설정: 하이브리드 점수로 후보를 먼저 걸러 상위 후보(shortlist)만 CrossEncoder로 리랭킹
+RERANK_CASCADE_ENABLED = os.getenv("RERANK_CASCADE_ENABLED", "false").lower() in ("1", "true", "yes")
+RERANK_CASCADE_MIN_KEEP = int(os.getenv("RERANK_CASCADE_MIN_KEEP", "5"))       # 항상 리랭킹할 최소 후보 수
+RERANK_CASCADE_MAX_KEEP = int(os.getenv("RERANK_CASCADE_MAX_KEEP", "0"))       # 최대 후보 수 (0이면 제한 없음)
+RERANK_CASCADE_MARGIN = float(os.getenv("RERANK_CASCADE_MARGIN", "0.35"))      # 1위 점수와의 차이가 이보다 크면 제외
+RERANK_CASCADE_GAP = float(os.getenv("RERANK_CASCADE_GAP", "0.15"))            # 연속 점수 차이가 이보다 크면 그 지점에서 자름
+
 
 class AdvancedRAGRetriever:
     """
@@ -16,7 +24,12 @@ class AdvancedRAGRetriever:
         base_retriever: BaseRetriever, 
         reranker: KoreanReranker = None,
         initial_k: int = 20,
-        final_k: int = 20
+        final_k: int = 20,
+        cascade: bool = RERANK_CASCADE_ENABLED,
+        cascade_min_keep: int = RERANK_CASCADE_MIN_KEEP,
+        cascade_max_keep: int = RERANK_CASCADE_MAX_KEEP,
+        cascade_margin: float = RERANK_CASCADE_MARGIN,
+        cascade_gap: float = RERANK_CASCADE_GAP
     ):
         """
         Advanced RAG 검색기 초기화
@@ -26,10 +39,26 @@ class AdvancedRAGRetriever:
             reranker (KoreanReranker, optional): 한국어 리랭커. None이면 자동 생성
             initial_k (int): 초기 검색에서 가져올 문서 수
             final_k (int): 최종 반환할 문서 수
+            cascade (bool): 캐스케이드 리랭킹 사용 여부.
+                base_retriever가 점수 포함 검색(aget_relevant_documents_with_scores)을 지원할 때만 적용됩니다.
+            cascade_min_keep (int): 점수와 관계없이 항상 리랭킹할 상위 후보 수
+            cascade_max_keep (int): 리랭킹할 최대 후보 수 (0이면 제한 없음)
+            cascade_margin (float): 1위 하이브리드 점수와의 차이가 이 값보다 큰 후보는 리랭킹에서 제외
+            cascade_gap (float): 인접 후보 간 점수 차이가 이 값보다 크면 그 지점에서 후보를 자름
         """
         self.base_retriever = base_retriever
         self.initial_k = initial_k
         self.final_k = final_k
+        self.cascade = cascade
+        self.cascade_min_keep = cascade_min_keep
+        self.cascade_max_keep = cascade_max_keep
+        self.cascade_margin = cascade_margin
+        self.cascade_gap = cascade_gap
+        
+        # 캐스케이드로 생략한 리랭킹 쌍 통계
+        self.cascade_requests = 0
+        self.cascade_pairs_total = 0
+        self.cascade_pairs_skipped = 0
         
         # 리랭커가 제공되지 않으면 기본값으로 생성
         if reranker is None:
@@ -37,45 +66,64 @@ class AdvancedRAGRetriever:
         else:
             self.reranker = reranker
         
-        print(f"Advanced RAG 검색기 초기화 완료: initial_k={initial_k}, final_k={final_k}")
+        print(f"Advanced RAG 검색기 초기화 완료: initial_k={initial_k}, final_k={final_k}, cascade={self.cascade}")
     
-    async def aretrieve(self, query: str) -> List[Document]:
+    async def aretrieve(self, query: str, filters: Optional[Any] = None) -> List[Document]:
         """
         비동기 검색 메서드. 쿼리를 받아 관련 문서를 검색 후 리랭킹하여 반환합니다.
 
         Args:
             query (str): 사용자 쿼리
+            filters (SearchFilters, optional): 메타데이터 사전 필터.
+                하이브리드 검색기에만 전달되며, 필터로 후보가 줄어든 만큼 리랭킹 쌍도 줄어듭니다.
 
         Returns:
             List[Document]: 리랭킹된 관련 문서 리스트
         """
+        search_kwargs = self._filter_kwargs(filters)
         try:
+            # 캐스케이드: 하이브리드 점수로 고른 상위 후보만 리랭킹
+            if self._cascade_supported("aget_relevant_documents_with_scores"):
+                scored_docs = await self.base_retriever.aget_relevant_documents_with_scores(query, **search_kwargs)
+                shortlist, tail = self._split_shortlist(scored_docs)
+                reranked_docs = await self.reranker.arerank(query, shortlist)
+                return (reranked_docs + tail)[:self.final_k]
+            
             # 초기 검색 수행
-            initial_docs = await self.base_retriever.ainvoke(query)
+            initial_docs = await self.base_retriever.ainvoke(query, **search_kwargs)
             
-            # 리랭킹 수행
-            reranked_docs = self.reranker.rerank(query, initial_docs)
+            # 리랭킹 수행 (배치 실행기에서 추론하므로 이벤트 루프를 막지 않음)
+            reranked_docs = await self.reranker.arerank(query, initial_docs)
             
             return reranked_docs
         except Exception as e:
             print(f"Advanced RAG 검색 중 오류 발생: {e}")
             # 오류 발생 시 초기 검색 결과 그대로 반환 (final_k 개수만큼)
-            initial_docs = await self.base_retriever.ainvoke(query)
+            initial_docs = await self.base_retriever.ainvoke(query, **search_kwargs)
             return initial_docs[:self.final_k]
     
-    def retrieve(self, query: str) -> List[Document]:
+    def retrieve(self, query: str, filters: Optional[Any] = None) -> List[Document]:
         """
         동기식 검색 메서드. 쿼리를 받아 관련 문서를 검색 후 리랭킹하여 반환합니다.
 
         Args:
             query (str): 사용자 쿼리
+            filters (SearchFilters, optional): 메타데이터 사전 필터 (하이브리드 검색기에만 전달)
 
         Returns:
             List[Document]: 리랭킹된 관련 문서 리스트
         """
+        search_kwargs = self._filter_kwargs(filters)
         try:
+            # 캐스케이드: 하이브리드 점수로 고른 상위 후보만 리랭킹
+            if self._cascade_supported("get_relevant_documents_with_scores"):
+                scored_docs = self.base_retriever.get_relevant_documents_with_scores(query, **search_kwargs)
+                shortlist, tail = self._split_shortlist(scored_docs)
+                reranked_docs = self.reranker.rerank(query, shortlist)
+                return (reranked_docs + tail)[:self.final_k]
+            
             # 초기 검색 수행
-            initial_docs = self.base_retriever.invoke(query)
+            initial_docs = self.base_retriever.invoke(query, **search_kwargs)
             
             # 리랭킹 수행
             reranked_docs = self.reranker.rerank(query, initial_docs)
@@ -84,8 +132,58 @@ class AdvancedRAGRetriever:
         except Exception as e:
             print(f"Advanced RAG 검색 중 오류 발생: {e}")
             # 오류 발생 시 초기 검색 결과 그대로 반환 (final_k 개수만큼)
-            initial_docs = self.base_retriever.invoke(query)
+            initial_docs = self.base_retriever.invoke(query, **search_kwargs)
             return initial_docs[:self.final_k]
+    
+    def _filter_kwargs(self, filters) -> Dict[str, Any]:
+        """
+        필터를 기본 검색기에 넘길 인자로 만듭니다.
+        기본 벡터 검색기(VectorStoreRetriever)는 추가 인자를 벡터스토어 검색 인자로 넘기므로 하이브리드 검색기에만 전달합니다.
+        """
+        if filters is None or not hasattr(self.base_retriever, "hybrid_search_obj"):
+            return {}
+        return {"filters": filters}
+    
+    def _cascade_supported(self, method_name: str) -> bool:
+        """캐스케이드 모드가 켜져 있고 기본 검색기가 점수 포함 검색을 지원하는지 확인합니다."""
+        return self.cascade and hasattr(self.base_retriever, method_name)
+    
+    def shortlist_size(self, scores: List[float]) -> int:
+        """
+        내림차순 하이브리드 점수에서 리랭킹할 상위 후보 수를 정합니다.
+        최소 cascade_min_keep개는 유지하고, 그 뒤로는 1위와의 차이(margin)나
+        인접 후보 간 점수 차이(gap)가 임계값을 넘는 지점에서 자릅니다.
+
+        Args:
+            scores (List[float]): 내림차순 정렬된 하이브리드 점수
+
+        Returns:
+            int: 리랭킹할 후보 수
+        """
+        limit = len(scores) if self.cascade_max_keep <= 0 else min(len(scores), self.cascade_max_keep)
+        keep = min(self.cascade_min_keep, limit)
+        while keep < limit:
+            if scores[0] - scores[keep] > self.cascade_margin:
+                break
+            if keep > 0 and scores[keep - 1] - scores[keep] > self.cascade_gap:
+                break
+            keep += 1
+        return keep
+    
+    def _split_shortlist(self, scored_docs: List[Tuple[Document, float]]) -> Tuple[List[Document], List[Document]]:
+        """
+        (문서, 하이브리드 점수) 리스트를 리랭킹할 상위 후보와 하이브리드 순서 그대로 뒤에 붙일 나머지로 나눕니다.
+        """
+        docs = [doc for doc, _ in scored_docs]
+        keep = self.shortlist_size([score for _, score in scored_docs])
+        skipped = len(docs) - keep
+        
+        self.cascade_requests += 1
+        self.cascade_pairs_total += len(docs)
+        self.cascade_pairs_skipped += skipped
+        print(f"캐스케이드 리랭킹: 후보 {len(docs)}개 중 {keep}개만 리랭킹 ({skipped}쌍 생략, 누적 생략률 "
+              f"{self.cascade_pairs_skipped / max(self.cascade_pairs_total, 1) * 100:.1f}%)")
+        return docs[:keep], docs[keep:]
 
 
 def create_advanced_rag_retriever(
@@ -0,0 +1,299 @@
+'''
+NumPy/SciPy 희소 행렬 기반 BM25 키워드 검색 엔진
+
+rank_bm25의 BM25Okapi와 같은 점수 공식(IDF 하한 epsilon 포함)을 사용하지만,
+문서별 단어 빈도 사전 대신 단어 x 문서 CSR 행렬에 BM25 가중치를 미리 계산해 두고
+쿼리 단어의 행만 더하는 한 번의 벡터 연산으로 전체 문서 점수를 계산합니다.
+'''
+import json
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from langchain_core.documents import Document
+
+from .snapshot import publish_snapshot, resolve_snapshot
+
+
+# 스냅샷 포맷 버전 (ai-preprocessing의 create_restaurant_vectordb.py도 이 모듈로 스냅샷을 저장)
+KEYWORD_INDEX_FORMAT_VERSION = 1
+_SNAPSHOT_ARRAYS = ("weights_data", "weights_indices", "weights_indptr", "idf", "doc_lengths")
+
+
+def default_tokenize(text: str) -> List[str]:
+    """공백 기준 토큰화 (langchain BM25Retriever의 기본 전처리와 동일)"""
+    return text.split()
+
+
+class SparseBM25:
+    """
+    CSR 단어-문서 가중치 행렬을 사용하는 BM25(Okapi) 검색 엔진.
+
+    weights[t, d] = idf[t] * tf(t, d) * (k1 + 1) / (tf(t, d) + k1 * (1 - b + b * |d| / avgdl))
+    score(q, d)   = sum_{t in q} weights[t, d]
+    """
+
+    def __init__(
+        self,
+        tokenized_corpus: Iterable[List[str]],
+        k1: float = 1.5,
+        b: float = 0.75,
+        epsilon: float = 0.25,
+        tokenize: Callable[[str], List[str]] = default_tokenize,
+        docs: Optional[List[Document]] = None
+    ):
+        """
+        BM25 엔진 초기화. 코퍼스는 한 번만 순회하므로 제너레이터를 전달할 수 있습니다.
+
+        Args:
+            tokenized_corpus (Iterable[List[str]]): 토큰화된 문서 이터러블
+            k1 (float): 단어 빈도 포화 파라미터
+            b (float): 문서 길이 정규화 파라미터
+            epsilon (float): 음수 IDF를 대체할 평균 IDF 비율 (BM25Okapi와 동일)
+            tokenize (Callable[[str], List[str]]): 쿼리 토큰화 함수
+            docs (List[Document], optional): 행렬 열 순서와 일치하는 문서 리스트
+        """
+        self.k1 = k1
+        self.b = b
+        self.epsilon = epsilon
+        self.tokenize = tokenize
+        self.docs: List[Document] = docs if docs is not None else []
+
+        vocabulary: Dict[str, int] = {}
+        term_ids: List[int] = []
+        doc_ids: List[int] = []
+        term_freqs: List[int] = []
+        doc_lengths: List[int] = []
+
+        for doc_id, tokens in enumerate(tokenized_corpus):
+            doc_lengths.append(len(tokens))
+            for token, freq in Counter(tokens).items():
+                term_id = vocabulary.setdefault(token, len(vocabulary))
+                term_ids.append(term_id)
+                doc_ids.append(doc_id)
+                term_freqs.append(freq)
+
+        self.vocabulary = vocabulary
+        self.doc_lengths = np.asarray(doc_lengths, dtype=np.float32)
+        self._build_weights(
+            np.asarray(term_ids, dtype=np.int32),
+            np.asarray(doc_ids, dtype=np.int32),
+            np.asarray(term_freqs, dtype=np.float32)
+        )
+
+    @classmethod
+    def from_documents(
+        cls,
+        documents: Iterable[Document],
+        tokenize: Callable[[str], List[str]] = default_tokenize,
+        **kwargs
+    ) -> "SparseBM25":
+        """
+        문서 이터러블로 BM25 엔진을 생성합니다. 문서는 복사하지 않고 참조만 보관합니다.
+
+        Args:
+            documents (Iterable[Document]): 키워드 검색 대상 문서 (제너레이터 가능)
+            tokenize (Callable[[str], List[str]]): 토큰화 함수
+
+        Returns:
+            SparseBM25: 생성된 BM25 엔진
+        """
+        docs: List[Document] = []
+
+        def tokenized_corpus():
+            for doc in documents:
+                docs.append(doc)
+                yield tokenize(doc.page_content)
+
+        return cls(tokenized_corpus(), tokenize=tokenize, docs=docs, **kwargs)
+
+    @classmethod
+    def load(
+        cls,
+        snapshot_dir: Path,
+        docs: Optional[List[Document]] = None,
+        tokenize: Callable[[str], List[str]] = default_tokenize
+    ) -> "SparseBM25":
+        """
+        저장된 스냅샷을 메모리 매핑으로 로드합니다. 가중치 행렬은 복사하지 않고 페이지 캐시를 공유합니다.
+
+        Args:
+            snapshot_dir (Path): save()로 저장한 스냅샷 경로 (링크를 한 번 따라가 같은 버전의 파일만 읽음)
+            docs (List[Document], optional): 행렬 열 순서와 일치하는 문서 리스트
+            tokenize (Callable[[str], List[str]]): 쿼리 토큰화 함수
+
+        Returns:
+            SparseBM25: 로드된 BM25 엔진
+        """
+        snapshot_dir = resolve_snapshot(snapshot_dir)
+        meta = read_snapshot_meta(snapshot_dir)
+        if meta is None or meta.get("format_version") != KEYWORD_INDEX_FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 키워드 인덱스 스냅샷입니다: {snapshot_dir}")
+
+        arrays = {name: np.load(snapshot_dir / f"{name}.npy", mmap_mode="r") for name in _SNAPSHOT_ARRAYS}
+        with open(snapshot_dir / "vocabulary.json", encoding="utf-8") as f:
+            terms = json.load(f)
+
+        engine = cls.__new__(cls)
+        engine.k1 = meta["k1"]
+        engine.b = meta["b"]
+        engine.epsilon = meta["epsilon"]
+        engine.tokenize = tokenize
+        engine.docs = docs if docs is not None else []
+        engine.vocabulary = {term: term_id for term_id, term in enumerate(terms)}
+        engine.num_docs = meta["num_docs"]
+        engine.idf = arrays["idf"]
+        engine.doc_lengths = arrays["doc_lengths"]
+        engine.weights = sparse.csr_matrix(
+            (arrays["weights_data"], arrays["weights_indices"], arrays["weights_indptr"]),
+            shape=(len(terms), meta["num_docs"]),
+            copy=False
+        )
+        return engine
+
+    def save(self, snapshot_dir: Path, docstore_checksum: str) -> None:
+        """
+        가중치 행렬과 사전을 메모리 매핑 가능한 .npy/.json 파일로 저장합니다.
+        여러 워커가 동시에 저장하거나 읽어도 안전하도록 publish_snapshot으로 새 버전을 쓴 뒤 링크를 교체합니다.
+
+        Args:
+            snapshot_dir (Path): 저장할 경로 (vectordb/<name>/keyword_index)
+            docstore_checksum (str): 인덱스를 만든 docstore의 체크섬 (스냅샷 유효성 검사용)
+        """
+        publish_snapshot(Path(snapshot_dir), lambda directory: self._write_snapshot(directory, docstore_checksum))
+
+    def _write_snapshot(self, directory: Path, docstore_checksum: str) -> None:
+        """빈 디렉토리에 스냅샷 파일을 씁니다 (meta.json은 마지막에 기록)."""
+        arrays = {
+            "weights_data": self.weights.data,
+            "weights_indices": self.weights.indices,
+            "weights_indptr": self.weights.indptr,
+            "idf": self.idf,
+            "doc_lengths": self.doc_lengths,
+        }
+        for name, array in arrays.items():
+            np.save(directory / f"{name}.npy", np.ascontiguousarray(array))
+
+        terms = [None] * len(self.vocabulary)
+        for term, term_id in self.vocabulary.items():
+            terms[term_id] = term
+        with open(directory / "vocabulary.json", "w", encoding="utf-8") as f:
+            json.dump(terms, f, ensure_ascii=False)
+
+        meta = {
+            "format_version": KEYWORD_INDEX_FORMAT_VERSION,
+            "tokenizer": "whitespace",
+            "k1": self.k1,
+            "b": self.b,
+            "epsilon": self.epsilon,
+            "num_docs": self.num_docs,
+            "num_terms": len(self.vocabulary),
+            "docstore_checksum": docstore_checksum,
+        }
+        with open(directory / "meta.json", "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+
+    def _build_weights(self, term_ids: np.ndarray, doc_ids: np.ndarray, term_freqs: np.ndarray) -> None:
+        """단어 빈도로부터 IDF와 BM25 가중치 CSR 행렬(단어 x 문서)을 계산합니다."""
+        num_docs = len(self.doc_lengths)
+        num_terms = len(self.vocabulary)
+        self.num_docs = num_docs
+
+        # 문서 빈도(df): 단어별로 등장한 문서 수
+        doc_freqs = np.bincount(term_ids, minlength=num_terms).astype(np.float64)
+        idf = np.log(num_docs - doc_freqs + 0.5) - np.log(doc_freqs + 0.5)
+        if num_terms:
+            # BM25Okapi와 동일하게 음수 IDF는 평균 IDF의 epsilon 배로 대체
+            idf[idf < 0] = self.epsilon * idf.mean()
+        self.idf = idf.astype(np.float32)
+
+        avgdl = float(self.doc_lengths.mean()) if num_docs else 0.0
+        length_norm = self.k1 * (1 - self.b + self.b * self.doc_lengths / avgdl) if avgdl else np.full(num_docs, self.k1, dtype=np.float32)
+        weights = self.idf[term_ids] * term_freqs * (self.k1 + 1) / (term_freqs + length_norm[doc_ids])
+
+        self.weights = sparse.csr_matrix(
+            (weights.astype(np.float32), (term_ids, doc_ids)),
+            shape=(num_terms, num_docs),
+            dtype=np.float32
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """가중치 행렬과 보조 배열의 메모리 사용량(바이트)"""
+        return (
+            self.weights.data.nbytes + self.weights.indices.nbytes + self.weights.indptr.nbytes
+            + self.idf.nbytes + self.doc_lengths.nbytes
+        )
+
+    def _query_terms(self, query: str) -> Tuple[np.ndarray, np.ndarray]:
+        """쿼리를 (단어 ID, 등장 횟수) 배열로 변환합니다. 사전에 없는 단어는 무시합니다."""
+        counts = Counter(token for token in self.tokenize(query) if token in self.vocabulary)
+        term_ids = np.fromiter((self.vocabulary[t] for t in counts), dtype=np.int32, count=len(counts))
+        term_counts = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+        return term_ids, term_counts
+
+    def get_scores(self, query: str) -> np.ndarray:
+        """
+        모든 문서에 대한 BM25 점수를 계산합니다.
+
+        Args:
+            query (str): 검색 쿼리
+
+        Returns:
+            np.ndarray: 문서별 BM25 점수 (길이 = 문서 수)
+        """
+        term_ids, term_counts = self._query_terms(query)
+        if len(term_ids) == 0:
+            return np.zeros(self.num_docs, dtype=np.float32)
+        # 쿼리 단어 행만 추출하여 (등장 횟수 가중) 합산
+        return np.asarray(self.weights[term_ids].T @ term_counts, dtype=np.float32).ravel()
+
+    def search(self, query: str, k: int = 20, mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        BM25 점수 상위 k개 문서의 위치와 점수를 반환합니다. 점수가 0인 문서는 제외합니다.
+
+        Args:
+            query (str): 검색 쿼리
+            k (int): 반환할 최대 문서 수
+            mask (np.ndarray, optional): 문서 위치별 bool 배열. False인 문서는 후보에서 제외 (메타데이터 필터)
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (문서 위치 배열, BM25 점수 배열), 점수 내림차순
+        """
+        scores = self.get_scores(query)
+        candidates = np.flatnonzero(scores > 0 if mask is None else (scores > 0) & mask)
+        if len(candidates) > k:
+            top = np.argpartition(-scores[candidates], k - 1)[:k]
+            candidates = candidates[top]
+        order = np.argsort(-scores[candidates], kind="stable")
+        candidates = candidates[order]
+        return candidates, scores[candidates]
+
+    def search_documents(self, query: str, k: int = 20, mask: Optional[np.ndarray] = None) -> List[Tuple[Document, float]]:
+        """
+        BM25 점수 상위 k개 문서를 (문서, 점수) 리스트로 반환합니다.
+
+        Args:
+            query (str): 검색 쿼리
+            k (int): 반환할 최대 문서 수
+            mask (np.ndarray, optional): 문서 위치별 bool 배열. False인 문서는 후보에서 제외 (메타데이터 필터)
+
+        Returns:
+            List[Tuple[Document, float]]: (문서, BM25 점수) 리스트, 점수 내림차순
+        """
+        positions, scores = self.search(query, k, mask=mask)
+        return [(self.docs[p], float(s)) for p, s in zip(positions, scores)]
+
+
+def read_snapshot_meta(snapshot_dir: Path) -> Optional[dict]:
+    """스냅샷의 meta.json을 읽습니다. 없거나 읽을 수 없으면 None을 반환합니다."""
+    meta_path = Path(snapshot_dir) / "meta.json"
+    if not meta_path.exists():
+        return None
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
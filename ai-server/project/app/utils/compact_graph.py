@@ -0,0 +1,436 @@
+'''
+메모리 매핑 CSR 지식 그래프 (여러 워커 프로세스가 페이지 캐시를 공유)
+
+knowledge_graph.gpickle은 노드/엣지마다 속성 사전을 가진 networkx.DiGraph 전체를 프로세스마다 언피클하므로
+시작이 느리고 메모리를 많이 씁니다. CompactKnowledgeGraph는 graphdb/knowledge_graph/에
+- node_ids.bin / node_id_offsets.npy      : 노드 ID(UTF-8)를 이어 붙인 blob과 시작 위치
+- node_hash.npy                           : 노드 ID의 64비트 해시 (오름차순, 노드 번호 = 해시 정렬 순서, ID 조회용)
+- node_type.npy                           : 노드 유형 코드 (uint8, meta.json의 node_types 순서)
+- indptr.npy / indices.npy / edge_type.npy : 나가는 엣지의 CSR 인접 배열과 엣지 유형 코드
+- node_attrs/, edge_attrs/                : 속성별 컬럼. 숫자 속성은 <key>.npy(float64, 없으면 NaN),
+                                            문자열 속성은 <key>.bin + <key>_offsets.npy (빈 값은 없음으로 취급)
+- meta.json                               : 포맷 버전, 노드/엣지 수, 유형 목록, 속성 목록, 원본 gpickle 체크섬
+을 두고 읽기 전용 mmap으로 열어, 조회한 노드/엣지의 속성만 그때그때 만듭니다.
+networkx.DiGraph에서 사용하던 조회 API(has_node, nodes[...], out_edges(data=True), number_of_nodes 등)를 그대로 제공합니다.
+'''
+import hashlib
+import json
+import math
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .docstore import open_blob
+from .snapshot import resolve_snapshot
+
+# 포맷 버전 (스냅샷은 write_compact_graph로만 저장하며, knowledge_graph_loader.build_compact_graph_snapshot이 그래프 생성 시 / 필요하면 첫 로드 때 호출)
+COMPACT_GRAPH_FORMAT_VERSION = 1
+# 노드 ID → 노드 번호 조회 결과를 캐시할 최대 개수 (지역 / 특징 / 메뉴 같은 허브 노드가 반복 조회됨)
+NODE_INDEX_CACHE_SIZE = 65536
+
+
+def load_array(path: Path) -> np.ndarray:
+    '''.npy를 읽기 전용 mmap으로 열어 일반 ndarray 뷰로 반환합니다 (np.memmap의 원소 조회 오버헤드 없이 페이지 캐시 공유).'''
+    return np.load(path, mmap_mode="r").view(np.ndarray)
+
+
+def node_id_hash(node_id: str) -> int:
+    '''노드 ID의 64비트 해시 (blake2b, 프로세스와 관계없이 같은 값)'''
+    return int.from_bytes(hashlib.blake2b(node_id.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class StringColumn(Sequence):
+    '''offset으로 색인한 UTF-8 blob의 i번째 문자열 (빈 값은 None)'''
+
+    def __init__(self, blob, offsets: np.ndarray):
+        self._blob = blob
+        self._offsets = offsets
+
+    def __getitem__(self, i: int) -> Optional[str]:
+        start, end = int(self._offsets[i]), int(self._offsets[i + 1])
+        if end == start:
+            return None
+        return self._blob[start:end].decode("utf-8")
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._blob) + self._offsets.nbytes
+
+
+class NumberColumn(Sequence):
+    '''float64 속성 컬럼의 i번째 값 (NaN은 None, 원본이 정수였던 컬럼은 int로 반환)'''
+
+    def __init__(self, values: np.ndarray, integral: bool):
+        self._values = values
+        self._integral = integral
+
+    def __getitem__(self, i: int):
+        value = float(self._values[i])
+        if math.isnan(value):
+            return None
+        return int(value) if self._integral else value
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    @property
+    def values(self) -> np.ndarray:
+        '''컬럼 전체 (float64, 값이 없으면 NaN)'''
+        return self._values
+
+    @property
+    def nbytes(self) -> int:
+        return self._values.nbytes
+
+
+def _open_columns(directory: Path, columns_meta: Dict[str, List[str]]) -> Dict[str, Sequence]:
+    columns: Dict[str, Sequence] = {}
+    for kind in ("int", "float"):
+        for key in columns_meta.get(kind, []):
+            columns[key] = NumberColumn(load_array(directory / f"{key}.npy"), integral=kind == "int")
+    for key in columns_meta.get("str", []):
+        columns[key] = StringColumn(open_blob(directory / f"{key}.bin"), load_array(directory / f"{key}_offsets.npy"))
+    return columns
+
+
+class AttributeView(Mapping):
+    '''노드(또는 엣지) 하나의 속성 사전. 키를 조회할 때만 해당 컬럼에서 값을 읽습니다 (값이 없는 속성은 키도 없음).'''
+
+    __slots__ = ("_type", "_columns", "_index")
+
+    def __init__(self, type_name: Optional[str], columns: Dict[str, Sequence], index: int):
+        self._type = type_name
+        self._columns = columns
+        self._index = index
+
+    def __getitem__(self, key: str):
+        if key == "type":
+            value = self._type
+        else:
+            column = self._columns.get(key)
+            value = column[self._index] if column is not None else None
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        if self._type is not None:
+            yield "type"
+        for key, column in self._columns.items():
+            if column[self._index] is not None:
+                yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class NodeView(Mapping):
+    '''networkx의 graph.nodes처럼 노드 ID → 속성 사전(AttributeView)을 제공합니다.'''
+
+    def __init__(self, graph: "CompactKnowledgeGraph"):
+        self._graph = graph
+
+    def __getitem__(self, node_id: str) -> AttributeView:
+        index = self._graph.node_index(node_id)
+        if index is None:
+            raise KeyError(node_id)
+        return self._graph.node_attributes(index)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._graph._node_ids)
+
+    def __len__(self) -> int:
+        return self._graph.num_nodes
+
+    def __contains__(self, node_id) -> bool:
+        return self._graph.node_index(node_id) is not None
+
+
+class CompactKnowledgeGraph:
+    '''읽기 전용 메모리 매핑 CSR 지식 그래프. networkx.DiGraph의 조회 API와 정수 노드 번호 기반 API를 함께 제공합니다.'''
+
+    def __init__(self, directory: Path):
+        '''
+        Args:
+            directory (Path): write_compact_graph로 저장한 디렉토리 또는 스냅샷 링크 (graphdb/knowledge_graph)
+        '''
+        # 링크를 한 번만 따라가 meta.json과 배열을 같은 버전에서 읽음 (스니펫 / 좌표 색인도 이 버전 디렉토리 아래에 저장)
+        self.directory = resolve_snapshot(directory)
+        meta = read_compact_graph_meta(self.directory)
+        if meta is None or meta.get("format_version") != COMPACT_GRAPH_FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 지식 그래프 스냅샷입니다: {self.directory}")
+        self.meta = meta
+        self.num_nodes: int = meta["num_nodes"]
+        self.num_edges: int = meta["num_edges"]
+        # 유형이 없는 노드/엣지는 빈 문자열 코드로 저장되어 있음
+        self.node_types: List[Optional[str]] = [name or None for name in meta["node_types"]]
+        self.edge_types: List[Optional[str]] = [name or None for name in meta["edge_types"]]
+        self._node_ids = StringColumn(
+            open_blob(self.directory / "node_ids.bin"), load_array(self.directory / "node_id_offsets.npy")
+        )
+        self.node_hash = load_array(self.directory / "node_hash.npy")
+        self.node_type = load_array(self.directory / "node_type.npy")
+        self.indptr = load_array(self.directory / "indptr.npy")
+        self.indices = load_array(self.directory / "indices.npy")
+        self.edge_type = load_array(self.directory / "edge_type.npy")
+        self._node_attrs = _open_columns(self.directory / "node_attrs", meta["node_attributes"])
+        self._edge_attrs = _open_columns(self.directory / "edge_attrs", meta["edge_attributes"])
+        self.nodes = NodeView(self)
+        self.node_index = lru_cache(maxsize=NODE_INDEX_CACHE_SIZE)(self._find_node_index)
+
+    # --- 정수 노드 번호 기반 API ---
+
+    def _find_node_index(self, node_id: str) -> Optional[int]:
+        '''노드 ID의 노드 번호 (해시 배열에서 이진 탐색 후 ID 비교, 없으면 None). node_index()는 이 결과를 캐시합니다.'''
+        if not isinstance(node_id, str):
+            return None
+        key = np.uint64(node_id_hash(node_id))
+        index = int(np.searchsorted(self.node_hash, key))
+        while index < self.num_nodes and self.node_hash[index] == key:
+            if self._node_ids[index] == node_id:
+                return index
+            index += 1
+        return None
+
+    def node_id(self, index: int) -> str:
+        return self._node_ids[index]
+
+    def type_code(self, type_name: str, edge: bool = False) -> Optional[int]:
+        '''노드(또는 엣지) 유형 이름의 코드 (없는 유형이면 None)'''
+        types = self.edge_types if edge else self.node_types
+        return types.index(type_name) if type_name in types else None
+
+    def attribute(self, index: int, key: str, default=None):
+        '''노드 번호의 속성 하나 (없으면 default)'''
+        column = self._node_attrs.get(key)
+        value = column[index] if column is not None else None
+        return default if value is None else value
+
+    def node_attributes(self, index: int) -> AttributeView:
+        '''노드 번호의 속성 사전 (type 포함, 값이 없는 속성은 제외)'''
+        return AttributeView(self.node_types[self.node_type[index]], self._node_attrs, index)
+
+    def edge_attributes(self, edge: int) -> AttributeView:
+        '''CSR 엣지 번호의 속성 사전 (type 포함, 값이 없는 속성은 제외)'''
+        return AttributeView(self.edge_types[self.edge_type[edge]], self._edge_attrs, edge)
+
+    def node_values(self, key: str) -> Optional[np.ndarray]:
+        '''숫자 노드 속성 컬럼 전체 (노드 번호 순서 float64, 값이 없으면 NaN. 숫자 컬럼이 아니면 None)'''
+        column = self._node_attrs.get(key)
+        return column.values if isinstance(column, NumberColumn) else None
+
+    def edge_values(self, key: str) -> Optional[np.ndarray]:
+        '''숫자 엣지 속성 컬럼 전체 (CSR 엣지 번호 순서 float64, 값이 없으면 NaN. 숫자 컬럼이 아니면 None)'''
+        column = self._edge_attrs.get(key)
+        return column.values if isinstance(column, NumberColumn) else None
+
+    def out_edge_range(self, index: int) -> Tuple[int, int]:
+        '''노드 번호에서 나가는 엣지의 CSR 범위 [start, end)'''
+        return int(self.indptr[index]), int(self.indptr[index + 1])
+
+    def successors_of(self, index: int) -> Tuple[np.ndarray, np.ndarray]:
+        '''노드 번호에서 나가는 엣지의 (대상 노드 번호 배열, 엣지 유형 코드 배열)'''
+        start, end = self.out_edge_range(index)
+        return self.indices[start:end], self.edge_type[start:end]
+
+    # --- networkx.DiGraph 호환 조회 API ---
+
+    def has_node(self, node_id: str) -> bool:
+        return self.node_index(node_id) is not None
+
+    def __contains__(self, node_id) -> bool:
+        return self.has_node(node_id)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._node_ids)
+
+    def __len__(self) -> int:
+        return self.num_nodes
+
+    def number_of_nodes(self) -> int:
+        return self.num_nodes
+
+    def number_of_edges(self) -> int:
+        return self.num_edges
+
+    def successors(self, node_id: str) -> Iterator[str]:
+        index = self.node_index(node_id)
+        if index is None:
+            raise KeyError(node_id)
+        targets, _ = self.successors_of(index)
+        return (self._node_ids[int(target)] for target in targets)
+
+    def out_edges(self, node_id: str, data: bool = False) -> Iterator[tuple]:
+        '''노드에서 나가는 엣지 (u, v) 또는 (u, v, 속성 사전). 없는 노드면 빈 결과'''
+        index = self.node_index(node_id)
+        if index is None:
+            return iter(())
+        return self._iter_out_edges(index, data)
+
+    def edges(self, data: bool = False) -> Iterator[tuple]:
+        for index in range(self.num_nodes):
+            yield from self._iter_out_edges(index, data)
+
+    def _iter_out_edges(self, index: int, data: bool) -> Iterator[tuple]:
+        source = self._node_ids[index]
+        start, end = self.out_edge_range(index)
+        for edge, target in enumerate(self.indices[start:end].tolist(), start):
+            target_id = self._node_ids[target]
+            yield (source, target_id, self.edge_attributes(edge)) if data else (source, target_id)
+
+    @property
+    def nbytes(self) -> int:
+        '''매핑된 파일 크기 합계 (프로세스 간 공유되는 페이지 캐시)'''
+        arrays = (self.node_hash, self.node_type, self.indptr, self.indices, self.edge_type)
+        columns = list(self._node_attrs.values()) + list(self._edge_attrs.values())
+        return self._node_ids.nbytes + sum(a.nbytes for a in arrays) + sum(c.nbytes for c in columns)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "nodes": self.num_nodes,
+            "edges": self.num_edges,
+            "node_types": self.node_types,
+            "edge_types": self.edge_types,
+            "size_mb": round(self.nbytes / 1024 / 1024, 2),
+        }
+
+
+_ABSENT = object()
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, (bool, np.bool_))
+
+
+def _write_columns(directory: Path, records: Sequence[Dict[str, Any]]) -> Dict[str, List[str]]:
+    '''
+    속성 사전 목록을 속성별 컬럼 파일로 저장합니다.
+    값이 모두 숫자인 속성은 float64 배열(정수뿐이면 "int"로 기록), 나머지는 문자열 blob으로 저장합니다.
+    '''
+    directory.mkdir(parents=True, exist_ok=True)
+    keys = sorted({key for record in records for key in record})
+    columns_meta: Dict[str, List[str]] = {"int": [], "float": [], "str": []}
+    for key in keys:
+        values = [record.get(key, _ABSENT) for record in records]
+        present = [value for value in values if value is not _ABSENT and value is not None]
+        if present and all(_is_number(value) for value in present):
+            encoded = np.fromiter(
+                (math.nan if value is _ABSENT or value is None else float(value) for value in values),
+                dtype=np.float64, count=len(values)
+            )
+            np.save(directory / f"{key}.npy", encoded)
+            # 정수 값은 float64로 정확히 표현되는 범위에서만 int로 되돌림
+            integral = all(isinstance(value, (int, np.integer)) and abs(value) < 2 ** 53 for value in present)
+            columns_meta["int" if integral else "float"].append(key)
+            continue
+        offsets = [0]
+        with open(directory / f"{key}.bin", "wb") as blob:
+            for value in values:
+                if value is _ABSENT or value is None or (isinstance(value, float) and math.isnan(value)):
+                    encoded = b""
+                else:
+                    encoded = str(value).encode("utf-8")
+                blob.write(encoded)
+                offsets.append(offsets[-1] + len(encoded))
+        np.save(directory / f"{key}_offsets.npy", np.asarray(offsets, dtype=np.int64))
+        columns_meta["str"].append(key)
+    return columns_meta
+
+
+def write_compact_graph(
+    directory: Path,
+    graph,
+    source_checksum: Optional[str] = None,
+    source_stat: Optional[Dict[str, int]] = None
+) -> Dict[str, Any]:
+    '''
+    networkx.DiGraph를 CSR 컬럼형 파일로 저장합니다.
+    노드 번호는 (노드 ID 해시, 노드 ID) 정렬 순서이고, 나가는 엣지는 networkx에 추가된 순서를 유지합니다.
+
+    Args:
+        directory (Path): 저장할 디렉토리 (graphdb/knowledge_graph)
+        graph (nx.DiGraph): 저장할 지식 그래프 (노드 ID는 문자열이어야 함)
+        source_checksum (str, optional): 원본 gpickle의 체크섬 (스냅샷 유효성 검사용)
+        source_stat (Dict[str, int], optional): 원본 gpickle의 {"size", "mtime_ns"} (체크섬 재계산 생략용)
+
+    Returns:
+        Dict[str, Any]: 저장한 meta.json 내용
+    '''
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    # meta.json은 마지막에 기록하므로, 저장 도중 중단되면 스냅샷 전체가 무효로 처리됨
+    (directory / "meta.json").unlink(missing_ok=True)
+
+    node_ids = list(graph.nodes)
+    if not all(isinstance(node_id, str) for node_id in node_ids):
+        raise ValueError("지식 그래프 노드 ID는 모두 문자열이어야 합니다.")
+    hashes = {node_id: node_id_hash(node_id) for node_id in node_ids}
+    node_ids.sort(key=lambda node_id: (hashes[node_id], node_id))
+    node_index = {node_id: index for index, node_id in enumerate(node_ids)}
+    np.save(directory / "node_hash.npy", np.asarray([hashes[node_id] for node_id in node_ids], dtype=np.uint64))
+
+    offsets = [0]
+    with open(directory / "node_ids.bin", "wb") as blob:
+        for node_id in node_ids:
+            encoded = node_id.encode("utf-8")
+            blob.write(encoded)
+            offsets.append(offsets[-1] + len(encoded))
+    np.save(directory / "node_id_offsets.npy", np.asarray(offsets, dtype=np.int64))
+
+    node_records = [dict(graph.nodes[node_id]) for node_id in node_ids]
+    node_type_names = [record.pop("type", None) or "" for record in node_records]
+    node_types = sorted(set(node_type_names))
+    node_codes = {name: code for code, name in enumerate(node_types)}
+    np.save(directory / "node_type.npy", np.asarray([node_codes[name] for name in node_type_names], dtype=np.uint8))
+
+    indptr = [0]
+    targets: List[int] = []
+    edge_records: List[Dict[str, Any]] = []
+    for node_id in node_ids:
+        for _, neighbor_id, data in graph.out_edges(node_id, data=True):
+            targets.append(node_index[neighbor_id])
+            edge_records.append(dict(data))
+        indptr.append(len(targets))
+    edge_type_names = [record.pop("type", None) or "" for record in edge_records]
+    edge_types = sorted(set(edge_type_names))
+    edge_codes = {name: code for code, name in enumerate(edge_types)}
+    if len(node_types) > 255 or len(edge_types) > 255:
+        raise ValueError("노드/엣지 유형이 너무 많습니다 (최대 255개).")
+    np.save(directory / "indptr.npy", np.asarray(indptr, dtype=np.int64))
+    np.save(directory / "indices.npy", np.asarray(targets, dtype=np.int32))
+    np.save(directory / "edge_type.npy", np.asarray([edge_codes[name] for name in edge_type_names], dtype=np.uint8))
+
+    meta = {
+        "format_version": COMPACT_GRAPH_FORMAT_VERSION,
+        "num_nodes": len(node_ids),
+        "num_edges": len(targets),
+        "node_types": node_types,
+        "edge_types": edge_types,
+        "node_attributes": _write_columns(directory / "node_attrs", node_records),
+        "edge_attributes": _write_columns(directory / "edge_attrs", edge_records),
+        "source_checksum": source_checksum,
+        "source_stat": source_stat,
+    }
+    with open(directory / "meta.json", "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    return meta
+
+
+def read_compact_graph_meta(directory: Path) -> Optional[dict]:
+    '''지식 그래프 스냅샷의 meta.json을 읽습니다. 없거나 읽을 수 없으면 None을 반환합니다.'''
+    meta_path = Path(directory) / "meta.json"
+    if not meta_path.exists():
+        return None
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,313 @@
+'''
+메모리 매핑 컬럼형 문서 저장소 (여러 워커 프로세스가 페이지 캐시를 공유)
+
+FAISS.load_local은 index.pkl의 InMemoryDocstore(모든 Document 객체)를 프로세스마다 언피클하므로
+시작이 느리고 uvicorn 워커 수만큼 문서 메모리가 늘어납니다. MmapDocstore는 vectordb/<name>/docstore/에
+- content.bin / content_offsets.npy   : UTF-8 본문을 이어 붙인 blob과 문서별 시작 위치 (N+1개)
+- columns/<key>.npy                   : RSTR_ID, content_id, UC_SEQ 같은 정수 메타데이터 (int64, 없으면 MISSING)
+- metadata.bin / metadata_offsets.npy : 컬럼으로 저장하지 않은 나머지 메타데이터 JSON blob과 시작 위치
+- meta.json                            : 포맷 버전, 문서 수, 컬럼 목록(정수가 아닌 값이 섞여 JSON에 남긴 키 포함), 원본 docstore(index.pkl) 체크섬
+을 두고 읽기 전용 mmap으로 열어, 검색 결과로 필요한 문서만 그때그때 Document로 만듭니다.
+식별자만 필요하면 column()으로 Document를 만들지 않고 배열에서 바로 읽을 수 있습니다.
+docstore id는 FAISS 벡터 위치의 문자열("0", "1", ...)입니다.
+벡터 위치는 인덱스 생성 시 정해지는 정수 문서 ID로, FAISS / BM25 / 메타데이터 필터 / 하이브리드 결합이 같은 값을 키로 쓰며
+모든 Document의 metadata["doc_id"]에 담겨 전달됩니다 (RSTR_ID / UC_SEQ 같은 원본 ID는 columns로 매핑).
+'''
+import json
+import mmap
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Union
+
+import numpy as np
+from langchain_community.docstore.base import Docstore
+from langchain_core.documents import Document
+
+from .snapshot import resolve_snapshot
+
+# 포맷 버전 (스냅샷은 write_docstore로만 저장하며, ai-preprocessing도 vectordb.write_docstore_snapshot을 사용)
+DOCSTORE_FORMAT_VERSION = 2
+DOCSTORE_DIRNAME = "docstore"
+# 값이 모두 정수이면 int64 배열로 저장할 메타데이터 키
+DOCSTORE_INT_COLUMNS = ("RSTR_ID", "content_id", "UC_SEQ")
+# 정수 컬럼에서 키가 없음(MISSING) / 값이 None(NULL)임을 나타내는 값
+MISSING = np.iinfo(np.int64).min
+NULL = MISSING + 1
+# 정수 문서 ID(벡터 위치)를 담는 메타데이터 키. 위치 자체이므로 스냅샷에는 저장하지 않음
+DOC_ID_KEY = "doc_id"
+
+
+def public_metadata(doc: Document) -> dict:
+    """
+    API 응답(sources)에 담을 문서 메타데이터.
+    정수 문서 ID(벡터 위치)는 인덱스를 다시 만들면 바뀌는 내부 값이므로 제외합니다.
+
+    Args:
+        doc (Document): 문서 객체
+
+    Returns:
+        dict: metadata["doc_id"]를 뺀 메타데이터 복사본
+    """
+    return {key: value for key, value in (doc.metadata or {}).items() if key != DOC_ID_KEY}
+
+
+def open_blob(path: Path):
+    """읽기 전용 mmap (빈 파일은 mmap할 수 없으므로 빈 bytes)"""
+    with open(path, "rb") as f:
+        if f.seek(0, 2) == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class PositionIds(Mapping):
+    """
+    FAISS 벡터 위치 → docstore id 매핑 (index_to_docstore_id 대체).
+    위치를 그대로 문자열 id로 사용하므로 문서 수만큼의 uuid 사전을 만들지 않습니다.
+    """
+
+    def __init__(self, size: int):
+        self._size = size
+
+    def __getitem__(self, position: int) -> str:
+        if not 0 <= position < self._size:
+            raise KeyError(position)
+        return str(position)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(self._size))
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class DocumentSequence(Sequence):
+    """
+    MmapDocstore의 문서를 벡터 위치 순서의 리스트처럼 제공합니다 (SparseBM25.docs 등).
+    인덱싱할 때만 Document를 만들므로 전체 문서를 메모리에 복사하지 않습니다.
+    """
+
+    def __init__(self, docstore: "MmapDocstore"):
+        self.docstore = docstore
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self.docstore.document(i) for i in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError(position)
+        return self.docstore.document(int(position))
+
+    def __len__(self) -> int:
+        return self.docstore.num_docs
+
+
+class MmapDocstore(Docstore):
+    """읽기 전용 메모리 매핑 문서 저장소. 문서는 조회할 때만 Document 객체로 만듭니다."""
+
+    def __init__(self, directory: Path):
+        """
+        Args:
+            directory (Path): write_docstore로 저장한 디렉토리 또는 스냅샷 링크 (vectordb/<name>/docstore)
+        """
+        # 링크를 한 번만 따라가 meta.json과 배열을 같은 버전에서 읽음
+        self.directory = resolve_snapshot(directory)
+        meta = read_docstore_meta(self.directory)
+        if meta is None or meta.get("format_version") != DOCSTORE_FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 docstore 스냅샷입니다: {self.directory}")
+        self.num_docs = meta["num_docs"]
+        self._content = open_blob(self.directory / "content.bin")
+        self._content_offsets = np.load(self.directory / "content_offsets.npy", mmap_mode="r")
+        self._metadata = open_blob(self.directory / "metadata.bin")
+        self._metadata_offsets = np.load(self.directory / "metadata_offsets.npy", mmap_mode="r")
+        self.columns: Dict[str, np.ndarray] = {
+            name: np.load(self.directory / "columns" / f"{name}.npy", mmap_mode="r") for name in meta["columns"]
+        }
+        # 정수 컬럼 후보 중 JSON 메타데이터에 남긴 키 (기록이 없는 이전 스냅샷은 None)
+        self._json_columns = meta.get("json_columns")
+
+    def __len__(self) -> int:
+        return self.num_docs
+
+    def column(self, name: str) -> Optional[np.ndarray]:
+        """
+        정수 메타데이터 컬럼(벡터 위치 순서, 값이 없으면 MISSING)을 반환합니다. 없는 컬럼이면 None.
+
+        Args:
+            name (str): 메타데이터 키 (예: "RSTR_ID")
+
+        Returns:
+            np.ndarray: 읽기 전용 int64 배열
+        """
+        return self.columns.get(name)
+
+    def in_metadata(self, name: str) -> bool:
+        """
+        정수 컬럼 후보 키의 값이 컬럼이 아니라 문서별 JSON 메타데이터에 있을 수 있는지 여부.
+
+        Args:
+            name (str): 메타데이터 키 (DOCSTORE_INT_COLUMNS 중 하나)
+
+        Returns:
+            bool: JSON 메타데이터를 읽어야 하면 True
+        """
+        if name in self.columns:
+            return False
+        return self._json_columns is None or name in self._json_columns
+
+    def document(self, position: int) -> Document:
+        """
+        벡터 위치의 문서를 Document로 만듭니다.
+
+        Args:
+            position (int): FAISS 벡터 위치
+
+        Returns:
+            Document: 문서 (호출마다 새 객체, id는 docstore id와 같은 벡터 위치 문자열, metadata["doc_id"]는 벡터 위치)
+        """
+        start, end = int(self._content_offsets[position]), int(self._content_offsets[position + 1])
+        content = self._content[start:end].decode("utf-8")
+        return Document(id=str(position), page_content=content, metadata=self.metadata(position))
+
+    def metadata(self, position: int) -> dict:
+        """
+        벡터 위치 문서의 메타데이터를 만듭니다 (본문은 읽지 않음).
+
+        Args:
+            position (int): FAISS 벡터 위치
+
+        Returns:
+            dict: 정수 컬럼 값과 JSON 메타데이터 (metadata["doc_id"]는 벡터 위치)
+        """
+        metadata = {DOC_ID_KEY: position}
+        for name, values in self.columns.items():
+            value = values[position]
+            if value != MISSING:
+                metadata[name] = None if value == NULL else int(value)
+        start, end = int(self._metadata_offsets[position]), int(self._metadata_offsets[position + 1])
+        if end > start:
+            metadata.update(json.loads(self._metadata[start:end]))
+        return metadata
+
+    def search(self, search: str) -> Union[str, Document]:
+        """docstore id(벡터 위치 문자열)로 문서를 찾습니다. langchain Docstore 인터페이스."""
+        try:
+            position = int(search)
+        except (TypeError, ValueError):
+            return f"ID {search} not found."
+        if not 0 <= position < self.num_docs:
+            return f"ID {search} not found."
+        return self.document(position)
+
+    def add(self, texts: Dict[str, Document]) -> None:
+        raise NotImplementedError("MmapDocstore는 읽기 전용입니다.")
+
+    def delete(self, ids: List) -> None:
+        raise NotImplementedError("MmapDocstore는 읽기 전용입니다.")
+
+    @property
+    def nbytes(self) -> int:
+        """매핑된 파일 크기 합계 (프로세스 간 공유되는 페이지 캐시)"""
+        return (
+            len(self._content) + len(self._metadata)
+            + self._content_offsets.nbytes + self._metadata_offsets.nbytes
+            + sum(values.nbytes for values in self.columns.values())
+        )
+
+
+_ABSENT = object()
+
+
+def _is_int(value) -> bool:
+    return isinstance(value, (int, np.integer)) and not isinstance(value, bool)
+
+
+def write_docstore(
+    directory: Path,
+    documents: Iterable[Document],
+    docstore_checksum: Optional[str],
+    source_stat: Optional[Dict[str, int]] = None
+) -> int:
+    """
+    문서를 FAISS 벡터 순서대로 메모리 매핑 가능한 컬럼형 파일로 저장합니다.
+    DOCSTORE_INT_COLUMNS 중 모든 값이 정수인 키는 int64 컬럼으로, 나머지 메타데이터는 문서별 JSON으로 저장합니다.
+    metadata["doc_id"]는 벡터 위치와 같아야 하며 저장하지 않습니다 (읽을 때 위치로 다시 채움).
+
+    Args:
+        directory (Path): 저장할 디렉토리 (vectordb/<name>/docstore)
+        documents (Iterable[Document]): 벡터 위치 순서의 문서
+        docstore_checksum (str, optional): 원본 index.pkl의 체크섬 (스냅샷 유효성 검사용)
+        source_stat (Dict[str, int], optional): 원본 index.pkl의 {"size", "mtime_ns"} (체크섬 재계산 생략용)
+
+    Returns:
+        int: 저장한 문서 수
+    """
+    directory = Path(directory)
+    (directory / "columns").mkdir(parents=True, exist_ok=True)
+    # meta.json은 마지막에 기록하므로, 저장 도중 중단되면 스냅샷 전체가 무효로 처리됨
+    (directory / "meta.json").unlink(missing_ok=True)
+
+    content_offsets = [0]
+    column_values = {name: [] for name in DOCSTORE_INT_COLUMNS}
+    extras: List[dict] = []
+    with open(directory / "content.bin", "wb") as content_file:
+        for doc in documents:
+            content = doc.page_content.encode("utf-8")
+            content_file.write(content)
+            position = len(content_offsets) - 1
+            content_offsets.append(content_offsets[-1] + len(content))
+            extra = dict(doc.metadata or {})
+            doc_id = extra.pop(DOC_ID_KEY, position)
+            if doc_id != position:
+                raise ValueError(f"문서 ID({doc_id})가 벡터 위치({position})와 다릅니다.")
+            for name, values in column_values.items():
+                values.append(extra.pop(name, _ABSENT))
+            extras.append(extra)
+    np.save(directory / "content_offsets.npy", np.asarray(content_offsets, dtype=np.int64))
+
+    columns, json_columns = [], []
+    for name, values in column_values.items():
+        present = [value for value in values if value is not _ABSENT and value is not None]
+        if present and all(_is_int(value) and NULL < value <= np.iinfo(np.int64).max for value in present):
+            encoded = (MISSING if value is _ABSENT else NULL if value is None else value for value in values)
+            np.save(directory / "columns" / f"{name}.npy", np.fromiter(encoded, dtype=np.int64, count=len(values)))
+            columns.append(name)
+        else:
+            # 정수가 아닌 값이 섞인 키는 원래 타입을 유지하도록 JSON 메타데이터에 그대로 둠
+            if present:
+                json_columns.append(name)
+            for extra, value in zip(extras, values):
+                if value is not _ABSENT:
+                    extra[name] = value
+
+    metadata_offsets = [0]
+    with open(directory / "metadata.bin", "wb") as metadata_file:
+        for extra in extras:
+            metadata = json.dumps(extra, ensure_ascii=False, default=str).encode("utf-8") if extra else b""
+            metadata_file.write(metadata)
+            metadata_offsets.append(metadata_offsets[-1] + len(metadata))
+    np.save(directory / "metadata_offsets.npy", np.asarray(metadata_offsets, dtype=np.int64))
+
+    num_docs = len(content_offsets) - 1
+    meta = {
+        "format_version": DOCSTORE_FORMAT_VERSION,
+        "num_docs": num_docs,
+        "columns": columns,
+        "json_columns": json_columns,
+        "docstore_checksum": docstore_checksum,
+        "source_stat": source_stat,
+    }
+    with open(directory / "meta.json", "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    return num_docs
+
+
+def read_docstore_meta(directory: Path) -> Optional[dict]:
+    """docstore 스냅샷의 meta.json을 읽습니다. 없거나 읽을 수 없으면 None을 반환합니다."""
+    meta_path = Path(directory) / "meta.json"
+    if not meta_path.exists():
+        return None
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,225 @@
+'''
+쿼리 임베딩 캐시
+
+FAISS 검색(TMMCC_HybridSearch, as_retriever)은 쿼리마다 임베딩 API를 호출하므로,
+같은 도시/선호 조건으로 만들어진 동일한 쿼리도 매번 네트워크 왕복이 발생합니다.
+CachedEmbeddings는 임베딩 객체를 감싸 (모델 이름 + 정규화된 텍스트) 키로 쿼리 벡터를 캐시합니다.
+
+- 1단계: 프로세스 내 LRU (EMBEDDING_CACHE_MAX_ENTRIES개)
+- 2단계: 선택적 SQLite 파일 (EMBEDDING_CACHE_PATH 설정 시, 워커 프로세스/재시작 간 공유)
+- 문서 임베딩(embed_documents)은 인덱스 생성용이므로 캐시하지 않고 그대로 전달합니다.
+'''
+import asyncio
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "4096"))
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """유니코드 정규화(NFKC) 후 연속 공백을 하나로 합치고 앞뒤 공백을 제거합니다."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+
+
+def embedding_model_name(embeddings: Embeddings) -> str:
+    """임베딩 객체의 모델 이름 (model / model_name 속성이 없으면 클래스 이름)"""
+    for attr in ("model", "model_name"):
+        value = getattr(embeddings, attr, None)
+        if isinstance(value, str) and value:
+            return value
+    return embeddings.__class__.__name__
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    쿼리 임베딩을 메모리 LRU와 선택적 SQLite 저장소에 캐시하는 Embeddings 래퍼.
+    캐시 미스일 때만 내부 임베딩 객체(예: OpenAIEmbeddings)를 호출합니다.
+    """
+
+    def __init__(
+        self,
+        underlying: Embeddings,
+        model_name: Optional[str] = None,
+        max_entries: int = EMBEDDING_CACHE_MAX_ENTRIES,
+        db_path: Optional[str] = EMBEDDING_CACHE_PATH or None
+    ):
+        """
+        Args:
+            underlying (Embeddings): 실제 임베딩 객체
+            model_name (str, optional): 캐시 키에 사용할 모델 이름 (기본값: underlying의 모델 이름)
+            max_entries (int): 메모리 LRU 최대 항목 수
+            db_path (str, optional): SQLite 캐시 파일 경로 (None이면 메모리 캐시만 사용)
+        """
+        self.underlying = underlying
+        self.model_name = model_name or embedding_model_name(underlying)
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self.db_path = db_path
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        if db_path:
+            self._open_db(db_path)
+
+    def _open_db(self, db_path: str) -> None:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False, timeout=5)
+            # 여러 uvicorn 워커가 같은 파일을 동시에 읽고 쓸 수 있도록 WAL 모드 사용
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS query_embeddings ("
+                "key TEXT PRIMARY KEY, model TEXT NOT NULL, dim INTEGER NOT NULL, "
+                "vector BLOB NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._db.commit()
+            print(f"임베딩 캐시 SQLite 저장소 사용: {db_path}")
+        except sqlite3.Error as e:
+            print(f"임베딩 캐시 SQLite 저장소 열기 실패, 메모리 캐시만 사용: {e}")
+            self._db = None
+
+    def _key(self, normalized: str) -> str:
+        return hashlib.sha1(f"{self.model_name}\0{normalized}".encode("utf-8")).hexdigest()
+
+    # --- 메모리 / 디스크 캐시 ---
+
+    def _memory_get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+            return vector
+
+    def _memory_put(self, key: str, vector: np.ndarray) -> None:
+        with self._lock:
+            self._memory[key] = vector
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _disk_get(self, key: str) -> Optional[np.ndarray]:
+        if self._db is None:
+            return None
+        try:
+            with self._db_lock:
+                row = self._db.execute("SELECT vector FROM query_embeddings WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            print(f"임베딩 캐시 조회 실패: {e}")
+            return None
+        if row is None:
+            return None
+        vector = np.frombuffer(row[0], dtype=np.float32)
+        with self._lock:
+            self.disk_hits += 1
+        self._memory_put(key, vector)
+        return vector
+
+    def _disk_put(self, key: str, vector: np.ndarray) -> None:
+        if self._db is None:
+            return
+        try:
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO query_embeddings (key, model, dim, vector, created_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, self.model_name, int(vector.shape[0]), vector.tobytes(), time.time())
+                )
+                self._db.commit()
+        except sqlite3.Error as e:
+            print(f"임베딩 캐시 저장 실패: {e}")
+
+    def _store(self, key: str, embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        self._memory_put(key, vector)
+        self._disk_put(key, vector)
+        return vector
+
+    def _count_miss(self) -> None:
+        with self._lock:
+            self.misses += 1
+
+    # --- Embeddings 인터페이스 ---
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """문서 임베딩은 캐시하지 않고 내부 임베딩 객체로 그대로 전달합니다."""
+        return self.underlying.embed_documents(texts)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.underlying.aembed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        """
+        쿼리 임베딩을 반환합니다. 메모리 → SQLite → 임베딩 API 순서로 조회합니다.
+
+        Args:
+            text (str): 쿼리 텍스트
+
+        Returns:
+            List[float]: 쿼리 임베딩 벡터
+        """
+        normalized = normalize_text(text)
+        key = self._key(normalized)
+        vector = self._memory_get(key)
+        if vector is None:
+            vector = self._disk_get(key)
+        if vector is None:
+            self._count_miss()
+            vector = self._store(key, self.underlying.embed_query(normalized))
+        return vector.tolist()
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """
+        embed_query의 비동기 버전. SQLite 조회/저장은 스레드에서 실행하여 이벤트 루프를 막지 않습니다.
+
+        Args:
+            text (str): 쿼리 텍스트
+
+        Returns:
+            List[float]: 쿼리 임베딩 벡터
+        """
+        normalized = normalize_text(text)
+        key = self._key(normalized)
+        vector = self._memory_get(key)
+        if vector is None and self._db is not None:
+            vector = await asyncio.to_thread(self._disk_get, key)
+        if vector is None:
+            self._count_miss()
+            embedding = await self.underlying.aembed_query(normalized)
+            if self._db is not None:
+                vector = await asyncio.to_thread(self._store, key, embedding)
+            else:
+                vector = self._store(key, embedding)
+        return vector.tolist()
+
+    def stats(self) -> dict:
+        """메모리/디스크 히트, 미스, 히트율 통계를 반환합니다."""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "model": self.model_name,
+            "entries": len(self._memory),
+            "max_entries": self.max_entries,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "db_path": self.db_path if self._db is not None else None,
+        }
@@ -0,0 +1,191 @@
+'''
+임베딩 제공자(provider) 선택과 인덱스 메타데이터
+
+벡터 DB마다 어떤 임베딩으로 만들어졌는지 vectordb/<name>/index_meta.json에 기록하고,
+로드할 때 같은 임베딩을 생성합니다. 다른 임베딩(제공자, 모델, 차원)으로 검색하면
+결과가 조용히 틀어지므로 불일치는 로드 시점에 거부합니다.
+
+제공자
+- "openai"               : OpenAIEmbeddings (기본값, 네트워크 필요)
+- "sentence-transformers": 로컬 CPU 다국어 문장 임베딩 모델
+- "hashing"              : 글자 n-gram 해싱 임베딩 (네트워크/모델 파일 없이 결정적, 오프라인 부하 테스트/CI용)
+
+ai-preprocessing의 create_restaurant_vectordb.py도 이 모듈로 임베딩을 만들고 index_meta.json을 기록합니다.
+'''
+import json
+import os
+import re
+import unicodedata
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+INDEX_META_FILENAME = "index_meta.json"
+INDEX_META_FORMAT_VERSION = 1
+
+EMBEDDING_PROVIDERS = ("openai", "sentence-transformers", "hashing")
+
+# 비어 있으면 인덱스 메타데이터에 기록된 제공자를 따르고, 설정하면 그 제공자만 허용합니다.
+EMBEDDING_PROVIDER = os.getenv("EMBEDDING_PROVIDER", "").lower()
+
+DEFAULT_SENTENCE_TRANSFORMER_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+DEFAULT_HASHING_DIM = 384
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class EmbeddingMismatchError(ValueError):
+    """벡터 DB를 만든 임베딩과 검색에 사용할 임베딩이 다를 때 발생하는 오류"""
+
+
+class HashingEmbeddings(Embeddings):
+    """
+    글자 1~3-gram을 부호 있는 특성 해싱(feature hashing)으로 고정 차원에 누적한 뒤 L2 정규화하는 임베딩.
+    모델 파일이나 네트워크 없이 항상 같은 벡터를 만들므로 오프라인 부하 테스트와 CI에 사용합니다.
+    """
+
+    def __init__(self, dim: int = DEFAULT_HASHING_DIM):
+        self.dim = dim
+        self.model = f"hashing-v1-{dim}"
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        normalized = _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text)).strip().lower()
+        for token in normalized.split(" "):
+            padded = f" {token} "
+            for n in (1, 2, 3):
+                for i in range(len(padded) - n + 1):
+                    gram = padded[i:i + n]
+                    if not gram.strip():
+                        continue
+                    h = zlib.crc32(gram.encode("utf-8"))
+                    vector[h % self.dim] += 1.0 if (h >> 31) & 1 else -1.0
+        norm = float(np.linalg.norm(vector))
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+class SentenceTransformerEmbeddings(Embeddings):
+    """sentence-transformers 모델로 CPU에서 계산하는 정규화된 문장 임베딩"""
+
+    def __init__(self, model_name: str = DEFAULT_SENTENCE_TRANSFORMER_MODEL, batch_size: int = 64):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = model_name
+        self.batch_size = batch_size
+        self._encoder = SentenceTransformer(model_name, device="cpu")
+        dim_fn = getattr(self._encoder, "get_embedding_dimension", None) or self._encoder.get_sentence_embedding_dimension
+        self.dim = int(dim_fn())
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = self._encoder.encode(
+            list(texts), batch_size=self.batch_size, normalize_embeddings=True, convert_to_numpy=True
+        )
+        return vectors.astype(np.float32).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+def create_embeddings(provider: str, model: Optional[str] = None, dim: Optional[int] = None) -> Embeddings:
+    """
+    제공자 이름으로 임베딩 객체를 생성합니다.
+
+    Args:
+        provider (str): "openai", "sentence-transformers", "hashing"
+        model (str, optional): 모델 이름 (제공자 기본값 사용 시 None)
+        dim (int, optional): 해싱 임베딩 차원
+
+    Returns:
+        Embeddings: 임베딩 객체
+    """
+    provider = provider.lower()
+    if provider == "openai":
+        from langchain_openai import OpenAIEmbeddings
+        return OpenAIEmbeddings(model=model) if model else OpenAIEmbeddings()
+    if provider == "sentence-transformers":
+        return SentenceTransformerEmbeddings(model or DEFAULT_SENTENCE_TRANSFORMER_MODEL)
+    if provider == "hashing":
+        return HashingEmbeddings(dim or DEFAULT_HASHING_DIM)
+    raise ValueError(f"지원하지 않는 임베딩 제공자입니다: {provider}")
+
+
+def describe_embeddings(provider: str, embeddings: Embeddings, dim: Optional[int] = None) -> Dict[str, Any]:
+    """인덱스 메타데이터에 기록할 임베딩 정보 (제공자, 모델, 차원)"""
+    return {
+        "provider": provider.lower(),
+        "model": getattr(embeddings, "model", None) or getattr(embeddings, "model_name", None),
+        "dim": dim or getattr(embeddings, "dim", None),
+    }
+
+
+def read_index_meta(vectordb_path: Path) -> Optional[Dict[str, Any]]:
+    """vectordb/<name>/index_meta.json을 읽습니다. 없으면(이전 형식 인덱스) None을 반환합니다."""
+    meta_path = Path(vectordb_path) / INDEX_META_FILENAME
+    if not meta_path.exists():
+        return None
+    with open(meta_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_index_meta(vectordb_path: Path, meta: Dict[str, Any]) -> None:
+    """인덱스 메타데이터를 기록합니다. 기존 항목(예: 인덱스 종류)은 유지하고 주어진 항목만 갱신합니다."""
+    current = read_index_meta(vectordb_path) or {}
+    current.update(meta)
+    current["format_version"] = INDEX_META_FORMAT_VERSION
+    with open(Path(vectordb_path) / INDEX_META_FILENAME, "w", encoding="utf-8") as f:
+        json.dump(current, f, ensure_ascii=False, indent=2)
+
+
+def resolve_index_embeddings(index_name: str, meta: Optional[Dict[str, Any]]) -> Tuple[Embeddings, Dict[str, Any]]:
+    """
+    인덱스 메타데이터에 기록된 임베딩을 생성합니다.
+    EMBEDDING_PROVIDER가 설정되어 있고 기록된 제공자와 다르면 EmbeddingMismatchError를 발생시킵니다.
+    메타데이터가 없는 이전 인덱스는 OpenAI로 만들어진 것으로 간주합니다.
+
+    Args:
+        index_name (str): 벡터 DB 이름 (오류 메시지용)
+        meta (Dict[str, Any], optional): read_index_meta 결과
+
+    Returns:
+        Tuple[Embeddings, Dict[str, Any]]: (임베딩 객체, 기대하는 임베딩 정보)
+    """
+    recorded = (meta or {}).get("embedding")
+    if recorded is None:
+        provider = EMBEDDING_PROVIDER or "openai"
+        if EMBEDDING_PROVIDER and EMBEDDING_PROVIDER != "openai":
+            print(f"경고: {index_name}에 {INDEX_META_FILENAME}이 없어 임베딩 일치 여부는 벡터 차원으로만 확인합니다.")
+        embeddings = create_embeddings(provider)
+        return embeddings, describe_embeddings(provider, embeddings)
+
+    if EMBEDDING_PROVIDER and EMBEDDING_PROVIDER != recorded["provider"]:
+        raise EmbeddingMismatchError(
+            f"{index_name}은(는) '{recorded['provider']}' 임베딩으로 만들어졌지만 "
+            f"EMBEDDING_PROVIDER='{EMBEDDING_PROVIDER}'로 로드하려고 했습니다."
+        )
+    embeddings = create_embeddings(recorded["provider"], recorded.get("model"), recorded.get("dim"))
+    expected = dict(recorded)
+    actual_model = describe_embeddings(recorded["provider"], embeddings)["model"]
+    if recorded.get("model") and actual_model and actual_model != recorded["model"]:
+        raise EmbeddingMismatchError(
+            f"{index_name}은(는) '{recorded['model']}' 모델로 만들어졌지만 '{actual_model}' 모델이 생성되었습니다."
+        )
+    return embeddings, expected
+
+
+def validate_index_dimension(index_name: str, vectorstore, expected: Dict[str, Any]) -> None:
+    """FAISS 인덱스 벡터 차원이 임베딩 차원과 다르면 EmbeddingMismatchError를 발생시킵니다."""
+    expected_dim = expected.get("dim")
+    index_dim = getattr(getattr(vectorstore, "index", None), "d", None)
+    if expected_dim and index_dim and int(expected_dim) != int(index_dim):
+        raise EmbeddingMismatchError(
+            f"{index_name}의 벡터 차원({index_dim})이 임베딩 '{expected.get('model')}'의 차원({expected_dim})과 다릅니다."
+        )
@@ -0,0 +1,401 @@
+'''
+지식 그래프 관광지 / 식당 좌표의 공간 색인 (반경 / k-최근접 조회)
+
+Attraction(LAT / LNG)과 Restaurant(RSTR_LA / RSTR_LO) 노드의 위도 / 경도를 단위 구면 위의 3차원 좌표로 바꿔
+노드 유형별 scipy cKDTree로 색인합니다. 구면 위 두 점의 직선(현) 거리는 대원(haversine) 거리와 단조 관계이므로
+현 거리로 찾은 반경 / 최근접 결과는 haversine 기준 결과와 같고, 반환 거리는 대원 거리(m)입니다.
+- CompactKnowledgeGraph : graphdb/knowledge_graph/geo 에 저장한 좌표 노드 번호 / 위경도 배열을 mmap으로 열고 트리만 만듭니다.
+                          색인은 그래프 생성 시 create_knowledge_graph.py가 write_geo_index로 함께 저장하며,
+                          없거나 그래프 체크섬이 다르면 첫 로드 때 그래프의 좌표 컬럼으로 다시 저장합니다.
+- networkx.DiGraph      : 노드 속성에서 좌표를 모아 메모리에서 만듭니다.
+'''
+import json
+import logging
+import math
+import time
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from .compact_graph import CompactKnowledgeGraph, load_array, read_compact_graph_meta
+from .snapshot import publish_snapshot, resolve_snapshot
+
+logger = logging.getLogger(__name__)
+
+# 저장 형식이 바뀌면 올려서 저장된 색인을 무효화
+GEO_INDEX_FORMAT_VERSION = 1
+GEO_INDEX_DIRNAME = "geo"
+# 좌표를 색인할 노드 유형 (저장 순서)
+GEO_NODE_TYPES = ("Attraction", "Restaurant")
+# 지구 평균 반지름 (m)
+EARTH_RADIUS_METERS = 6371008.8
+
+
+class GeoNeighbor(NamedTuple):
+    '''공간 조회 결과 한 건'''
+    node_id: str
+    distance: float  # 대원 거리 (m)
+
+
+def valid_coordinates(latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    '''유효한 위경도 여부 (NaN, 범위 밖, 값이 없어 0으로 채워진 (0, 0) 제외)'''
+    return (
+        np.isfinite(latitudes) & np.isfinite(longitudes)
+        & (np.abs(latitudes) <= 90) & (np.abs(longitudes) <= 180)
+        & ((latitudes != 0) | (longitudes != 0))
+    )
+
+
+def to_unit_xyz(latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    '''위경도(도) → 단위 구면 3차원 좌표 (n, 3)'''
+    lat = np.radians(np.asarray(latitudes, dtype=np.float64))
+    lon = np.radians(np.asarray(longitudes, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)))
+
+
+def meters_to_chord(meters: float) -> float:
+    '''대원 거리(m) → 단위 구면 현 거리'''
+    return 2.0 * math.sin(min(max(meters, 0.0) / (2.0 * EARTH_RADIUS_METERS), math.pi / 2))
+
+
+def chord_to_meters(chord: np.ndarray) -> np.ndarray:
+    '''단위 구면 현 거리 → 대원 거리(m)'''
+    return 2.0 * EARTH_RADIUS_METERS * np.arcsin(np.minimum(np.asarray(chord, dtype=np.float64) / 2.0, 1.0))
+
+
+def _parse_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+class GeoIndex:
+    '''노드 유형별 좌표 KD-트리 (반경 / k-최근접 조회, 결과는 가까운 순서)'''
+
+    def __init__(
+        self,
+        nodes: np.ndarray,
+        coordinates: np.ndarray,
+        type_ranges: Dict[str, Tuple[int, int]],
+        node_ids: Optional[List[str]] = None,
+        graph: Optional[CompactKnowledgeGraph] = None,
+    ):
+        '''
+        Args:
+            nodes (np.ndarray): 좌표가 있는 노드 번호 (유형별로 모여 있음)
+            coordinates (np.ndarray): nodes 순서의 (위도, 경도) 배열 (n, 2)
+            type_ranges (Dict[str, Tuple[int, int]]): 노드 유형 → nodes의 [start, end) 구간
+            node_ids (List[str], optional): 노드 번호 → 노드 ID (networkx 그래프)
+            graph (CompactKnowledgeGraph, optional): 노드 번호 ↔ 노드 ID를 바꿀 CSR 그래프
+        '''
+        self.nodes = np.asarray(nodes, dtype=np.int64)
+        self.coordinates = np.asarray(coordinates, dtype=np.float64).reshape(-1, 2)
+        self.type_ranges = {name: (int(start), int(end)) for name, (start, end) in type_ranges.items() if end > start}
+        self._node_ids = node_ids
+        self._node_numbers = {node_id: number for number, node_id in enumerate(node_ids)} if node_ids is not None else None
+        self._graph = graph
+        self._rows = {number: row for row, number in enumerate(self.nodes.tolist())}
+        self._xyz = to_unit_xyz(self.coordinates[:, 0], self.coordinates[:, 1])
+        self._trees = {
+            name: cKDTree(self._xyz[start:end])
+            for name, (start, end) in self.type_ranges.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def _node_number(self, node_id: str) -> Optional[int]:
+        if self._node_numbers is not None:
+            return self._node_numbers.get(node_id)
+        return self._graph.node_index(node_id)
+
+    def _node_id(self, number: int) -> str:
+        return self._node_ids[number] if self._node_ids is not None else self._graph.node_id(number)
+
+    def _types(self, node_type: Optional[str]) -> List[str]:
+        if node_type is None:
+            return list(self._trees)
+        return [node_type] if node_type in self._trees else []
+
+    def position(self, node_id: str) -> Optional[Tuple[float, float]]:
+        '''노드의 (위도, 경도) (좌표가 없으면 None)'''
+        number = self._node_number(node_id)
+        row = self._rows.get(number) if number is not None else None
+        if row is None:
+            return None
+        latitude, longitude = self.coordinates[row]
+        return float(latitude), float(longitude)
+
+    def _query_nearest(self, xyz: np.ndarray, k: int, node_type: Optional[str], max_meters: Optional[float]) -> Tuple[np.ndarray, np.ndarray]:
+        '''
+        k-최근접 (유형별 트리 결과를 거리로 병합).
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: 거리(m)와 색인 행 번호, 각각 (질의 수, k). 찾지 못한 칸은 거리 inf, 행 -1
+        '''
+        upper = meters_to_chord(max_meters) if max_meters is not None else np.inf
+        distances, rows = [], []
+        for name in self._types(node_type):
+            tree = self._trees[name]
+            count = min(k, tree.n)
+            chord, local = tree.query(xyz, k=[i + 1 for i in range(count)], distance_upper_bound=upper)
+            found = local < tree.n
+            distances.append(np.where(found, chord, np.inf))
+            rows.append(np.where(found, local + self.type_ranges[name][0], -1))
+        if not distances:
+            return np.full((len(xyz), 0), np.inf), np.full((len(xyz), 0), -1, dtype=np.int64)
+        distances, rows = np.hstack(distances), np.hstack(rows)
+        if len(distances[0]) > k:
+            order = np.argsort(distances, axis=1, kind="stable")[:, :k]
+            distances, rows = np.take_along_axis(distances, order, axis=1), np.take_along_axis(rows, order, axis=1)
+        # chord_to_meters는 arcsin 안에서 현을 지름으로 잘라 inf를 지구 반둘레(약 20,015km)로 바꾸므로 빈 칸은 inf로 되돌림
+        return np.where(rows >= 0, chord_to_meters(distances), np.inf), rows
+
+    def nearest_many(
+        self, latitudes: np.ndarray, longitudes: np.ndarray, k: int = 5, node_type: Optional[str] = None, max_meters: Optional[float] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        '''
+        여러 좌표의 k-최근접을 한 번에 조회합니다.
+
+        Args:
+            latitudes (np.ndarray): 위도 배열
+            longitudes (np.ndarray): 경도 배열
+            k (int): 좌표당 최대 결과 수
+            node_type (str, optional): 찾을 노드 유형 (None이면 모든 유형)
+            max_meters (float, optional): 최대 거리(m)
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: 거리(m)와 노드 번호, 각각 (좌표 수, k 이하). 찾지 못한 칸은 거리 inf, 노드 번호 -1
+        '''
+        distances, rows = self._query_nearest(to_unit_xyz(latitudes, longitudes), k, node_type, max_meters)
+        return distances, np.where(rows >= 0, self.nodes[rows], -1)
+
+    def _neighbors(self, distances: np.ndarray, rows: np.ndarray, exclude: Optional[int] = None) -> List[GeoNeighbor]:
+        return [
+            GeoNeighbor(self._node_id(int(self.nodes[row])), float(distance))
+            for distance, row in zip(distances.tolist(), rows.tolist())
+            if row >= 0 and row != exclude
+        ]
+
+    def nearest(
+        self, latitude: float, longitude: float, k: int = 5, node_type: Optional[str] = None, max_meters: Optional[float] = None
+    ) -> List[GeoNeighbor]:
+        '''
+        좌표에서 가까운 노드 k개 (가까운 순서).
+
+        Args:
+            latitude (float): 위도
+            longitude (float): 경도
+            k (int): 최대 결과 수
+            node_type (str, optional): 찾을 노드 유형 (None이면 모든 유형)
+            max_meters (float, optional): 최대 거리(m)
+
+        Returns:
+            List[GeoNeighbor]: (노드 ID, 거리 m) 목록
+        '''
+        distances, rows = self._query_nearest(to_unit_xyz([latitude], [longitude]), k, node_type, max_meters)
+        return self._neighbors(distances[0], rows[0])
+
+    def within(
+        self, latitude: float, longitude: float, meters: float, node_type: Optional[str] = None, limit: Optional[int] = None
+    ) -> List[GeoNeighbor]:
+        '''
+        좌표에서 반경 meters 안의 노드 (가까운 순서).
+
+        Args:
+            latitude (float): 위도
+            longitude (float): 경도
+            meters (float): 반경(m)
+            node_type (str, optional): 찾을 노드 유형 (None이면 모든 유형)
+            limit (int, optional): 최대 결과 수
+
+        Returns:
+            List[GeoNeighbor]: (노드 ID, 거리 m) 목록
+        '''
+        xyz = to_unit_xyz([latitude], [longitude])[0]
+        radius = meters_to_chord(meters)
+        rows = [
+            np.asarray(self._trees[name].query_ball_point(xyz, radius), dtype=np.int64) + self.type_ranges[name][0]
+            for name in self._types(node_type)
+        ]
+        rows = np.concatenate(rows) if rows else np.empty(0, dtype=np.int64)
+        distances = chord_to_meters(np.linalg.norm(self._xyz[rows] - xyz, axis=1))
+        order = np.lexsort((self.nodes[rows], distances))[:limit]
+        return self._neighbors(distances[order], rows[order])
+
+    def near_node(
+        self, node_id: str, k: int = 5, node_type: Optional[str] = None, max_meters: Optional[float] = None
+    ) -> List[GeoNeighbor]:
+        '''
+        노드(관광지 / 식당)에서 가까운 다른 노드 k개 (가까운 순서, 자기 자신 제외). 좌표가 없는 노드는 빈 목록.
+
+        Args:
+            node_id (str): 기준 노드 ID
+            k (int): 최대 결과 수
+            node_type (str, optional): 찾을 노드 유형 (예: 관광지 주변 식당이면 "Restaurant")
+            max_meters (float, optional): 최대 거리(m)
+
+        Returns:
+            List[GeoNeighbor]: (노드 ID, 거리 m) 목록
+        '''
+        number = self._node_number(node_id)
+        row = self._rows.get(number) if number is not None else None
+        if row is None:
+            return []
+        distances, rows = self._query_nearest(self._xyz[row:row + 1], k + 1, node_type, max_meters)
+        return self._neighbors(distances[0], rows[0], exclude=row)[:k]
+
+    @property
+    def nbytes(self) -> int:
+        # 트리 노드는 대략 점 배열과 같은 크기
+        return int(self.nodes.nbytes + self.coordinates.nbytes + 2 * self._xyz.nbytes)
+
+    def stats(self) -> Dict[str, int]:
+        return {name: end - start for name, (start, end) in self.type_ranges.items()}
+
+
+def _coordinate_column(graph: CompactKnowledgeGraph, key: str, candidates: np.ndarray) -> np.ndarray:
+    '''CSR 그래프 노드의 숫자 좌표 (문자열 컬럼이면 노드마다 변환, 없으면 NaN)'''
+    values = graph.node_values(key)
+    if values is not None:
+        return np.asarray(values[candidates], dtype=np.float64)
+    return np.fromiter((_parse_float(graph.attribute(index, key)) for index in candidates.tolist()), dtype=np.float64, count=len(candidates))
+
+
+def collect_points(graph) -> Tuple[np.ndarray, np.ndarray, Dict[str, Tuple[int, int]], Optional[List[str]]]:
+    '''
+    그래프에서 좌표가 있는 GEO_NODE_TYPES 노드를 유형 순서, 유형 안에서는 노드 번호 순서로 모읍니다.
+
+    Returns:
+        Tuple: (노드 번호, (위도, 경도) 배열, 유형별 구간, 노드 번호 → 노드 ID 목록(networkx) 또는 None)
+    '''
+    nodes, coordinates, type_ranges = [], [], {}
+    count = 0
+    if isinstance(graph, CompactKnowledgeGraph):
+        node_ids = None
+        node_type = np.asarray(graph.node_type)
+        for name in GEO_NODE_TYPES:
+            code = graph.type_code(name)
+            candidates = np.flatnonzero(node_type == code) if code is not None else np.empty(0, dtype=np.int64)
+            latitudes = _coordinate_column(graph, "latitude", candidates)
+            longitudes = _coordinate_column(graph, "longitude", candidates)
+            keep = valid_coordinates(latitudes, longitudes)
+            nodes.append(candidates[keep])
+            coordinates.append(np.column_stack((latitudes[keep], longitudes[keep])))
+            type_ranges[name] = (count, count + int(keep.sum()))
+            count += int(keep.sum())
+    else:
+        node_ids = list(graph.nodes)
+        for name in GEO_NODE_TYPES:
+            candidates = [number for number, node_id in enumerate(node_ids) if graph.nodes[node_id].get("type") == name]
+            latitudes = np.asarray([_parse_float(graph.nodes[node_ids[number]].get("latitude")) for number in candidates], dtype=np.float64)
+            longitudes = np.asarray([_parse_float(graph.nodes[node_ids[number]].get("longitude")) for number in candidates], dtype=np.float64)
+            keep = valid_coordinates(latitudes, longitudes)
+            nodes.append(np.asarray(candidates, dtype=np.int64)[keep])
+            coordinates.append(np.column_stack((latitudes[keep], longitudes[keep])))
+            type_ranges[name] = (count, count + int(keep.sum()))
+            count += int(keep.sum())
+    return (
+        np.concatenate(nodes).astype(np.int64),
+        np.concatenate(coordinates).reshape(-1, 2),
+        type_ranges,
+        node_ids,
+    )
+
+
+def write_geo_index(directory: Path, graph: CompactKnowledgeGraph) -> bool:
+    '''
+    CSR 그래프의 좌표 노드 번호 / 위경도를 저장합니다.
+    여러 워커가 동시에 저장하거나 읽어도 안전하도록 publish_snapshot으로 새 버전을 쓴 뒤 링크를 교체하며,
+    다른 워커가 먼저 같은 색인을 만들었으면 교체하지 않습니다.
+    ai-preprocessing의 create_knowledge_graph.py도 CSR 스냅샷을 저장한 직후 이 함수로 색인을 저장합니다.
+
+    Args:
+        directory (Path): 저장할 경로 (graphdb/knowledge_graph/geo)
+        graph (CompactKnowledgeGraph): 지식 그래프
+
+    Returns:
+        bool: 새 색인으로 교체했으면 True
+    '''
+    return publish_snapshot(
+        directory,
+        lambda tmp_dir: _write_geo_files(tmp_dir, graph),
+        skip_if=lambda: _geo_index_valid(read_compact_graph_meta(directory), graph)
+    )
+
+
+def _write_geo_files(directory: Path, graph: CompactKnowledgeGraph) -> dict:
+    '''빈 디렉토리에 좌표 배열과 meta.json을 씁니다.'''
+    nodes, coordinates, type_ranges, _ = collect_points(graph)
+    np.save(directory / "geo_nodes.npy", nodes.astype(np.int64))
+    np.save(directory / "geo_coordinates.npy", coordinates.astype(np.float64))
+    meta = {
+        "format_version": GEO_INDEX_FORMAT_VERSION,
+        "num_nodes": graph.num_nodes,
+        "num_points": int(len(nodes)),
+        "type_ranges": {name: list(bounds) for name, bounds in type_ranges.items()},
+        "source_checksum": graph.meta.get("source_checksum"),
+    }
+    with open(directory / "meta.json", "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    return meta
+
+
+def _geo_index_valid(meta: Optional[dict], graph: CompactKnowledgeGraph) -> bool:
+    return (
+        meta is not None
+        and meta.get("format_version") == GEO_INDEX_FORMAT_VERSION
+        and meta.get("num_nodes") == graph.num_nodes
+        and meta.get("source_checksum") == graph.meta.get("source_checksum")
+    )
+
+
+def load_geo_index(graph) -> Optional[GeoIndex]:
+    '''
+    지식 그래프의 좌표 공간 색인을 로드하거나 만듭니다.
+    CSR 그래프는 스냅샷의 geo/ 가 유효하면 mmap으로 열고, 없거나 오래되었으면 다시 저장합니다.
+    (스냅샷 디렉토리에 쓸 수 없으면 메모리에서만 만듭니다.)
+
+    Args:
+        graph (nx.DiGraph | CompactKnowledgeGraph): 지식 그래프
+
+    Returns:
+        GeoIndex: 공간 색인 (그래프가 없거나 좌표가 있는 노드가 없으면 None)
+    '''
+    if graph is None:
+        return None
+    start = time.perf_counter()
+    index = None
+    if isinstance(graph, CompactKnowledgeGraph):
+        directory = graph.directory / GEO_INDEX_DIRNAME
+        try:
+            # 링크를 한 번만 따라가 meta.json과 배열을 같은 버전에서 읽음
+            snapshot = resolve_snapshot(directory)
+            meta = read_compact_graph_meta(snapshot)
+            if not _geo_index_valid(meta, graph):
+                write_geo_index(directory, graph)
+                logger.info(f"좌표 공간 색인 저장 완료: {directory}")
+                snapshot = resolve_snapshot(directory)
+                meta = read_compact_graph_meta(snapshot)
+                if not _geo_index_valid(meta, graph):
+                    raise ValueError("저장한 좌표 색인 스냅샷을 찾을 수 없습니다.")
+            index = GeoIndex(
+                load_array(snapshot / "geo_nodes.npy"),
+                load_array(snapshot / "geo_coordinates.npy"),
+                {name: tuple(bounds) for name, bounds in meta["type_ranges"].items()},
+                graph=graph,
+            )
+        except (OSError, ValueError) as e:
+            logger.warning(f"좌표 공간 색인을 저장하지 못해 메모리에 만듭니다: {directory} - {e}")
+    if index is None:
+        nodes, coordinates, type_ranges, node_ids = collect_points(graph)
+        index = GeoIndex(nodes, coordinates, type_ranges, node_ids=node_ids, graph=graph if node_ids is None else None)
+    if not len(index):
+        logger.info("좌표가 있는 관광지 / 식당 노드가 없어 공간 색인을 만들지 않습니다.")
+        return None
+    logger.info(f"좌표 공간 색인 로드 완료: {index.stats()}, {time.perf_counter() - start:.2f}s")
+    return index
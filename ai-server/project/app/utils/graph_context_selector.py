@@ -0,0 +1,208 @@
+'''
+쿼리 관련도 기반 그래프 컨텍스트 선택
+
+GraphRAGEnhancer가 검색된 엔티티마다 모든 메뉴 / 특징 / 주변 정보를 프롬프트에 넣으면 LLM 입력 토큰과 지연이 커지므로,
+엔티티 스니펫(graph_snippets.EntitySnippet)의 사실(fact)마다 쿼리 관련도 점수를 매기고
+요청당 토큰 예산(GRAPH_CONTEXT_TOKEN_BUDGET) 안에서 점수가 높은 사실부터 엔티티를 가로질러 채웁니다.
+- 쿼리와 사실 매칭 용어(메뉴 이름 / 분류, 특징 이름 등)의 글자 2-gram 겹침
+- 쿼리가 묻는 정보 유형 (주차 / 애견동반 등 특징, 영업시간, 휴무일, 가격, 주변, 교통, 연락처)
+- 주변 랜드마크 / 좌표로 찾은 주변 관광지·식당 거리 (쿼리에 "500m" 같은 거리가 있으면 그 값, 없으면 GRAPH_CONTEXT_NEARBY_METERS 이내 우대)
+- 검색 순위가 높은 엔티티 우대
+선택된 사실은 엔티티의 검색 순위, 엔티티 안에서는 원래 순서대로 출력합니다.
+'''
+import logging
+import os
+import re
+from functools import lru_cache
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from .graph_snippets import EntitySnippet, GraphFact
+
+logger = logging.getLogger(__name__)
+
+# 요청당 그래프 컨텍스트 토큰 예산 (0 이하이면 모든 사실을 그대로 사용)
+GRAPH_CONTEXT_TOKEN_BUDGET = int(os.getenv("GRAPH_CONTEXT_TOKEN_BUDGET", "800"))
+# 쿼리에 거리 조건이 없을 때 "가까운" 랜드마크로 보는 거리(m)
+GRAPH_CONTEXT_NEARBY_METERS = float(os.getenv("GRAPH_CONTEXT_NEARBY_METERS", "1000"))
+# 관광지 / 식당 스니펫에 넣을 좌표 기준 주변 식당 / 관광지 수 (GRAPH_CONTEXT_NEARBY_METERS 이내, 0이면 넣지 않음)
+GRAPH_CONTEXT_NEARBY_PLACES = int(os.getenv("GRAPH_CONTEXT_NEARBY_PLACES", "3"))
+# 토큰 수를 셀 tiktoken 인코딩 (로드할 수 없으면 글자 수로 근사)
+GRAPH_CONTEXT_TOKENIZER = os.getenv("GRAPH_CONTEXT_TOKENIZER", "o200k_base")
+
+# 사실 유형별 기본 점수 (쿼리와 관계없이 유용한 정도)
+_KIND_PRIOR = {
+    "location": 1.0,
+    "hours": 0.6,
+    "closed_days": 0.5,
+    "description": 0.4,
+    "menu": 0.3,
+    "feature": 0.3,
+    "traffic": 0.3,
+    "landmark": 0.2,
+    "nearby": 0.2,
+    "contact": 0.2,
+}
+# 쿼리가 해당 유형의 정보를 묻는다고 볼 단서
+_KIND_TRIGGERS = {
+    "hours": ("영업", "시간", "몇시", "오픈", "마감", "늦게", "아침", "점심", "저녁", "새벽", "24시"),
+    "closed_days": ("휴무", "쉬는", "쉬나", "요일", "주말", "공휴일", "연중무휴"),
+    "menu": ("메뉴", "가격", "얼마", "저렴", "싼", "비싼", "가성비"),
+    "landmark": ("근처", "주변", "가까운", "가깝", "인근", "도보", "걸어서", "부근"),
+    "nearby": ("근처", "주변", "가까운", "가깝", "인근", "도보", "걸어서", "부근", "같이", "들를", "코스"),
+    "traffic": ("교통", "가는길", "가는법", "지하철", "버스", "역에서", "역까지", "역근처"),
+    "contact": ("연락", "전화", "번호", "예약", "문의"),
+    "location": ("위치", "어디", "지역", "동네"),
+}
+# 특징 이름 → 쿼리 단서 (create_knowledge_graph.py의 Feature 노드 이름 기준)
+_FEATURE_TRIGGERS = {
+    "주차": ("주차", "차로", "차를", "자차", "운전", "파킹"),
+    "애견": ("애견", "반려", "강아지", "댕댕", "펫", "개랑", "개와"),
+    "와이파이": ("와이파이", "wifi", "인터넷", "노트북"),
+}
+# 어느 사실과도 겹쳐서 관련도를 구분하지 못하는 쿼리 단어 (2-gram 비교 전에 제거)
+_QUERY_STOPWORDS = re.compile(r"부산|맛집|추천|식당|음식점|관광지|여행지|명소|알려|가능|있는|있어|어디|좋은|해줘|주세요")
+_DISTANCE = re.compile(r"(\d+(?:\.\d+)?)\s*(km|킬로|m|미터)", re.IGNORECASE)
+
+_MATCH_WEIGHT = 2.0    # 쿼리-매칭 용어 2-gram 겹침 비율 가중치
+_TRIGGER_WEIGHT = 1.0  # 쿼리가 묻는 정보 유형 가중치
+_FEATURE_WEIGHT = 2.0  # 쿼리가 찾는 특징과 일치하는 특징 가중치
+_NEARBY_WEIGHT = 1.0   # 거리 조건 이내 랜드마크 가중치 (가까울수록 큼)
+_RANK_DECAY = 0.1      # 검색 순위 r의 엔티티 점수 배율 1 / (1 + r * _RANK_DECAY)
+# 거리(m)가 있는 사실 유형
+_DISTANCE_KINDS = ("landmark", "nearby")
+
+
+def _compact(text: str) -> str:
+    return re.sub(r"\s+", "", text.lower())
+
+
+def _char_bigrams(text: str) -> set:
+    """공백을 제외한 글자 2-gram 집합 (조사가 붙은 한국어 어절도 부분 일치하도록)"""
+    grams = set()
+    for token in text.lower().split():
+        if len(token) == 1:
+            grams.add(token)
+        grams.update(token[i:i + 2] for i in range(len(token) - 1))
+    return grams
+
+
+@lru_cache(maxsize=65536)
+def _term_bigrams(terms: str) -> frozenset:
+    """사실 매칭 용어의 글자 2-gram (메뉴 / 특징 / 지역 이름은 엔티티 간에 반복되므로 캐시)"""
+    return frozenset(_char_bigrams(terms))
+
+
+@lru_cache(maxsize=1)
+def _tiktoken_encoding(name: str):
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(name)
+    except Exception as e:
+        logger.warning(f"tiktoken 인코딩({name})을 로드하지 못해 글자 수로 토큰 수를 근사합니다: {e}")
+        return None
+
+
+def warm_tokenizer() -> None:
+    """토큰 수를 셀 인코딩을 미리 로드 (첫 로드는 BPE 파일을 읽거나 내려받으므로 요청 처리 중 이벤트 루프에서 하지 않도록 시작 시 호출)"""
+    _tiktoken_encoding(GRAPH_CONTEXT_TOKENIZER)
+
+
+def count_tokens(text: str) -> int:
+    """LLM 입력 토큰 수 (tiktoken이 없으면 글자 수로 근사. 한국어는 글자 수가 토큰 수보다 크므로 예산을 넘지 않음)"""
+    encoding = _tiktoken_encoding(GRAPH_CONTEXT_TOKENIZER)
+    if encoding is None:
+        return len(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+class QueryProfile:
+    """쿼리에서 한 번만 계산하는 매칭 정보"""
+
+    def __init__(self, query: str, nearby_meters: float = GRAPH_CONTEXT_NEARBY_METERS):
+        compact = _compact(query or "")
+        self.grams = _char_bigrams(_QUERY_STOPWORDS.sub(" ", (query or "").lower()))
+        self.kinds = {kind for kind, triggers in _KIND_TRIGGERS.items() if any(t in compact for t in triggers)}
+        self.features = {name for name, triggers in _FEATURE_TRIGGERS.items() if any(t in compact for t in triggers)}
+        self.max_distance = nearby_meters
+        match = _DISTANCE.search(query or "")
+        self.explicit_distance = match is not None
+        if match:
+            value = float(match.group(1))
+            self.max_distance = value * 1000 if match.group(2).lower() in ("km", "킬로") else value
+            self.kinds.update(_DISTANCE_KINDS)
+
+    def score(self, fact: GraphFact) -> float:
+        """사실 하나의 쿼리 관련도 점수 (0 이하이면 선택하지 않음)"""
+        if fact.kind in _DISTANCE_KINDS and self.explicit_distance and fact.distance is not None and fact.distance > self.max_distance:
+            # 쿼리의 거리 조건을 벗어난 랜드마크 / 주변 장소
+            return 0.0
+        score = _KIND_PRIOR.get(fact.kind, 0.1)
+        if fact.kind in self.kinds:
+            score += _TRIGGER_WEIGHT
+        if self.grams and fact.terms:
+            term_grams = _term_bigrams(fact.terms)
+            if term_grams:
+                score += _MATCH_WEIGHT * len(self.grams & term_grams) / min(len(term_grams), len(self.grams))
+        if fact.kind == "feature" and self.features:
+            terms = _compact(fact.terms)
+            if any(name in terms for name in self.features):
+                score += _FEATURE_WEIGHT
+        if fact.kind in _DISTANCE_KINDS and fact.distance is not None:
+            if fact.distance <= self.max_distance:
+                score += _NEARBY_WEIGHT * (1.0 - fact.distance / max(self.max_distance, 1.0))
+            elif fact.kind in self.kinds:
+                # "근처"를 물었는데 기본 거리보다 먼 랜드마크 / 주변 장소는 유형 가중치를 상쇄
+                score -= _TRIGGER_WEIGHT
+        return score
+
+
+def select_graph_context(
+    query: str,
+    snippets: Sequence[EntitySnippet],
+    token_budget: int = GRAPH_CONTEXT_TOKEN_BUDGET,
+    token_counter: Callable[[str], int] = count_tokens,
+) -> str:
+    """
+    토큰 예산 안에서 쿼리와 관련도가 높은 사실을 엔티티를 가로질러 선택하여 컨텍스트를 만듭니다.
+
+    Args:
+        query (str): 사용자 쿼리
+        snippets (Sequence[EntitySnippet]): 검색 순위 순서의 엔티티 컨텍스트
+        token_budget (int): 컨텍스트 최대 토큰 수 (0 이하이면 모든 사실 사용)
+        token_counter (Callable[[str], int]): 텍스트 → 토큰 수 함수
+
+    Returns:
+        str: 엔티티별 "제목 줄 + 선택된 사실 줄"을 빈 줄로 이은 컨텍스트 (선택된 사실이 없으면 빈 문자열)
+    """
+    snippets = [snippet for snippet in snippets if snippet and snippet.facts]
+    if token_budget <= 0:
+        return "\n\n".join(snippet.text() for snippet in snippets)
+
+    profile = QueryProfile(query)
+    candidates: List[Tuple[float, int, int]] = []
+    for rank, snippet in enumerate(snippets):
+        rank_weight = 1.0 / (1.0 + rank * _RANK_DECAY)
+        for position, fact in enumerate(snippet.facts):
+            score = profile.score(fact)
+            if score > 0:
+                candidates.append((score * rank_weight, rank, position))
+    # 점수 내림차순, 동점이면 검색 순위와 원래 순서
+    candidates.sort(key=lambda candidate: (-candidate[0], candidate[1], candidate[2]))
+
+    # 줄바꿈 / 엔티티 사이 빈 줄도 토큰으로 계산
+    selected: Dict[int, List[int]] = {}
+    used = 0
+    for _, rank, position in candidates:
+        snippet = snippets[rank]
+        cost = token_counter(snippet.facts[position].text) + 1
+        if rank not in selected:
+            cost += token_counter(snippet.header) + 2
+        if used + cost > token_budget:
+            continue
+        used += cost
+        selected.setdefault(rank, []).append(position)
+
+    return "\n\n".join(
+        snippets[rank].text(snippets[rank].facts[position] for position in sorted(selected[rank]))
+        for rank in sorted(selected)
+    )
@@ -1,28 +1,65 @@
 '''
 지식 그래프를 활용하여 RAG 컨텍스트를 강화하는 유틸리티
 '''
-import networkx as nx
 import logging
 import re
 from typing import List, Dict, Any, Optional, Tuple
 
 from langchain_core.documents import Document
-from .knowledge_graph_loader import get_knowledge_graph # 순환 참조를 피하기 위해 함수 임포트
+from .knowledge_graph_loader import KnowledgeGraph, get_knowledge_graph # 순환 참조를 피하기 위해 함수 임포트
+from .graph_context_selector import GRAPH_CONTEXT_NEARBY_METERS, GRAPH_CONTEXT_NEARBY_PLACES, GRAPH_CONTEXT_TOKEN_BUDGET, select_graph_context, warm_tokenizer
+from .graph_snippets import EntitySnippet, GraphFact
+from .resource_registry import get_resource_registry, get_shared_geo_index, get_shared_graph_snippets, graph_resource_name
 
 logger = logging.getLogger(__name__)
 
+# 엔티티 유형 → 좌표로 짝지을 주변 장소 유형과 표시 이름
+_NEARBY_PLACE_TYPES = {'Attraction': ('Restaurant', '주변 맛집'), 'Restaurant': ('Attraction', '주변 관광지')}
+
 class GraphRAGEnhancer:
-    def __init__(self, graph: Optional[nx.DiGraph] = None):
+    def __init__(self, graph: Optional[KnowledgeGraph] = None, token_budget: int = GRAPH_CONTEXT_TOKEN_BUDGET):
         '''
         GraphRAGEnhancer 초기화.
 
         Args:
-            graph (nx.DiGraph, optional): 사용할 지식 그래프 객체.
+            graph (nx.DiGraph | CompactKnowledgeGraph, optional): 사용할 지식 그래프 객체.
                                           None이면 get_knowledge_graph()를 통해 로드 시도.
+            token_budget (int): 요청당 그래프 컨텍스트 토큰 예산 (0 이하이면 모든 정보 포함)
         '''
         self._graph = graph if graph else get_knowledge_graph()
+        self._token_budget = token_budget
+        self._snippets = None
+        self._geo_index = None
+        # 레지스트리에서 획득한 공유 리소스 목록 (close 시 참조 해제)
+        self._shared_resources = []
+        if self._token_budget > 0:
+            # 요청마다 컨텍스트 토큰 수를 세므로 인코딩은 서비스 생성(애플리케이션 시작) 시 미리 로드
+            warm_tokenizer()
         if not self._graph:
             logger.warning("GraphRAGEnhancer 초기화: 지식 그래프가 로드되지 않았습니다. 기능이 제한될 수 있습니다.")
+        else:
+            # 관광지 ↔ 주변 식당을 좌표로 짝짓기 위한 공간 색인 (스니펫 렌더링에서 사용하므로 먼저 획득)
+            self._geo_index = get_shared_geo_index(self._graph)
+            # 엔티티 노드별 컨텍스트 텍스트를 한 번만 렌더링하여 요청 간(서비스 간)에 공유
+            self._snippets = get_shared_graph_snippets(self._graph, self._get_entity_snippet, self.snippet_render_settings)
+            name = graph_resource_name(self._graph)
+            self._shared_resources = [("geo_index", name), ("graph_snippets", name)]
+
+    def close(self) -> None:
+        '''레지스트리에서 획득한 공간 색인과 스니펫의 참조를 해제합니다.'''
+        registry = get_resource_registry()
+        for kind, name in self._shared_resources:
+            registry.release(kind, name)
+        self._shared_resources = []
+
+    @property
+    def snippet_render_settings(self) -> Dict[str, Any]:
+        '''스니펫 렌더링 결과를 바꾸는 설정 (저장된 스니펫이 현재 설정으로 만들어졌는지 확인하는 데 사용)'''
+        return {
+            "nearby_meters": GRAPH_CONTEXT_NEARBY_METERS,
+            "nearby_places": GRAPH_CONTEXT_NEARBY_PLACES,
+            "geo_index": self._geo_index is not None,
+        }
 
     def _normalize_text(self, text: Optional[str]) -> Optional[str]:
         '''텍스트 정규화 (공백 제거, 소문자 변환 등)'''
@@ -170,16 +207,33 @@ class GraphRAGEnhancer:
     def _get_related_info_from_graph(self, node_id: str, query: Optional[str] = None) -> str:
         '''
         주어진 그래프 노드 ID에 대해 관련된 주요 정보를 추출하여 문자열로 반환합니다.
-        query를 참고하여 관련성 높은 정보를 우선적으로 포함할 수 있습니다 (향후 확장).
+        (query를 참고한 사실 선택은 get_graph_context_for_docs에서 graph_context_selector로 수행)
         '''
         if not self._graph or not self._graph.has_node(node_id):
             return ""
+        snippet = self._get_entity_snippet(node_id)
+        if snippet is None: # 추가된 정보가 없는 경우 (타이틀만 있는 경우)
+            node_name = self._graph.nodes[node_id].get('name', node_id)
+            return f"'{node_name}'에 대한 그래프 추가 정보는 현재 없습니다."
+        return snippet.text()
+
+    def _get_entity_snippet(self, node_id: str) -> Optional[EntitySnippet]:
+        '''
+        주어진 그래프 노드 ID의 관련 정보를 제목 줄 + 사실(fact) 목록으로 추출합니다.
+        사실마다 유형 / 쿼리 매칭 용어 / 거리를 함께 담아 쿼리 관련도로 고를 수 있게 합니다.
+
+        Returns:
+            Optional[EntitySnippet]: 엔티티 컨텍스트 (노드가 없거나 추가 정보가 없으면 None)
+        '''
+        if not self._graph or not self._graph.has_node(node_id):
+            return None
 
         node_attrs = self._graph.nodes[node_id]
         node_name = node_attrs.get('name', node_id) # create_knowledge_graph.py에서 name 속성 사용
         node_type = node_attrs.get('type', '알 수 없음')
         
-        info_parts = [f"['{node_name}' ({node_type}) 관련 추가 정보]"]
+        header = f"['{node_name}' ({node_type}) 관련 추가 정보]"
+        facts: List[GraphFact] = []
 
         # 관계 유형별 정보 추출 (Detail_Graph_RAG.md의 탐색 대상 및 프롬프트 통합 예시 참고)
         # out_edges로 해당 노드에서 나가는 관계만 탐색
@@ -189,46 +243,62 @@ class GraphRAGEnhancer:
             neighbor_name = neighbor_attrs.get('name', neighbor_id) # 연결된 노드의 이름
             neighbor_node_type = neighbor_attrs.get('type', '정보')
 
-            formatted_info = None
             if edge_type == 'LOCATED_IN':
-                formatted_info = f"  - 위치: {neighbor_name} ({neighbor_node_type})"
+                facts.append(GraphFact('location', f"  - 위치: {neighbor_name} ({neighbor_node_type})", str(neighbor_name), None))
             elif edge_type == 'SERVES_MENU':
                 price = edge_data.get('price')
                 price_info = f" (가격: {price}원)" if price is not None and price != 'nan' and price != '' else ""
                 menu_desc = neighbor_attrs.get('description', '')
                 menu_desc_info = f" [{menu_desc}]" if menu_desc else ""
-                formatted_info = f"  - 주요 메뉴: {neighbor_name}{menu_desc_info}{price_info}"
+                # 메뉴 이름 / 분류 / 설명으로 쿼리와 매칭
+                terms = " ".join(str(value) for value in (neighbor_name, neighbor_attrs.get('category'), neighbor_attrs.get('sub_category'), menu_desc) if value)
+                facts.append(GraphFact('menu', f"  - 주요 메뉴: {neighbor_name}{menu_desc_info}{price_info}", terms, None))
             elif edge_type == 'HAS_FEATURE':
-                formatted_info = f"  - 특징: {neighbor_name}"
+                facts.append(GraphFact('feature', f"  - 특징: {neighbor_name}", str(neighbor_name), None))
             elif edge_type == 'NEARBY_LANDMARK':
                 distance = edge_data.get('distance')
-                dist_info = f" (거리: 약 {float(distance):.0f}m)" if distance is not None and str(distance).lower() != 'nan' else ""
-                formatted_info = f"  - 주변: {neighbor_name}{dist_info}"
+                has_distance = distance is not None and str(distance).lower() != 'nan'
+                dist_info = f" (거리: 약 {float(distance):.0f}m)" if has_distance else ""
+                facts.append(GraphFact('landmark', f"  - 주변: {neighbor_name}{dist_info}", str(neighbor_name), float(distance) if has_distance else None))
             # 필요에 따라 다른 관계 유형에 대한 정보 추가 (예: Attraction의 contact, traffic_info 등은 노드 자체 속성)
-            
-            if formatted_info:
-                info_parts.append(formatted_info)
         
         # 노드 자체의 추가 속성 (예: 설명, 연락처 등)
         if node_type == 'Attraction':
             description = node_attrs.get('description')
             contact = node_attrs.get('contact')
             traffic = node_attrs.get('traffic_info')
-            if description and description not in ' '.join(info_parts): info_parts.append(f"  - 상세 설명: {description[:100]}...") # 너무 길면 일부만
-            if contact: info_parts.append(f"  - 연락처: {contact}")
-            if traffic: info_parts.append(f"  - 교통정보: {traffic}")
+            if description and not any(description in fact.text for fact in facts): facts.append(GraphFact('description', f"  - 상세 설명: {description[:100]}...", description[:100], None)) # 너무 길면 일부만
+            if contact: facts.append(GraphFact('contact', f"  - 연락처: {contact}", "", None))
+            if traffic: facts.append(GraphFact('traffic', f"  - 교통정보: {traffic}", str(traffic), None))
         elif node_type == 'Restaurant':
             description = node_attrs.get('description')
             hours = node_attrs.get('hours')
             closed_days = node_attrs.get('closed_days')
-            if description and description not in ' '.join(info_parts): info_parts.append(f"  - 식당 소개: {description[:100]}...")
-            if hours: info_parts.append(f"  - 영업시간: {hours}")
-            if closed_days: info_parts.append(f"  - 휴무일: {closed_days}")
-            
-        if len(info_parts) == 1: # 추가된 정보가 없는 경우 (타이틀만 있는 경우)
-            return f"'{node_name}'에 대한 그래프 추가 정보는 현재 없습니다."
+            if description and not any(description in fact.text for fact in facts): facts.append(GraphFact('description', f"  - 식당 소개: {description[:100]}...", description[:100], None))
+            if hours: facts.append(GraphFact('hours', f"  - 영업시간: {hours}", str(hours), None))
+            if closed_days: facts.append(GraphFact('closed_days', f"  - 휴무일: {closed_days}", str(closed_days), None))
+
+        facts.extend(self._get_nearby_place_facts(node_id, node_type))
             
-        return "\n".join(info_parts)
+        return EntitySnippet(header, tuple(facts)) if facts else None
+
+    def _get_nearby_place_facts(self, node_id: str, node_type: str) -> List[GraphFact]:
+        '''
+        좌표 공간 색인으로 관광지 주변 식당 / 식당 주변 관광지를 찾아 사실 목록으로 만듭니다.
+        (GRAPH_CONTEXT_NEARBY_METERS 이내에서 가까운 GRAPH_CONTEXT_NEARBY_PLACES개, 좌표가 없으면 빈 목록)
+        '''
+        if self._geo_index is None or node_type not in _NEARBY_PLACE_TYPES or GRAPH_CONTEXT_NEARBY_PLACES <= 0:
+            return []
+        place_type, label = _NEARBY_PLACE_TYPES[node_type]
+        facts = []
+        for neighbor in self._geo_index.near_node(node_id, k=GRAPH_CONTEXT_NEARBY_PLACES, node_type=place_type, max_meters=GRAPH_CONTEXT_NEARBY_METERS):
+            place_attrs = self._graph.nodes[neighbor.node_id]
+            place_name = place_attrs.get('name', neighbor.node_id)
+            category = place_attrs.get('category')
+            category_info = f" [{category}]" if category else ""
+            terms = " ".join(str(value) for value in (place_name, category) if value)
+            facts.append(GraphFact('nearby', f"  - {label}: {place_name}{category_info} (거리: 약 {neighbor.distance:.0f}m)", terms, neighbor.distance))
+        return facts
 
     async def get_graph_context_for_docs(self, query: str, docs: List[Document]) -> str:
         '''
@@ -251,24 +321,26 @@ class GraphRAGEnhancer:
             logger.info("문서에서 그래프와 연결할 엔티티를 추출하지 못했습니다.")
             return ""
 
-        graph_contexts = []
-        processed_node_ids = set() # 중복된 노드 정보 방지를 위해 처리된 노드 ID 저장
-
+        node_ids = [] # 중복된 노드 정보 방지를 위해 처음 나온 순서대로 한 번씩만 포함
         for entity_name, entity_type, source_id, original_metadata in extracted_entities:
             node_id = self._find_graph_node_for_entity(entity_name, entity_type, source_id)
-            if node_id and node_id not in processed_node_ids:
-                related_info = self._get_related_info_from_graph(node_id, query) # query 전달은 향후 활용 가능성
-                if related_info and "현재 없습니다" not in related_info:
-                    graph_contexts.append(related_info)
-                    processed_node_ids.add(node_id)
-            elif node_id in processed_node_ids:
+            if node_id and node_id not in node_ids:
+                node_ids.append(node_id)
+            elif node_id:
                  logger.debug(f"노드 '{node_id}'는 이미 처리되어 컨텍스트를 추가하지 않습니다.")
 
-        if not graph_contexts:
+        # 미리 렌더링한 스니펫을 노드 ID로 조회 (스니펫 캐시가 없으면 그때그때 렌더링)
+        if self._snippets is not None:
+            snippets = self._snippets.get_many(node_ids)
+        else:
+            snippets = [self._get_entity_snippet(node_id) for node_id in node_ids]
+
+        # 토큰 예산 안에서 쿼리와 관련도가 높은 사실만 선택
+        final_context = select_graph_context(query, snippets, self._token_budget)
+        if not final_context:
             logger.info("추출된 엔티티에 대한 유의미한 그래프 정보를 찾지 못했습니다.")
             return ""
-        
-        final_context = "\n\n".join(graph_contexts)
+
         logger.info(f"그래프 기반 추가 컨텍스트 생성 완료 (일부):\n{final_context[:500]}...")
         return final_context
 
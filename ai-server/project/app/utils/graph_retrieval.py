@@ -0,0 +1,457 @@
+'''
+지식 그래프 다중 홉 검색 (하이브리드 결합의 세 번째 후보 목록)
+
+벡터 / BM25 검색은 문서 본문만 보므로 "해운대해수욕장 근처 주차 되는 식당"처럼 그래프 관계로만 연결되는 후보를 놓칩니다.
+쿼리에서 그래프 노드 이름(지역 / 랜드마크 / 메뉴 / 특징, 3글자 이상의 식당 / 관광지 이름)을 찾아 시드로 삼고,
+시드 유형별로 정한 엣지 경로(메타패스)만 따라가는 제한된 BFS로 식당 / 관광지 문서를 찾아 점수와 함께 반환합니다.
+  예) Landmark ← NEARBY_LANDMARK ← Restaurant → HAS_FEATURE → Feature(주차가능)
+      Restaurant(이름) → NEARBY_LANDMARK → Landmark ← NEARBY_LANDMARK ← Restaurant (같은 랜드마크 주변 식당)
+- 시드 매칭: 이름 / 별칭의 첫 글자 2-gram 색인으로 후보 이름만 골라 쿼리 위치에서 일치하는지 확인하고,
+  더 긴 일치 안에 포함된 짧은 일치("해운대해수욕장" 안의 "해운대")는 버립니다.
+- 허브 제한: 따라갈 엣지 수가 GRAPH_RETRIEVAL_HUB_DEGREE를 넘는 노드(지역, 특징 등)는 펼치지 않고
+  다른 시드로 찾은 후보가 그 노드와 연결되어 있는지 확인하는 조건으로만 사용합니다.
+- 메모이제이션: 같은 시드 집합의 탐색 결과는 LRU 캐시에 보관합니다. (시드 집합 → 문서 위치 / 점수)
+그래프는 탐색용 정수 CSR 배열(정방향 / 역방향)로 한 번 변환해 두며, networkx 그래프와 CSR 그래프를 모두 지원합니다.
+'''
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .compact_graph import CompactKnowledgeGraph
+from .metadata_filter import FEATURE_KEYWORDS, normalize_name
+
+logger = logging.getLogger(__name__)
+
+# 하이브리드 검색에 그래프 검색 결과를 세 번째 후보 목록으로 결합할지 여부
+GRAPH_RETRIEVAL_ENABLED = os.getenv("GRAPH_RETRIEVAL_ENABLED", "false").lower() in ("1", "true", "yes")
+# 그래프 검색 결과의 CC 가중치 (벡터 alpha, 키워드 1 - alpha와 함께 결합)
+GRAPH_RETRIEVAL_WEIGHT = float(os.getenv("GRAPH_RETRIEVAL_WEIGHT", "0.2"))
+# 이보다 많은 엣지를 따라가야 하는 노드는 펼치지 않고 조건으로만 사용
+GRAPH_RETRIEVAL_HUB_DEGREE = int(os.getenv("GRAPH_RETRIEVAL_HUB_DEGREE", "500"))
+# 그래프 검색 후보 최대 수
+GRAPH_RETRIEVAL_MAX_RESULTS = int(os.getenv("GRAPH_RETRIEVAL_MAX_RESULTS", "100"))
+# 시드 집합별 탐색 결과 캐시 크기
+GRAPH_RETRIEVAL_CACHE_SIZE = int(os.getenv("GRAPH_RETRIEVAL_CACHE_SIZE", "1024"))
+# NEARBY_LANDMARK 거리 감쇠 기준(m): 경로 점수 배율 1 / (1 + 거리 / 기준)
+GRAPH_RETRIEVAL_DISTANCE_SCALE = float(os.getenv("GRAPH_RETRIEVAL_DISTANCE_SCALE", "1000"))
+
+# 검색 결과가 되는 노드 유형 (벡터 DB 문서와 연결되는 엔티티)
+ENTITY_TYPES = ("Restaurant", "Attraction")
+# 시드 유형별 메타패스: (경로 가중치, ((엣지 유형, 방향), ...)). "in"은 시드 쪽으로 들어오는 엣지를 거슬러 올라감
+METAPATHS: Dict[str, Tuple[Tuple[float, Tuple[Tuple[str, str], ...]], ...]] = {
+    "Landmark": ((1.0, (("NEARBY_LANDMARK", "in"),)),),
+    "Menu": ((1.0, (("SERVES_MENU", "in"),)),),
+    "Area": ((0.5, (("LOCATED_IN", "in"),)),),
+    "Feature": ((0.5, (("HAS_FEATURE", "in"),)),),
+    "Restaurant": (
+        (1.0, ()),
+        (0.5, (("NEARBY_LANDMARK", "out"), ("NEARBY_LANDMARK", "in"))),
+        (0.3, (("SERVES_MENU", "out"), ("SERVES_MENU", "in"))),
+    ),
+    "Attraction": (
+        (1.0, ()),
+        (0.3, (("LOCATED_IN", "out"), ("LOCATED_IN", "in"))),
+    ),
+}
+# 시드로 찾을 이름의 최소 길이 (식당 / 관광지 이름은 일반 단어와 겹치기 쉬우므로 더 길게)
+_MIN_NAME_LENGTH = {"Restaurant": 3, "Attraction": 3}
+_DEFAULT_MIN_NAME_LENGTH = 2
+_AREA_SUFFIXES = ("구", "군", "시", "동", "읍", "면")
+
+_EMPTY_IDS = np.zeros(0, dtype=np.int64)
+_EMPTY_SCORES = np.zeros(0, dtype=np.float32)
+
+
+class TraversalStats(NamedTuple):
+    '''탐색 1회 통계 (벤치마크 / 로그용)'''
+    seeds: int            # 시드 노드 수
+    expanded_nodes: int   # 엣지를 펼친 노드 수
+    visited_edges: int    # 따라간 엣지 수
+    hub_skips: int        # 허브라서 펼치지 않은 노드 수
+    candidates: int       # 찾은 엔티티 노드 수
+    seconds: float        # 탐색 시간
+
+
+class GraphRetriever:
+    '''
+    쿼리 → 시드 노드 → 메타패스 BFS → 벡터 DB 문서 위치 / 점수.
+    '''
+
+    def __init__(
+        self,
+        graph,
+        doc_node_ids: Sequence[Optional[str]],
+        hub_degree: int = GRAPH_RETRIEVAL_HUB_DEGREE,
+        max_results: int = GRAPH_RETRIEVAL_MAX_RESULTS,
+        cache_size: int = GRAPH_RETRIEVAL_CACHE_SIZE,
+        distance_scale: float = GRAPH_RETRIEVAL_DISTANCE_SCALE,
+    ):
+        '''
+        Args:
+            graph (nx.DiGraph | CompactKnowledgeGraph): 지식 그래프
+            doc_node_ids (Sequence[Optional[str]]): 벡터 DB 문서 위치별 그래프 노드 ID (metadata_filter.document_node_ids)
+            hub_degree (int): 펼칠 수 있는 최대 엣지 수 (넘으면 허브로 보고 조건으로만 사용)
+            max_results (int): 반환할 최대 문서 수
+            cache_size (int): 시드 집합별 탐색 결과 캐시 크기 (0이면 캐시하지 않음)
+            distance_scale (float): NEARBY_LANDMARK 거리 감쇠 기준(m)
+        '''
+        self.hub_degree = hub_degree
+        self.max_results = max_results
+        self.cache_size = cache_size
+        self.distance_scale = distance_scale
+        self._cache: "OrderedDict[Tuple[int, ...], Tuple[np.ndarray, np.ndarray, TraversalStats]]" = OrderedDict()
+        # 검색 스레드 풀의 여러 스레드가 캐시를 함께 사용
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+        if isinstance(graph, CompactKnowledgeGraph):
+            node_ids, names = self._load_compact(graph)
+        else:
+            node_ids, names = self._load_networkx(graph)
+        self._build_reverse()
+        self._map_documents(node_ids, doc_node_ids)
+        self._build_name_index(names)
+
+    # --- 그래프 → 정수 배열 ---
+
+    def _load_compact(self, graph: CompactKnowledgeGraph) -> Tuple[Optional[List[str]], List[Optional[str]]]:
+        '''CSR 그래프의 배열을 그대로 사용합니다. (노드 ID 목록은 만들지 않고 노드 번호로 문서를 연결)'''
+        self._graph = graph
+        self.node_types = [name or "" for name in graph.node_types]
+        self.edge_types = [name or "" for name in graph.edge_types]
+        self.node_type = np.asarray(graph.node_type)
+        self.indptr = np.asarray(graph.indptr, dtype=np.int64)
+        self.indices = np.asarray(graph.indices, dtype=np.int64)
+        self.edge_type = np.asarray(graph.edge_type)
+        distance = graph.edge_values("distance")
+        self.distance = np.asarray(distance, dtype=np.float64) if distance is not None else self._parse_distances(
+            lambda edge: graph.edge_attributes(edge).get("distance")
+        )
+        names = [None] * graph.num_nodes
+        for index in self._seed_candidates():
+            names[index] = graph.attribute(int(index), "name")
+        return None, names
+
+    def _load_networkx(self, graph) -> Tuple[List[str], List[Optional[str]]]:
+        '''networkx 그래프를 노드 순서대로 CSR 배열로 변환합니다. (나가는 엣지는 추가된 순서 유지)'''
+        self._graph = None
+        node_ids = list(graph.nodes)
+        node_index = {node_id: index for index, node_id in enumerate(node_ids)}
+        type_names = [graph.nodes[node_id].get("type") or "" for node_id in node_ids]
+        self.node_types = sorted(set(type_names))
+        type_codes = {name: code for code, name in enumerate(self.node_types)}
+        self.node_type = np.asarray([type_codes[name] for name in type_names], dtype=np.uint8)
+
+        targets, edge_type_names, distances, indptr = [], [], [], [0]
+        for node_id in node_ids:
+            for _, neighbor_id, data in graph.out_edges(node_id, data=True):
+                targets.append(node_index[neighbor_id])
+                edge_type_names.append(data.get("type") or "")
+                distances.append(data.get("distance"))
+            indptr.append(len(targets))
+        self.edge_types = sorted(set(edge_type_names))
+        edge_codes = {name: code for code, name in enumerate(self.edge_types)}
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(targets, dtype=np.int64)
+        self.edge_type = np.asarray([edge_codes[name] for name in edge_type_names], dtype=np.uint8)
+        self.distance = self._parse_distances(distances.__getitem__)
+        names = [None] * len(node_ids)
+        for index in self._seed_candidates():
+            names[index] = graph.nodes[node_ids[index]].get("name")
+        return node_ids, names
+
+    def _parse_distances(self, get_distance) -> np.ndarray:
+        '''NEARBY_LANDMARK 엣지의 거리 (숫자로 바꿀 수 없으면 NaN)'''
+        distance = np.full(len(self.indices), np.nan)
+        code = self._edge_code("NEARBY_LANDMARK")
+        if code is None:
+            return distance
+        for edge in np.flatnonzero(self.edge_type == code).tolist():
+            try:
+                distance[edge] = float(get_distance(edge))
+            except (TypeError, ValueError):
+                pass
+        return distance
+
+    def _build_reverse(self) -> None:
+        '''들어오는 엣지 CSR (대상 노드 순서, 같은 대상 안에서는 정방향 엣지 번호 순서)'''
+        num_nodes = len(self.node_type)
+        sources = np.repeat(np.arange(num_nodes, dtype=np.int64), np.diff(self.indptr))
+        order = np.argsort(self.indices, kind="stable")
+        self.rev_indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.indices, minlength=num_nodes), out=self.rev_indptr[1:])
+        self.rev_sources = sources[order]
+        self.rev_edges = order
+
+    def _map_documents(self, node_ids: Optional[List[str]], doc_node_ids: Sequence[Optional[str]]) -> None:
+        '''노드 번호 → 문서 위치 CSR (한 노드에 문서가 여러 개일 수 있음)'''
+        num_nodes = len(self.node_type)
+        if node_ids is None:
+            lookup = self._graph.node_index
+        else:
+            node_index = {node_id: index for index, node_id in enumerate(node_ids)}
+            lookup = node_index.get
+        pairs = []
+        for position, node_id in enumerate(doc_node_ids):
+            index = lookup(node_id) if node_id is not None else None
+            if index is not None:
+                pairs.append((index, position))
+        pairs.sort()
+        nodes = np.asarray([index for index, _ in pairs], dtype=np.int64)
+        self.doc_positions = np.asarray([position for _, position in pairs], dtype=np.int64)
+        self.doc_indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(nodes, minlength=num_nodes), out=self.doc_indptr[1:])
+        self.num_docs = len(doc_node_ids)
+
+    def _seed_candidates(self) -> np.ndarray:
+        codes = [code for code in (self._node_code(name) for name in METAPATHS) if code is not None]
+        return np.flatnonzero(np.isin(self.node_type, codes))
+
+    def _build_name_index(self, names: List[Optional[str]]) -> None:
+        '''
+        시드 이름 / 별칭 색인: 정규화된 별칭 → [노드 번호], 별칭의 첫 글자 2-gram → 별칭 길이들.
+        (같은 2-gram으로 시작하는 이름이 수만 개여도 쿼리 위치마다 길이 수만큼만 사전을 조회)
+        지역은 행정구역 접미사를 뗀 이름, 특징은 metadata_filter.FEATURE_KEYWORDS의 요청 문구도 별칭으로 둡니다.
+        '''
+        index: Dict[str, List[int]] = {}
+        lengths: Dict[str, set] = {}
+        feature_aliases = {normalize_name(name): keywords for name, keywords in FEATURE_KEYWORDS.items()}
+        for node in self._seed_candidates().tolist():
+            normalized = normalize_name(names[node])
+            if not normalized:
+                continue
+            type_name = self.node_types[self.node_type[node]]
+            aliases = {normalized}
+            if type_name == "Area" and normalized.endswith(_AREA_SUFFIXES) and len(normalized) > 2:
+                aliases.add(normalized[:-1])
+            elif type_name == "Feature":
+                aliases.update(normalize_name(keyword) for keyword in feature_aliases.get(normalized, ()))
+            min_length = _MIN_NAME_LENGTH.get(type_name, _DEFAULT_MIN_NAME_LENGTH)
+            for alias in aliases:
+                if len(alias) >= min_length:
+                    index.setdefault(alias, []).append(node)
+                    lengths.setdefault(alias[:2], set()).add(len(alias))
+        self._name_index = index
+        self._alias_lengths = {prefix: sorted(values) for prefix, values in lengths.items()}
+        self._names = names
+        self.num_seed_names = sum(len(nodes) for nodes in index.values())
+
+    def _node_code(self, name: str) -> Optional[int]:
+        return self.node_types.index(name) if name in self.node_types else None
+
+    def _edge_code(self, name: str) -> Optional[int]:
+        return self.edge_types.index(name) if name in self.edge_types else None
+
+    # --- 시드 매칭 ---
+
+    def match_seeds(self, query: str) -> Tuple[int, ...]:
+        '''
+        쿼리에 이름(또는 별칭)이 나오는 시드 노드를 찾습니다.
+        다른 일치 구간 안에 완전히 포함되는 더 짧은 일치는 버립니다.
+
+        Args:
+            query (str): 사용자 쿼리
+
+        Returns:
+            Tuple[int, ...]: 시드 노드 번호 (오름차순)
+        '''
+        text = normalize_name(query)
+        matches = []
+        for start in range(len(text) - 1):
+            for length in self._alias_lengths.get(text[start:start + 2], ()):
+                for node in self._name_index.get(text[start:start + length], ()):
+                    matches.append((start, start + length, node))
+        # 긴 일치부터 받아들이고, 이미 받아들인 더 긴 구간 안에 있는 짧은 일치는 제외
+        matches.sort(key=lambda match: match[0] - match[1])
+        accepted: List[Tuple[int, int, int]] = []
+        for start, end, node in matches:
+            if any(s <= start and end <= e and (s, e) != (start, end) for s, e, _ in accepted):
+                continue
+            accepted.append((start, end, node))
+        return tuple(sorted({node for _, _, node in accepted}))
+
+    # --- 탐색 ---
+
+    def _step(self, node: int, edge_code: int, direction: str) -> Tuple[np.ndarray, np.ndarray]:
+        '''노드에서 한 유형의 엣지를 따라간 (이웃 노드 번호, 엣지 번호)'''
+        if direction == "out":
+            start, end = self.indptr[node], self.indptr[node + 1]
+            edges = np.arange(start, end)[self.edge_type[start:end] == edge_code]
+            return self.indices[edges], edges
+        start, end = self.rev_indptr[node], self.rev_indptr[node + 1]
+        edges = self.rev_edges[start:end]
+        keep = self.edge_type[edges] == edge_code
+        return self.rev_sources[start:end][keep], edges[keep]
+
+    def _has_edge(self, node: int, target: int) -> bool:
+        start, end = self.indptr[node], self.indptr[node + 1]
+        return bool(np.any(self.indices[start:end] == target))
+
+    def _traverse(self, seeds: Tuple[int, ...]) -> Tuple[Dict[int, float], TraversalStats]:
+        '''
+        시드별 메타패스 BFS. 엔티티 노드 점수는 시드마다 가장 좋은 경로 점수를 더한 값입니다.
+        첫 단계부터 허브인 시드는 펼치지 않고, 다른 시드로 찾은 엔티티가 그 시드와 직접 연결되면 경로 가중치를 더합니다.
+        '''
+        start_time = time.perf_counter()
+        entity_codes = {code for code in (self._node_code(name) for name in ENTITY_TYPES) if code is not None}
+        scores: Dict[int, float] = {}
+        constraints: List[Tuple[int, float]] = []
+        expanded = visited = hub_skips = 0
+
+        for seed in seeds:
+            seed_type = self.node_types[self.node_type[seed]]
+            best: Dict[int, float] = {}
+            for path_weight, steps in METAPATHS.get(seed_type, ()):
+                frontier = {seed: path_weight}
+                for depth, (edge_name, direction) in enumerate(steps):
+                    edge_code = self._edge_code(edge_name)
+                    if edge_code is None:
+                        frontier = {}
+                        break
+                    next_frontier: Dict[int, float] = {}
+                    for node, weight in frontier.items():
+                        neighbors, edges = self._step(node, edge_code, direction)
+                        if len(neighbors) > self.hub_degree:
+                            hub_skips += 1
+                            if depth == 0 and node == seed and len(steps) == 1:
+                                constraints.append((seed, path_weight))
+                            continue
+                        expanded += 1
+                        visited += len(neighbors)
+                        if edge_name == "NEARBY_LANDMARK":
+                            factors = 1.0 / (1.0 + np.nan_to_num(self.distance[edges], nan=self.distance_scale) / self.distance_scale)
+                        else:
+                            factors = np.ones(len(neighbors))
+                        for neighbor, factor in zip(neighbors.tolist(), factors.tolist()):
+                            if neighbor != seed and weight * factor > next_frontier.get(neighbor, 0.0):
+                                next_frontier[neighbor] = weight * factor
+                    frontier = next_frontier
+                for node, weight in frontier.items():
+                    if self.node_type[node] in entity_codes and weight > best.get(node, 0.0):
+                        best[node] = weight
+            for node, weight in best.items():
+                scores[node] = scores.get(node, 0.0) + weight
+
+        # 허브 시드는 조건으로: 다른 시드로 찾은 엔티티가 연결되어 있으면 가중치를 더함
+        for hub, weight in constraints:
+            for node in scores:
+                if self._has_edge(node, hub):
+                    scores[node] += weight
+
+        stats = TraversalStats(len(seeds), expanded, visited, hub_skips, len(scores), time.perf_counter() - start_time)
+        return scores, stats
+
+    def expand(self, seeds: Tuple[int, ...]) -> Tuple[np.ndarray, np.ndarray, TraversalStats]:
+        '''
+        시드 집합을 탐색하여 (문서 위치, 점수, 통계)를 반환합니다. 같은 시드 집합은 캐시된 결과를 반환합니다.
+
+        Args:
+            seeds (Tuple[int, ...]): 시드 노드 번호 (오름차순)
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, TraversalStats]: (문서 위치 int64, 점수 float32, 탐색 통계), 점수 내림차순
+        '''
+        with self._cache_lock:
+            cached = self._cache.get(seeds)
+            if cached is not None:
+                self._cache.move_to_end(seeds)
+                self.cache_hits += 1
+                return cached
+            self.cache_misses += 1
+
+        scores, stats = self._traverse(seeds)
+        nodes = np.fromiter(scores.keys(), dtype=np.int64, count=len(scores))
+        node_scores = np.fromiter(scores.values(), dtype=np.float64, count=len(scores))
+        counts = self.doc_indptr[nodes + 1] - self.doc_indptr[nodes]
+        has_docs = counts > 0
+        nodes, node_scores, counts = nodes[has_docs], node_scores[has_docs], counts[has_docs]
+        positions = np.concatenate(
+            [self.doc_positions[self.doc_indptr[node]:self.doc_indptr[node + 1]] for node in nodes.tolist()]
+        ) if len(nodes) else _EMPTY_IDS
+        doc_scores = np.repeat(node_scores, counts)
+        # 점수 내림차순, 동점이면 문서 위치 순서 (그래프 포맷과 관계없이 같은 쿼리에 항상 같은 순서)
+        order = np.lexsort((positions, -doc_scores))[:self.max_results]
+        result = (positions[order], doc_scores[order].astype(np.float32), stats)
+
+        if self.cache_size > 0:
+            with self._cache_lock:
+                self._cache[seeds] = result
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return result
+
+    def search(self, query: str, mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        '''
+        쿼리로 그래프 검색을 수행합니다.
+
+        Args:
+            query (str): 사용자 쿼리
+            mask (np.ndarray, optional): 메타데이터 필터의 문서 위치 마스크 (bool). 주어지면 통과한 문서만 반환
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (문서 위치, 그래프 점수), 점수 내림차순 (시드가 없으면 빈 배열)
+        '''
+        seeds = self.match_seeds(query)
+        if not seeds:
+            return _EMPTY_IDS, _EMPTY_SCORES
+        positions, scores, stats = self.expand(seeds)
+        if mask is not None and len(positions):
+            keep = mask[positions]
+            positions, scores = positions[keep], scores[keep]
+        logger.info(
+            f"그래프 검색: 시드 {self.seed_names(seeds)}, 펼친 노드 {stats.expanded_nodes}개, 엣지 {stats.visited_edges}개, "
+            f"허브 {stats.hub_skips}개 제외 → 문서 {len(positions)}개"
+        )
+        return positions, scores
+
+    def seed_names(self, seeds: Sequence[int]) -> List[str]:
+        '''시드 노드 번호 → "이름(유형)" (로그 / 벤치마크용)'''
+        return [f"{self._names[node]}({self.node_types[self.node_type[node]]})" for node in seeds]
+
+    @property
+    def nbytes(self) -> int:
+        '''탐색용 배열 메모리 사용량(바이트, 이름 색인 제외)'''
+        arrays = (
+            self.node_type, self.indptr, self.indices, self.edge_type, self.distance,
+            self.rev_indptr, self.rev_sources, self.rev_edges, self.doc_indptr, self.doc_positions,
+        )
+        return sum(array.nbytes for array in arrays)
+
+    def stats(self) -> Dict[str, int]:
+        '''/resources의 details'''
+        return {
+            "nodes": len(self.node_type),
+            "edges": len(self.indices),
+            "documents": self.num_docs,
+            "seed_names": self.num_seed_names,
+            "cached_seed_sets": len(self._cache),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+        }
+
+
+def load_graph_retriever(vectorstore, graph) -> Optional[GraphRetriever]:
+    '''
+    벡터 DB와 지식 그래프로 그래프 검색기를 만듭니다. 그래프가 없거나 GRAPH_RETRIEVAL_ENABLED가 꺼져 있으면 None.
+
+    Args:
+        vectorstore (FAISS): 로드된 벡터스토어
+        graph (nx.DiGraph | CompactKnowledgeGraph, optional): 지식 그래프
+
+    Returns:
+        GraphRetriever: 그래프 검색기
+    '''
+    from .metadata_filter import document_node_ids
+
+    if not GRAPH_RETRIEVAL_ENABLED or graph is None:
+        return None
+    start = time.perf_counter()
+    retriever = GraphRetriever(graph, document_node_ids(vectorstore))
+    logger.info(f"그래프 검색기 생성 완료: {retriever.stats()} ({time.perf_counter() - start:.2f}s)")
+    return retriever
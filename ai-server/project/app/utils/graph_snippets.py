@@ -0,0 +1,232 @@
+'''
+지식 그래프 엔티티별 컨텍스트 스니펫 캐시
+
+그래프는 빌드 사이에 바뀌지 않으므로, Restaurant / Attraction 노드마다 GraphRAGEnhancer가 만드는
+"관련 추가 정보" 블록(제목 줄 + 사실(fact) 줄)을 시작 시 한 번만 렌더링해 두고 요청마다 노드 ID로 조회합니다.
+사실마다 유형 / 매칭 용어 / 거리를 함께 저장하여 graph_context_selector가 쿼리 관련도로 고를 수 있게 합니다.
+- CompactKnowledgeGraph : graphdb/knowledge_graph/snippets/ 에 노드 번호 순서의 UTF-8 blob과 오프셋으로 저장하고
+                          mmap으로 열어 워커 간에 공유합니다. meta.json의 그래프 체크섬이나 렌더링 설정
+                          (주변 장소 거리 / 개수, 좌표 색인 유무 등 스니펫 내용을 바꾸는 값)이 바뀌면 다시 만듭니다.
+- networkx.DiGraph      : 프로세스 메모리의 사전으로 만듭니다.
+GRAPH_SNIPPETS_REBUILD=true 이거나 script/build_graph_snippets.py 를 실행하면 저장된 스니펫을 무시하고 다시 렌더링합니다.
+'''
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+from .compact_graph import CompactKnowledgeGraph, StringColumn, load_array, read_compact_graph_meta
+from .docstore import open_blob
+from .snapshot import publish_snapshot, resolve_snapshot
+
+logger = logging.getLogger(__name__)
+
+# 스니펫 렌더링 형식이 바뀌면 올려서 저장된 스니펫을 무효화
+SNIPPET_FORMAT_VERSION = 3
+SNIPPETS_DIRNAME = "snippets"
+# 스니펫을 미리 만들 노드 유형 (GraphRAGEnhancer가 문서와 매칭하는 엔티티)
+SNIPPET_NODE_TYPES = ("Restaurant", "Attraction")
+# 시작 시 저장된 스니펫을 무시하고 다시 렌더링할지 여부
+GRAPH_SNIPPETS_REBUILD = os.getenv("GRAPH_SNIPPETS_REBUILD", "false").lower() in ("1", "true", "yes")
+
+# 저장 형식의 사실 / 필드 구분자 (사실 텍스트에는 줄바꿈이 들어갈 수 있음)
+_FACT_SEP = "\x1e"
+_FIELD_SEP = "\x1f"
+
+
+class GraphFact(NamedTuple):
+    '''엔티티 컨텍스트의 사실 한 줄'''
+    kind: str                  # location / menu / feature / landmark / nearby / description / contact / traffic / hours / closed_days
+    text: str                  # 프롬프트에 들어갈 렌더링된 줄 ("  - 주요 메뉴: ...")
+    terms: str                 # 쿼리와 비교할 텍스트 (메뉴 이름 + 분류, 특징 이름 등)
+    distance: Optional[float]  # NEARBY_LANDMARK 거리 또는 좌표로 잰 주변 관광지 / 식당 거리(m)
+
+
+class EntitySnippet(NamedTuple):
+    '''엔티티 노드 하나의 컨텍스트 (제목 줄 + 사실들)'''
+    header: str
+    facts: Tuple[GraphFact, ...]
+
+    def text(self, facts: Optional[Iterable[GraphFact]] = None) -> str:
+        '''제목 줄과 사실 줄(기본: 모든 사실)을 이은 텍스트'''
+        return "\n".join([self.header] + [fact.text for fact in (self.facts if facts is None else facts)])
+
+
+def _clean(text: str) -> str:
+    return text.replace(_FACT_SEP, " ").replace(_FIELD_SEP, " ")
+
+
+def encode_snippet(snippet: EntitySnippet) -> str:
+    '''EntitySnippet → 저장용 문자열'''
+    records = [_clean(snippet.header)]
+    for fact in snippet.facts:
+        distance = "" if fact.distance is None else repr(fact.distance)
+        records.append(_FIELD_SEP.join((fact.kind, _clean(fact.terms), distance, _clean(fact.text))))
+    return _FACT_SEP.join(records)
+
+
+def decode_snippet(encoded: str) -> EntitySnippet:
+    '''저장용 문자열 → EntitySnippet'''
+    header, *records = encoded.split(_FACT_SEP)
+    facts = []
+    for record in records:
+        kind, terms, distance, text = record.split(_FIELD_SEP, 3)
+        facts.append(GraphFact(kind, text, terms, float(distance) if distance else None))
+    return EntitySnippet(header, tuple(facts))
+
+
+# 노드 ID → 엔티티 컨텍스트 (추가 정보가 없으면 None)
+SnippetRenderer = Callable[[str], Optional[EntitySnippet]]
+
+
+class GraphSnippets:
+    '''노드 ID → 미리 렌더링한 엔티티 컨텍스트 조회 (정보가 없는 노드는 None)'''
+
+    def __init__(self, snippets: Union[Dict[str, EntitySnippet], StringColumn], graph: Optional[CompactKnowledgeGraph] = None):
+        '''
+        Args:
+            snippets (Dict[str, EntitySnippet] | StringColumn): 노드 ID별 사전, 또는 CSR 그래프 노드 번호 순서의 인코딩된 문자열 컬럼
+            graph (CompactKnowledgeGraph, optional): snippets가 문자열 컬럼일 때 노드 ID를 번호로 바꿀 그래프
+        '''
+        self._snippets = snippets
+        self._graph = graph
+
+    def get(self, node_id: str) -> Optional[EntitySnippet]:
+        if isinstance(self._snippets, dict):
+            return self._snippets.get(node_id)
+        index = self._graph.node_index(node_id)
+        encoded = self._snippets[index] if index is not None else None
+        return decode_snippet(encoded) if encoded else None
+
+    def get_many(self, node_ids: Iterable[str]) -> List[Optional[EntitySnippet]]:
+        return [self.get(node_id) for node_id in node_ids]
+
+    @property
+    def nbytes(self) -> int:
+        if isinstance(self._snippets, dict):
+            return sum(len(encode_snippet(snippet).encode("utf-8")) for snippet in self._snippets.values())
+        return self._snippets.nbytes
+
+
+def _entity_nodes(graph) -> Iterator[Tuple[Optional[int], str]]:
+    '''스니펫을 만들 (노드 번호 또는 None, 노드 ID)'''
+    if isinstance(graph, CompactKnowledgeGraph):
+        codes = [code for code in (graph.type_code(name) for name in SNIPPET_NODE_TYPES) if code is not None]
+        for index in np.flatnonzero(np.isin(graph.node_type, codes)).tolist():
+            yield index, graph.node_id(index)
+        return
+    for node_id, node_type in graph.nodes(data="type"):
+        if node_type in SNIPPET_NODE_TYPES:
+            yield None, node_id
+
+
+def write_graph_snippets(
+    directory: Path, graph: CompactKnowledgeGraph, render: SnippetRenderer, render_settings: Optional[dict] = None
+) -> dict:
+    '''
+    CSR 그래프의 엔티티 노드 스니펫을 노드 번호 순서의 blob / 오프셋으로 저장합니다.
+
+    Args:
+        directory (Path): 저장할 디렉토리 (graphdb/knowledge_graph/snippets)
+        graph (CompactKnowledgeGraph): 지식 그래프
+        render (SnippetRenderer): 노드 ID → 엔티티 컨텍스트 함수
+        render_settings (dict, optional): render 결과를 바꾸는 설정 (JSON 값, meta.json에 기록하여 유효성 검사에 사용)
+
+    Returns:
+        dict: 저장한 meta.json 내용
+    '''
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / "meta.json").unlink(missing_ok=True)
+
+    rendered = {}
+    for index, node_id in _entity_nodes(graph):
+        snippet = render(node_id)
+        rendered[index] = encode_snippet(snippet).encode("utf-8") if snippet else b""
+    offsets = np.zeros(graph.num_nodes + 1, dtype=np.int64)
+    with open(directory / "snippets.bin", "wb") as blob:
+        for index in range(graph.num_nodes):
+            encoded = rendered.get(index, b"")
+            blob.write(encoded)
+            offsets[index + 1] = offsets[index] + len(encoded)
+    np.save(directory / "snippet_offsets.npy", offsets)
+
+    meta = {
+        "format_version": SNIPPET_FORMAT_VERSION,
+        "num_nodes": graph.num_nodes,
+        "num_snippets": sum(1 for encoded in rendered.values() if encoded),
+        "source_checksum": graph.meta.get("source_checksum"),
+        "render_settings": render_settings or {},
+    }
+    with open(directory / "meta.json", "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    return meta
+
+
+def _snippets_valid(directory: Path, graph: CompactKnowledgeGraph, render_settings: Optional[dict] = None) -> bool:
+    '''저장된 스니펫이 현재 렌더링 형식 / 설정과 그래프 체크섬으로 만들어졌는지 확인합니다.'''
+    meta = read_compact_graph_meta(directory)
+    return (
+        meta is not None
+        and meta.get("format_version") == SNIPPET_FORMAT_VERSION
+        and meta.get("num_nodes") == graph.num_nodes
+        and meta.get("source_checksum") == graph.meta.get("source_checksum")
+        and meta.get("render_settings") == (render_settings or {})
+    )
+
+
+def _rebuild_snippets(
+    directory: Path, graph: CompactKnowledgeGraph, render: SnippetRenderer, rebuild: bool, render_settings: Optional[dict] = None
+) -> None:
+    '''새 버전에 스니펫을 쓴 뒤 링크를 교체합니다 (여러 워커가 동시에 시작해도 안전).'''
+    publish_snapshot(
+        directory,
+        lambda tmp_dir: write_graph_snippets(tmp_dir, graph, render, render_settings),
+        # 다른 워커가 먼저 같은 스니펫을 만든 경우
+        skip_if=lambda: not rebuild and _snippets_valid(directory, graph, render_settings)
+    )
+
+
+def load_graph_snippets(
+    graph, render: SnippetRenderer, render_settings: Optional[dict] = None, rebuild: bool = GRAPH_SNIPPETS_REBUILD
+) -> Optional[GraphSnippets]:
+    '''
+    지식 그래프의 엔티티 스니펫을 로드하거나 렌더링합니다.
+    CSR 그래프는 저장된 스니펫이 유효하면 mmap으로 열고, 없거나 오래되었거나(그래프 / 렌더링 설정 변경) rebuild이면
+    다시 렌더링하여 저장합니다. (스냅샷 디렉토리에 쓸 수 없으면 메모리 사전으로 대신합니다.)
+
+    Args:
+        graph (nx.DiGraph | CompactKnowledgeGraph): 지식 그래프
+        render (SnippetRenderer): 노드 ID → 엔티티 컨텍스트 함수
+        render_settings (dict, optional): render 결과를 바꾸는 설정 (예: 주변 장소 거리 / 개수, 좌표 색인 유무)
+        rebuild (bool): 저장된 스니펫을 무시하고 다시 렌더링할지 여부
+
+    Returns:
+        GraphSnippets: 스니펫 조회 객체 (그래프가 없으면 None)
+    '''
+    if graph is None:
+        return None
+    start = time.perf_counter()
+    if isinstance(graph, CompactKnowledgeGraph):
+        directory = graph.directory / SNIPPETS_DIRNAME
+        try:
+            # 링크를 한 번만 따라가 유효성 검사와 로드가 같은 버전을 보도록 함
+            snapshot = resolve_snapshot(directory)
+            if rebuild or not _snippets_valid(snapshot, graph, render_settings):
+                _rebuild_snippets(directory, graph, render, rebuild, render_settings)
+                logger.info(f"그래프 스니펫 저장 완료: {directory} ({time.perf_counter() - start:.2f}s)")
+                snapshot = resolve_snapshot(directory)
+                if not _snippets_valid(snapshot, graph, render_settings):
+                    raise ValueError("저장한 스니펫 스냅샷을 찾을 수 없습니다.")
+            snippets = StringColumn(open_blob(snapshot / "snippets.bin"), load_array(snapshot / "snippet_offsets.npy"))
+            return GraphSnippets(snippets, graph)
+        except (OSError, ValueError) as e:
+            logger.warning(f"그래프 스니펫을 저장하지 못해 메모리에 만듭니다: {directory} - {e}")
+
+    snippets = {node_id: snippet for node_id, snippet in ((node_id, render(node_id)) for _, node_id in _entity_nodes(graph)) if snippet}
+    logger.info(f"그래프 스니펫 렌더링 완료: 스니펫 {len(snippets)}개, {time.perf_counter() - start:.2f}s")
+    return GraphSnippets(snippets)
@@ -1,11 +1,113 @@
-from typing import List, Dict, Any, Tuple, Union, Optional
+from typing import List, Dict, Any, Tuple, Union, Optional, Iterable, Sequence
 from langchain_core.documents import Document
 from langchain_core.retrievers import BaseRetriever
-from langchain_community.retrievers import BM25Retriever
+from .bm25 import SparseBM25
+from .docstore import DOC_ID_KEY
+from .graph_retrieval import GRAPH_RETRIEVAL_WEIGHT, GraphRetriever
+from .metadata_filter import FilterSelection, MetadataFilterIndex, SearchFilters, search_parameters
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import faiss
 import numpy as np
+import asyncio
+import os
+import threading
 import traceback
 
 
+# FAISS 검색과 BM25 점수 계산을 이벤트 루프 밖에서 실행하는 프로세스 전역 스레드 풀.
+# FAISS 검색은 GIL을 놓고 실행되므로 BM25 점수 계산과 실제로 겹쳐 실행되고,
+# 그동안 이벤트 루프는 다른 요청을 계속 처리합니다.
+RETRIEVAL_MAX_WORKERS = int(os.getenv("RETRIEVAL_MAX_WORKERS", "8"))
+_retrieval_executor: Optional[ThreadPoolExecutor] = None
+_retrieval_executor_lock = threading.Lock()
+
+
+def get_retrieval_executor() -> ThreadPoolExecutor:
+    """검색 전용 스레드 풀을 반환합니다. (최대 RETRIEVAL_MAX_WORKERS개 스레드)"""
+    global _retrieval_executor
+    with _retrieval_executor_lock:
+        if _retrieval_executor is None:
+            _retrieval_executor = ThreadPoolExecutor(
+                max_workers=RETRIEVAL_MAX_WORKERS,
+                thread_name_prefix="retrieval"
+            )
+        return _retrieval_executor
+
+
+# (문서 위치 배열, 점수 배열, CC 가중치): 하이브리드 결합에 추가로 넣을 검색 결과
+ScoredIds = Tuple[np.ndarray, np.ndarray, float]
+
+_EMPTY_IDS = np.zeros(0, dtype=np.int64)
+_EMPTY_SCORES = np.zeros(0, dtype=np.float32)
+
+
+def rank_scores(n: int) -> np.ndarray:
+    """점수가 없는 결과 순서에 붙일 역순위 기반 점수 (1.0, 1-1/n, ...)"""
+    return 1.0 - np.arange(n, dtype=np.float64) / max(n, 1)
+
+
+def tmm_normalize(scores: np.ndarray, top: int = 3) -> np.ndarray:
+    """
+    TMM (Top-Min-Max) 정규화를 수행합니다.
+    최소값을 0, 상위 top개 점수의 평균을 1로 두고 0~1 범위로 자릅니다.
+
+    Args:
+        scores (np.ndarray): 정규화할 점수 (클수록 관련성 높음)
+        top (int): 최대값으로 사용할 상위 점수 개수
+
+    Returns:
+        np.ndarray: 정규화된 점수 (float64, 0~1 범위)
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    if scores.size == 0:
+        return scores
+    k = min(top, scores.size)
+    max_score = np.partition(scores, scores.size - k)[scores.size - k:].mean()
+    min_score = scores.min()
+    # 최대값과 최소값이 같으면 모두 1로 설정
+    if max_score == min_score:
+        return np.ones_like(scores)
+    return np.clip((scores - min_score) / (max_score - min_score), 0.0, 1.0)
+
+
+def fuse_scores(
+    results: Sequence[Tuple[np.ndarray, np.ndarray]],
+    weights: Sequence[float],
+    limit: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    여러 검색 결과를 정수 문서 ID 기준으로 TMM 정규화 + CC(가중합) 결합하여 상위 limit개를 반환합니다.
+    점수 합산은 np.unique의 역인덱스에 대한 bincount(scatter-add), 상위 선택은 argpartition으로 수행하므로
+    후보 수 n에 대해 전체 정렬 없이 O(n log n)의 unique 한 번과 O(n + k log k)로 끝납니다.
+    동점은 먼저 나온 결과(앞 검색기의 상위 순위)를 우선합니다.
+
+    Args:
+        results (Sequence[Tuple[np.ndarray, np.ndarray]]): 검색기별 (문서 ID, 점수) 배열
+        weights (Sequence[float]): 검색기별 CC 가중치
+        limit (int): 반환할 최대 문서 수
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (문서 ID int64, 하이브리드 점수 float64), 점수 내림차순
+    """
+    all_ids = np.concatenate([np.asarray(ids, dtype=np.int64) for ids, _ in results])
+    if all_ids.size == 0 or limit <= 0:
+        return _EMPTY_IDS, np.zeros(0, dtype=np.float64)
+    all_scores = np.concatenate([tmm_normalize(scores) * weight for (_, scores), weight in zip(results, weights)])
+
+    unique_ids, first_seen, inverse = np.unique(all_ids, return_index=True, return_inverse=True)
+    combined = np.bincount(inverse, weights=all_scores, minlength=len(unique_ids))
+
+    candidates = np.arange(len(unique_ids))
+    if limit < len(unique_ids):
+        # k번째 점수 이상인 후보만 남김 (경계의 동점 후보도 남겨 순서 규칙을 지킴)
+        kth = combined[np.argpartition(-combined, limit - 1)[limit - 1]]
+        candidates = np.flatnonzero(combined >= kth)
+    order = np.lexsort((first_seen[candidates], -combined[candidates]))[:limit]
+    top = candidates[order]
+    return unique_ids[top], combined[top]
+
+
 class TMMCC_HybridSearch:
     """
     TMM(Top-Min-Max) 정규화와 CC(Convex Combination) 방식의 하이브리드 검색 클래스.
@@ -14,147 +116,84 @@ class TMMCC_HybridSearch:
     더 관련성 높은 결과를 제공합니다.
     
     기본 alpha 값은 0.8로 설정되어 있어 벡터 검색에 80%, 키워드 검색에 20% 가중치를 부여합니다.
+    
+    두 검색 결과는 벡터 DB 문서 위치(FAISS 벡터 위치 = BM25 행렬 열)를 정수 ID로 사용해 NumPy 배열로 결합하고,
+    최종 상위 문서만 docstore에서 Document로 만듭니다.
     """
     
     def __init__(
         self, 
         vectordb, 
-        documents: List[Document], 
+        documents: Optional[List[Document]] = None, 
         alpha: float = 0.8,
-        top_k: int = 20
+        top_k: int = 20,
+        keyword_index: Optional[SparseBM25] = None,
+        filter_index: Optional[MetadataFilterIndex] = None,
+        graph_retriever: Optional[GraphRetriever] = None,
+        graph_weight: float = GRAPH_RETRIEVAL_WEIGHT
     ):
         """
         TMMCC 하이브리드 검색기 초기화
 
         Args:
             vectordb: 벡터 검색을 위한 벡터 스토어 객체
-            documents (List[Document]): 키워드 검색을 위한 문서 리스트
+            documents (List[Document], optional): 키워드 검색을 위한 문서 리스트.
+                BM25 결과를 벡터 검색 결과와 문서 위치로 결합하므로 벡터 DB 문서 순서와 같아야 합니다.
             alpha (float): 벡터 검색 가중치 (0.0~1.0, 기본값 0.8)
             top_k (int): 검색 결과 수 (기본값 20)
+            keyword_index (SparseBM25, optional): 공유 BM25 엔진.
+                주어지면 documents로 새로 만들지 않고 읽기 전용으로 재사용합니다.
+            filter_index (MetadataFilterIndex, optional): 지식 그래프 기반 메타데이터 필터 비트맵.
+                없으면 search(..., filters=)의 필터 조건은 무시됩니다.
+            graph_retriever (GraphRetriever, optional): 지식 그래프 다중 홉 검색기.
+                주어지면 쿼리에서 찾은 그래프 시드로 탐색한 문서를 세 번째 후보 목록으로 결합합니다.
+            graph_weight (float): 그래프 검색 결과의 CC 가중치
         """
         self.vectordb = vectordb
-        self.bm25 = BM25Retriever.from_documents(documents)
-        self.bm25.k = top_k
+        self.filter_index = filter_index
+        self.graph_retriever = graph_retriever
+        self.graph_weight = graph_weight
+        if keyword_index is not None:
+            self.bm25 = keyword_index
+        else:
+            self.bm25 = SparseBM25.from_documents(documents)
         self.alpha = alpha
         self.top_k = top_k
         self.normalize_scores = True
-        print(f"TMMCC 하이브리드 검색기 초기화 완료: alpha={alpha}, top_k={top_k}, BM25 문서 수={len(documents)}")
+        print(f"TMMCC 하이브리드 검색기 초기화 완료: alpha={alpha}, top_k={top_k}, BM25 문서 수={self.bm25.num_docs}")
     
-    def search(self, query: str, limit: int = 20) -> List[Document]:
+    def search(self, query: str, limit: int = 20, filters: Optional[SearchFilters] = None) -> List[Document]:
         """
         하이브리드 검색을 수행합니다.
 
         Args:
             query (str): 검색 쿼리
             limit (int): 반환할 최대 문서 수
+            filters (SearchFilters, optional): 지역 / 특징 / 기피 음식 사전 필터.
+                FAISS(IDSelector)와 BM25(점수 마스크) 검색 안에서 적용되어 조건에 맞는 문서만 후보가 됩니다.
 
         Returns:
             List[Document]: 하이브리드 검색 결과 문서 리스트
         """
+        return [doc for doc, _ in self.search_with_scores(query, limit, filters)]
+    
+    def search_with_scores(
+        self, query: str, limit: int = 20, filters: Optional[SearchFilters] = None
+    ) -> List[Tuple[Document, float]]:
+        """
+        하이브리드 검색을 수행하고 문서별 하이브리드 점수를 함께 반환합니다.
+
+        Args:
+            query (str): 검색 쿼리
+            limit (int): 반환할 최대 문서 수
+            filters (SearchFilters, optional): 지역 / 특징 / 기피 음식 사전 필터
+
+        Returns:
+            List[Tuple[Document, float]]: (문서, 하이브리드 점수) 리스트 (점수 내림차순)
+        """
         print(f"TMMCC 하이브리드 검색 시작: 쿼리='{query}', limit={limit}")
         try:
-            # 벡터 검색 수행 (점수 포함)
-            try:
-                vector_results_with_scores = self.vectordb.similarity_search_with_score(query, k=limit)
-                print(f"벡터 검색 완료: {len(vector_results_with_scores)}개 문서")
-            except Exception as vec_error:
-                print(f"벡터 검색(similarity_search_with_score) 중 오류 발생: {vec_error}")
-                print(f"기본 similarity_search로 대체 시도...")
-                try:
-                    # 점수 없는 검색으로 대체
-                    vector_docs = self.vectordb.similarity_search(query, k=limit)
-                    # 임의 점수 할당 (역순위 기반)
-                    vector_results_with_scores = [(doc, 1.0 - (i / len(vector_docs))) 
-                                                 for i, doc in enumerate(vector_docs)]
-                    print(f"대체 벡터 검색 완료: {len(vector_results_with_scores)}개 문서")
-                except Exception as fallback_error:
-                    print(f"대체 벡터 검색도 실패: {fallback_error}")
-                    print(f"스택 트레이스: {traceback.format_exc()}")
-                    vector_results_with_scores = []
-            
-            # 키워드 검색 수행
-            try:
-                keyword_results = self.bm25.get_relevant_documents(query)
-                print(f"키워드 검색 완료: {len(keyword_results)}개 문서")
-            except Exception as key_error:
-                print(f"키워드 검색 중 오류 발생: {key_error}")
-                print(f"스택 트레이스: {traceback.format_exc()}")
-                keyword_results = []
-            
-            # 결과가 없는 경우 처리
-            if not vector_results_with_scores and not keyword_results:
-                print("벡터 검색과 키워드 검색 모두 결과 없음")
-                return []
-            
-            # 벡터 검색 결과만 있는 경우
-            if not keyword_results:
-                print("키워드 검색 결과 없음, 벡터 검색 결과만 반환")
-                vector_docs = [doc for doc, _ in vector_results_with_scores]
-                return vector_docs[:limit]
-            
-            # 키워드 검색 결과만 있는 경우
-            if not vector_results_with_scores:
-                print("벡터 검색 결과 없음, 키워드 검색 결과만 반환")
-                return keyword_results[:limit]
-            
-            # TMM-CC 하이브리드 검색 적용
-            print(f"TMM-CC 하이브리드 검색 적용 중...")
-            
-            # 벡터 검색 결과와 점수 분리
-            vector_docs = [doc for doc, _ in vector_results_with_scores]
-            vector_scores = [float(score) for _, score in vector_results_with_scores]
-            
-            # 벡터 점수는 similarity_search_with_score에서 거리 값으로 반환될 수 있으므로
-            # 거리가 작을수록 유사도가 높음을 고려해 변환 (필요 시 활성화)
-            # 거리 기반 점수인 경우 역수를 취해 유사도로 변환 (-1을 곱하거나 역수를 취함)
-            # vector_scores = [-score for score in vector_scores]  # 거리에 -1 곱하기
-            
-            # BM25 키워드 검색 점수 추정
-            keyword_scores = self._estimate_bm25_scores(query, keyword_results)
-            
-            # TMM 정규화 적용
-            normalized_vector_scores = self._tmm_normalize(vector_scores)
-            normalized_keyword_scores = self._tmm_normalize(keyword_scores)
-            
-            # 하이브리드 점수 계산 (두 결과 집합 결합)
-            combined_results = {}
-            
-            # 벡터 검색 결과 처리
-            for i, doc in enumerate(vector_docs):
-                doc_id = self._get_doc_id(doc)
-                combined_results[doc_id] = {
-                    "doc": doc, 
-                    "vector_score": normalized_vector_scores[i],
-                    "keyword_score": 0.0
-                }
-            
-            # 키워드 검색 결과 처리
-            for i, doc in enumerate(keyword_results):
-                doc_id = self._get_doc_id(doc)
-                if doc_id in combined_results:
-                    combined_results[doc_id]["keyword_score"] = normalized_keyword_scores[i]
-                else:
-                    combined_results[doc_id] = {
-                        "doc": doc,
-                        "vector_score": 0.0,
-                        "keyword_score": normalized_keyword_scores[i]
-                    }
-            
-            # CC 가중치 적용 (H = αV + (1-α)K)
-            final_results = []
-            for doc_id, result in combined_results.items():
-                hybrid_score = self.alpha * result["vector_score"] + (1 - self.alpha) * result["keyword_score"]
-                final_results.append((result["doc"], hybrid_score))
-            
-            # 점수 기준 내림차순 정렬
-            sorted_results = sorted(final_results, key=lambda x: x[1], reverse=True)
-            
-            # 상위 문서만 반환
-            final_docs = [doc for doc, _ in sorted_results[:limit]]
-            print(f"하이브리드 검색 완료: {len(final_docs)}개 문서 반환")
-            
-            return final_docs
-            
+            return self._materialize(*self.search_ids(query, limit, filters))
         except Exception as e:
             print(f"하이브리드 검색 중 오류 발생: {e}")
             print(f"스택 트레이스: {traceback.format_exc()}")
@@ -163,164 +202,325 @@ class TMMCC_HybridSearch:
             try:
                 if hasattr(self.vectordb, 'similarity_search'):
                     print("오류 복구: 벡터 검색 결과만 반환 시도")
-                    return self.vectordb.similarity_search(query, k=limit)
+                    return self._rank_scores(self.vectordb.similarity_search(query, k=limit))
                 else:
                     return []
             except Exception as fallback_error:
                 print(f"복구 시도 중 추가 오류 발생: {fallback_error}")
                 return []
     
-    def _combine_results(
-        self, 
-        query: str, 
-        vector_results: List[Tuple[Document, float]],
-        keyword_results: List[Document]
-    ) -> List[Document]:
+    def search_ids(
+        self,
+        query: str,
+        limit: int = 20,
+        filters: Optional[SearchFilters] = None,
+        extra_results: Sequence[ScoredIds] = ()
+    ) -> Tuple[np.ndarray, np.ndarray]:
         """
-        벡터 검색과 키워드 검색 결과를 TMM 정규화 및 CC 가중치로 결합합니다.
+        하이브리드 검색 결과를 Document로 만들지 않고 (문서 위치, 하이브리드 점수) 배열로 반환합니다.
 
         Args:
             query (str): 검색 쿼리
-            vector_results (List[Tuple[Document, float]]): 벡터 검색 결과와 점수
-            keyword_results (List[Document]): 키워드 검색 결과
+            limit (int): 반환할 최대 문서 수
+            filters (SearchFilters, optional): 지역 / 특징 / 기피 음식 사전 필터
+            extra_results (Sequence[ScoredIds]): 함께 결합할 추가 검색 결과 (문서 위치, 점수, 가중치)
 
         Returns:
-            List[Document]: 결합된 검색 결과 문서 리스트
+            Tuple[np.ndarray, np.ndarray]: (문서 위치, 하이브리드 점수), 점수 내림차순
         """
-        # 결과를 ID로 매핑 (ID가 없는 경우 내용 앞 부분으로 대체)
-        combined_results = {}
-        
-        # 벡터 검색 결과 처리
-        vector_scores = [score for _, score in vector_results]
-        normalized_vector_scores = self._tmm_normalize(vector_scores)
-        
-        for i, (doc, _) in enumerate(vector_results):
-            doc_id = self._get_doc_id(doc)
-            combined_results[doc_id] = {
-                "doc": doc,
-                "vector_score": normalized_vector_scores[i],
-                "keyword_score": 0.0
-            }
-        
-        # 키워드 검색 결과 처리 (BM25 점수 추정)
-        keyword_scores = self._estimate_bm25_scores(query, keyword_results)
-        normalized_keyword_scores = self._tmm_normalize(keyword_scores)
-        
-        for i, doc in enumerate(keyword_results):
-            doc_id = self._get_doc_id(doc)
-            if doc_id in combined_results:
-                combined_results[doc_id]["keyword_score"] = normalized_keyword_scores[i]
-            else:
-                combined_results[doc_id] = {
-                    "doc": doc,
-                    "vector_score": 0.0,
-                    "keyword_score": normalized_keyword_scores[i]
-                }
-        
-        # CC 가중치 적용하여 최종 점수 계산 (alpha=0.8)
-        # H = (1-α)K + αV 공식 적용
-        final_results = []
-        for doc_id, result in combined_results.items():
-            final_score = (1 - self.alpha) * result["keyword_score"] + self.alpha * result["vector_score"]
-            final_results.append((result["doc"], final_score))
-        
-        # 점수 기준 내림차순 정렬 후 문서만 반환
-        sorted_results = sorted(final_results, key=lambda x: x[1], reverse=True)
-        return [doc for doc, _ in sorted_results[:self.top_k]]
+        selection = self._select(filters)
+        vector_results = self._vector_search(query, limit, selection)
+        keyword_results = self._keyword_search(query, selection)
+        graph_results = self._graph_search(query, selection)
+        return self._fuse_results(vector_results, keyword_results, limit, (*extra_results, *graph_results))
     
-    def _tmm_normalize(self, scores: List[float]) -> List[float]:
+    async def asearch(self, query: str, limit: int = 20, filters: Optional[SearchFilters] = None) -> List[Document]:
         """
-        TMM (Top-Min-Max) 정규화를 수행합니다.
-        상위 k개 점수의 평균을 최대값으로 설정하는 방식입니다.
+        하이브리드 검색을 비동기로 수행합니다.
+
+        쿼리 임베딩은 비동기 임베딩 API로 요청하고, FAISS 검색과 BM25 점수 계산은
+        제한된 크기의 검색 스레드 풀에서 동시에 실행하므로 이벤트 루프를 막지 않습니다.
+        지연 시간은 두 검색 시간의 합이 아니라 더 긴 쪽에 가까워집니다.
 
         Args:
-            scores (List[float]): 정규화할 점수 리스트
+            query (str): 검색 쿼리
+            limit (int): 반환할 최대 문서 수
+            filters (SearchFilters, optional): 지역 / 특징 / 기피 음식 사전 필터
 
         Returns:
-            List[float]: 정규화된 점수 리스트 (0~1 범위)
+            List[Document]: 하이브리드 검색 결과 문서 리스트
         """
-        if not scores:
-            return []
-        
-        # 최소값 찾기
-        min_score = min(scores)
-        
-        # 상위 3개(또는 길이가 더 작으면 전체) 점수의 평균을 최대값으로 설정
-        k = min(3, len(scores))
-        sorted_scores = sorted(scores, reverse=True)
-        max_score = sum(sorted_scores[:k]) / k
-        
-        # 최대값과 최소값이 같으면 모두 1로 설정
-        if max_score == min_score:
-            return [1.0] * len(scores)
-        
-        # TMM 정규화 적용
-        normalized = [(s - min_score) / (max_score - min_score) for s in scores]
-        
-        # 0~1 범위 보장
-        return [max(0.0, min(1.0, s)) for s in normalized]
+        return [doc for doc, _ in await self.asearch_with_scores(query, limit, filters)]
     
-    def _estimate_bm25_scores(self, query: str, docs: List[Document]) -> List[float]:
+    async def asearch_with_scores(
+        self, query: str, limit: int = 20, filters: Optional[SearchFilters] = None
+    ) -> List[Tuple[Document, float]]:
         """
-        BM25 검색 결과의 점수를 추정합니다.
-        정확한 BM25 점수를 얻기 어려운 경우 순위 기반 점수로 대체합니다.
+        asearch와 같지만 문서별 하이브리드 점수를 함께 반환합니다. (캐스케이드 리랭킹 등에서 사용)
 
         Args:
             query (str): 검색 쿼리
-            docs (List[Document]): BM25 검색 결과 문서들
+            limit (int): 반환할 최대 문서 수
+            filters (SearchFilters, optional): 지역 / 특징 / 기피 음식 사전 필터
 
         Returns:
-            List[float]: 추정된 BM25 점수 리스트
+            List[Tuple[Document, float]]: (문서, 하이브리드 점수) 리스트 (점수 내림차순)
         """
-        # BM25 결과는 관련성 순으로 정렬되어 있다고 가정
-        # 1/rank 방식으로 점수 추정 (rank=1이 가장 높은 점수)
-        scores = []
-        for i, _ in enumerate(docs):
-            rank = i + 1
-            score = 1.0 / rank
-            scores.append(score)
-        return scores
+        print(f"TMMCC 비동기 하이브리드 검색 시작: 쿼리='{query}', limit={limit}")
+        loop = asyncio.get_running_loop()
+        executor = get_retrieval_executor()
+        try:
+            ids, scores = await self.asearch_ids(query, limit, filters)
+            # 최종 상위 문서만 Document로 만듦 (mmap docstore에서는 이때 처음 본문을 읽음)
+            return await loop.run_in_executor(executor, self._materialize, ids, scores)
+        except Exception as e:
+            print(f"비동기 하이브리드 검색 중 오류 발생: {e}")
+            print(f"스택 트레이스: {traceback.format_exc()}")
+            
+            # 에러 시 가능한 결과 반환 시도
+            try:
+                if hasattr(self.vectordb, 'similarity_search'):
+                    print("오류 복구: 벡터 검색 결과만 반환 시도")
+                    docs = await loop.run_in_executor(
+                        executor, partial(self.vectordb.similarity_search, query, k=limit)
+                    )
+                    return self._rank_scores(docs)
+                else:
+                    return []
+            except Exception as fallback_error:
+                print(f"복구 시도 중 추가 오류 발생: {fallback_error}")
+                return []
     
-    def _get_doc_id(self, doc: Document) -> str:
+    async def asearch_ids(
+        self,
+        query: str,
+        limit: int = 20,
+        filters: Optional[SearchFilters] = None,
+        extra_results: Sequence[ScoredIds] = ()
+    ) -> Tuple[np.ndarray, np.ndarray]:
         """
-        문서의 고유 ID를 가져옵니다. 메타데이터에 ID가 없으면 내용 앞부분을 사용합니다.
+        search_ids의 비동기 버전. 벡터 검색과 BM25 검색을 검색 스레드 풀에서 동시에 실행합니다.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (문서 위치, 하이브리드 점수), 점수 내림차순
+        """
+        loop = asyncio.get_running_loop()
+        executor = get_retrieval_executor()
+        selection = self._select(filters)
+        vector_results, keyword_results, graph_results = await asyncio.gather(
+            self._avector_search(query, limit, selection),
+            loop.run_in_executor(executor, self._keyword_search, query, selection),
+            loop.run_in_executor(executor, self._graph_search, query, selection)
+        )
+        return self._fuse_results(vector_results, keyword_results, limit, (*extra_results, *graph_results))
+    
+    def _select(self, filters: Optional[SearchFilters]) -> Optional[FilterSelection]:
+        """필터 조건을 문서 위치 비트맵으로 결합합니다. 적용할 조건이 없으면 None."""
+        if filters is None or filters.is_empty():
+            return None
+        if self.filter_index is None:
+            print("메타데이터 필터 인덱스가 없어 필터 조건을 무시합니다.")
+            return None
+        selection = self.filter_index.select(filters)
+        if selection is not None:
+            print(f"메타데이터 필터 적용: {selection.description} → 문서 {selection.count}/{selection.num_docs}개")
+        return selection
+    
+    def _vector_search(
+        self, query: str, limit: int, selection: Optional[FilterSelection] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """벡터 검색을 수행하여 (문서 위치, 유사도 점수) 배열을 반환합니다. 실패하면 빈 결과를 반환합니다."""
+        try:
+            embedding = self.vectordb.embeddings.embed_query(query)
+            positions, scores = self._vector_search_by_vector(embedding, limit, selection)
+            print(f"벡터 검색 완료: {len(positions)}개 문서")
+            return positions, scores
+        except Exception as vec_error:
+            print(f"벡터 검색 중 오류 발생: {vec_error}")
+            print(f"스택 트레이스: {traceback.format_exc()}")
+            return _EMPTY_IDS, _EMPTY_SCORES
+    
+    async def _avector_search(
+        self, query: str, limit: int, selection: Optional[FilterSelection] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        쿼리 임베딩은 비동기 API로, FAISS 검색은 검색 스레드 풀에서 수행합니다.
+        실패하면 빈 결과를 반환합니다.
+        """
+        loop = asyncio.get_running_loop()
+        executor = get_retrieval_executor()
+        try:
+            embedding = await self.vectordb.embeddings.aembed_query(query)
+            positions, scores = await loop.run_in_executor(
+                executor, self._vector_search_by_vector, embedding, limit, selection
+            )
+            print(f"벡터 검색 완료: {len(positions)}개 문서")
+            return positions, scores
+        except Exception as vec_error:
+            print(f"벡터 검색 중 오류 발생: {vec_error}")
+            print(f"스택 트레이스: {traceback.format_exc()}")
+            return _EMPTY_IDS, _EMPTY_SCORES
+    
+    def _vector_search_by_vector(
+        self, embedding: List[float], limit: int, selection: Optional[FilterSelection] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        FAISS 인덱스를 직접 검색하여 (문서 위치, 유사도 점수)를 반환합니다.
+        L2 인덱스의 거리는 작을수록 가까우므로 부호를 바꿔 "클수록 유사"한 점수로 맞춥니다.
+        필터가 있으면 비트맵을 IDSelector로 검색 파라미터에 넣어 조건에 맞는 벡터 중에서만 찾습니다.
+        (similarity_search_with_score_by_vector의 filter는 검색 후 걸러내므로 결과 수가 줄어듦)
 
         Args:
-            doc (Document): 문서 객체
+            embedding (List[float]): 쿼리 임베딩
+            limit (int): 반환할 최대 문서 수
+            selection (FilterSelection, optional): 메타데이터 필터 결과
 
         Returns:
-            str: 문서 ID
+            Tuple[np.ndarray, np.ndarray]: (문서 위치, 유사도 점수), 점수 내림차순
         """
-        # 메타데이터에 id가 있으면 사용
-        if hasattr(doc, 'metadata') and doc.metadata and 'id' in doc.metadata:
-            return str(doc.metadata['id'])
+        index = self.vectordb.index
+        k = min(limit, index.ntotal if selection is None else selection.count)
+        if k <= 0:
+            return _EMPTY_IDS, _EMPTY_SCORES
+        vector = np.asarray([embedding], dtype=np.float32)
+        if getattr(self.vectordb, "_normalize_L2", False):
+            faiss.normalize_L2(vector)
+        params = None
+        if selection is not None:
+            # 셀렉터는 검색이 끝날 때까지 참조를 유지해야 함
+            selector = selection.faiss_selector()
+            params = search_parameters(index, selector)
+        scores, positions = index.search(vector, k, params=params)
+        found = positions[0] >= 0
+        positions, scores = positions[0][found], scores[0][found]
+        if index.metric_type == faiss.METRIC_L2:
+            scores = -scores
+        return positions.astype(np.int64), scores.astype(np.float32)
+    
+    def _keyword_search(self, query: str, selection: Optional[FilterSelection] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """BM25 키워드 검색을 수행하여 (문서 위치, 실제 BM25 점수) 배열을 반환합니다. 필터가 있으면 점수를 마스킹합니다."""
+        try:
+            mask = selection.mask if selection is not None else None
+            positions, scores = self.bm25.search(query, k=self.top_k, mask=mask)
+            print(f"키워드 검색 완료: {len(positions)}개 문서")
+            return positions.astype(np.int64), scores
+        except Exception as key_error:
+            print(f"키워드 검색 중 오류 발생: {key_error}")
+            print(f"스택 트레이스: {traceback.format_exc()}")
+            return _EMPTY_IDS, _EMPTY_SCORES
+    
+    def _graph_search(self, query: str, selection: Optional[FilterSelection] = None) -> Tuple[ScoredIds, ...]:
+        """그래프 다중 홉 검색 결과를 추가 검색 결과로 만듭니다. (그래프 검색기가 없거나 시드가 없으면 빈 튜플)"""
+        if self.graph_retriever is None:
+            return ()
+        try:
+            ids, scores = self.graph_retriever.search(query, selection.mask if selection is not None else None)
+        except Exception as e:
+            print(f"그래프 검색 중 오류 발생 (그래프 결과 없이 결합): {e}")
+            return ()
+        return ((ids, scores, self.graph_weight),) if len(ids) else ()
+    
+    def _fuse_results(
+        self,
+        vector_results: Tuple[np.ndarray, np.ndarray],
+        keyword_results: Tuple[np.ndarray, np.ndarray],
+        limit: int,
+        extra_results: Sequence[ScoredIds] = ()
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        벡터 검색과 키워드 검색(및 추가 검색) 결과를 TMM 정규화 및 CC 가중치로 결합합니다.
+        한쪽 결과만 있으면 그 결과를 순서 그대로, 역순위 기반 점수와 함께 반환합니다.
+
+        Args:
+            vector_results (Tuple[np.ndarray, np.ndarray]): 벡터 검색 (문서 위치, 유사도 점수)
+            keyword_results (Tuple[np.ndarray, np.ndarray]): 키워드 검색 (문서 위치, BM25 점수)
+            limit (int): 반환할 최대 문서 수
+            extra_results (Sequence[ScoredIds]): 추가 검색 결과 (문서 위치, 점수, 가중치)
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (문서 위치, 하이브리드 점수), 점수 내림차순
+        """
+        results = [
+            (vector_results[0], vector_results[1], self.alpha),
+            (keyword_results[0], keyword_results[1], 1 - self.alpha),
+            *extra_results,
+        ]
+        non_empty = [result for result in results if len(result[0])]
+        
+        # 결과가 없는 경우 처리
+        if not non_empty:
+            print("벡터 검색과 키워드 검색 모두 결과 없음")
+            return _EMPTY_IDS, _EMPTY_SCORES
         
-        # id가 없으면 내용 앞 부분 해시 사용
-        return str(hash(doc.page_content[:100]))
+        # 한 검색 결과만 있는 경우
+        if len(non_empty) == 1:
+            print("한 검색 결과만 있어 그 순서대로 반환")
+            ids = np.asarray(non_empty[0][0][:limit], dtype=np.int64)
+            return ids, rank_scores(len(ids))
+        
+        # TMM-CC 하이브리드 결합 (H = Σ w_i * TMM(S_i), 기본은 αV + (1-α)K)
+        ids, scores = fuse_scores(
+            [(ids, scores) for ids, scores, _ in non_empty],
+            [weight for _, _, weight in non_empty],
+            limit
+        )
+        print(f"하이브리드 검색 완료: {len(ids)}개 문서 반환")
+        return ids, scores
+    
+    def _materialize(self, ids: np.ndarray, scores: np.ndarray) -> List[Tuple[Document, float]]:
+        """
+        최종 상위 문서 위치만 docstore에서 Document로 만들어 (문서, 점수) 리스트로 반환합니다.
+        반환 문서는 metadata["doc_id"]에 정수 문서 ID(벡터 위치)를 담습니다.
+        """
+        results = []
+        for position, score in zip(ids.tolist(), scores.tolist()):
+            doc = self.vectordb.docstore.search(self.vectordb.index_to_docstore_id[position])
+            if isinstance(doc, Document):
+                # load_vectordb를 거치지 않은 벡터스토어(스크립트에서 직접 만든 경우 등)도 같은 ID를 갖도록 채움
+                if doc.metadata is None:
+                    doc.metadata = {}
+                doc.metadata.setdefault(DOC_ID_KEY, position)
+                results.append((doc, score))
+        return results
+    
+    @staticmethod
+    def _rank_scores(docs: List[Document]) -> List[Tuple[Document, float]]:
+        """점수가 없는 결과 순서에 역순위 기반 점수(1.0, 1-1/n, ...)를 붙입니다."""
+        return list(zip(docs, rank_scores(len(docs)).tolist()))
 
 
 def create_hybrid_search(
     vectordb, 
-    documents: List[Document], 
+    documents: Optional[List[Document]] = None, 
     alpha: float = 0.8,
-    top_k: int = 20
+    top_k: int = 20,
+    keyword_index: Optional[SparseBM25] = None,
+    filter_index: Optional[MetadataFilterIndex] = None,
+    graph_retriever: Optional[GraphRetriever] = None
 ) -> TMMCC_HybridSearch:
     """
     TMMCC 하이브리드 검색기 생성 편의 함수
 
     Args:
         vectordb: 벡터 검색을 위한 벡터 스토어 객체
-        documents (List[Document]): 키워드 검색을 위한 문서 리스트
+        documents (List[Document], optional): 키워드 검색을 위한 문서 리스트
         alpha (float): 벡터 검색 가중치 (0.0~1.0, 기본값 0.8)
         top_k (int): 검색 결과 수 (기본값 20)
+        keyword_index (SparseBM25, optional): 공유 BM25 엔진 (리소스 레지스트리에서 획득)
+        filter_index (MetadataFilterIndex, optional): 공유 메타데이터 필터 비트맵 (리소스 레지스트리에서 획득)
+        graph_retriever (GraphRetriever, optional): 공유 그래프 다중 홉 검색기 (리소스 레지스트리에서 획득)
 
     Returns:
         TMMCC_HybridSearch: 생성된 하이브리드 검색기
     """
-    print(f"하이브리드 검색기 생성 시작: alpha={alpha}, top_k={top_k}, 문서 수={len(documents)}")
+    doc_count = keyword_index.num_docs if keyword_index is not None else len(documents)
+    print(f"하이브리드 검색기 생성 시작: alpha={alpha}, top_k={top_k}, 문서 수={doc_count}")
     return TMMCC_HybridSearch(
         vectordb=vectordb,
         documents=documents,
         alpha=alpha,
-        top_k=top_k
+        top_k=top_k,
+        keyword_index=keyword_index,
+        filter_index=filter_index,
+        graph_retriever=graph_retriever
     ) 
\ No newline at end of file
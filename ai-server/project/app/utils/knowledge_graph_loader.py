@@ -1,29 +1,59 @@
 '''
 Knowledge Graph 로딩 및 접근 유틸리티
 '''
+import hashlib
+import os
 import pickle
 import networkx as nx
 from pathlib import Path
+from typing import Dict, Optional, Union
 import logging
 
+from .compact_graph import COMPACT_GRAPH_FORMAT_VERSION, CompactKnowledgeGraph, read_compact_graph_meta, write_compact_graph
+from .snapshot import publish_snapshot
+
 # 로거 설정
 logger = logging.getLogger(__name__)
 
 # 그래프 파일 경로 (ai-server/project 기준)
 # create_knowledge_graph.py 에서 저장한 경로와 일치해야 합니다.
 GRAPH_FILE_PATH = Path(__file__).parent.parent.parent / "graphdb" / "knowledge_graph.gpickle"
+# CSR 컬럼형 그래프 스냅샷 경로 (그래프 생성 시 create_knowledge_graph.py가 저장하며, 없거나 gpickle과 맞지 않으면 첫 로드 때 생성)
+COMPACT_GRAPH_PATH = GRAPH_FILE_PATH.with_suffix("")
+# gpickle을 언피클하지 않고 CSR 스냅샷을 mmap으로 열지 여부 (false면 networkx.DiGraph를 그대로 로드)
+KNOWLEDGE_GRAPH_COMPACT = os.getenv("KNOWLEDGE_GRAPH_COMPACT", "true").lower() in ("1", "true", "yes")
+
+# GraphRAGEnhancer / MetadataFilterIndex가 사용하는 조회 API는 두 그래프 모두 같음
+KnowledgeGraph = Union[nx.DiGraph, CompactKnowledgeGraph]
 
-_graph_instance: nx.DiGraph | None = None
+_graph_instance: KnowledgeGraph | None = None
 _graph_load_attempted: bool = False
 
-def load_knowledge_graph() -> nx.DiGraph | None:
+def load_knowledge_graph() -> KnowledgeGraph | None:
     '''
-    knowledge_graph.gpickle 파일을 로드하여 networkx.DiGraph 객체를 반환합니다.
+    지식 그래프를 로드합니다.
+    KNOWLEDGE_GRAPH_COMPACT가 켜져 있으면 CSR 스냅샷(graphdb/knowledge_graph/)을 mmap으로 열어
+    CompactKnowledgeGraph를 반환합니다. 스냅샷이 없거나 gpickle보다 오래되었으면 gpickle로 한 번 생성합니다.
+    꺼져 있으면 knowledge_graph.gpickle 파일을 로드하여 networkx.DiGraph 객체를 반환합니다.
     파일이 없거나 오류 발생 시 None을 반환하고 오류를 로깅합니다.
     '''
     global _graph_load_attempted
     _graph_load_attempted = True
 
+    if KNOWLEDGE_GRAPH_COMPACT:
+        try:
+            return load_compact_knowledge_graph()
+        except Exception as e:
+            logger.error(f"CSR 지식 그래프 로드 실패, gpickle로 로드합니다: {COMPACT_GRAPH_PATH} - {e}")
+
+    return load_pickled_knowledge_graph()
+
+
+def load_pickled_knowledge_graph() -> nx.DiGraph | None:
+    '''
+    knowledge_graph.gpickle 파일을 로드하여 networkx.DiGraph 객체를 반환합니다.
+    파일이 없거나 오류 발생 시 None을 반환하고 오류를 로깅합니다.
+    '''
     logger.info(f"지식 그래프 로드 시도. 경로: {GRAPH_FILE_PATH}")
 
     if not GRAPH_FILE_PATH.exists():
@@ -48,7 +78,92 @@ def load_knowledge_graph() -> nx.DiGraph | None:
         logger.error(f"지식 그래프 로드 중 알 수 없는 오류 발생: {GRAPH_FILE_PATH} - {e}")
         return None
 
-def get_knowledge_graph() -> nx.DiGraph | None:
+def load_compact_knowledge_graph() -> CompactKnowledgeGraph | None:
+    '''
+    CSR 지식 그래프 스냅샷을 mmap으로 엽니다. 스냅샷이 없거나 gpickle 체크섬과 다르면 gpickle로 다시 생성합니다.
+    gpickle 없이 스냅샷만 배포한 경우에도 로드할 수 있습니다.
+
+    Returns:
+        CompactKnowledgeGraph: 읽기 전용 그래프 (스냅샷과 gpickle이 모두 없으면 None)
+    '''
+    if not _compact_graph_valid(read_compact_graph_meta(COMPACT_GRAPH_PATH)):
+        if not GRAPH_FILE_PATH.exists():
+            logger.error(f"지식 그래프 파일을 찾을 수 없습니다: {GRAPH_FILE_PATH}")
+            return None
+        logger.info(f"CSR 지식 그래프 스냅샷이 없거나 오래되어 gpickle로 생성합니다: {COMPACT_GRAPH_PATH}")
+        build_compact_graph_snapshot()
+
+    graph = CompactKnowledgeGraph(COMPACT_GRAPH_PATH)
+    logger.info(
+        f"CSR 지식 그래프 로드 성공: {COMPACT_GRAPH_PATH} "
+        f"(노드: {graph.number_of_nodes()}, 엣지: {graph.number_of_edges()}, {graph.nbytes / 1024 / 1024:.1f}MB)"
+    )
+    return graph
+
+
+def _compact_graph_valid(meta: Optional[Dict], graph_file: Path = GRAPH_FILE_PATH) -> bool:
+    '''스냅샷 포맷이 현재 버전이고, gpickle이 있으면 그 체크섬으로 만들어졌는지 확인합니다.'''
+    if meta is None or meta.get("format_version") != COMPACT_GRAPH_FORMAT_VERSION:
+        return False
+    stat = graph_pickle_stat(graph_file)
+    if stat is None:
+        return True
+    # 크기/수정 시각이 기록과 같으면 gpickle을 다시 읽지 않음
+    if meta.get("source_stat") == stat and meta.get("source_checksum"):
+        return True
+    return meta.get("source_checksum") == graph_checksum(graph_file)
+
+
+def build_compact_graph_snapshot(graph_file: Path = GRAPH_FILE_PATH, graph: Optional[nx.DiGraph] = None) -> Path:
+    '''
+    gpickle 그래프를 CSR 스냅샷(gpickle 경로에서 확장자를 뺀 디렉토리)으로 저장합니다.
+    여러 워커가 동시에 저장하거나 읽어도 안전하도록 publish_snapshot으로 새 버전을 쓴 뒤 링크를 교체합니다.
+    ai-preprocessing의 create_knowledge_graph.py도 gpickle 저장 직후 이 함수로 스냅샷을 저장하며,
+    서버는 스냅샷이 없거나 gpickle과 맞지 않을 때만 첫 로드에서 다시 만듭니다.
+
+    Args:
+        graph_file (Path): knowledge_graph.gpickle 경로
+        graph (nx.DiGraph, optional): 방금 저장한 그래프 객체 (None이면 gpickle을 언피클)
+
+    Returns:
+        Path: CSR 스냅샷 경로
+    '''
+    graph_file = Path(graph_file)
+    compact_path = graph_file.with_suffix("")
+    checksum, stat = graph_checksum(graph_file), graph_pickle_stat(graph_file)
+    if graph is None:
+        with open(graph_file, 'rb') as f:
+            graph = pickle.load(f)
+    published = publish_snapshot(
+        compact_path,
+        lambda directory: write_compact_graph(directory, graph, checksum, stat),
+        # 다른 워커가 먼저 같은 스냅샷을 만든 경우
+        skip_if=lambda: _compact_graph_valid(read_compact_graph_meta(compact_path), graph_file)
+    )
+    if published:
+        logger.info(f"CSR 지식 그래프 스냅샷 저장 완료: {compact_path} (노드: {graph.number_of_nodes()}, 엣지: {graph.number_of_edges()})")
+    return compact_path
+
+
+def graph_checksum(graph_file: Path = GRAPH_FILE_PATH) -> str:
+    '''knowledge_graph.gpickle의 SHA-256 체크섬'''
+    digest = hashlib.sha256()
+    with open(graph_file, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def graph_pickle_stat(graph_file: Path = GRAPH_FILE_PATH) -> Optional[Dict[str, int]]:
+    '''knowledge_graph.gpickle의 크기와 수정 시각 (없으면 None)'''
+    graph_file = Path(graph_file)
+    if not graph_file.exists():
+        return None
+    stat = graph_file.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def get_knowledge_graph() -> KnowledgeGraph | None:
     '''
     로드된 지식 그래프 인스턴스를 반환합니다.
     그래프가 아직 로드되지 않았다면 로드를 시도합니다.
@@ -0,0 +1,377 @@
+'''
+지식 그래프 기반 메타데이터 사전 필터 (지역 / 특징 / 음식 카테고리)
+
+지식 그래프의 LOCATED_IN(지역), HAS_FEATURE(주차가능 등), SERVES_MENU → 메뉴 카테고리 엣지를
+벡터 DB 문서 위치(FAISS 벡터 위치 = BM25 행렬 열) 기준 비트맵으로 미리 계산해 두고,
+검색 시 조건에 맞는 비트맵을 AND / OR / NOT으로 결합합니다.
+결합한 비트맵은 FAISS에는 IDSelector(SearchParameters)로, BM25에는 점수 마스크로 전달되어
+조건에 맞지 않는 문서는 후보에 오르지 않습니다. (리랭킹 쌍과 LLM 컨텍스트 감소)
+
+비트맵은 np.packbits(bitorder="little") 형식으로 faiss.IDSelectorBitmap이 그대로 사용할 수 있습니다.
+'''
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import faiss
+import numpy as np
+
+from .compact_graph import CompactKnowledgeGraph
+
+# 요청 문구 → 지식 그래프 Feature 노드 이름 (create_knowledge_graph.py의 features와 일치해야 함)
+# 특징이 없는 문서를 검색 후보에서 빼는 강한 조건이므로 특징 자체를 명시한 단어만 둡니다.
+# ("자동차" / "렌터카" 같은 교통수단은 주차 필요 여부를 뜻하지 않으므로 필터로 쓰지 않고 쿼리 문장으로만 반영)
+FEATURE_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "주차가능": ("주차", "파킹"),
+    "애견동반가능": ("애견", "반려견", "반려동물", "강아지"),
+    "와이파이가능": ("와이파이", "wifi"),
+}
+# 이 비율보다 적은 문서만 남으면 비트맵 대신 ID 목록(IDSelectorBatch)으로 FAISS에 전달
+BATCH_SELECTOR_RATIO = 1 / 64
+# 지역 이름 별칭을 만들 때 떼어 낼 행정구역 접미사 ("해운대구" → "해운대")
+_AREA_SUFFIXES = ("구", "군", "시", "동", "읍", "면")
+
+
+def normalize_name(text: Optional[str]) -> str:
+    '''텍스트 정규화 (create_knowledge_graph.py의 normalize_text와 동일: 소문자, 공백/특수 문자 제거)'''
+    if not text or not isinstance(text, str):
+        return ""
+    normalized = re.sub(r'\s+', '', text.strip().lower())
+    return re.sub(r'[^\w\sㄱ-힣]', '', normalized)
+
+
+def features_from_text(*texts: Optional[str]) -> Tuple[str, ...]:
+    '''
+    요구사항 문구에서 명시적으로 요청한 특징(Feature 노드 이름)을 찾습니다.
+
+    Args:
+        *texts (str): 요청 문구 (None은 무시)
+
+    Returns:
+        Tuple[str, ...]: 필요한 특징 이름 (예: ("주차가능",))
+    '''
+    normalized = " ".join(normalize_name(text) for text in texts if text)
+    return tuple(
+        feature for feature, keywords in FEATURE_KEYWORDS.items()
+        if any(keyword in normalized for keyword in keywords)
+    )
+
+
+@dataclass(frozen=True)
+class SearchFilters:
+    '''
+    검색 사전 필터 조건. 각 항목은 자유 문구이며 MetadataFilterIndex가 그래프의 지역/카테고리 이름과 매칭합니다.
+
+    Attributes:
+        areas: 지역 문구 (매칭된 지역 중 하나에 위치하면 통과)
+        features: 필요한 특징 이름 (모두 가져야 통과)
+        excluded_categories: 기피 음식 문구 (매칭된 카테고리의 메뉴/업종이면 제외)
+    '''
+    areas: Tuple[str, ...] = ()
+    features: Tuple[str, ...] = ()
+    excluded_categories: Tuple[str, ...] = ()
+
+    def is_empty(self) -> bool:
+        return not (self.areas or self.features or self.excluded_categories)
+
+
+class FilterSelection:
+    '''필터 조건을 결합한 결과 (문서 위치 비트맵). FAISS 셀렉터와 BM25 마스크로 변환합니다.'''
+
+    def __init__(self, bitmap: np.ndarray, num_docs: int, description: str = ""):
+        '''
+        Args:
+            bitmap (np.ndarray): packbits(bitorder="little")로 압축한 uint8 비트맵
+            num_docs (int): 전체 문서 수
+            description (str): 로그용 조건 설명
+        '''
+        self.bitmap = np.ascontiguousarray(bitmap, dtype=np.uint8)
+        self.num_docs = num_docs
+        self.description = description
+        self.mask = np.unpackbits(self.bitmap, count=num_docs, bitorder="little").view(bool)
+        self.count = int(np.count_nonzero(self.mask))
+        self._ids: Optional[np.ndarray] = None
+
+    @property
+    def ids(self) -> np.ndarray:
+        '''선택된 문서 위치 (int64, 오름차순)'''
+        if self._ids is None:
+            self._ids = np.flatnonzero(self.mask).astype(np.int64)
+        return self._ids
+
+    def faiss_selector(self):
+        '''
+        FAISS IDSelector를 만듭니다. 선택 문서가 적으면 ID 목록(IDSelectorBatch), 아니면 비트맵(IDSelectorBitmap).
+        셀렉터는 이 객체의 배열을 참조하므로 검색이 끝날 때까지 FilterSelection을 유지해야 합니다.
+        '''
+        if self.count < self.num_docs * BATCH_SELECTOR_RATIO:
+            return faiss.IDSelectorBatch(self.ids)
+        return faiss.IDSelectorBitmap(self.num_docs, faiss.swig_ptr(self.bitmap))
+
+
+def search_parameters(index, selector):
+    '''
+    인덱스 종류에 맞는 SearchParameters에 셀렉터를 넣어 반환합니다.
+    IVF / HNSW는 전용 파라미터 타입이 필요하므로 현재 nprobe / efSearch 값을 그대로 옮깁니다.
+
+    Args:
+        index (faiss.Index): 검색할 인덱스
+        selector (faiss.IDSelector): 문서 위치 셀렉터
+
+    Returns:
+        faiss.SearchParameters: index.search(..., params=)에 전달할 파라미터
+    '''
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        return faiss.SearchParametersIVF(sel=selector, nprobe=ivf.nprobe)
+    downcast = faiss.downcast_index(index)
+    if hasattr(downcast, "hnsw"):
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=downcast.hnsw.efSearch)
+    return faiss.SearchParameters(sel=selector)
+
+
+class MetadataFilterIndex:
+    '''
+    지식 그래프 엣지로 만든 문서 위치 비트맵 모음.
+    키는 (종류, 정규화된 이름)이며 종류는 "area", "feature", "category"입니다.
+    '''
+
+    def __init__(self, num_docs: int, bitmaps: Dict[Tuple[str, str], np.ndarray], names: Dict[Tuple[str, str], str]):
+        '''
+        Args:
+            num_docs (int): 벡터 DB 문서 수
+            bitmaps (Dict[Tuple[str, str], np.ndarray]): (종류, 정규화 이름) → packbits 비트맵
+            names (Dict[Tuple[str, str], str]): (종류, 정규화 이름) → 그래프의 원래 이름 (로그용)
+        '''
+        self.num_docs = num_docs
+        self.bitmaps = bitmaps
+        self.names = names
+        # 지역은 "해운대구"를 "해운대"로도 찾을 수 있도록 별칭을 둠
+        self._aliases: Dict[Tuple[str, str], List[Tuple[str, str]]] = {}
+        for key in bitmaps:
+            self._aliases.setdefault(key, []).append(key)
+            kind, name = key
+            if kind == "area" and name.endswith(_AREA_SUFFIXES) and len(name) > 2:
+                self._aliases.setdefault((kind, name[:-1]), []).append(key)
+
+    @classmethod
+    def from_graph(cls, graph, node_ids: Sequence[Optional[str]]) -> "MetadataFilterIndex":
+        '''
+        지식 그래프에서 문서 위치별 지역 / 특징 / 카테고리 비트맵을 만듭니다.
+
+        Args:
+            graph (nx.DiGraph | CompactKnowledgeGraph): 지식 그래프
+            node_ids (Sequence[Optional[str]]): 문서 위치별 그래프 노드 ID (없으면 None)
+
+        Returns:
+            MetadataFilterIndex: 비트맵 인덱스
+        '''
+        num_docs = len(node_ids)
+        positions: Dict[Tuple[str, str], List[int]] = {}
+        names: Dict[Tuple[str, str], str] = {}
+
+        def add(kind: str, name, position: int) -> None:
+            normalized = normalize_name(name)
+            if normalized:
+                positions.setdefault((kind, normalized), []).append(position)
+                names.setdefault((kind, normalized), name)
+
+        if isinstance(graph, CompactKnowledgeGraph):
+            cls._collect_compact(graph, node_ids, add)
+        else:
+            cls._collect(graph, node_ids, add)
+
+        bitmaps = {}
+        for key, doc_positions in positions.items():
+            mask = np.zeros(num_docs, dtype=bool)
+            mask[doc_positions] = True
+            bitmaps[key] = np.packbits(mask, bitorder="little")
+        return cls(num_docs, bitmaps, names)
+
+    @staticmethod
+    def _collect(graph, node_ids: Sequence[Optional[str]], add) -> None:
+        '''문서 노드의 업종 카테고리와 LOCATED_IN / HAS_FEATURE / SERVES_MENU 이웃 이름을 add(kind, name, position)로 전달합니다.'''
+        for position, node_id in enumerate(node_ids):
+            if node_id is None or not graph.has_node(node_id):
+                continue
+            add("category", graph.nodes[node_id].get("category"), position)
+            for _, neighbor_id, edge_data in graph.out_edges(node_id, data=True):
+                edge_type = edge_data.get("type")
+                neighbor = graph.nodes[neighbor_id]
+                if edge_type == "LOCATED_IN":
+                    add("area", neighbor.get("name"), position)
+                elif edge_type == "HAS_FEATURE":
+                    add("feature", neighbor.get("name"), position)
+                elif edge_type == "SERVES_MENU":
+                    add("category", neighbor.get("category"), position)
+                    add("category", neighbor.get("sub_category"), position)
+
+    @staticmethod
+    def _collect_compact(graph: CompactKnowledgeGraph, node_ids: Sequence[Optional[str]], add) -> None:
+        '''from_graph와 같은 규칙으로, CSR 그래프는 속성 사전을 만들지 않고 노드 번호와 엣지 유형 코드로 순회합니다.'''
+        edge_kinds = {
+            graph.type_code("LOCATED_IN", edge=True): (("area", "name"),),
+            graph.type_code("HAS_FEATURE", edge=True): (("feature", "name"),),
+            graph.type_code("SERVES_MENU", edge=True): (("category", "category"), ("category", "sub_category")),
+        }
+        edge_kinds.pop(None, None)
+        # 지역 / 특징 / 메뉴 노드는 여러 문서가 공유하므로 노드 번호별로 속성을 한 번만 읽음
+        neighbor_names: Dict[Tuple[int, str], Optional[str]] = {}
+        for position, node_id in enumerate(node_ids):
+            index = graph.node_index(node_id) if node_id is not None else None
+            if index is None:
+                continue
+            add("category", graph.attribute(index, "category"), position)
+            targets, edge_types = graph.successors_of(index)
+            for target, edge_type in zip(targets.tolist(), edge_types.tolist()):
+                for kind, key in edge_kinds.get(edge_type, ()):
+                    if (target, key) not in neighbor_names:
+                        neighbor_names[(target, key)] = graph.attribute(target, key)
+                    add(kind, neighbor_names[(target, key)], position)
+
+    def _match(self, kind: str, phrases: Iterable[str]) -> List[Tuple[str, str]]:
+        '''문구에 이름(또는 별칭)이 포함된 비트맵 키를 찾습니다. 한 글자 이름은 오탐이 많아 제외합니다.'''
+        normalized_phrases = [normalize_name(phrase) for phrase in phrases]
+        matched = []
+        for (alias_kind, alias), keys in self._aliases.items():
+            if alias_kind != kind or len(alias) < 2:
+                continue
+            if any(alias in phrase for phrase in normalized_phrases):
+                matched.extend(key for key in keys if key not in matched)
+        return matched
+
+    def _union(self, keys: List[Tuple[str, str]]) -> np.ndarray:
+        result = np.zeros((self.num_docs + 7) // 8, dtype=np.uint8)
+        for key in keys:
+            result |= self.bitmaps[key]
+        return result
+
+    def select(self, filters: Optional[SearchFilters]) -> Optional[FilterSelection]:
+        '''
+        필터 조건을 비트맵으로 결합합니다.
+        그래프에서 찾을 수 없는 조건은 무시하고, 조건을 모두 적용했을 때 남는 문서가 없으면
+        검색 결과가 비지 않도록 필터를 적용하지 않습니다.
+
+        Args:
+            filters (SearchFilters, optional): 필터 조건
+
+        Returns:
+            FilterSelection: 결합된 선택 (적용할 조건이 없으면 None)
+        '''
+        if filters is None or filters.is_empty():
+            return None
+        bitmap = np.full((self.num_docs + 7) // 8, 0xFF, dtype=np.uint8)
+        applied = []
+
+        areas = self._match("area", filters.areas)
+        if areas:
+            bitmap &= self._union(areas)
+            applied.append("지역=" + "|".join(self.names[key] for key in areas))
+        for feature in filters.features:
+            key = ("feature", normalize_name(feature))
+            if key in self.bitmaps:
+                bitmap &= self.bitmaps[key]
+                applied.append(f"특징={self.names[key]}")
+        categories = self._match("category", filters.excluded_categories)
+        if categories:
+            bitmap &= ~self._union(categories)
+            applied.append("제외=" + "|".join(self.names[key] for key in categories))
+
+        if not applied:
+            return None
+        selection = FilterSelection(bitmap, self.num_docs, ", ".join(applied))
+        if selection.count == 0:
+            print(f"메타데이터 필터 결과가 없어 필터를 적용하지 않습니다: {selection.description}")
+            return None
+        return selection
+
+    @property
+    def nbytes(self) -> int:
+        '''비트맵 메모리 사용량(바이트)'''
+        return sum(bitmap.nbytes for bitmap in self.bitmaps.values())
+
+    def stats(self) -> Dict[str, int]:
+        '''종류별 비트맵 수 (/resources의 details)'''
+        counts: Dict[str, int] = {}
+        for kind, _ in self.bitmaps:
+            counts[kind] = counts.get(kind, 0) + 1
+        return {"num_docs": self.num_docs, **{f"{kind}_bitmaps": count for kind, count in counts.items()}}
+
+
+# 지식 그래프 노드 ID를 만들 식별자 메타데이터 키 (우선순위 순)
+NODE_ID_KEYS = ("UC_SEQ", "RSTR_ID", "content_id")
+
+
+def document_node_ids(vectorstore) -> List[Optional[str]]:
+    '''
+    벡터 DB 문서 위치별 지식 그래프 노드 ID를 만듭니다.
+    (UC_SEQ / content_id → "attraction_<id>", RSTR_ID → "restaurant_<id>",
+    create_knowledge_graph.py 규칙과 GraphRAGEnhancer의 우선순위를 따름)
+    mmap docstore는 식별자 값이 모두 정수 컬럼에 있으면 Document를 만들지 않고 컬럼에서 바로 읽고,
+    문자열 / 실수 값이 섞여 JSON 메타데이터에 남은 키가 있으면 문서별 메타데이터로 pickle docstore와 같은 규칙을 적용합니다.
+
+    Args:
+        vectorstore (FAISS): 로드된 벡터스토어
+
+    Returns:
+        List[Optional[str]]: 노드 ID (식별자가 없는 문서는 None)
+    '''
+    from .docstore import MmapDocstore, NULL
+    from .vectordb import iter_vectordb_documents
+
+    docstore = vectorstore.docstore
+    if isinstance(docstore, MmapDocstore):
+        if not any(docstore.in_metadata(name) for name in NODE_ID_KEYS):
+            node_ids: List[Optional[str]] = [None] * docstore.num_docs
+            # 우선순위가 낮은 컬럼부터 채워 높은 쪽이 덮어쓰도록 함
+            for name, prefix in (("content_id", "attraction_"), ("RSTR_ID", "restaurant_"), ("UC_SEQ", "attraction_")):
+                column = docstore.column(name)
+                if column is None:
+                    continue
+                for position in np.flatnonzero(column > NULL):
+                    node_ids[position] = f"{prefix}{int(column[position])}"
+            return node_ids
+        return [metadata_node_id(docstore.metadata(position)) for position in range(docstore.num_docs)]
+
+    return [metadata_node_id(doc.metadata or {}) for doc in iter_vectordb_documents(vectorstore)]
+
+
+def metadata_node_id(metadata: Dict) -> Optional[str]:
+    '''
+    문서 메타데이터의 식별자로 지식 그래프 노드 ID를 만듭니다 (변환할 수 없으면 None).
+
+    Args:
+        metadata (Dict): 문서 메타데이터
+
+    Returns:
+        Optional[str]: 노드 ID
+    '''
+    try:
+        if metadata.get("UC_SEQ") is not None:
+            return f"attraction_{metadata['UC_SEQ']}"
+        if metadata.get("RSTR_ID") is not None:
+            return f"restaurant_{int(float(metadata['RSTR_ID']))}"
+        if metadata.get("content_id") is not None:
+            return f"attraction_{metadata['content_id']}"
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+def load_metadata_filter(vectorstore, graph) -> Optional[MetadataFilterIndex]:
+    '''
+    벡터 DB와 지식 그래프로 메타데이터 필터 인덱스를 만듭니다. 그래프가 없으면 None.
+
+    Args:
+        vectorstore (FAISS): 로드된 벡터스토어
+        graph (nx.DiGraph | CompactKnowledgeGraph, optional): 지식 그래프
+
+    Returns:
+        MetadataFilterIndex: 필터 인덱스 (그래프가 없으면 None)
+    '''
+    if graph is None:
+        print("지식 그래프가 없어 메타데이터 필터를 사용하지 않습니다.")
+        return None
+    filter_index = MetadataFilterIndex.from_graph(graph, document_node_ids(vectorstore))
+    print(f"메타데이터 필터 인덱스 생성 완료: {filter_index.stats()}")
+    return filter_index
@@ -0,0 +1,213 @@
+'''
+ONNX Runtime 리랭커 백엔드
+
+CrossEncoder(예: cross-encoder/ms-marco-MiniLM-L-6-v2)를 ONNX로 내보내고 동적 int8 양자화를 적용한 뒤,
+ONNX Runtime CPU 세션으로 추론합니다. predict() 인터페이스가 CrossEncoder와 같으므로
+RerankBatcher / 점수 캐시와 그대로 함께 사용할 수 있습니다.
+
+- 내보낸 모델은 RERANKER_ONNX_DIR/<모델 이름> (버전 디렉토리 링크, snapshot.py 참고)에 저장되고, 다음 실행부터는 내보내기 없이 바로 로드합니다.
+- RERANKER_ONNX_THREADS: 세션 intra-op 스레드 수 (0이면 ONNX Runtime 기본값)
+- RERANKER_ONNX_QUANTIZE: int8 동적 양자화 사용 여부 (기본값 true)
+
+onnx / onnxruntime 패키지는 이 백엔드를 사용할 때만 임포트합니다.
+'''
+import json
+import os
+import re
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+from .snapshot import publish_snapshot, resolve_snapshot
+
+RERANKER_ONNX_DIR = Path(
+    os.getenv("RERANKER_ONNX_DIR", str(Path(__file__).parent.parent.parent / "models" / "onnx"))
+)
+RERANKER_ONNX_THREADS = int(os.getenv("RERANKER_ONNX_THREADS", "0"))
+RERANKER_ONNX_QUANTIZE = os.getenv("RERANKER_ONNX_QUANTIZE", "true").lower() in ("1", "true", "yes")
+
+ONNX_EXPORT_META = "export_meta.json"
+
+
+def onnx_model_dir(model_name: str) -> Path:
+    """모델 이름별 ONNX 저장 디렉토리 (경로 구분자 등은 '__'로 치환)"""
+    return RERANKER_ONNX_DIR / re.sub(r"[^0-9A-Za-z._-]+", "__", model_name.strip("/"))
+
+
+def read_export_meta(model_dir: Path) -> Optional[dict]:
+    """내보낸 모델의 export_meta.json (없거나 읽을 수 없으면 None)"""
+    meta_path = Path(model_dir) / ONNX_EXPORT_META
+    if not meta_path.exists():
+        return None
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _export_valid(meta: Optional[dict], model_name: str, quantize: bool) -> bool:
+    return meta is not None and meta.get("model_name") == model_name and (not quantize or meta.get("quantized"))
+
+
+def export_onnx_cross_encoder(
+    model_name: str,
+    output_dir: Optional[Path] = None,
+    quantize: bool = True,
+    opset_version: int = 17
+) -> Path:
+    """
+    CrossEncoder 모델을 ONNX로 내보내고, 필요하면 int8 동적 양자화 모델도 함께 저장합니다.
+    여러 워커가 동시에 내보내거나 세션을 열어도 안전하도록 publish_snapshot으로 새 버전에 쓴 뒤 링크를 교체하며,
+    다른 워커가 먼저 같은 모델을 내보냈으면 교체하지 않습니다.
+
+    Args:
+        model_name (str): Hugging Face 모델 이름 또는 로컬 경로
+        output_dir (Path, optional): 저장 경로 (기본값: onnx_model_dir(model_name))
+        quantize (bool): int8 동적 양자화 모델(model.int8.onnx) 생성 여부
+        opset_version (int): ONNX opset 버전
+
+    Returns:
+        Path: 저장 경로
+    """
+    output_dir = Path(output_dir) if output_dir else onnx_model_dir(model_name)
+    print(f"ONNX 리랭커 내보내기 시작: {model_name} -> {output_dir}")
+    published = publish_snapshot(
+        output_dir,
+        lambda directory: _write_onnx_export(directory, model_name, quantize, opset_version),
+        skip_if=lambda: _export_valid(read_export_meta(output_dir), model_name, quantize)
+    )
+    print(f"ONNX 리랭커 내보내기 완료: {output_dir} (양자화={quantize}{'' if published else ', 다른 프로세스가 먼저 저장'})")
+    return output_dir
+
+
+def _write_onnx_export(directory: Path, model_name: str, quantize: bool, opset_version: int) -> None:
+    """빈 디렉토리에 ONNX 모델 / 토크나이저 / 메타 파일을 씁니다."""
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name)
+    model.eval()
+
+    sample = tokenizer(["쿼리"], ["문서 본문"], padding=True, truncation=True, return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+
+    fp32_path = directory / "model.onnx"
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in input_names),
+            str(fp32_path),
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset_version,
+            do_constant_folding=True,
+            dynamo=False
+        )
+    tokenizer.save_pretrained(str(directory))
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(str(fp32_path), str(directory / "model.int8.onnx"), weight_type=QuantType.QInt8)
+
+    # 메타 파일은 마지막에 기록하여, 중간에 실패한 내보내기를 완료된 것으로 오인하지 않도록 함
+    meta = {
+        "model_name": model_name,
+        "num_labels": int(model.config.num_labels),
+        "input_names": input_names,
+        "opset_version": opset_version,
+        "quantized": quantize,
+    }
+    with open(directory / ONNX_EXPORT_META, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+
+
+class OnnxCrossEncoder:
+    """
+    ONNX Runtime으로 추론하는 CrossEncoder 대체 클래스.
+    predict()는 sentence_transformers.CrossEncoder.predict와 같은 점수(레이블 1개면 sigmoid)를 반환합니다.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        max_length: int = 512,
+        quantize: bool = RERANKER_ONNX_QUANTIZE,
+        intra_op_threads: int = RERANKER_ONNX_THREADS
+    ):
+        """
+        Args:
+            model_name (str): 리랭커 모델 이름 (내보낸 모델이 없으면 이 모델로 내보내기 수행)
+            max_length (int): 최대 입력 토큰 길이
+            quantize (bool): int8 양자화 모델 사용 여부
+            intra_op_threads (int): ONNX Runtime intra-op 스레드 수 (0이면 기본값)
+        """
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        self.model_name = model_name
+        self.max_length = max_length
+        # 링크를 한 번만 따라가 메타 / 모델 / 토크나이저를 같은 버전에서 읽음
+        self.model_dir = resolve_snapshot(onnx_model_dir(model_name))
+        meta = read_export_meta(self.model_dir)
+        if not _export_valid(meta, model_name, quantize):
+            self.model_dir = resolve_snapshot(export_onnx_cross_encoder(model_name, onnx_model_dir(model_name), quantize=quantize))
+            meta = read_export_meta(self.model_dir)
+            if not _export_valid(meta, model_name, quantize):
+                raise RuntimeError(f"내보낸 ONNX 리랭커를 찾을 수 없습니다: {self.model_dir}")
+
+        self.num_labels = meta["num_labels"]
+        self.input_names = meta["input_names"]
+        self.model_path = self.model_dir / ("model.int8.onnx" if quantize else "model.onnx")
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.inter_op_num_threads = 1
+        if intra_op_threads > 0:
+            options.intra_op_num_threads = intra_op_threads
+        self.session = ort.InferenceSession(
+            str(self.model_path), sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self.tokenizer = AutoTokenizer.from_pretrained(str(self.model_dir))
+        print(f"ONNX 리랭커 세션 생성 완료: {self.model_path.name}, intra-op 스레드={intra_op_threads or '기본값'}")
+
+    @property
+    def nbytes(self) -> int:
+        """로드한 ONNX 모델 파일 크기 (가중치 메모리 사용량 근사치)"""
+        return self.model_path.stat().st_size
+
+    def predict(self, pairs: List[List[str]], batch_size: int = 32, **kwargs) -> np.ndarray:
+        """
+        (쿼리, 문서) 쌍의 관련성 점수를 계산합니다.
+
+        Args:
+            pairs (List[List[str]]): [쿼리, 문서 본문] 쌍 리스트
+            batch_size (int): 세션 실행 1회당 쌍 수
+
+        Returns:
+            np.ndarray: 쌍 순서와 같은 순서의 점수
+        """
+        if not pairs:
+            return np.zeros(0, dtype=np.float32)
+        outputs = []
+        for start in range(0, len(pairs), batch_size):
+            batch = pairs[start:start + batch_size]
+            features = self.tokenizer(
+                [query for query, _ in batch],
+                [text for _, text in batch],
+                padding=True,
+                truncation=True,
+                max_length=self.max_length,
+                return_tensors="np"
+            )
+            feed = {name: features[name].astype(np.int64) for name in self.input_names}
+            outputs.append(self.session.run(["logits"], feed)[0])
+        logits = np.concatenate(outputs, axis=0)
+        if self.num_labels == 1:
+            return 1.0 / (1.0 + np.exp(-logits[:, 0]))
+        return logits
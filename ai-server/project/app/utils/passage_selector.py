@@ -0,0 +1,194 @@
+'''
+리랭킹 전 문서 구간(passage) 선택
+
+문서 page_content(마크다운) 전체를 max_length=512 모델에 넣으면 긴 문서는 뒷부분이 임의로 잘리고,
+짧은 문서도 가장 긴 문서 길이까지 패딩되어 연산이 낭비됩니다.
+토큰 예산(RERANK_PASSAGE_MAX_TOKENS) 안에서 제목 줄 + 쿼리와 가장 많이 겹치는 섹션(과 그 주변 섹션)만 골라
+리랭커 입력으로 사용합니다. 예산 안에 들어오는 문서는 원문 그대로 사용합니다.
+'''
+import copy
+import os
+import re
+from typing import List, Optional, Sequence, Tuple
+
+RERANK_PASSAGE_MAX_TOKENS = int(os.getenv("RERANK_PASSAGE_MAX_TOKENS", "256"))
+
+_HEADING = re.compile(r"^\s*#{1,6}\s")
+_BLANK_LINES = re.compile(r"\n\s*\n")
+
+
+def split_sections(text: str) -> List[str]:
+    """
+    문서를 섹션 단위로 나눕니다.
+    마크다운 제목(#)이 있으면 제목 기준으로, 없으면 빈 줄 기준으로, 그것도 없으면 줄 단위로 나눕니다.
+    """
+    lines = text.split("\n")
+    if any(_HEADING.match(line) for line in lines[1:]):
+        sections, current = [], []
+        for line in lines:
+            if _HEADING.match(line) and current:
+                sections.append("\n".join(current))
+                current = []
+            current.append(line)
+        sections.append("\n".join(current))
+    else:
+        sections = _BLANK_LINES.split(text)
+        if len(sections) == 1:
+            sections = lines
+    return [s.strip() for s in sections if s.strip()]
+
+
+def _char_bigrams(text: str) -> set:
+    """공백을 제외한 글자 2-gram 집합 (조사가 붙은 한국어 어절도 부분 일치하도록)"""
+    grams = set()
+    for token in text.lower().split():
+        if len(token) == 1:
+            grams.add(token)
+        grams.update(token[i:i + 2] for i in range(len(token) - 1))
+    return grams
+
+
+class PassageSelector:
+    """
+    쿼리별로 문서의 제목 + 가장 관련 있는 섹션 구간을 토큰 예산 안에서 선택합니다.
+    """
+
+    def __init__(self, tokenizer=None, max_tokens: int = RERANK_PASSAGE_MAX_TOKENS):
+        """
+        Args:
+            tokenizer: 리랭커 모델의 Hugging Face 토크나이저 (없으면 글자 수로 토큰 수를 근사)
+            max_tokens (int): 문서 구간 최대 토큰 수 (0 이하이면 선택하지 않고 원문 사용)
+        """
+        self.tokenizer = tokenizer
+        self.max_tokens = max_tokens
+
+    def count_tokens(self, texts: Sequence[str]) -> List[int]:
+        """텍스트별 토큰 수 (특수 토큰 제외)"""
+        if not texts:
+            return []
+        if self.tokenizer is None:
+            return [len(text) for text in texts]
+        return [len(ids) for ids in self.tokenizer(list(texts), add_special_tokens=False)["input_ids"]]
+
+    def select(self, query: str, text: str) -> str:
+        """
+        문서에서 쿼리와 가장 관련 있는 구간을 선택합니다.
+
+        Args:
+            query (str): 사용자 쿼리
+            text (str): 문서 본문
+
+        Returns:
+            str: 제목 줄 + 선택된 섹션 구간 (예산 안에 들어오면 원문)
+        """
+        return self.select_with_tokens(query, text)[0]
+
+    def select_with_tokens(self, query: str, text: str) -> Tuple[str, int]:
+        """
+        select와 같되 선택 중에 센 구간 토큰 수도 함께 반환합니다.
+        섹션별 토큰 수의 합이므로 근사값이며, 리랭커 배치 실행기가 쌍을 다시 토큰화하지 않고 길이순 정렬에 사용합니다.
+
+        Args:
+            query (str): 사용자 쿼리
+            text (str): 문서 본문
+
+        Returns:
+            Tuple[str, int]: (선택된 구간, 구간 토큰 수)
+        """
+        if self.max_tokens <= 0:
+            return text, self.count_tokens([text])[0]
+        sections = split_sections(text)
+        if len(sections) <= 1:
+            num_tokens = self.count_tokens([text])[0]
+            return self._truncate(text, num_tokens, self.max_tokens), min(num_tokens, self.max_tokens)
+
+        token_counts = self.count_tokens(sections)
+        if sum(token_counts) <= self.max_tokens:
+            return text, sum(token_counts)
+
+        # 첫 섹션의 첫 줄을 제목으로 항상 포함
+        title, _, first_body = sections[0].partition("\n")
+        title_tokens = self.count_tokens([title])[0]
+        if first_body.strip():
+            sections[0] = first_body.strip()
+            token_counts[0] = self.count_tokens([sections[0]])[0]
+        else:
+            sections, token_counts = sections[1:], token_counts[1:]
+        budget = self.max_tokens - title_tokens
+        if budget <= 0 or not sections:
+            return self._truncate(title, title_tokens, self.max_tokens), min(title_tokens, self.max_tokens)
+
+        # 제목이 이미 담고 있지 않은 쿼리 글자 2-gram이 가장 많이 겹치는 섹션 (동점이면 앞쪽 섹션)
+        query_grams = _char_bigrams(query)
+        query_grams = (query_grams - _char_bigrams(title)) or query_grams
+        overlaps = [len(query_grams & _char_bigrams(section)) for section in sections]
+        best = max(range(len(sections)), key=lambda i: (overlaps[i], -i))
+
+        if token_counts[best] >= budget:
+            return title + "\n" + self._truncate(sections[best], token_counts[best], budget), self.max_tokens
+
+        # 최적 섹션에서 시작하여 예산이 허락하는 만큼 뒤/앞 섹션으로 구간 확장
+        start, end, used = best, best + 1, token_counts[best]
+        while True:
+            extended = False
+            if end < len(sections) and used + token_counts[end] <= budget:
+                used += token_counts[end]
+                end += 1
+                extended = True
+            if start > 0 and used + token_counts[start - 1] <= budget:
+                start -= 1
+                used += token_counts[start]
+                extended = True
+            if not extended:
+                break
+        return "\n".join([title] + sections[start:end]), title_tokens + used
+
+    def select_many(self, query: str, texts: Sequence[str]) -> List[str]:
+        """여러 문서에 대해 select를 수행합니다."""
+        return [self.select(query, text) for text in texts]
+
+    def select_pairs(self, query: str, texts: Sequence[str]) -> Tuple[List[List[str]], List[int]]:
+        """
+        여러 문서의 구간을 골라 리랭커 입력 (쿼리, 구간) 쌍과 쌍별 토큰 수(쿼리 + 구간)를 만듭니다.
+        리랭커 배치 실행기 워커 스레드에서 prepare 콜백으로 호출됩니다.
+
+        Args:
+            query (str): 사용자 쿼리
+            texts (Sequence[str]): 문서 본문 리스트
+
+        Returns:
+            Tuple[List[List[str]], List[int]]: ([쿼리, 구간] 쌍 리스트, 쌍별 토큰 수)
+        """
+        query_tokens = self.count_tokens([query])[0]
+        pairs, lengths = [], []
+        for text in texts:
+            passage, num_tokens = self.select_with_tokens(query, text)
+            pairs.append([query, passage])
+            lengths.append(query_tokens + num_tokens)
+        return pairs, lengths
+
+    @staticmethod
+    def _truncate(text: str, num_tokens: int, budget: int) -> str:
+        """토큰 수 비율만큼 글자 단위로 앞부분을 잘라냅니다."""
+        if num_tokens <= budget:
+            return text
+        return text[:max(1, len(text) * budget // num_tokens)]
+
+
+def create_passage_selector(model, max_tokens: int = RERANK_PASSAGE_MAX_TOKENS) -> Optional[PassageSelector]:
+    """
+    리랭커 모델의 토크나이저로 구간 선택기를 생성합니다. max_tokens가 0 이하이면 None을 반환합니다.
+    Rust 기반 fast 토크나이저는 스레드 간 공유가 안전하지 않으므로 토크나이저 복사본을 사용합니다.
+    (리랭커는 선택을 배치 실행기 워커 스레드에서 실행하지만, 평가 스크립트 등은 다른 스레드에서 직접 호출)
+
+    Args:
+        model: tokenizer 속성을 가진 리랭커 모델 (CrossEncoder 또는 OnnxCrossEncoder)
+        max_tokens (int): 문서 구간 최대 토큰 수
+
+    Returns:
+        Optional[PassageSelector]: 구간 선택기
+    """
+    if max_tokens <= 0:
+        return None
+    tokenizer = getattr(model, "tokenizer", None)
+    return PassageSelector(tokenizer=copy.deepcopy(tokenizer) if tokenizer is not None else None, max_tokens=max_tokens)
@@ -0,0 +1,222 @@
+'''
+요청 간 마이크로 배칭 리랭커 실행기
+
+동시에 들어온 여러 요청의 (쿼리, 문서) 쌍을 모아 CrossEncoder.predict 한 번으로 처리합니다.
+모델 추론은 모델별 전용 워커 스레드 하나에서만 실행되므로 이벤트 루프를 막지 않고,
+CPU 노드에서 작은 배치를 여러 번 돌리는 대신 큰 배치 한 번으로 처리량을 높입니다.
+
+- 배치는 쌍 수가 RERANK_MAX_BATCH_PAIRS에 도달하거나
+  첫 작업 이후 RERANK_MAX_WAIT_MS가 지나면 실행됩니다.
+- 배치 안의 쌍은 길이순으로 정렬한 뒤 비슷한 길이끼리 미니배치로 묶어 패딩 낭비를 줄입니다.
+- 작업에 prepare 콜백(리랭커의 문서 구간 선택)이 있으면 이벤트 루프가 아닌 워커 스레드에서 실행하고,
+  콜백이 돌려준 토큰 수를 길이순 정렬에 그대로 사용합니다 (쌍을 다시 토큰화하지 않음).
+- 각 요청은 자신의 쌍에 해당하는 점수만 돌려받습니다.
+'''
+import asyncio
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+RERANK_MAX_BATCH_PAIRS = int(os.getenv("RERANK_MAX_BATCH_PAIRS", "128"))
+RERANK_MAX_WAIT_MS = float(os.getenv("RERANK_MAX_WAIT_MS", "5"))
+RERANK_PREDICT_BATCH_SIZE = int(os.getenv("RERANK_PREDICT_BATCH_SIZE", "32"))
+
+
+# 워커 스레드에서 실행할 입력 준비 콜백: ([쿼리, 문서] 쌍 리스트, 쌍별 토큰 수)를 반환
+PreparePairs = Callable[[], Tuple[List[List[str]], Optional[List[int]]]]
+
+
+@dataclass
+class _RerankJob:
+    """한 요청의 (쿼리, 문서) 쌍과 결과를 받을 future"""
+    pairs: List[List[str]]
+    lengths: Optional[List[int]] = None
+    prepare: Optional[PreparePairs] = None
+    future: Future = field(default_factory=Future)
+
+
+class RerankBatcher:
+    """
+    CrossEncoder 모델 하나를 소유하는 마이크로 배칭 실행기.
+    submit()은 어느 스레드/이벤트 루프에서든 호출할 수 있으며, 추론은 전용 워커 스레드에서만 실행됩니다.
+    """
+
+    def __init__(
+        self,
+        model,
+        max_batch_pairs: int = RERANK_MAX_BATCH_PAIRS,
+        max_wait_ms: float = RERANK_MAX_WAIT_MS,
+        predict_batch_size: int = RERANK_PREDICT_BATCH_SIZE,
+        name: str = "reranker"
+    ):
+        """
+        Args:
+            model: predict(pairs, batch_size=...)를 제공하는 CrossEncoder 모델
+            max_batch_pairs (int): 한 번의 predict 호출에 모을 최대 쌍 수
+            max_wait_ms (float): 첫 작업 도착 후 다른 요청을 기다리는 최대 시간 (ms)
+            predict_batch_size (int): predict 내부 미니배치 크기
+            name (str): 워커 스레드 이름
+        """
+        self.model = model
+        self.max_batch_pairs = max_batch_pairs
+        self.max_wait = max_wait_ms / 1000
+        self.predict_batch_size = predict_batch_size
+        self._queue: "queue.Queue[Optional[_RerankJob]]" = queue.Queue()
+        self._closed = False
+
+        # 처리 통계
+        self.batches = 0
+        self.jobs = 0
+        self.pairs = 0
+        self.predict_seconds = 0.0
+
+        self._worker = threading.Thread(target=self._run, name=f"rerank-{name}", daemon=True)
+        self._worker.start()
+
+    def submit(self, pairs: List[List[str]], prepare: Optional[PreparePairs] = None) -> Future:
+        """
+        (쿼리, 문서) 쌍 리스트를 배치 큐에 넣고 점수 리스트를 돌려줄 future를 반환합니다.
+
+        Args:
+            pairs (List[List[str]]): [쿼리, 문서 본문] 쌍 리스트
+            prepare (PreparePairs, optional): 워커 스레드에서 추론 직전에 pairs를 대신할 쌍과 쌍별 토큰 수를 만드는 콜백
+                (같은 수의 쌍을 같은 순서로 반환해야 함)
+
+        Returns:
+            Future: 입력 순서와 같은 순서의 점수 리스트(List[float])로 완료되는 future
+        """
+        job = _RerankJob(pairs=pairs, prepare=prepare)
+        if not pairs:
+            job.future.set_result([])
+            return job.future
+        if self._closed:
+            job.future.set_exception(RuntimeError("리랭커 배치 실행기가 종료되었습니다."))
+            return job.future
+        self._queue.put(job)
+        return job.future
+
+    def predict(self, pairs: List[List[str]], prepare: Optional[PreparePairs] = None) -> List[float]:
+        """동기 호출용: 배치 큐를 거쳐 점수를 계산하고 완료될 때까지 기다립니다."""
+        return self.submit(pairs, prepare).result()
+
+    async def apredict(self, pairs: List[List[str]], prepare: Optional[PreparePairs] = None) -> List[float]:
+        """비동기 호출용: 이벤트 루프를 막지 않고 배치 처리 결과를 기다립니다."""
+        return await asyncio.wrap_future(self.submit(pairs, prepare))
+
+    def close(self) -> None:
+        """워커 스레드를 종료합니다. 이미 큐에 들어간 작업은 모두 처리한 뒤 종료합니다."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._worker.join(timeout=5)
+
+    def stats(self) -> dict:
+        """배치 처리 통계를 반환합니다."""
+        return {
+            "batches": self.batches,
+            "jobs": self.jobs,
+            "pairs": self.pairs,
+            "avg_pairs_per_batch": round(self.pairs / self.batches, 2) if self.batches else 0.0,
+            "predict_seconds": round(self.predict_seconds, 3),
+        }
+
+    def _collect_batch(self, first: _RerankJob) -> List[_RerankJob]:
+        """첫 작업 이후 최대 대기 시간 동안 최대 쌍 수까지 작업을 모읍니다."""
+        batch = [first]
+        num_pairs = len(first.pairs)
+        deadline = time.perf_counter() + self.max_wait
+        while num_pairs < self.max_batch_pairs:
+            remaining = deadline - time.perf_counter()
+            try:
+                job = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is None:
+                # 종료 신호는 현재 배치를 처리한 뒤 반영되도록 다시 넣어둠
+                self._queue.put(None)
+                break
+            batch.append(job)
+            num_pairs += len(job.pairs)
+        return batch
+
+    def _pair_lengths(self, pairs: List[List[str]]) -> np.ndarray:
+        """쌍별 입력 길이. 모델 토크나이저가 있으면 토큰 수, 없으면 글자 수를 사용합니다."""
+        tokenizer = getattr(self.model, "tokenizer", None)
+        if tokenizer is not None:
+            encoded = tokenizer(
+                [query for query, _ in pairs],
+                [text for _, text in pairs],
+                truncation=True,
+                max_length=getattr(self.model, "max_length", None) or 512
+            )
+            return np.fromiter((len(ids) for ids in encoded["input_ids"]), dtype=np.int64, count=len(pairs))
+        return np.fromiter((len(q) + len(t) for q, t in pairs), dtype=np.int64, count=len(pairs))
+
+    def _prepare(self, job: _RerankJob) -> bool:
+        """작업의 prepare 콜백을 실행해 쌍과 토큰 수를 채웁니다. 실패하면 future에 예외를 넣고 False를 반환합니다."""
+        if job.prepare is None:
+            return True
+        try:
+            pairs, lengths = job.prepare()
+            if len(pairs) != len(job.pairs) or (lengths is not None and len(lengths) != len(pairs)):
+                raise ValueError(f"prepare 결과 쌍 수가 다릅니다: {len(job.pairs)} → {len(pairs)}")
+        except Exception as e:
+            job.future.set_exception(e)
+            return False
+        job.pairs, job.lengths = pairs, lengths
+        return True
+
+    def _batch_lengths(self, batch: List[_RerankJob]) -> np.ndarray:
+        """배치 전체의 쌍별 길이. prepare가 센 토큰 수가 있는 작업은 그대로 쓰고, 나머지만 토큰화합니다."""
+        lengths = []
+        for job in batch:
+            lengths.append(np.asarray(job.lengths, dtype=np.int64) if job.lengths is not None else self._pair_lengths(job.pairs))
+        return np.concatenate(lengths)
+
+    def _predict_bucketed(self, pairs: List[List[str]], lengths: np.ndarray) -> np.ndarray:
+        """
+        쌍을 길이순으로 정렬해 predict_batch_size개씩 길이 버킷으로 추론한 뒤 원래 순서로 되돌립니다.
+        미니배치마다 가장 긴 쌍 길이까지만 패딩되므로 길이가 섞인 배치보다 연산량이 줄어듭니다.
+        """
+        order = np.argsort(lengths, kind="stable")
+        scores = np.empty(len(pairs), dtype=np.float32)
+        for start in range(0, len(order), self.predict_batch_size):
+            bucket = order[start:start + self.predict_batch_size]
+            scores[bucket] = self.model.predict([pairs[i] for i in bucket], batch_size=len(bucket))
+        return scores
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch = [job for job in self._collect_batch(first) if job.future.set_running_or_notify_cancel()]
+            batch = [job for job in batch if self._prepare(job)]
+            if not batch:
+                continue
+
+            pairs = [pair for job in batch for pair in job.pairs]
+            start = time.perf_counter()
+            try:
+                scores = self._predict_bucketed(pairs, self._batch_lengths(batch))
+            except Exception as e:
+                for job in batch:
+                    job.future.set_exception(e)
+                continue
+            self.predict_seconds += time.perf_counter() - start
+            self.batches += 1
+            self.jobs += len(batch)
+            self.pairs += len(pairs)
+
+            # 요청별로 자기 쌍의 점수만 돌려줌
+            offset = 0
+            for job in batch:
+                job.future.set_result([float(s) for s in scores[offset:offset + len(job.pairs)]])
+                offset += len(job.pairs)
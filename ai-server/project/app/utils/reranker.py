@@ -1,6 +1,22 @@
-from typing import List, Dict, Any
+import os
+from functools import partial
+from typing import List, Dict, Any, Optional, Tuple
 from langchain_core.documents import Document
-from sentence_transformers import CrossEncoder
+from .resource_registry import (
+    get_resource_registry,
+    get_shared_cross_encoder,
+    get_shared_onnx_cross_encoder,
+    get_shared_rerank_batcher,
+    get_shared_score_cache,
+)
+from .passage_selector import create_passage_selector
+from .rerank_batcher import PreparePairs
+from .score_cache import RERANK_CACHE_ENABLED, CacheKey, document_cache_id, query_fingerprint
+
+# 리랭커 추론 백엔드: "torch"(sentence_transformers CrossEncoder) 또는 "onnx"(ONNX Runtime int8)
+RERANKER_BACKEND = os.getenv("RERANKER_BACKEND", "torch").lower()
+# 리랭커 모델 이름 또는 로컬 경로 (오프라인 환경에서는 미리 받아 둔 모델 디렉토리)
+RERANKER_MODEL = os.getenv("RERANKER_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
 
 
 class KoreanReranker:
@@ -9,16 +25,30 @@ class KoreanReranker:
     Jina AI의 다국어 Reranker 모델을 사용하여 검색 결과를 재정렬합니다.
     """
     
-    def __init__(self, model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2", top_k: int = 5):
+    def __init__(
+        self,
+        model_name: str = RERANKER_MODEL,
+        top_k: int = 5,
+        backend: str = RERANKER_BACKEND
+    ):
         """
         리랭커 초기화
 
         Args:
             model_name (str): 사용할 리랭커 모델 이름
             top_k (int): 리랭킹 후 반환할 문서 수
+            backend (str): 추론 백엔드 ("torch" 또는 "onnx", 기본값은 RERANKER_BACKEND 환경 변수)
         """
         self.model_loaded = False
+        self.model_name = None
+        self.model_key = None
+        self.backend = backend
+        self.batcher = None
+        self.score_cache = None
+        self.passage_selector = None
         self.top_k = top_k
+        # 레지스트리에서 획득한 공유 리소스 목록 (close 시 참조 해제)
+        self._shared_resources = []
         
         # 모델 로드 시도 순서 (실패 시 다음 모델로 시도)
         models_to_try = [
@@ -30,7 +60,20 @@ class KoreanReranker:
         for model_id in models_to_try:
             try:
                 print(f"리랭커 모델 로드 시도: {model_id}")
-                self.model = CrossEncoder(model_id, max_length=512)
+                self.model = self._load_model(model_id)
+                # 문서마다 제목 + 쿼리와 가장 관련 있는 섹션만 토큰 예산 안에서 골라 리랭커에 입력
+                self.passage_selector = create_passage_selector(self.model)
+                # 백엔드마다 점수가 조금씩 다르므로 배치 실행기와 점수 캐시는 (모델, 백엔드)별로 분리
+                model_key = f"{model_id}@{self.backend}"
+                # 동시 요청의 쌍을 모아 한 번에 추론하는 모델별 공유 배치 실행기
+                self.batcher = get_shared_rerank_batcher(model_key, self.model)
+                self._shared_resources.append(("rerank_batcher", model_key))
+                # (쿼리 해시, 문서 ID)별 점수 캐시: 처음 보는 쌍만 모델로 보냄
+                if RERANK_CACHE_ENABLED:
+                    self.score_cache = get_shared_score_cache(model_key)
+                    self._shared_resources.append(("rerank_score_cache", model_key))
+                self.model_name = model_id
+                self.model_key = model_key
                 self.model_loaded = True
                 print(f"리랭커 모델 로드 성공: {model_id}")
                 break  # 성공하면 루프 종료
@@ -41,6 +84,31 @@ class KoreanReranker:
         if not self.model_loaded:
             print("모든 리랭커 모델 로드 실패. 기본 정렬 사용")
     
+    def _load_model(self, model_id: str):
+        """
+        설정된 백엔드로 공유 리랭커 모델을 로드합니다.
+        ONNX 백엔드를 사용할 수 없으면(패키지 없음, 내보내기 실패) PyTorch 백엔드로 대체합니다.
+        """
+        if self.backend == "onnx":
+            try:
+                model = get_shared_onnx_cross_encoder(model_id, max_length=512)
+                self._shared_resources.append(("cross_encoder_onnx", model_id))
+                return model
+            except Exception as e:
+                print(f"ONNX 리랭커 백엔드 로드 실패, PyTorch 백엔드로 대체: {e}")
+                self.backend = "torch"
+        # 같은 모델은 프로세스 내에서 한 번만 로드하여 모든 서비스가 공유
+        model = get_shared_cross_encoder(model_id, max_length=512)
+        self._shared_resources.append(("cross_encoder", model_id))
+        return model
+
+    def close(self) -> None:
+        """레지스트리에서 획득한 모델, 배치 실행기, 점수 캐시의 참조를 해제합니다."""
+        registry = get_resource_registry()
+        for kind, name in self._shared_resources:
+            registry.release(kind, name)
+        self._shared_resources = []
+    
     def rerank(self, query: str, documents: List[Document]) -> List[Document]:
         """
         쿼리와 문서 리스트를 받아 관련성에 따라 문서를 재정렬합니다.
@@ -60,23 +128,100 @@ class KoreanReranker:
             return documents[:self.top_k]
         
         try:
-            # 쿼리와 문서 페어 생성
-            pairs = [[query, doc.page_content] for doc in documents]
-            
-            # 관련성 점수 계산
-            scores = self.model.predict(pairs)
-            
-            # 문서와 점수를 함께 정렬
-            scored_documents = list(zip(documents, scores))
-            ranked_documents = sorted(scored_documents, key=lambda x: x[1], reverse=True)
+            # 캐시에 없는 문서만 골라 (쿼리, 문서) 페어 생성
+            keys, scores, missing = self._lookup_cached_scores(query, documents)
+            pairs, prepare = self._build_pairs(query, documents, missing)
             
-            # 상위 k개 문서만 반환
-            result_documents = [doc for doc, _ in ranked_documents[:self.top_k]]
+            # 관련성 점수 계산 (배치 실행기 워커 스레드에서 문서 구간을 고른 뒤 다른 요청과 함께 추론)
+            if pairs:
+                self._fill_scores(keys, scores, missing, self.batcher.predict(pairs, prepare))
             
-            return result_documents
+            return self._rank(documents, scores)
         except Exception as e:
             print(f"리랭킹 과정 중 오류 발생: {e}")
             return documents[:self.top_k]  # 오류 시 기본 정렬 사용
+    
+    async def arerank(self, query: str, documents: List[Document]) -> List[Document]:
+        """
+        rerank의 비동기 버전. 이벤트 루프를 막지 않고 배치 실행기의 추론 결과를 기다립니다.
+        동시에 들어온 다른 요청의 쌍과 함께 한 번의 predict 호출로 처리됩니다.
+
+        Args:
+            query (str): 사용자 쿼리
+            documents (List[Document]): 재정렬할 문서 리스트
+
+        Returns:
+            List[Document]: 재정렬된 문서 리스트 (상위 top_k개)
+        """
+        if not documents:
+            return []
+        
+        # 모델 로드 실패 시 원본 문서 그대로 반환 (top_k 개수만큼)
+        if not self.model_loaded:
+            return documents[:self.top_k]
+        
+        try:
+            keys, scores, missing = self._lookup_cached_scores(query, documents)
+            pairs, prepare = self._build_pairs(query, documents, missing)
+            if pairs:
+                self._fill_scores(keys, scores, missing, await self.batcher.apredict(pairs, prepare))
+            return self._rank(documents, scores)
+        except Exception as e:
+            print(f"리랭킹 과정 중 오류 발생: {e}")
+            return documents[:self.top_k]  # 오류 시 기본 정렬 사용
+    
+    def _build_pairs(
+        self, query: str, documents: List[Document], indices: List[int]
+    ) -> Tuple[List[List[str]], Optional[PreparePairs]]:
+        """
+        지정한 문서들의 (쿼리, 본문) 쌍과 문서 구간 선택 콜백을 만듭니다.
+        구간 선택(토큰화)은 이벤트 루프를 막지 않도록 배치 실행기 워커 스레드에서 prepare 콜백으로 실행되며,
+        선택 중에 센 토큰 수가 길이순 정렬에 그대로 쓰입니다. 구간 선택기가 없으면 본문 전체를 사용합니다.
+        """
+        texts = [documents[i].page_content for i in indices]
+        pairs = [[query, text] for text in texts]
+        if self.passage_selector is None:
+            return pairs, None
+        return pairs, partial(self.passage_selector.select_pairs, query, texts)
+    
+    def _lookup_cached_scores(
+        self, query: str, documents: List[Document]
+    ) -> Tuple[List[CacheKey], List[Optional[float]], List[int]]:
+        """
+        점수 캐시를 조회합니다.
+
+        Returns:
+            Tuple: (문서별 캐시 키, 문서별 점수(미스는 None), 모델로 계산해야 할 문서 인덱스)
+        """
+        if self.score_cache is None:
+            return [], [None] * len(documents), list(range(len(documents)))
+        fingerprint = query_fingerprint(query)
+        keys = [(self.model_key, fingerprint, document_cache_id(doc)) for doc in documents]
+        scores = self.score_cache.get_many(keys)
+        missing = [i for i, score in enumerate(scores) if score is None]
+        return keys, scores, missing
+    
+    def _fill_scores(
+        self,
+        keys: List[CacheKey],
+        scores: List[Optional[float]],
+        missing: List[int],
+        new_scores: List[float]
+    ) -> None:
+        """모델이 계산한 점수를 결과 자리에 채우고 캐시에 저장합니다."""
+        for i, score in zip(missing, new_scores):
+            scores[i] = float(score)
+        if self.score_cache is not None:
+            self.score_cache.put_many([keys[i] for i in missing], new_scores)
+    
+    def _rank(self, documents: List[Document], scores: List[float]) -> List[Document]:
+        """점수 기준 내림차순으로 정렬한 상위 top_k개 문서를 반환합니다."""
+        # 문서와 점수를 함께 정렬
+        scored_documents = list(zip(documents, scores))
+        ranked_documents = sorted(scored_documents, key=lambda x: x[1], reverse=True)
+        
+        # 상위 k개 문서만 반환
+        return [doc for doc, _ in ranked_documents[:self.top_k]]
 
 
 def create_korean_reranker(top_k: int = 5) -> KoreanReranker:
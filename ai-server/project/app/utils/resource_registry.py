@@ -0,0 +1,444 @@
+'''
+프로세스 전역 검색 리소스 레지스트리
+
+여러 서비스(RestaurantService, RestaurantGraphRAGService, RestaurantChatbotService 등)가
+같은 벡터 DB, BM25 코퍼스, 리랭커 모델을 각자 로드하지 않도록
+리소스 종류/이름별로 한 번만 생성하고 공유 핸들을 나눠줍니다.
+
+공유 핸들은 읽기 전용으로 사용해야 합니다. (인덱스에 문서 추가, 모델 설정 변경 금지)
+'''
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+@dataclass
+class SharedResource:
+    """레지스트리에 등록된 공유 리소스 하나의 상태"""
+    kind: str
+    name: str
+    value: Any
+    size_bytes: int = 0
+    build_seconds: float = 0.0
+    ref_count: int = 0
+    created_at: float = field(default_factory=time.time)
+
+
+class ResourceRegistry:
+    """
+    (리소스 종류, 이름) 키로 무거운 객체를 한 번만 생성하여 공유하는 레지스트리.
+    같은 키에 대한 동시 생성 요청은 키별 잠금으로 직렬화되어 팩토리가 한 번만 실행됩니다.
+    """
+
+    def __init__(self):
+        self._resources: Dict[Tuple[str, str], SharedResource] = {}
+        self._lock = threading.Lock()
+        self._build_locks: Dict[Tuple[str, str], threading.Lock] = {}
+
+    def _get_build_lock(self, key: Tuple[str, str]) -> threading.Lock:
+        with self._lock:
+            if key not in self._build_locks:
+                self._build_locks[key] = threading.Lock()
+            return self._build_locks[key]
+
+    def acquire(
+        self,
+        kind: str,
+        name: str,
+        factory: Callable[[], Any],
+        size_fn: Optional[Callable[[Any], int]] = None
+    ) -> Any:
+        """
+        공유 리소스를 가져옵니다. 없으면 factory로 생성하여 등록합니다.
+
+        Args:
+            kind (str): 리소스 종류 (예: "vectordb", "bm25", "cross_encoder")
+            name (str): 리소스 이름 (예: 인덱스 이름, 모델 이름)
+            factory (Callable[[], Any]): 리소스 생성 함수
+            size_fn (Callable[[Any], int], optional): 리소스 메모리 사용량(바이트) 추정 함수
+
+        Returns:
+            Any: 공유 리소스 객체 (읽기 전용으로 사용)
+        """
+        key = (kind, name)
+        with self._get_build_lock(key):
+            with self._lock:
+                resource = self._resources.get(key)
+                if resource is not None:
+                    resource.ref_count += 1
+                    return resource.value
+
+            print(f"공유 리소스 생성 시작: kind={kind}, name={name}")
+            start = time.perf_counter()
+            value = factory()
+            build_seconds = time.perf_counter() - start
+
+            size_bytes = 0
+            try:
+                size_bytes = int(size_fn(value)) if size_fn else sys.getsizeof(value)
+            except Exception as e:
+                print(f"공유 리소스 메모리 추정 실패 ({kind}/{name}): {e}")
+
+            with self._lock:
+                self._resources[key] = SharedResource(
+                    kind=kind,
+                    name=name,
+                    value=value,
+                    size_bytes=size_bytes,
+                    build_seconds=build_seconds,
+                    ref_count=1
+                )
+            print(f"공유 리소스 생성 완료: kind={kind}, name={name}, {build_seconds:.2f}s, 약 {size_bytes / 1024 / 1024:.1f}MB")
+            return value
+
+    def release(self, kind: str, name: str) -> None:
+        """
+        공유 리소스의 참조 수를 하나 줄입니다.
+        참조 수가 0이 되어도 다음 요청에 재사용할 수 있도록 리소스는 유지됩니다.
+        """
+        with self._lock:
+            resource = self._resources.get((kind, name))
+            if resource is not None and resource.ref_count > 0:
+                resource.ref_count -= 1
+
+    def evict(self, kind: str, name: str) -> bool:
+        """참조 수가 0인 리소스를 레지스트리에서 제거합니다. 제거 여부를 반환합니다."""
+        with self._lock:
+            resource = self._resources.get((kind, name))
+            if resource is None or resource.ref_count > 0:
+                return False
+            del self._resources[(kind, name)]
+            return True
+
+    def evict_unused(self) -> List[Tuple[str, str]]:
+        """
+        참조 수가 0인 리소스를 모두 제거하고, close() 메서드가 있는 리소스(예: 리랭커 배치 실행기)는 닫습니다.
+        다음 acquire에서 다시 생성되므로 서비스를 요청마다 새로 만들던 방식의 비용을 재현하는 벤치마크에서 사용합니다.
+
+        Returns:
+            List[Tuple[str, str]]: 제거한 (리소스 종류, 이름) 목록
+        """
+        with self._lock:
+            unused = [key for key, resource in self._resources.items() if resource.ref_count == 0]
+            evicted = [self._resources.pop(key) for key in unused]
+        for resource in evicted:
+            if callable(getattr(resource.value, "close", None)):
+                resource.value.close()
+        return unused
+
+    def get(self, kind: str, name: str) -> Optional[Any]:
+        """참조 수를 변경하지 않고 등록된 리소스를 조회합니다."""
+        with self._lock:
+            resource = self._resources.get((kind, name))
+            return resource.value if resource else None
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """
+        등록된 리소스별 참조 수, 메모리 추정치, 생성 시간을 반환합니다.
+        리소스 객체가 stats() 메서드를 제공하면 그 결과를 "details"로 함께 반환합니다.
+        """
+        with self._lock:
+            resources = list(self._resources.values())
+        results = []
+        for r in resources:
+            item = {
+                "kind": r.kind,
+                "name": r.name,
+                "ref_count": r.ref_count,
+                "size_bytes": r.size_bytes,
+                "size_mb": round(r.size_bytes / 1024 / 1024, 2),
+                "build_seconds": round(r.build_seconds, 3),
+                "created_at": r.created_at,
+            }
+            if callable(getattr(r.value, "stats", None)):
+                item["details"] = r.value.stats()
+            results.append(item)
+        return results
+
+
+_registry = ResourceRegistry()
+
+
+def get_resource_registry() -> ResourceRegistry:
+    """프로세스 전역 리소스 레지스트리를 반환합니다."""
+    return _registry
+
+
+# --- 리소스별 메모리 추정 함수 ---
+
+def estimate_vectorstore_size(vectorstore) -> int:
+    """FAISS 인덱스 벡터와 docstore 문서 텍스트의 대략적인 메모리 사용량"""
+    size = 0
+    index = getattr(vectorstore, "index", None)
+    if index is not None:
+        code_size = getattr(index, "code_size", index.d * 4)
+        size += index.ntotal * code_size
+    docstore = getattr(vectorstore, "docstore", None)
+    if hasattr(docstore, "nbytes"):
+        # MmapDocstore: 매핑된 파일 크기 (워커 간 공유 페이지 캐시)
+        return size + docstore.nbytes
+    docs = getattr(docstore, "_dict", None)
+    if docs:
+        for doc in docs.values():
+            size += len(doc.page_content.encode("utf-8")) + sys.getsizeof(doc.metadata)
+    return size
+
+
+def estimate_bm25_size(keyword_index) -> int:
+    """BM25 가중치 행렬의 메모리 사용량 (문서는 docstore와 공유하므로 제외)"""
+    return keyword_index.nbytes
+
+
+def estimate_torch_model_size(cross_encoder) -> int:
+    """CrossEncoder 모델 파라미터의 메모리 사용량"""
+    model = getattr(cross_encoder, "model", None)
+    if model is None or not hasattr(model, "parameters"):
+        return 0
+    return sum(p.numel() * p.element_size() for p in model.parameters())
+
+
+# --- 리소스별 공유 핸들 생성 함수 ---
+
+def graph_resource_name(graph) -> str:
+    """그래프별 공유 리소스 이름 (CSR 그래프는 스냅샷 디렉토리, networkx 그래프는 객체 단위로 구분)"""
+    return str(getattr(graph, "directory", None) or f"networkx-{id(graph)}")
+
+
+def get_shared_vectordb(index_name: str):
+    """
+    벡터 DB를 한 번만 로드하여 공유합니다.
+
+    Args:
+        index_name (str): 벡터 DB 이름 (예: "restaurant_finder")
+
+    Returns:
+        FAISS: 공유 벡터스토어 객체
+    """
+    from .vectordb import load_vectordb
+
+    return _registry.acquire(
+        "vectordb",
+        index_name,
+        lambda: load_vectordb(index_name),
+        size_fn=estimate_vectorstore_size
+    )
+
+
+def get_shared_bm25(index_name: str, vectorstore):
+    """
+    BM25 키워드 검색 엔진을 인덱스별로 한 번만 생성하여 공유합니다.
+    저장된 스냅샷이 유효하면 메모리 매핑으로 로드하고, 아니면 docstore 전체로 생성합니다.
+
+    Args:
+        index_name (str): 벡터 DB 이름
+        vectorstore (FAISS): 키워드 인덱스 문서와 순서를 맞출 벡터스토어 객체
+
+    Returns:
+        SparseBM25: 공유 BM25 엔진
+    """
+    from .vectordb import load_keyword_index
+
+    return _registry.acquire(
+        "bm25",
+        index_name,
+        lambda: load_keyword_index(index_name, vectorstore),
+        size_fn=estimate_bm25_size
+    )
+
+
+def get_shared_metadata_filter(index_name: str, vectorstore):
+    """
+    지식 그래프 기반 메타데이터 필터 비트맵을 인덱스별로 한 번만 생성하여 공유합니다.
+
+    Args:
+        index_name (str): 벡터 DB 이름
+        vectorstore (FAISS): 비트맵 위치와 순서를 맞출 벡터스토어 객체
+
+    Returns:
+        MetadataFilterIndex: 공유 필터 인덱스 (지식 그래프가 없으면 None)
+    """
+    from .knowledge_graph_loader import get_knowledge_graph
+    from .metadata_filter import load_metadata_filter
+
+    return _registry.acquire(
+        "metadata_filter",
+        index_name,
+        lambda: load_metadata_filter(vectorstore, get_knowledge_graph()),
+        size_fn=lambda filter_index: filter_index.nbytes if filter_index is not None else 0
+    )
+
+
+def get_shared_graph_retriever(index_name: str, vectorstore):
+    """
+    지식 그래프 다중 홉 검색기를 인덱스별로 한 번만 생성하여 공유합니다.
+    (시드 집합별 탐색 결과 캐시도 인덱스를 쓰는 모든 서비스가 공유)
+
+    Args:
+        index_name (str): 벡터 DB 이름
+        vectorstore (FAISS): 문서 위치와 순서를 맞출 벡터스토어 객체
+
+    Returns:
+        GraphRetriever: 공유 그래프 검색기 (GRAPH_RETRIEVAL_ENABLED가 꺼져 있거나 지식 그래프가 없으면 None)
+    """
+    from .graph_retrieval import load_graph_retriever
+    from .knowledge_graph_loader import get_knowledge_graph
+
+    return _registry.acquire(
+        "graph_retrieval",
+        index_name,
+        lambda: load_graph_retriever(vectorstore, get_knowledge_graph()),
+        size_fn=lambda retriever: retriever.nbytes if retriever is not None else 0
+    )
+
+
+def get_shared_graph_snippets(graph, render, render_settings=None):
+    """
+    지식 그래프 엔티티별 컨텍스트 스니펫을 그래프별로 한 번만 만들어 공유합니다.
+    (CSR 그래프는 스냅샷 디렉토리, networkx 그래프는 객체 단위로 구분)
+
+    Args:
+        graph (nx.DiGraph | CompactKnowledgeGraph): 지식 그래프
+        render (Callable[[str], Optional[EntitySnippet]]): 노드 ID → 엔티티 컨텍스트 함수
+        render_settings (dict, optional): render 결과를 바꾸는 설정 (바뀌면 저장된 스니펫을 다시 렌더링)
+
+    Returns:
+        GraphSnippets: 공유 스니펫 조회 객체 (그래프가 없으면 None)
+    """
+    from .graph_snippets import load_graph_snippets
+
+    return _registry.acquire(
+        "graph_snippets",
+        graph_resource_name(graph),
+        lambda: load_graph_snippets(graph, render, render_settings),
+        size_fn=lambda snippets: snippets.nbytes if snippets is not None else 0
+    )
+
+
+def get_shared_geo_index(graph):
+    """
+    지식 그래프 관광지 / 식당 좌표의 공간 색인(반경 / k-최근접 조회)을 그래프별로 한 번만 만들어 공유합니다.
+    (CSR 그래프는 스냅샷 디렉토리, networkx 그래프는 객체 단위로 구분)
+
+    Args:
+        graph (nx.DiGraph | CompactKnowledgeGraph): 지식 그래프
+
+    Returns:
+        GeoIndex: 공유 공간 색인 (그래프가 없거나 좌표가 있는 노드가 없으면 None)
+    """
+    from .geo_index import load_geo_index
+
+    return _registry.acquire(
+        "geo_index",
+        graph_resource_name(graph),
+        lambda: load_geo_index(graph),
+        size_fn=lambda index: index.nbytes if index is not None else 0
+    )
+
+
+def get_shared_cross_encoder(model_name: str, max_length: int = 512):
+    """
+    CrossEncoder 리랭커 모델을 모델 이름별로 한 번만 로드하여 공유합니다.
+
+    Args:
+        model_name (str): 리랭커 모델 이름
+        max_length (int): 최대 입력 토큰 길이
+
+    Returns:
+        CrossEncoder: 공유 CrossEncoder 모델
+    """
+    from sentence_transformers import CrossEncoder
+
+    return _registry.acquire(
+        "cross_encoder",
+        model_name,
+        lambda: CrossEncoder(model_name, max_length=max_length),
+        size_fn=estimate_torch_model_size
+    )
+
+
+def get_shared_onnx_cross_encoder(model_name: str, max_length: int = 512):
+    """
+    ONNX Runtime(int8 양자화) 리랭커 모델을 모델 이름별로 한 번만 로드하여 공유합니다.
+    내보낸 ONNX 모델이 없으면 처음 로드할 때 내보내기를 수행합니다.
+
+    Args:
+        model_name (str): 리랭커 모델 이름
+        max_length (int): 최대 입력 토큰 길이
+
+    Returns:
+        OnnxCrossEncoder: 공유 ONNX 리랭커 모델
+    """
+    from .onnx_reranker import OnnxCrossEncoder
+
+    return _registry.acquire(
+        "cross_encoder_onnx",
+        model_name,
+        lambda: OnnxCrossEncoder(model_name, max_length=max_length),
+        size_fn=lambda model: model.nbytes
+    )
+
+
+def get_shared_rerank_batcher(model_name: str, model):
+    """
+    리랭커 모델별 마이크로 배칭 실행기를 한 번만 생성하여 공유합니다.
+    같은 모델을 쓰는 모든 서비스의 요청이 하나의 배치 큐로 모입니다.
+
+    Args:
+        model_name (str): 리랭커 모델 이름
+        model: 공유 CrossEncoder 모델 (get_shared_cross_encoder 결과)
+
+    Returns:
+        RerankBatcher: 공유 배치 실행기
+    """
+    from .rerank_batcher import RerankBatcher
+
+    return _registry.acquire(
+        "rerank_batcher",
+        model_name,
+        lambda: RerankBatcher(model, name=model_name.split("/")[-1]),
+        size_fn=lambda _: 0  # 모델 메모리는 cross_encoder 항목에서 집계
+    )
+
+
+def get_shared_score_cache(model_name: str):
+    """
+    리랭커 모델별 점수 캐시를 한 번만 생성하여 공유합니다.
+
+    Args:
+        model_name (str): 리랭커 모델 이름 (점수는 모델마다 다르므로 모델별로 분리)
+
+    Returns:
+        ScoreCache: 공유 점수 캐시
+    """
+    from .score_cache import ScoreCache
+
+    return _registry.acquire(
+        "rerank_score_cache",
+        model_name,
+        ScoreCache,
+        size_fn=lambda _: 0  # 캐시는 점점 커지므로 사용량은 details.size_mb로 확인
+    )
+
+
+def get_shared_cached_embeddings(embeddings):
+    """
+    임베딩 모델별 쿼리 임베딩 캐시를 한 번만 생성하여 공유합니다.
+    같은 모델을 쓰는 벡터 DB(예: restaurant_finder, attraction_finder)는 하나의 캐시를 함께 사용합니다.
+
+    Args:
+        embeddings (Embeddings): 캐시로 감쌀 임베딩 객체 (처음 생성될 때만 사용)
+
+    Returns:
+        CachedEmbeddings: 공유 캐시 임베딩 객체
+    """
+    from .embedding_cache import CachedEmbeddings, embedding_model_name
+
+    model_name = embedding_model_name(embeddings)
+    return _registry.acquire(
+        "embedding_cache",
+        model_name,
+        lambda: CachedEmbeddings(embeddings, model_name=model_name),
+        size_fn=lambda _: 0  # 캐시는 점점 커지므로 사용량은 details로 확인
+    )
@@ -0,0 +1,172 @@
+'''
+리랭커(CrossEncoder) 점수 캐시
+
+여행 계획 요청(RestaurantSearchRequest.create_query / AttractionSearchRequest.create_query)은
+같은 지역, 같은 선호 조건으로 반복되는 경우가 많으므로, (모델, 정규화된 쿼리 해시, 문서 ID) 키로
+CrossEncoder 점수를 캐시하여 처음 보는 쌍만 모델에 보냅니다.
+
+- LRU 순서로 최대 항목 수(RERANK_CACHE_MAX_ENTRIES)와 추정 메모리(RERANK_CACHE_MAX_MB)를 넘지 않게 유지
+- 항목별 TTL(RERANK_CACHE_TTL_SECONDS)이 지나면 만료
+- 히트/미스/만료/제거 횟수를 stats()로 제공 (/resources 엔드포인트에 노출)
+'''
+import hashlib
+import os
+import re
+import sys
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple
+
+from langchain_core.documents import Document
+
+RERANK_CACHE_ENABLED = os.getenv("RERANK_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+RERANK_CACHE_MAX_ENTRIES = int(os.getenv("RERANK_CACHE_MAX_ENTRIES", "200000"))
+RERANK_CACHE_MAX_MB = float(os.getenv("RERANK_CACHE_MAX_MB", "64"))
+RERANK_CACHE_TTL_SECONDS = float(os.getenv("RERANK_CACHE_TTL_SECONDS", "3600"))
+
+# 항목 하나당 OrderedDict 노드, 키 튜플, float, 만료 시각에 드는 대략적인 고정 비용 (바이트)
+_ENTRY_OVERHEAD_BYTES = 240
+
+CacheKey = Tuple[str, str, str]
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def query_fingerprint(query: str) -> str:
+    """유니코드 정규화(NFKC), 소문자화, 공백 정리 후의 쿼리 SHA-1 해시"""
+    normalized = _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", query)).strip().lower()
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def document_cache_id(doc: Document) -> str:
+    """
+    문서의 안정적인 캐시 ID.
+    RSTR_ID(음식점) / content_id, UC_SEQ(관광지)를 우선 사용하고, 없으면 본문 해시를 사용합니다.
+    정수 문서 ID(metadata["doc_id"], 벡터 위치)는 인덱스마다 따로 매겨지고 재생성하면 바뀌므로,
+    여러 인덱스가 모델별로 공유하는 이 캐시의 키로는 원본 ID를 사용합니다.
+    """
+    metadata = doc.metadata or {}
+    for key in ("RSTR_ID", "content_id", "UC_SEQ"):
+        value = metadata.get(key)
+        if value is not None:
+            return f"{key}:{value}"
+    return "sha1:" + hashlib.sha1(doc.page_content.encode("utf-8")).hexdigest()
+
+
+class ScoreCache:
+    """
+    스레드 안전한 LRU + TTL 점수 캐시.
+    값은 (점수, 만료 시각) 튜플이며, 조회 시 만료된 항목은 미스로 처리하고 제거합니다.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = RERANK_CACHE_MAX_ENTRIES,
+        max_mb: float = RERANK_CACHE_MAX_MB,
+        ttl_seconds: float = RERANK_CACHE_TTL_SECONDS
+    ):
+        """
+        Args:
+            max_entries (int): 최대 항목 수
+            max_mb (float): 추정 메모리 상한 (MB)
+            ttl_seconds (float): 항목 유효 시간 (초, 0 이하이면 만료 없음)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.ttl = ttl_seconds
+        self._entries: "OrderedDict[CacheKey, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _entry_size(key: CacheKey) -> int:
+        return _ENTRY_OVERHEAD_BYTES + sum(sys.getsizeof(part) for part in key[1:])
+
+    def _remove(self, key: CacheKey) -> None:
+        del self._entries[key]
+        self.nbytes -= self._entry_size(key)
+
+    def get_many(self, keys: Sequence[CacheKey]) -> List[Optional[float]]:
+        """
+        여러 키의 점수를 조회합니다. 없거나 만료된 키는 None을 반환합니다.
+
+        Args:
+            keys (Sequence[CacheKey]): (모델 이름, 쿼리 해시, 문서 ID) 키 리스트
+
+        Returns:
+            List[Optional[float]]: 키 순서와 같은 순서의 점수 (미스는 None)
+        """
+        now = time.monotonic()
+        results: List[Optional[float]] = []
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    self.misses += 1
+                    results.append(None)
+                    continue
+                score, expires_at = entry
+                if expires_at and expires_at < now:
+                    self._remove(key)
+                    self.expired += 1
+                    self.misses += 1
+                    results.append(None)
+                    continue
+                self._entries.move_to_end(key)
+                self.hits += 1
+                results.append(score)
+        return results
+
+    def put_many(self, keys: Sequence[CacheKey], scores: Sequence[float]) -> None:
+        """
+        여러 키의 점수를 저장하고, 상한을 넘으면 가장 오래 사용되지 않은 항목부터 제거합니다.
+
+        Args:
+            keys (Sequence[CacheKey]): 키 리스트
+            scores (Sequence[float]): 키 순서와 같은 순서의 점수
+        """
+        expires_at = time.monotonic() + self.ttl if self.ttl > 0 else 0.0
+        with self._lock:
+            for key, score in zip(keys, scores):
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                else:
+                    self.nbytes += self._entry_size(key)
+                self._entries[key] = (float(score), expires_at)
+
+            while self._entries and (len(self._entries) > self.max_entries or self.nbytes > self.max_bytes):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """모든 항목을 제거합니다. (통계는 유지)"""
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        """히트율, 항목 수, 추정 메모리 사용량 등 캐시 통계를 반환합니다."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "size_mb": round(self.nbytes / 1024 / 1024, 2),
+            "max_entries": self.max_entries,
+            "max_mb": round(self.max_bytes / 1024 / 1024, 2),
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "expired": self.expired,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,123 @@
+'''
+스냅샷 디렉토리 원자적 교체 (여러 워커 / 전처리 스크립트가 같은 스냅샷을 동시에 쓰고 읽어도 안전)
+
+<name> 은 버전 디렉토리(<name>.v<시각>-<pid>)를 가리키는 상대 경로 심볼릭 링크입니다.
+- 쓰는 쪽 : publish_snapshot()이 <name>.tmp-<pid> 에 파일을 모두 쓰고 버전 디렉토리로 이름을 바꾼 뒤,
+            새 링크를 만들어 os.replace로 <name>을 한 번에 바꿉니다. <name>이 사라지는 순간이 없습니다.
+- 읽는 쪽 : resolve_snapshot()으로 링크를 한 번만 따라가 같은 버전 디렉토리에서 meta.json과 배열을 함께 엽니다.
+            (meta.json은 이전 버전, 배열은 새 버전에서 읽는 일이 없음)
+이전 버전은 막 링크를 따라간 워커가 파일을 열 수 있도록 교체된 뒤 SNAPSHOT_GRACE_SECONDS가 지나야 다음 교체 때 지웁니다.
+이미 mmap으로 연 파일은 디렉토리가 지워져도 프로세스가 닫을 때까지 유효합니다.
+링크가 아닌 실제 디렉토리(이전 형식, 또는 링크를 따라가 복사한 배포본)도 그대로 읽을 수 있고, 다음 교체 때 버전 디렉토리로 옮깁니다.
+'''
+import glob
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+# 이전 버전 디렉토리를 교체된 뒤 남겨 둘 시간(초)
+SNAPSHOT_GRACE_SECONDS = float(os.getenv("SNAPSHOT_GRACE_SECONDS", "60"))
+
+
+def resolve_snapshot(directory: Path) -> Path:
+    '''
+    스냅샷 링크를 따라간 버전 디렉토리를 반환합니다. 한 번의 로드에서 읽는 파일은 모두 이 경로 아래에서 엽니다.
+
+    Args:
+        directory (Path): 스냅샷 경로 (링크 또는 실제 디렉토리)
+
+    Returns:
+        Path: 버전 디렉토리 (링크가 아니면 directory 그대로의 절대 경로)
+    '''
+    return Path(os.path.realpath(directory))
+
+
+def publish_snapshot(
+    directory: Path,
+    write: Callable[[Path], Any],
+    skip_if: Optional[Callable[[], bool]] = None
+) -> bool:
+    '''
+    write(임시 디렉토리)로 스냅샷 파일을 모두 쓴 뒤 directory 링크를 새 버전으로 원자적으로 교체합니다.
+    쓰기나 교체에 실패하면 임시 / 버전 디렉토리를 지우고 예외를 그대로 전달합니다 (기존 스냅샷은 그대로).
+
+    Args:
+        directory (Path): 스냅샷 경로 (예: vectordb/<name>/keyword_index)
+        write (Callable[[Path], Any]): 주어진 빈 디렉토리에 스냅샷 파일을 쓰는 함수
+        skip_if (Callable[[], bool], optional): 쓰기를 마친 뒤 True이면 교체하지 않음 (다른 워커가 먼저 같은 스냅샷을 만든 경우)
+
+    Returns:
+        bool: 새 버전으로 교체했으면 True, skip_if로 건너뛰었으면 False
+    '''
+    directory = Path(directory)
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    pid = os.getpid()
+    tmp_dir = directory.with_name(f"{directory.name}.tmp-{pid}")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir()
+    try:
+        write(tmp_dir)
+        if skip_if is not None and skip_if():
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return False
+        # 버전 디렉토리 이름은 교체 직전에 정하므로 이름 순서 = 교체 순서 (쓰는 중인 디렉토리는 .tmp-<pid>)
+        version_dir = directory.with_name(f"{directory.name}.v{time.time_ns():020d}-{pid}")
+        os.rename(tmp_dir, version_dir)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    link = directory.with_name(f"{directory.name}.link-{pid}")
+    try:
+        if os.path.lexists(link):
+            os.unlink(link)
+        # 상대 경로 링크: 디렉토리를 통째로 복사하거나 다른 경로로 마운트해도 유효
+        os.symlink(version_dir.name, link, target_is_directory=True)
+        if directory.is_dir() and not directory.is_symlink():
+            _retire_directory(directory)
+        os.replace(link, directory)
+    except BaseException:
+        if os.path.lexists(link):
+            os.unlink(link)
+        shutil.rmtree(version_dir, ignore_errors=True)
+        raise
+    _prune_versions(directory)
+    return True
+
+
+def _retire_directory(directory: Path) -> None:
+    '''링크로 바꾸기 전에 실제 디렉토리(이전 형식)를 가장 오래된 버전 이름으로 옮깁니다.'''
+    try:
+        os.rename(directory, directory.with_name(f"{directory.name}.v{0:020d}-{os.getpid()}"))
+    except FileNotFoundError:
+        # 다른 워커가 먼저 옮긴 경우
+        pass
+
+
+def _prune_versions(directory: Path) -> None:
+    '''현재 버전보다 오래된 버전 중 교체된 지 SNAPSHOT_GRACE_SECONDS가 지난 디렉토리를 지웁니다.'''
+    try:
+        current = os.readlink(directory)
+    except OSError:
+        return
+    # 현재 버전보다 새 이름은 다른 워커가 막 교체하려는 버전이므로 건드리지 않음
+    names = sorted(
+        path.name for path in directory.parent.glob(f"{glob.escape(directory.name)}.v*")
+        if path.name < current
+    ) + [current]
+    deadline = time.time_ns() - int(SNAPSHOT_GRACE_SECONDS * 1e9)
+    for name, successor in zip(names, names[1:]):
+        # 버전이 교체된 시각 = 다음 버전 이름의 시각
+        replaced_at = _version_time(directory, successor)
+        if replaced_at is not None and replaced_at < deadline:
+            shutil.rmtree(directory.with_name(name), ignore_errors=True)
+
+
+def _version_time(directory: Path, name: str) -> Optional[int]:
+    '''버전 디렉토리 이름(<name>.v<시각>-<pid>)의 시각(ns)'''
+    try:
+        return int(name[len(directory.name) + 2:].split("-", 1)[0])
+    except ValueError:
+        return None
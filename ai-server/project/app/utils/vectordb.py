@@ -1,11 +1,61 @@
+import hashlib
+import os
 from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+import faiss
 from langchain_community.vectorstores import FAISS
-from langchain_openai import OpenAIEmbeddings
+from langchain_core.documents import Document
+from .bm25 import SparseBM25, read_snapshot_meta
+from .docstore import DOC_ID_KEY, DOCSTORE_DIRNAME, DOCSTORE_FORMAT_VERSION, DocumentSequence, MmapDocstore, PositionIds, read_docstore_meta, write_docstore
+from .embedding_cache import EMBEDDING_CACHE_ENABLED
+from .embeddings import read_index_meta, resolve_index_embeddings, validate_index_dimension
+from .resource_registry import get_shared_cached_embeddings
+from .snapshot import publish_snapshot, resolve_snapshot
+
+# 벡터 DB 저장 경로 (ai-server/project/vectordb)
+VECTORDB_ROOT = Path(__file__).parent.parent.parent / "vectordb"
+# 키워드 인덱스 스냅샷 디렉토리 이름 (vectordb/<name>/keyword_index)
+KEYWORD_INDEX_DIRNAME = "keyword_index"
+
+# 근사 인덱스 검색 파라미터 (0이면 index_meta.json에 기록된 기본값 사용)
+# nprobe: IVF에서 탐색할 클러스터 수, efSearch: HNSW 탐색 후보 리스트 크기. 클수록 recall↑ 지연 시간↑
+FAISS_NPROBE = int(os.getenv("FAISS_NPROBE", "0"))
+FAISS_EF_SEARCH = int(os.getenv("FAISS_EF_SEARCH", "0"))
+
+# FAISS 인덱스와 docstore를 읽기 전용 mmap으로 로드 (여러 uvicorn 워커가 페이지 캐시 한 벌을 공유)
+VECTORDB_MMAP = os.getenv("VECTORDB_MMAP", "true").lower() in ("1", "true", "yes")
+# IO_FLAG_MMAP_IFC: 평면/HNSW 벡터 저장소까지 복사 없이 매핑 (구버전 faiss는 IVF 리스트만 매핑)
+FAISS_MMAP_FLAGS = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+
+
+def resolve_vectordb_path(index_name: str) -> Path:
+    """
+    벡터 DB 디렉토리 경로를 반환합니다. 없으면 dummy_finder로 대체합니다.
+
+    Args:
+        index_name (str): 벡터 DB 이름 (예: "restaurant_finder")
+
+    Returns:
+        Path: 벡터 DB 디렉토리 경로
+    """
+    vectordb_path = VECTORDB_ROOT / index_name
+
+    if not vectordb_path.exists():
+        index_name = "dummy_finder"
+        vectordb_path = VECTORDB_ROOT / index_name
+
+    if not vectordb_path.exists():
+        raise FileNotFoundError(f"Vector DB not found at {vectordb_path}")
+    return vectordb_path
 
 
 def load_vectordb(index_name: str):
     """
     저장된 벡터 DB를 로드합니다.
+    VECTORDB_MMAP이 켜져 있으면 인덱스와 docstore를 읽기 전용 mmap으로 열어 워커 간에 메모리를 공유합니다.
+    index_meta.json에 기록된 임베딩(openai / sentence-transformers / hashing)으로 쿼리를 임베딩하며,
+    EMBEDDING_PROVIDER 설정이나 벡터 차원이 인덱스와 다르면 EmbeddingMismatchError로 로드를 거부합니다.
+    쿼리 임베딩은 모델별 공유 캐시(CachedEmbeddings)를 거치므로 같은 쿼리는 임베딩을 다시 계산하지 않습니다.
 
     Args:
         index_name (str): 벡터 DB 이름 (예: "restaurant_finder")
@@ -14,22 +64,26 @@ def load_vectordb(index_name: str):
         FAISS: 로드된 벡터스토어 객체
     """
     try:
-        # 프로젝트 루트 디렉토리 찾기
-        project_root = Path(__file__).parent.parent.parent
-        vectordb_path = project_root / "vectordb" / index_name
-
-        if not vectordb_path.exists():
-            index_name = "dummy_finder"
-            vectordb_path = project_root / "vectordb" / index_name
-
-        if not vectordb_path.exists():
-            raise FileNotFoundError(f"Vector DB not found at {vectordb_path}")
-
-        vectorstore = FAISS.load_local(
-            str(vectordb_path),
-            embeddings=OpenAIEmbeddings(),
-            allow_dangerous_deserialization=True,  # 안전한 소스에서 로드하므로 허용
-        )
+        vectordb_path = resolve_vectordb_path(index_name)
+
+        index_meta = read_index_meta(vectordb_path)
+        embeddings, expected = resolve_index_embeddings(index_name, index_meta)
+        if EMBEDDING_CACHE_ENABLED:
+            embeddings = get_shared_cached_embeddings(embeddings)
+
+        if VECTORDB_MMAP:
+            vectorstore = load_mmap_vectorstore(vectordb_path, embeddings)
+        else:
+            vectorstore = FAISS.load_local(
+                str(vectordb_path),
+                embeddings=embeddings,
+                allow_dangerous_deserialization=True,  # 안전한 소스에서 로드하므로 허용
+            )
+            assign_document_ids(vectorstore)
+        validate_index_dimension(index_name, vectorstore, expected)
+        params = apply_search_params(vectorstore.index, (index_meta or {}).get("index"))
+        if params:
+            print(f"FAISS 검색 파라미터 적용: {index_name} {params}")
         return vectorstore
     except Exception as e:
         print("="*10)
@@ -37,3 +91,263 @@ def load_vectordb(index_name: str):
         print("="*10)
         
         raise Exception(f"벡터 DB 로드 중 오류 발생: {e}")
+
+
+def load_mmap_vectorstore(vectordb_path: Path, embeddings) -> FAISS:
+    """
+    FAISS 인덱스를 mmap 플래그로 읽고 MmapDocstore와 묶어 FAISS 벡터스토어를 만듭니다.
+    유효한 docstore 스냅샷이 있으면 index.pkl을 언피클하지 않으며, index.pkl이 없어도 로드할 수 있습니다.
+    스냅샷이 없거나 포맷/체크섬이 다르면 index.pkl로 한 번 생성한 뒤 사용합니다.
+    (검색 결과는 FAISS.load_local과 같지만, 문서 id는 uuid 대신 벡터 위치 문자열입니다.)
+
+    Args:
+        vectordb_path (Path): 벡터 DB 디렉토리 경로
+        embeddings (Embeddings): 쿼리 임베딩 객체
+
+    Returns:
+        FAISS: 읽기 전용 벡터스토어 (문서 추가/삭제 불가)
+    """
+    docstore_dir = vectordb_path / DOCSTORE_DIRNAME
+    meta = read_docstore_meta(docstore_dir)
+    has_pickle = (vectordb_path / "index.pkl").exists()
+    if not _docstore_snapshot_valid(vectordb_path, meta):
+        if not has_pickle:
+            raise FileNotFoundError(f"docstore 스냅샷과 index.pkl이 모두 없습니다: {vectordb_path}")
+        print(f"docstore 스냅샷이 없거나 오래되어 index.pkl로 생성합니다: {docstore_dir}")
+        build_docstore_snapshot(vectordb_path, embeddings)
+
+    index = faiss.read_index(str(vectordb_path / "index.faiss"), FAISS_MMAP_FLAGS)
+    docstore = MmapDocstore(docstore_dir)
+    if docstore.num_docs != index.ntotal:
+        raise ValueError(f"docstore 문서 수({docstore.num_docs})와 벡터 수({index.ntotal})가 다릅니다: {vectordb_path}")
+    return FAISS(
+        embedding_function=embeddings,
+        index=index,
+        docstore=docstore,
+        index_to_docstore_id=PositionIds(docstore.num_docs),
+    )
+
+
+def _docstore_snapshot_valid(vectordb_path: Path, meta: Optional[Dict[str, Any]]) -> bool:
+    """스냅샷 포맷이 현재 버전이고, index.pkl이 있으면 그 체크섬으로 만들어졌는지 확인합니다."""
+    if meta is None or meta.get("format_version") != DOCSTORE_FORMAT_VERSION:
+        return False
+    if not (vectordb_path / "index.pkl").exists():
+        return True
+    return meta.get("docstore_checksum") == source_checksum(vectordb_path)
+
+
+def build_docstore_snapshot(vectordb_path: Path, embeddings) -> None:
+    """index.pkl을 언피클하여 문서를 벡터 순서대로 docstore 스냅샷으로 저장합니다."""
+    # 언피클 도중 index.pkl이 바뀌어도 오래된 체크섬이 기록되지 않도록 먼저 계산
+    checksum = docstore_checksum(vectordb_path)
+    pickled = FAISS.load_local(str(vectordb_path), embeddings=embeddings, allow_dangerous_deserialization=True)
+    write_docstore_snapshot(vectordb_path, pickled, checksum)
+
+
+def write_docstore_snapshot(vectordb_path: Path, vectorstore, checksum: Optional[str] = None) -> None:
+    """
+    벡터스토어의 문서를 벡터 순서대로 vectordb/<name>/docstore 스냅샷으로 저장합니다.
+    여러 워커가 동시에 저장하거나 읽어도 안전하도록 publish_snapshot으로 새 버전을 쓴 뒤 링크를 교체합니다.
+    ai-preprocessing의 create_restaurant_vectordb.py도 save_local() 직후 이 함수로 스냅샷을 저장합니다.
+
+    Args:
+        vectordb_path (Path): 벡터 DB 디렉토리 경로
+        vectorstore (FAISS): 문서를 읽을 벡터스토어 객체 (metadata["doc_id"]가 벡터 위치와 같아야 함)
+        checksum (str, optional): index.pkl 체크섬 (None이면 계산)
+    """
+    vectordb_path = Path(vectordb_path)
+    checksum = checksum or docstore_checksum(vectordb_path)
+    docstore_dir = vectordb_path / DOCSTORE_DIRNAME
+    published = publish_snapshot(
+        docstore_dir,
+        lambda directory: write_docstore(directory, iter_vectordb_documents(vectorstore), checksum, index_pickle_stat(vectordb_path)),
+        # 다른 워커가 먼저 같은 스냅샷을 만든 경우
+        skip_if=lambda: _docstore_snapshot_valid(vectordb_path, read_docstore_meta(docstore_dir))
+    )
+    if published:
+        print(f"docstore 스냅샷 저장 완료: {docstore_dir} (문서 수={len(vectorstore.index_to_docstore_id)})")
+
+
+def apply_search_params(index, index_info: Optional[Dict[str, Any]] = None) -> Dict[str, int]:
+    """
+    근사 인덱스의 검색 파라미터를 설정합니다.
+    FAISS_NPROBE / FAISS_EF_SEARCH가 설정되어 있으면 그 값을, 아니면 index_meta.json의 기본값을 사용합니다.
+    평면 인덱스에는 아무것도 적용하지 않습니다.
+
+    Args:
+        index (faiss.Index): 로드된 FAISS 인덱스
+        index_info (Dict[str, Any], optional): index_meta.json의 "index" 항목
+
+    Returns:
+        Dict[str, int]: 적용한 파라미터 (예: {"nprobe": 16})
+    """
+    index_info = index_info or {}
+    applied = {}
+    parameter_space = faiss.ParameterSpace()
+    if faiss.try_extract_index_ivf(index) is not None:
+        nprobe = FAISS_NPROBE or index_info.get("nprobe")
+        if nprobe:
+            parameter_space.set_index_parameter(index, "nprobe", int(nprobe))
+            applied["nprobe"] = int(nprobe)
+    if hasattr(faiss.downcast_index(index), "hnsw"):
+        ef_search = FAISS_EF_SEARCH or index_info.get("ef_search")
+        if ef_search:
+            parameter_space.set_index_parameter(index, "efSearch", int(ef_search))
+            applied["efSearch"] = int(ef_search)
+    return applied
+
+
+def assign_document_ids(vectorstore) -> int:
+    """
+    index.pkl에서 언피클한 문서의 metadata["doc_id"]를 벡터 위치로 채웁니다.
+    doc_id가 없는 이전 벡터 DB나 병합 후 위치가 바뀐 문서도 MmapDocstore와 같은 정수 문서 ID를 갖게 됩니다.
+
+    Args:
+        vectorstore (FAISS): 문서 ID를 채울 벡터스토어 객체
+
+    Returns:
+        int: doc_id를 새로 채우거나 고친 문서 수
+    """
+    assigned = 0
+    index_to_docstore_id = vectorstore.index_to_docstore_id
+    for position in range(len(index_to_docstore_id)):
+        doc = vectorstore.docstore.search(index_to_docstore_id[position])
+        if not isinstance(doc, Document):
+            continue
+        if doc.metadata is None:
+            doc.metadata = {}
+        if doc.metadata.get(DOC_ID_KEY) != position:
+            doc.metadata[DOC_ID_KEY] = position
+            assigned += 1
+    return assigned
+
+
+def iter_vectordb_documents(vectorstore) -> Iterator[Document]:
+    """
+    벡터 DB의 docstore에 저장된 모든 문서를 FAISS 인덱스 순서대로 순회합니다.
+    similarity_search와 달리 임베딩 호출이 없고 문서 수 제한도 없습니다.
+    문서는 복사하지 않고 docstore의 객체를 그대로 반환합니다.
+
+    Args:
+        vectorstore (FAISS): 문서를 순회할 벡터스토어 객체
+
+    Yields:
+        Document: docstore의 문서
+    """
+    index_to_docstore_id = vectorstore.index_to_docstore_id
+    for position in range(len(index_to_docstore_id)):
+        doc = vectorstore.docstore.search(index_to_docstore_id[position])
+        if isinstance(doc, Document):
+            yield doc
+
+
+def docstore_checksum(vectordb_path: Path) -> str:
+    """
+    docstore 파일(index.pkl)의 SHA-256 체크섬을 계산합니다.
+    키워드 인덱스 / docstore 스냅샷이 현재 docstore로 만들어졌는지 확인하는 데 사용합니다.
+
+    Args:
+        vectordb_path (Path): 벡터 DB 디렉토리 경로
+
+    Returns:
+        str: 16진수 체크섬 문자열
+    """
+    digest = hashlib.sha256()
+    with open(Path(vectordb_path) / "index.pkl", "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def index_pickle_stat(vectordb_path: Path) -> Optional[Dict[str, int]]:
+    """index.pkl의 크기와 수정 시각 (없으면 None)"""
+    pickle_path = Path(vectordb_path) / "index.pkl"
+    if not pickle_path.exists():
+        return None
+    stat = pickle_path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def source_checksum(vectordb_path: Path) -> Optional[str]:
+    """
+    스냅샷 유효성 검사에 사용할 index.pkl 체크섬.
+    docstore 스냅샷에 기록된 index.pkl 크기/수정 시각이 현재와 같으면 파일을 다시 읽지 않고 기록된 값을,
+    index.pkl이 없으면(스냅샷만 배포한 경우) 스냅샷에 기록된 값을 사용합니다.
+
+    Args:
+        vectordb_path (Path): 벡터 DB 디렉토리 경로
+
+    Returns:
+        str: 16진수 체크섬 문자열 (index.pkl과 스냅샷이 모두 없으면 None)
+    """
+    meta = read_docstore_meta(Path(vectordb_path) / DOCSTORE_DIRNAME) or {}
+    stat = index_pickle_stat(vectordb_path)
+    if stat is None or (meta.get("source_stat") == stat and meta.get("docstore_checksum")):
+        return meta.get("docstore_checksum")
+    return docstore_checksum(vectordb_path)
+
+
+def load_keyword_index(index_name: str, vectorstore) -> SparseBM25:
+    """
+    벡터 DB 옆에 저장된 키워드(BM25) 인덱스 스냅샷을 메모리 매핑으로 로드합니다.
+    스냅샷이 없거나 docstore 체크섬이 다르면(오래된 스냅샷) docstore 전체로 다시 생성하고
+    다음 시작부터 재사용할 수 있도록 스냅샷을 저장합니다.
+
+    Args:
+        index_name (str): 벡터 DB 이름
+        vectorstore (FAISS): 로드된 벡터스토어 객체 (문서 참조용)
+
+    Returns:
+        SparseBM25: 키워드 검색 엔진
+    """
+    vectordb_path = resolve_vectordb_path(index_name)
+    # 링크를 한 번만 따라가 유효성 검사와 로드가 같은 버전을 보도록 함
+    snapshot_dir = resolve_snapshot(vectordb_path / KEYWORD_INDEX_DIRNAME)
+    checksum = source_checksum(vectordb_path)
+
+    # mmap docstore는 문서를 복사하지 않고 검색 결과로 필요할 때만 Document를 만드는 시퀀스로 전달
+    if isinstance(vectorstore.docstore, MmapDocstore):
+        docs = DocumentSequence(vectorstore.docstore)
+    else:
+        docs = list(iter_vectordb_documents(vectorstore))
+
+    meta = read_snapshot_meta(snapshot_dir)
+    if meta and meta.get("docstore_checksum") == checksum:
+        try:
+            keyword_index = SparseBM25.load(snapshot_dir, docs=docs)
+            if keyword_index.num_docs == len(docs):
+                print(f"키워드 인덱스 스냅샷 로드 완료: {snapshot_dir} (문서 수={len(docs)})")
+                return keyword_index
+            print(f"키워드 인덱스 스냅샷 문서 수 불일치, 다시 생성합니다: {snapshot_dir}")
+        except Exception as e:
+            print(f"키워드 인덱스 스냅샷 로드 실패, 다시 생성합니다: {e}")
+    else:
+        print(f"키워드 인덱스 스냅샷이 없거나 오래되어 다시 생성합니다: {snapshot_dir}")
+
+    keyword_index = build_keyword_index(vectordb_path, vectorstore, checksum)
+    keyword_index.docs = docs
+    return keyword_index
+
+
+def build_keyword_index(vectordb_path: Path, vectorstore, checksum: Optional[str] = None) -> SparseBM25:
+    """
+    벡터스토어 docstore 전체로 BM25 인덱스를 만들고 vectordb/<name>/keyword_index 스냅샷으로 저장합니다.
+    ai-preprocessing의 create_restaurant_vectordb.py도 save_local() 직후 이 함수로 스냅샷을 저장합니다.
+
+    Args:
+        vectordb_path (Path): 벡터 DB 디렉토리 경로
+        vectorstore (FAISS): 문서를 읽을 벡터스토어 객체
+        checksum (str, optional): index.pkl 체크섬 (None이면 계산)
+
+    Returns:
+        SparseBM25: 생성된 키워드 검색 엔진 (docs는 벡터스토어의 문서)
+    """
+    snapshot_dir = Path(vectordb_path) / KEYWORD_INDEX_DIRNAME
+    keyword_index = SparseBM25.from_documents(iter_vectordb_documents(vectorstore))
+    try:
+        keyword_index.save(snapshot_dir, docstore_checksum=checksum or source_checksum(vectordb_path))
+        print(f"키워드 인덱스 스냅샷 저장 완료: {snapshot_dir} (문서 수={keyword_index.num_docs})")
+    except Exception as e:
+        print(f"키워드 인덱스 스냅샷 저장 실패 (메모리 인덱스는 계속 사용): {e}")
+    return keyword_index
@@ -0,0 +1,100 @@
+"""
+BM25 키워드 검색 마이크로벤치마크
+
+rank_bm25 기반 langchain BM25Retriever와 SparseBM25(CSR 행렬)를 같은 코퍼스에서 비교합니다.
+- 인덱스 생성 시간
+- 쿼리당 검색 시간 (상위 k개)
+- 점수 일치 여부 (BM25Okapi.get_scores와 최대 절대 오차)
+
+사용법 (ai-server 컨테이너의 /project 에서 실행):
+    python script/benchmark_bm25.py --index restaurant_finder
+    python script/benchmark_bm25.py --synthetic 50000   # 벡터 DB 없이 합성 코퍼스로 측정
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from dotenv import load_dotenv
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+load_dotenv()
+
+from langchain_core.documents import Document
+from langchain_community.retrievers import BM25Retriever
+from app.utils.bm25 import SparseBM25
+
+SAMPLE_QUERIES = [
+    "해운대 돼지국밥 맛집",
+    "서면 주차 가능한 고기집",
+    "광안리 바다 전망 카페",
+    "부산역 밀면",
+    "기장 해산물 식당 아이 동반",
+]
+
+
+def load_documents(index_name: str) -> list:
+    from app.utils.vectordb import load_vectordb, iter_vectordb_documents
+    return list(iter_vectordb_documents(load_vectordb(index_name)))
+
+
+def synthetic_documents(num_docs: int, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    vocab = [f"단어{i}" for i in range(20000)] + [w for q in SAMPLE_QUERIES for w in q.split()]
+    weights = [1.0 / (rank + 1) for rank in range(len(vocab))]  # Zipf 분포
+    docs = []
+    for i in range(num_docs):
+        tokens = rng.choices(vocab, weights=weights, k=rng.randint(30, 200))
+        docs.append(Document(page_content=" ".join(tokens), metadata={"RSTR_ID": i}))
+    return docs
+
+
+def time_queries(fn, queries: list, repeat: int) -> list:
+    latencies = []
+    for _ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            fn(query)
+            latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def main(args) -> None:
+    docs = synthetic_documents(args.synthetic) if args.synthetic else load_documents(args.index)
+    print(f"코퍼스 문서 수: {len(docs)}")
+
+    start = time.perf_counter()
+    retriever = BM25Retriever.from_documents(docs, k=args.k)
+    rank_bm25_build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    engine = SparseBM25.from_documents(docs)
+    sparse_build = time.perf_counter() - start
+
+    rank_bm25_latency = time_queries(retriever.invoke, SAMPLE_QUERIES, args.repeat)
+    sparse_latency = time_queries(lambda q: engine.search(q, k=args.k), SAMPLE_QUERIES, args.repeat)
+
+    max_abs_diff = 0.0
+    for query in SAMPLE_QUERIES:
+        expected = retriever.vectorizer.get_scores(retriever.preprocess_func(query))
+        max_abs_diff = max(max_abs_diff, float(np.max(np.abs(expected - engine.get_scores(query)))))
+
+    print("=" * 60)
+    print(f"{'':>10} {'build(s)':>10} {'p50(ms)':>10} {'mean(ms)':>10}")
+    print(f"{'rank_bm25':>10} {rank_bm25_build:>10.2f} {statistics.median(rank_bm25_latency):>10.3f} {statistics.mean(rank_bm25_latency):>10.3f}")
+    print(f"{'sparse':>10} {sparse_build:>10.2f} {statistics.median(sparse_latency):>10.3f} {statistics.mean(sparse_latency):>10.3f}")
+    print(f"BM25Okapi 점수 대비 최대 절대 오차: {max_abs_diff:.2e}")
+    print(f"SparseBM25 행렬 크기: {engine.nbytes / 1024 / 1024:.1f}MB")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="BM25 키워드 검색 마이크로벤치마크")
+    parser.add_argument("--index", default="restaurant_finder", help="벡터 DB 이름")
+    parser.add_argument("--synthetic", type=int, default=0, help="합성 코퍼스 문서 수 (0이면 벡터 DB 사용)")
+    parser.add_argument("--k", type=int, default=20, help="검색 결과 수")
+    parser.add_argument("--repeat", type=int, default=20, help="쿼리 반복 횟수")
+    main(parser.parse_args())
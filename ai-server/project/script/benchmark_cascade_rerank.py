@@ -0,0 +1,160 @@
+"""
+캐스케이드 리랭킹 지연 시간 / recall@k 벤치마크
+
+하이브리드 점수로 후보를 먼저 거른 뒤 상위 후보만 CrossEncoder로 리랭킹하는 캐스케이드 모드를
+전체 후보 리랭킹(기존 방식)과 비교합니다.
+- 요청당 리랭킹 쌍 수와 검색+리랭킹 지연 시간
+- recall@k (전체 리랭킹 상위 k개를 기준으로 한 일치율)
+- 합성 코퍼스에서는 정답 레이블 기준 recall@k
+
+사용법 (ai-server 컨테이너의 /project 에서 실행):
+    python script/benchmark_cascade_rerank.py --index restaurant_finder
+    python script/benchmark_cascade_rerank.py --synthetic 600   # 벡터 DB/API 키 없이 해시 임베딩으로 측정
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import zlib
+from pathlib import Path
+
+import numpy as np
+from dotenv import load_dotenv
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+load_dotenv()
+# 같은 쿼리를 설정별로 반복하므로 점수 캐시를 끄고 측정
+os.environ["RERANK_CACHE_ENABLED"] = "false"
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from app.services.base import HybridSearchRetriever
+from app.utils.advanced_rag import AdvancedRAGRetriever
+from app.utils.hybrid_search import create_hybrid_search
+from app.utils.reranker import KoreanReranker
+from eval_passage_selection import AREAS, MENUS, FEATURES, synthetic_corpus
+
+# (이름, min_keep, margin, gap)
+CASCADE_SETTINGS = [
+    ("strict", 3, 0.20, 0.10),
+    ("default", 5, 0.35, 0.15),
+    ("loose", 8, 0.50, 0.25),
+]
+
+
+class BigramHashEmbeddings(Embeddings):
+    """글자 2-gram 해싱 임베딩 (합성 코퍼스 측정용, API 호출 없음)"""
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+
+    def _vector(self, text: str) -> list:
+        vec = np.zeros(self.dim, dtype=np.float32)
+        for token in text.lower().split():
+            for i in range(max(1, len(token) - 1)):
+                vec[zlib.crc32(token[i:i + 2].encode("utf-8")) % self.dim] += 1.0
+        norm = np.linalg.norm(vec)
+        return (vec / norm if norm else vec).tolist()
+
+    def embed_documents(self, texts):
+        return [self._vector(t) for t in texts]
+
+    def embed_query(self, text):
+        return self._vector(text)
+
+
+def build_synthetic(num_docs: int, num_queries: int, seed: int = 3):
+    from langchain_community.vectorstores import FAISS
+
+    corpus = synthetic_corpus(num_docs)
+    docs = [
+        Document(page_content=text, metadata={"RSTR_ID": i, "area": area, "menu": menu})
+        for i, (text, area, menu, _) in enumerate(corpus)
+    ]
+    vectordb = FAISS.from_documents(docs, BigramHashEmbeddings())
+    rng = np.random.default_rng(seed)
+    queries = []
+    for _ in range(num_queries):
+        area, menu, feature = AREAS[rng.integers(len(AREAS))], MENUS[rng.integers(len(MENUS))], FEATURES[rng.integers(len(FEATURES))]
+        queries.append((f"{area} {menu} {feature} 맛집", (area, menu)))
+    return create_hybrid_search(vectordb, documents=docs), queries
+
+
+def build_index(index_name: str, num_queries: int):
+    from app.utils.resource_registry import get_shared_vectordb, get_shared_bm25
+
+    vectordb = get_shared_vectordb(index_name)
+    hybrid = create_hybrid_search(vectordb, keyword_index=get_shared_bm25(index_name, vectordb))
+    queries = [(f"{area} {menu} 맛집", None) for area in AREAS for menu in MENUS][:num_queries]
+    return hybrid, queries
+
+
+async def run(retriever: AdvancedRAGRetriever, queries: list) -> tuple:
+    results, latencies = [], []
+    pairs_before = retriever.reranker.batcher.pairs
+    for query, _ in queries:
+        start = time.perf_counter()
+        results.append(await retriever.aretrieve(query))
+        latencies.append((time.perf_counter() - start) * 1000)
+    pairs = (retriever.reranker.batcher.pairs - pairs_before) / len(queries)
+    return results, latencies, pairs
+
+
+def doc_key(doc: Document):
+    return doc.metadata.get("RSTR_ID", doc.page_content[:100])
+
+
+async def main(args) -> None:
+    if args.synthetic:
+        hybrid, queries = build_synthetic(args.synthetic, args.queries)
+    else:
+        hybrid, queries = build_index(args.index, args.queries)
+    hybrid.top_k = args.initial_k
+    base_retriever = HybridSearchRetriever(hybrid_search_obj=hybrid)
+    reranker = KoreanReranker(args.model, top_k=args.final_k)
+
+    configs = [("full", dict(cascade=False))] + [
+        (name, dict(cascade=True, cascade_min_keep=min_keep, cascade_margin=margin, cascade_gap=gap))
+        for name, min_keep, margin, gap in CASCADE_SETTINGS
+    ]
+    retrievers = {
+        name: AdvancedRAGRetriever(base_retriever, reranker=reranker, initial_k=args.initial_k, final_k=args.final_k, **kwargs)
+        for name, kwargs in configs
+    }
+    await retrievers["full"].aretrieve(queries[0][0])  # 예열
+
+    outcomes = {name: await run(retriever, queries) for name, retriever in retrievers.items()}
+    full_results = outcomes["full"][0]
+    k = args.k
+
+    print("=" * 80)
+    print(f"모델={args.model}, 쿼리 {len(queries)}개, initial_k={args.initial_k}, recall@{k}")
+    print(f"{'':>8} {'pairs/req':>10} {'p50(ms)':>9} {'mean(ms)':>9} {'recall@k(vs full)':>18} {'label recall@k':>15}")
+    for name, (results, latencies, pairs) in outcomes.items():
+        overlap = statistics.mean(
+            len({doc_key(d) for d in r[:k]} & {doc_key(d) for d in f[:k]}) / max(1, min(k, len(f)))
+            for r, f in zip(results, full_results)
+        )
+        label_recall = "-"
+        if queries[0][1] is not None:
+            label_recall = f"{statistics.mean(sum(1 for d in r[:k] if (d.metadata['area'], d.metadata['menu']) == q[1]) / k for r, q in zip(results, queries)):.3f}"
+        print(
+            f"{name:>8} {pairs:>10.1f} {statistics.median(latencies):>9.1f} {statistics.mean(latencies):>9.1f} "
+            f"{overlap:>18.3f} {label_recall:>15}"
+        )
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="캐스케이드 리랭킹 지연 시간 / recall@k 벤치마크")
+    parser.add_argument("--model", default="cross-encoder/ms-marco-MiniLM-L-6-v2", help="CrossEncoder 모델 이름 또는 경로")
+    parser.add_argument("--index", default="restaurant_finder", help="벡터 DB 이름")
+    parser.add_argument("--synthetic", type=int, default=0, help="합성 코퍼스 문서 수 (0이면 벡터 DB 사용)")
+    parser.add_argument("--queries", type=int, default=20, help="측정 쿼리 수")
+    parser.add_argument("--initial-k", type=int, default=20, help="하이브리드 검색 후보 수")
+    parser.add_argument("--final-k", type=int, default=20, help="최종 반환 문서 수")
+    parser.add_argument("--k", type=int, default=5, help="recall@k의 k")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,116 @@
+"""
+/chatbot 경로 요청당 지연 시간 벤치마크
+
+- before: 요청마다 QueryRouterService + RestaurantChatbotService를 새로 생성한 뒤 검색 (기존 방식)
+          요청이 끝나면 서비스를 닫고 리소스 레지스트리에서 참조가 없는 리소스를 모두 제거하므로,
+          다음 요청은 기존 방식처럼 벡터 DB / BM25 / 리랭커 모델 / 그래프 스니펫을 다시 로드합니다.
+- after : lifespan에서 한 번 생성한 싱글톤 서비스로 검색 (현재 방식)
+
+LLM 호출(라우팅, 답변 생성)은 두 방식에서 동일하므로 제외하고,
+서비스 생성 + 검색(하이브리드 검색, 리랭킹)에 드는 시간만 측정합니다.
+서비스 재사용 효과만 비교하도록 쿼리 임베딩 / 리랭커 점수 캐시는 기본으로 끕니다 (환경 변수로 켜면 그대로 사용).
+
+사용법 (ai-server 컨테이너의 /project 에서 실행):
+    python script/benchmark_chatbot_latency.py --requests 5
+    # 오프라인: hashing 임베딩 인덱스와 로컬 리랭커 모델로 측정 (LLM은 생성만 하고 호출하지 않음)
+    python script/build_offline_index.py --name restaurant_finder --synthetic 2000
+    OPENAI_API_KEY=offline EMBEDDING_PROVIDER=hashing RERANKER_MODEL=/models/reranker python script/benchmark_chatbot_latency.py
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+load_dotenv()
+os.environ.setdefault("EMBEDDING_CACHE_ENABLED", "false")
+os.environ.setdefault("RERANK_CACHE_ENABLED", "false")
+
+from app.services.query_router import QueryRouterService
+from app.services.restaurant_chatbot_service import RestaurantChatbotService
+from app.utils.resource_registry import get_resource_registry
+
+SAMPLE_QUERIES = [
+    "해운대 근처에 주차 가능한 고기 맛집 추천해줘",
+    "서면에서 혼밥하기 좋은 국밥집 알려줘",
+    "광안리 바다가 보이는 카페 추천해줘",
+    "부산역 근처 돼지국밥 맛집",
+    "기장에서 아이와 함께 갈 만한 해산물 식당",
+]
+
+
+def summarize(name: str, latencies: list) -> None:
+    latencies_ms = [t * 1000 for t in latencies]
+    print(
+        f"{name:>8}: n={len(latencies_ms)}, "
+        f"mean={statistics.mean(latencies_ms):.1f}ms, "
+        f"p50={statistics.median(latencies_ms):.1f}ms, "
+        f"max={max(latencies_ms):.1f}ms"
+    )
+
+
+async def run_before(queries: list) -> list:
+    """요청마다 서비스를 새로 생성하는 기존 방식 (공유 리소스 없이 매번 로드)"""
+    registry = get_resource_registry()
+    latencies = []
+    for query in queries:
+        # 이전 요청이 만든 리소스를 제거해 레지스트리 공유 없이 새로 로드하도록 함
+        registry.evict_unused()
+        start = time.perf_counter()
+        QueryRouterService()
+        service = RestaurantChatbotService()
+        try:
+            await service.retriever.aretrieve(query)
+        finally:
+            service.close()
+        latencies.append(time.perf_counter() - start)
+    registry.evict_unused()
+    return latencies
+
+
+async def run_after(queries: list) -> list:
+    """lifespan 싱글톤 서비스를 재사용하는 방식"""
+    QueryRouterService()
+    service = RestaurantChatbotService()
+    latencies = []
+    try:
+        for query in queries:
+            start = time.perf_counter()
+            await service.retriever.aretrieve(query)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        service.close()
+    return latencies
+
+
+async def main(num_requests: int) -> None:
+    queries = [SAMPLE_QUERIES[i % len(SAMPLE_QUERIES)] for i in range(num_requests)]
+
+    # 프로세스 첫 로드 비용(모델 다운로드, 디스크 캐시)이 before에만 몰리지 않도록 한 번 예열
+    await run_after(queries[:1])
+    get_resource_registry().evict_unused()
+
+    before = await run_before(queries)
+    after = await run_after(queries)
+
+    print("=" * 60)
+    print("/chatbot 요청당 서비스 생성 + 검색 지연 시간 (LLM 호출 제외)")
+    summarize("before", before)
+    summarize("after", after)
+    print(f"평균 개선: {statistics.mean(before) / max(statistics.mean(after), 1e-9):.1f}x")
+    # 서비스를 모두 닫았으므로 참조 수가 남은 리소스가 있으면 close() 누락
+    leaked = [f"{r['kind']}/{r['name']}={r['ref_count']}" for r in get_resource_registry().stats() if r["ref_count"]]
+    print(f"참조가 남은 공유 리소스: {', '.join(leaked) if leaked else '없음'}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="/chatbot 요청당 지연 시간 벤치마크")
+    parser.add_argument("--requests", type=int, default=5, help="측정할 요청 수")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
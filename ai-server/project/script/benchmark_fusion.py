@@ -0,0 +1,131 @@
+"""
+하이브리드 점수 결합(TMM 정규화 + CC) 마이크로벤치마크
+
+기존 방식(Document 리스트, _get_doc_id 문자열 키 사전, 리스트 컴프리헨션 정규화, 전체 sorted)과
+정수 문서 ID + NumPy 배열 방식(hybrid_search.fuse_scores: 벡터화 TMM, bincount 합산, argpartition 상위 선택)을
+같은 후보(검색기당 k개, 절반 정도가 겹침)에서 비교합니다.
+- 결합 1회당 시간 (기존 방식은 Document → 문서 ID 변환 비용 포함)
+- 상위 문서 순서와 점수 일치 여부
+- 3개 검색기 결합 시간 (그래프 검색 등 추가 결과를 넣는 경우)
+
+사용법 (ai-server 컨테이너의 /project 에서 실행):
+    python script/benchmark_fusion.py
+    python script/benchmark_fusion.py --k 20 200 2000 --repeat 500
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from dotenv import load_dotenv
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+load_dotenv()
+
+from langchain_core.documents import Document
+from app.utils.hybrid_search import fuse_scores
+
+ALPHA = 0.8
+
+
+def legacy_tmm_normalize(scores: list) -> list:
+    """기존 TMMCC_HybridSearch._tmm_normalize"""
+    if not scores:
+        return []
+    min_score = min(scores)
+    k = min(3, len(scores))
+    sorted_scores = sorted(scores, reverse=True)
+    max_score = sum(sorted_scores[:k]) / k
+    if max_score == min_score:
+        return [1.0] * len(scores)
+    normalized = [(s - min_score) / (max_score - min_score) for s in scores]
+    return [max(0.0, min(1.0, s)) for s in normalized]
+
+
+def legacy_get_doc_id(doc: Document) -> str:
+    """기존 TMMCC_HybridSearch._get_doc_id"""
+    if doc.metadata and "id" in doc.metadata:
+        return str(doc.metadata["id"])
+    return str(hash(doc.page_content[:100]))
+
+
+def legacy_fuse(vector_results: list, keyword_results: list, limit: int) -> list:
+    """기존 TMMCC_HybridSearch._fuse_results의 TMM-CC 결합 부분 (문자열 키 사전 + 전체 정렬)"""
+    vector_scores = legacy_tmm_normalize([float(score) for _, score in vector_results])
+    keyword_scores = legacy_tmm_normalize([score for _, score in keyword_results])
+    combined = {}
+    for i, (doc, _) in enumerate(vector_results):
+        combined[legacy_get_doc_id(doc)] = {"doc": doc, "vector_score": vector_scores[i], "keyword_score": 0.0}
+    for i, (doc, _) in enumerate(keyword_results):
+        doc_id = legacy_get_doc_id(doc)
+        if doc_id in combined:
+            combined[doc_id]["keyword_score"] = keyword_scores[i]
+        else:
+            combined[doc_id] = {"doc": doc, "vector_score": 0.0, "keyword_score": keyword_scores[i]}
+    final = [(r["doc"], ALPHA * r["vector_score"] + (1 - ALPHA) * r["keyword_score"]) for r in combined.values()]
+    return sorted(final, key=lambda x: x[1], reverse=True)[:limit]
+
+
+def make_candidates(k: int, num_docs: int, rng: np.random.Generator):
+    """검색기당 k개 후보 (약 절반이 겹치도록 같은 범위에서 추출), 점수 내림차순"""
+    pool = rng.choice(num_docs, size=min(num_docs, int(k * 1.5)), replace=False)
+    results = []
+    for _ in range(3):
+        ids = rng.choice(pool, size=k, replace=False).astype(np.int64)
+        scores = np.sort(rng.gamma(2.0, 1.0, size=k))[::-1].astype(np.float32)
+        results.append((ids, scores))
+    return results
+
+
+def time_call(fn, repeat: int) -> float:
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+    return statistics.median(latencies) * 1000
+
+
+def main(args) -> None:
+    rng = np.random.default_rng(args.seed)
+    docs = [Document(page_content=f"문서 {i} " + "본문 " * 20, metadata={"id": i}) for i in range(args.num_docs)]
+    rows = []
+    for k in args.k:
+        (vector_ids, vector_scores), (keyword_ids, keyword_scores), extra = make_candidates(k, args.num_docs, rng)
+        vector_docs = [(docs[i], float(s)) for i, s in zip(vector_ids, vector_scores)]
+        keyword_docs = [(docs[i], float(s)) for i, s in zip(keyword_ids, keyword_scores)]
+        limit = k
+
+        legacy = legacy_fuse(vector_docs, keyword_docs, limit)
+        ids, scores = fuse_scores([(vector_ids, vector_scores), (keyword_ids, keyword_scores)], [ALPHA, 1 - ALPHA], limit)
+        same_order = [doc.metadata["id"] for doc, _ in legacy] == ids.tolist()
+        max_error = max(abs(a - b) for (_, a), b in zip(legacy, scores.tolist()))
+
+        legacy_ms = time_call(lambda: legacy_fuse(vector_docs, keyword_docs, limit), args.repeat)
+        numpy_ms = time_call(
+            lambda: fuse_scores([(vector_ids, vector_scores), (keyword_ids, keyword_scores)], [ALPHA, 1 - ALPHA], limit),
+            args.repeat
+        )
+        three_ms = time_call(
+            lambda: fuse_scores([(vector_ids, vector_scores), (keyword_ids, keyword_scores), extra], [0.6, 0.2, 0.2], limit),
+            args.repeat
+        )
+        rows.append((k, legacy_ms, numpy_ms, three_ms, same_order, max_error))
+
+    print("=" * 86)
+    print(f"검색기당 후보 k개, 상위 k개 반환, 결합 1회 중앙값 (ms), 반복 {args.repeat}회")
+    print(f"{'k':>6} {'legacy':>10} {'numpy':>10} {'speedup':>8} {'numpy 3-way':>12} {'same order':>11} {'max |Δscore|':>13}")
+    for k, legacy_ms, numpy_ms, three_ms, same_order, max_error in rows:
+        print(f"{k:>6} {legacy_ms:>10.3f} {numpy_ms:>10.3f} {legacy_ms / numpy_ms:>7.1f}x {three_ms:>12.3f} {str(same_order):>11} {max_error:>13.2e}")
+    print("=" * 86)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="하이브리드 점수 결합 마이크로벤치마크 (사전 기반 vs NumPy)")
+    parser.add_argument("--k", type=int, nargs="+", default=[20, 200, 2000], help="검색기당 후보 수")
+    parser.add_argument("--num-docs", type=int, default=100000, help="문서 ID 범위")
+    parser.add_argument("--repeat", type=int, default=300, help="측정 반복 횟수")
+    parser.add_argument("--seed", type=int, default=0, help="난수 시드")
+    main(parser.parse_args())
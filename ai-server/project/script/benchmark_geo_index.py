@@ -0,0 +1,134 @@
+"""
+좌표 공간 색인(geo_index.GeoIndex) k-최근접 / 반경 조회 성능 측정
+
+지식 그래프의 관광지 / 식당 좌표 전체를 색인한 뒤 부산 영역의 임의 좌표로
+- 색인 로드 시간 (CSR 스냅샷 geo/ mmap + KD-트리 생성)
+- k-최근접 조회 지연 (쿼리 1건씩 호출한 중앙값 / p95, µs)과 nearest_many 일괄 조회 처리량 (쿼리/s)
+- 반경 조회 지연과 평균 결과 수
+- 전체 좌표에 대한 NumPy haversine 전수 비교(기준) 지연과 결과 일치 여부
+- 모든 관광지의 주변 식당 k개 짝짓기(GraphRAGEnhancer 스니펫 렌더링과 같은 조회) 전체 시간
+을 출력합니다. --graph를 주지 않으면 benchmark_graph_load.py의 합성 그래프로 측정합니다.
+
+사용법 (ai-server 컨테이너의 /project 에서 실행):
+    python script/benchmark_geo_index.py --graph graphdb/knowledge_graph.gpickle
+    python script/benchmark_geo_index.py --restaurants 50000 --queries 2000 --k 1 5 20
+"""
+import argparse
+import pickle
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from dotenv import load_dotenv
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+load_dotenv()
+
+from app.utils.compact_graph import CompactKnowledgeGraph, write_compact_graph
+from app.utils.geo_index import EARTH_RADIUS_METERS, load_geo_index
+from benchmark_graph_load import synthetic_graph
+
+# 부산 영역 (위도, 경도)
+BUSAN_BOUNDS = ((35.0, 35.4), (128.75, 129.35))
+
+
+def haversine(latitude: float, longitude: float, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    """한 좌표에서 좌표 배열까지의 대원 거리(m)"""
+    lat1, lon1, lat2, lon2 = map(np.radians, (latitude, longitude, latitudes, longitudes))
+    h = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_METERS * np.arcsin(np.sqrt(h))
+
+
+def time_each(fn, points) -> np.ndarray:
+    latencies = []
+    for latitude, longitude in points:
+        start = time.perf_counter()
+        fn(latitude, longitude)
+        latencies.append(time.perf_counter() - start)
+    return np.asarray(latencies) * 1e6
+
+
+def summary(latencies: np.ndarray) -> str:
+    return f"중앙값 {np.median(latencies):8.1f}µs  p95 {np.percentile(latencies, 95):8.1f}µs"
+
+
+def main(args) -> None:
+    import logging
+    logging.getLogger("app").setLevel(logging.WARNING)
+
+    if args.graph:
+        with open(args.graph, "rb") as f:
+            nx_graph = pickle.load(f)
+    else:
+        nx_graph = synthetic_graph(args.restaurants, args.attractions, args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        compact_path = Path(tmp) / "knowledge_graph"
+        write_compact_graph(compact_path, nx_graph)
+        graph = CompactKnowledgeGraph(compact_path)
+        load_geo_index(graph)  # geo/ 저장 (그래프 생성 시 write_geo_index로 저장하는 파일과 같음)
+        start = time.perf_counter()
+        index = load_geo_index(graph)
+        load_seconds = time.perf_counter() - start
+        if index is None:
+            print("좌표가 있는 관광지 / 식당 노드가 없습니다.")
+            return
+
+        rng = random.Random(args.seed)
+        points = [(rng.uniform(*BUSAN_BOUNDS[0]), rng.uniform(*BUSAN_BOUNDS[1])) for _ in range(args.queries)]
+        latitudes = np.asarray([point[0] for point in points])
+        longitudes = np.asarray([point[1] for point in points])
+        node_type = args.node_type
+        start_row, end_row = index.type_ranges.get(node_type, (0, 0))
+        all_latitudes = index.coordinates[start_row:end_row, 0]
+        all_longitudes = index.coordinates[start_row:end_row, 1]
+
+        print("=" * 100)
+        print(f"좌표 노드: {index.stats()}, 색인 로드 {load_seconds * 1000:.1f}ms, 약 {index.nbytes / 1024 / 1024:.1f}MB, 쿼리 {args.queries}개")
+        print(f"[k-최근접: {node_type}]")
+        for k in args.k:
+            single = time_each(lambda lat, lon: index.nearest(lat, lon, k=k, node_type=node_type), points)
+            start = time.perf_counter()
+            index.nearest_many(latitudes, longitudes, k=k, node_type=node_type)
+            batch_seconds = time.perf_counter() - start
+            brute = time_each(lambda lat, lon: np.argsort(haversine(lat, lon, all_latitudes, all_longitudes))[:k], points[:200])
+            # 전수 비교와 같은 이웃인지 확인 (일부 쿼리)
+            matches = 0
+            for latitude, longitude in points[:200]:
+                rows = np.argsort(haversine(latitude, longitude, all_latitudes, all_longitudes), kind="stable")[:k] + start_row
+                expected = {graph.node_id(int(node)) for node in index.nodes[rows]}
+                found = {neighbor.node_id for neighbor in index.nearest(latitude, longitude, k=k, node_type=node_type)}
+                matches += expected == found
+            print(
+                f"  k={k:<3} 단건 {summary(single)} | 일괄 {args.queries / batch_seconds:10.0f} 쿼리/s | "
+                f"전수 haversine {summary(brute)} | 일치 {matches}/200"
+            )
+
+        print(f"[반경: {node_type}]")
+        for meters in args.radius:
+            single = time_each(lambda lat, lon: index.within(lat, lon, meters, node_type=node_type), points)
+            hits = np.mean([len(index.within(lat, lon, meters, node_type=node_type)) for lat, lon in points[:200]])
+            print(f"  {meters:>6.0f}m 단건 {summary(single)} | 평균 결과 {hits:.1f}개")
+
+        attraction_ids = [graph.node_id(int(node)) for node in index.nodes[slice(*index.type_ranges.get("Attraction", (0, 0)))]]
+        start = time.perf_counter()
+        paired = sum(bool(index.near_node(node_id, k=3, node_type="Restaurant", max_meters=1000)) for node_id in attraction_ids)
+        print(f"[관광지 → 주변 식당 3곳 (1km)] 관광지 {len(attraction_ids)}개, 짝지어진 관광지 {paired}개, {time.perf_counter() - start:.2f}s")
+        print("=" * 100)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="좌표 공간 색인 k-최근접 / 반경 조회 성능 측정")
+    parser.add_argument("--graph", default=None, help="측정할 gpickle 경로 (없으면 합성 그래프)")
+    parser.add_argument("--restaurants", type=int, default=50000, help="합성 그래프 식당 수")
+    parser.add_argument("--attractions", type=int, default=2000, help="합성 그래프 관광지 수")
+    parser.add_argument("--node-type", default="Restaurant", help="조회할 노드 유형")
+    parser.add_argument("--queries", type=int, default=2000, help="임의 좌표 쿼리 수")
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 5, 20], help="k-최근접 k 값들")
+    parser.add_argument("--radius", type=float, nargs="+", default=[300, 1000, 3000], help="반경 조회 거리(m)들")
+    parser.add_argument("--seed", type=int, default=0, help="난수 시드")
+    main(parser.parse_args())
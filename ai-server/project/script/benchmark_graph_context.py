@@ -0,0 +1,160 @@
+"""
+그래프 컨텍스트 생성 시간 비교 (요청마다 렌더링 vs 미리 렌더링한 엔티티 스니펫 조회)
+
+검색 결과 문서 N개(기본 20개, 식당 / 관광지 혼합)에 대해 GraphRAGEnhancer.get_graph_context_for_docs를
+다음 방식으로 반복 호출하여 1회당 중앙값(ms)을 보고합니다.
+- render   : 기존처럼 요청마다 노드별 _get_related_info_from_graph로 텍스트를 만드는 방식 (networkx / CSR 그래프)
+- snippets : graph_snippets의 미리 렌더링한 스니펫을 노드 ID로 조회하여 잇는 방식 (networkx 사전 / CSR mmap)
+방식별 컨텍스트 문자열이 모두 같은지, 스니펫 생성 시간과 크기도 함께 출력합니다. (위 비교는 토큰 예산 없이 모든 정보를 포함)
+이어서 쿼리별로 토큰 예산(graph_context_selector)을 적용했을 때의 컨텍스트 토큰 수와 생성 시간을 전체 컨텍스트와 비교합니다.
+
+--graph를 주지 않으면 benchmark_graph_load.py의 합성 그래프로 측정합니다.
+
+사용법 (ai-server 컨테이너의 /project 에서 실행):
+    python script/benchmark_graph_context.py --restaurants 50000
+    python script/benchmark_graph_context.py --graph graphdb/knowledge_graph.gpickle --docs 20
+    python script/benchmark_graph_context.py --budget 400 800 --show
+"""
+import argparse
+import asyncio
+import logging
+import pickle
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+load_dotenv()
+
+from langchain_core.documents import Document
+from app.utils.compact_graph import CompactKnowledgeGraph, write_compact_graph
+from app.utils.graph_context_selector import GRAPH_CONTEXT_TOKEN_BUDGET, count_tokens
+from app.utils.graph_rag_enhancer import GraphRAGEnhancer
+from app.utils.graph_snippets import load_graph_snippets
+from benchmark_graph_load import synthetic_graph
+
+QUERIES = [
+    "부산 맛집 추천",
+    "해운대구 주차 가능한 식당 알려줘",
+    "애견동반 가능한 카페 있어?",
+    "메뉴12 가격이 얼마야",
+    "랜드마크3 근처 500m 이내 맛집",
+    "월요일에도 영업하는 곳 영업시간 알려줘",
+]
+
+
+def sample_docs(graph, num_docs: int, rng: random.Random) -> list:
+    """그래프의 식당 / 관광지 노드에 대응하는 검색 결과 Document (RSTR_ID / UC_SEQ 메타데이터)"""
+    docs = []
+    node_ids = [node_id for node_id in graph.nodes if str(node_id).startswith(("restaurant_", "attraction_"))]
+    for node_id in rng.sample(node_ids, min(num_docs, len(node_ids))):
+        name = graph.nodes[node_id].get("name")
+        source_id = node_id.split("_", 1)[1]
+        if node_id.startswith("restaurant_"):
+            metadata = {"RSTR_NM": name, "RSTR_ID": source_id}
+        else:
+            metadata = {"MAIN_TITLE": name, "UC_SEQ": source_id}
+        docs.append(Document(page_content=f"{name} 소개", metadata=metadata))
+    return docs
+
+
+def time_context(enhancer: GraphRAGEnhancer, docs: list, repeat: int, query: str = QUERIES[0]):
+    """get_graph_context_for_docs 1회당 중앙값(ms)과 컨텍스트 문자열"""
+    loop = asyncio.new_event_loop()
+    context = loop.run_until_complete(enhancer.get_graph_context_for_docs(query, docs))
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        loop.run_until_complete(enhancer.get_graph_context_for_docs(query, docs))
+        latencies.append(time.perf_counter() - start)
+    loop.close()
+    return statistics.median(latencies) * 1000, context
+
+
+def make_enhancer(graph, snippets, token_budget: int = 0) -> GraphRAGEnhancer:
+    """공유 레지스트리를 거치지 않고 스니펫 / 토큰 예산을 직접 지정한 GraphRAGEnhancer"""
+    enhancer = GraphRAGEnhancer.__new__(GraphRAGEnhancer)
+    enhancer._graph = graph
+    enhancer._snippets = snippets
+    enhancer._geo_index = None
+    enhancer._token_budget = token_budget
+    return enhancer
+
+
+def main(args) -> None:
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger("app").setLevel(logging.WARNING)
+    rng = random.Random(args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.graph:
+            with open(args.graph, "rb") as f:
+                nx_graph = pickle.load(f)
+        else:
+            nx_graph = synthetic_graph(args.restaurants, args.attractions, args.seed)
+        compact_path = Path(tmp) / "knowledge_graph"
+        write_compact_graph(compact_path, nx_graph)
+        compact_graph = CompactKnowledgeGraph(compact_path)
+        docs = sample_docs(nx_graph, args.docs, rng)
+
+        rows = []
+        for label, graph in (("networkx", nx_graph), ("compact", compact_graph)):
+            renderer = make_enhancer(graph, None)
+            start = time.perf_counter()
+            snippets = load_graph_snippets(graph, renderer._get_entity_snippet, renderer.snippet_render_settings, rebuild=True)
+            build_seconds = time.perf_counter() - start
+            render_ms, render_context = time_context(renderer, docs, args.repeat)
+            snippet_ms, snippet_context = time_context(make_enhancer(graph, snippets), docs, args.repeat)
+            rows.append((label, render_ms, snippet_ms, build_seconds, snippets.nbytes, render_context, snippet_context))
+
+        # 토큰 예산 적용 (CSR 그래프 + 스니펫)
+        budget_rows = []
+        for query in QUERIES:
+            full_ms, full_context = time_context(make_enhancer(compact_graph, snippets), docs, args.repeat, query)
+            row = [query, count_tokens(full_context), full_ms]
+            for budget in args.budget:
+                budget_ms, budget_context = time_context(make_enhancer(compact_graph, snippets, budget), docs, args.repeat, query)
+                row.extend([count_tokens(budget_context), budget_ms])
+                if args.show:
+                    print(f"--- {query} (예산 {budget}) ---\n{budget_context}\n")
+            budget_rows.append(row)
+
+    reference = rows[0][5]
+    print("=" * 92)
+    print(f"노드 {nx_graph.number_of_nodes()}개, 엣지 {nx_graph.number_of_edges()}개, 문서 {len(docs)}개, 반복 {args.repeat}회 중앙값")
+    print(f"{'graph':>9} {'render ms':>10} {'snippets ms':>12} {'speedup':>8} {'build s':>8} {'snippets MB':>12} {'same context':>13}")
+    for label, render_ms, snippet_ms, build_seconds, nbytes, render_context, snippet_context in rows:
+        same = render_context == snippet_context == reference
+        print(
+            f"{label:>9} {render_ms:>10.3f} {snippet_ms:>12.3f} {render_ms / snippet_ms:>7.1f}x "
+            f"{build_seconds:>8.2f} {nbytes / 1024 / 1024:>12.1f} {str(same):>13}"
+        )
+    print("-" * 92)
+    print("토큰 예산 적용 (CSR 그래프 + 스니펫): 컨텍스트 토큰 수 / 생성 ms")
+    header = f"{'query':<36} {'full':>12}" + "".join(f" {f'budget {budget}':>16}" for budget in args.budget)
+    print(header)
+    for query, full_tokens, full_ms, *budgets in budget_rows:
+        line = f"{query:<36} {full_tokens:>6} {full_ms:>5.2f}"
+        for tokens, ms in zip(budgets[::2], budgets[1::2]):
+            line += f" {tokens:>10} {ms:>5.2f}"
+        print(line)
+    print("=" * 92)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="그래프 컨텍스트 생성 시간 비교 (요청마다 렌더링 vs 스니펫 조회)")
+    parser.add_argument("--graph", default=None, help="측정할 gpickle 경로 (없으면 합성 그래프)")
+    parser.add_argument("--restaurants", type=int, default=50000, help="합성 그래프 식당 수")
+    parser.add_argument("--attractions", type=int, default=2000, help="합성 그래프 관광지 수")
+    parser.add_argument("--docs", type=int, default=20, help="컨텍스트를 만들 검색 결과 문서 수")
+    parser.add_argument("--budget", type=int, nargs="+", default=[GRAPH_CONTEXT_TOKEN_BUDGET], help="비교할 컨텍스트 토큰 예산")
+    parser.add_argument("--show", action="store_true", help="예산을 적용한 컨텍스트 출력")
+    parser.add_argument("--repeat", type=int, default=200, help="측정 반복 횟수")
+    parser.add_argument("--seed", type=int, default=0, help="난수 시드")
+    main(parser.parse_args())
@@ -0,0 +1,188 @@
+"""
+지식 그래프 로드 시간 / 메모리 사용량 비교 (gpickle networkx.DiGraph vs CSR CompactKnowledgeGraph)
+
+같은 그래프를 knowledge_graph.gpickle과 CSR 스냅샷(write_compact_graph)으로 저장한 뒤,
+포맷별로 새 프로세스에서 로드하여 다음을 보고합니다.
+- 로드 시간 (언피클 / mmap 열기)
+- 로드로 늘어난 RSS, PSS, USS (/proc/self/smaps_rollup 기준, MB)
+- GraphRAGEnhancer._get_related_info_from_graph 호출 지연 (노드당 중앙값, ms)
+- 두 포맷의 그래프 컨텍스트 문자열이 모두 같은지 여부
+
+--graph를 주지 않으면 create_knowledge_graph.py와 같은 구조(식당 / 관광지 / 지역 / 메뉴 / 특징 / 랜드마크)의
+합성 그래프를 만들어 측정합니다.
+
+사용법 (ai-server 컨테이너의 /project 에서 실행):
+    python script/benchmark_graph_load.py --restaurants 50000
+    python script/benchmark_graph_load.py --graph graphdb/knowledge_graph.gpickle
+"""
+import argparse
+import hashlib
+import multiprocessing as mp
+import pickle
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+load_dotenv()
+
+from benchmark_worker_memory import read_memory
+
+AREAS = ["해운대구", "수영구", "부산진구", "중구", "동구", "서구", "남구", "북구", "사하구", "사상구", "금정구", "연제구", "동래구", "강서구", "영도구", "기장군"]
+CATEGORIES = ["한식", "일식", "중식", "양식", "분식", "카페", "해산물", "고기"]
+FEATURES = ["주차가능", "와이파이가능", "애견동반가능"]
+
+
+def synthetic_graph(num_restaurants: int, num_attractions: int, seed: int):
+    """create_knowledge_graph.py와 같은 노드 ID / 속성 / 엣지 구조의 합성 그래프"""
+    import networkx as nx
+
+    rng = random.Random(seed)
+    # 식당 좌표는 별도 난수열로 만들어 다른 속성 / 엣지는 좌표 추가 전과 같게 유지
+    geo_rng = random.Random(seed + 1)
+    graph = nx.DiGraph()
+    for area in AREAS:
+        graph.add_node(f"area_{area}", type="Area", name=area)
+    for feature in FEATURES:
+        graph.add_node(f"feature_{feature}", type="Feature", name=feature)
+    menus = [f"메뉴{i}" for i in range(max(100, num_restaurants // 20))]
+    landmarks = [f"랜드마크{i}" for i in range(max(20, num_restaurants // 100))]
+    for i in range(num_attractions):
+        node_id = f"attraction_{i}"
+        graph.add_node(
+            node_id, type="Attraction", name=f"관광지 {i}", address=f"부산광역시 {rng.choice(AREAS)} 관광로 {i}",
+            latitude=35.0 + rng.random() * 0.3, longitude=128.9 + rng.random() * 0.4,
+            description=f"관광지 {i}은(는) 바다와 산이 어우러진 부산의 대표 관광지입니다. " * 6,
+            contact=f"051-{rng.randint(100, 999)}-{rng.randint(1000, 9999)}", traffic_info="지하철 2호선 하차 후 도보 10분"
+        )
+        graph.add_edge(node_id, f"area_{rng.choice(AREAS)}", type="LOCATED_IN")
+    for i in range(num_restaurants):
+        node_id = f"restaurant_{i}"
+        graph.add_node(
+            node_id, type="Restaurant", name=f"맛집 {i}", address=f"부산광역시 {rng.choice(AREAS)} 맛집로 {i}",
+            latitude=35.0 + geo_rng.random() * 0.3, longitude=128.9 + geo_rng.random() * 0.4,
+            category=rng.choice(CATEGORIES), rating=round(rng.uniform(3.0, 5.0), 1),
+            description=f"맛집 {i}은(는) 신선한 재료로 매일 아침 직접 준비하는 정성 가득한 음식점입니다. " * 3,
+            hours="11:00~21:00", closed_days=rng.choice(["매주 월요일", "연중무휴", None])
+        )
+        graph.add_edge(node_id, f"area_{rng.choice(AREAS)}", type="LOCATED_IN")
+        for menu in rng.sample(menus, rng.randint(1, 4)):
+            menu_id = f"menu_{menu}"
+            if not graph.has_node(menu_id):
+                graph.add_node(menu_id, type="Menu", name=menu, category=rng.choice(CATEGORIES), sub_category=rng.choice(CATEGORIES), description=None)
+            graph.add_edge(node_id, menu_id, type="SERVES_MENU", price=float(rng.randrange(5000, 50000, 500)))
+        landmark_id = f"landmark_{rng.choice(landmarks)}"
+        if not graph.has_node(landmark_id):
+            graph.add_node(landmark_id, type="Landmark", name=landmark_id[len("landmark_"):])
+        graph.add_edge(node_id, landmark_id, type="NEARBY_LANDMARK", distance=float(rng.randint(50, 3000)))
+        for feature in FEATURES:
+            if rng.random() < 0.4:
+                graph.add_edge(node_id, f"feature_{feature}", type="HAS_FEATURE")
+    return graph
+
+
+def worker(fmt: str, graph_path: str, compact_path: str, sample_ids: list, results: mp.Queue) -> None:
+    from app.utils.compact_graph import CompactKnowledgeGraph
+    from app.utils.graph_rag_enhancer import GraphRAGEnhancer
+
+    baseline = read_memory()
+    start = time.perf_counter()
+    if fmt == "gpickle":
+        with open(graph_path, "rb") as f:
+            graph = pickle.load(f)
+    else:
+        graph = CompactKnowledgeGraph(Path(compact_path))
+    load_seconds = time.perf_counter() - start
+
+    enhancer = GraphRAGEnhancer(graph)
+    digest = hashlib.sha256()
+    latencies = []
+    for node_id in sample_ids:
+        start = time.perf_counter()
+        context = enhancer._get_related_info_from_graph(node_id)
+        latencies.append(time.perf_counter() - start)
+        digest.update(context.encode("utf-8"))
+    memory = read_memory()
+    results.put({
+        "load_seconds": load_seconds,
+        "rss": memory["rss"] - baseline["rss"],
+        "pss": memory["pss"] - baseline["pss"],
+        "uss": memory["uss"] - baseline["uss"],
+        "lookup_ms": statistics.median(latencies) * 1000,
+        "digest": digest.hexdigest(),
+    })
+
+
+def measure(fmt: str, graph_path: Path, compact_path: Path, sample_ids: list) -> dict:
+    ctx = mp.get_context("spawn")
+    results = ctx.Queue()
+    process = ctx.Process(target=worker, args=(fmt, str(graph_path), str(compact_path), sample_ids, results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+
+def directory_size(path: Path) -> float:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file()) / 1024 / 1024
+
+
+def main(args) -> None:
+    from app.utils.compact_graph import write_compact_graph
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        if args.graph:
+            graph_path = Path(args.graph)
+            with open(graph_path, "rb") as f:
+                graph = pickle.load(f)
+        else:
+            graph = synthetic_graph(args.restaurants, args.attractions, args.seed)
+            graph_path = tmp / "knowledge_graph.gpickle"
+            with open(graph_path, "wb") as f:
+                pickle.dump(graph, f, pickle.HIGHEST_PROTOCOL)
+        compact_path = tmp / "knowledge_graph"
+        start = time.perf_counter()
+        write_compact_graph(compact_path, graph)
+        write_seconds = time.perf_counter() - start
+
+        rng = random.Random(args.seed)
+        node_ids = [node_id for node_id in graph.nodes if str(node_id).startswith(("restaurant_", "attraction_"))]
+        sample_ids = rng.sample(node_ids, min(args.lookups, len(node_ids)))
+        num_nodes, num_edges = graph.number_of_nodes(), graph.number_of_edges()
+        del graph
+
+        rows = []
+        for fmt in ("gpickle", "compact"):
+            runs = [measure(fmt, graph_path, compact_path, sample_ids) for _ in range(args.repeat)]
+            rows.append((fmt, runs))
+        file_sizes = {"gpickle": graph_path.stat().st_size / 1024 / 1024, "compact": directory_size(compact_path)}
+
+    print("=" * 92)
+    print(f"노드 {num_nodes}개, 엣지 {num_edges}개, CSR 스냅샷 생성 {write_seconds:.1f}s, 조회 노드 {len(sample_ids)}개, 반복 {args.repeat}회 중앙값")
+    print(f"{'format':>8} {'file MB':>8} {'load(s)':>8} {'RSS MB':>8} {'PSS MB':>8} {'USS MB':>8} {'lookup ms':>10}  context digest")
+    for fmt, runs in rows:
+        median = lambda key: statistics.median(run[key] for run in runs)
+        print(
+            f"{fmt:>8} {file_sizes[fmt]:>8.1f} {median('load_seconds'):>8.3f} {median('rss'):>8.1f} {median('pss'):>8.1f} "
+            f"{median('uss'):>8.1f} {median('lookup_ms'):>10.3f}  {runs[0]['digest'][:16]}"
+        )
+    print(f"그래프 컨텍스트 일치: {rows[0][1][0]['digest'] == rows[1][1][0]['digest']}")
+    print("=" * 92)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="지식 그래프 로드 시간 / 메모리 비교 (gpickle vs CSR)")
+    parser.add_argument("--graph", default=None, help="측정할 gpickle 경로 (없으면 합성 그래프)")
+    parser.add_argument("--restaurants", type=int, default=50000, help="합성 그래프 식당 수")
+    parser.add_argument("--attractions", type=int, default=2000, help="합성 그래프 관광지 수")
+    parser.add_argument("--lookups", type=int, default=500, help="컨텍스트를 만들어 볼 노드 수")
+    parser.add_argument("--repeat", type=int, default=3, help="포맷별 측정 반복 횟수")
+    parser.add_argument("--seed", type=int, default=0, help="난수 시드")
+    main(parser.parse_args())
@@ -0,0 +1,126 @@
+"""
+그래프 다중 홉 검색(graph_retrieval.GraphRetriever) 탐색 비용 / 허브 노드 최악 팬아웃 측정
+
+쿼리 유형별로 시드 매칭 결과와 탐색 통계(펼친 노드, 따라간 엣지, 허브 제외, 후보 수)를 출력하고,
+캐시 없이 탐색한 경우(cold)와 같은 시드 집합을 캐시에서 읽은 경우(cached)의 검색 1회 중앙값(ms)을 비교합니다.
+허브 제한(GRAPH_RETRIEVAL_HUB_DEGREE)을 끈 경우(--hub-degree 0 → 무제한)도 함께 측정하여
+지역 / 특징처럼 수천~수만 개 엣지가 들어오는 허브 노드를 펼칠 때의 최악 팬아웃을 보여 줍니다.
+
+--graph를 주지 않으면 benchmark_graph_load.py의 합성 그래프(CSR 스냅샷)로 측정합니다.
+
+사용법 (ai-server 컨테이너의 /project 에서 실행):
+    python script/benchmark_graph_retrieval.py --restaurants 50000
+    python script/benchmark_graph_retrieval.py --hub-degree 200 500 0 --repeat 50
+"""
+import argparse
+import pickle
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from dotenv import load_dotenv
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+load_dotenv()
+
+from app.utils.compact_graph import CompactKnowledgeGraph, write_compact_graph
+from app.utils.graph_retrieval import GRAPH_RETRIEVAL_HUB_DEGREE, GraphRetriever
+from benchmark_graph_load import synthetic_graph
+
+
+def default_queries(graph) -> list:
+    """합성 그래프(또는 실제 그래프)의 노드 이름으로 쿼리 유형별 예시를 만듭니다."""
+    def first_name(node_type: str) -> str:
+        return next(attrs.get("name") for _, attrs in graph.nodes(data=True) if attrs.get("type") == node_type)
+
+    # 들어오는 엣지가 가장 많은 지역 / 랜드마크 (최악 팬아웃)
+    def busiest(node_type: str) -> str:
+        nodes = [node for node, attrs in graph.nodes(data=True) if attrs.get("type") == node_type]
+        return graph.nodes[max(nodes, key=graph.in_degree)].get("name")
+
+    area, landmark, menu, restaurant = busiest("Area"), busiest("Landmark"), first_name("Menu"), first_name("Restaurant")
+    return [
+        ("landmark", f"{landmark} 근처 맛집"),
+        ("landmark+feature", f"{landmark} 근처 주차 되는 식당"),
+        ("menu", f"{menu} 잘하는 집"),
+        ("restaurant 2-hop", f"{restaurant} 근처 다른 식당"),
+        ("area (hub)", f"{area} 맛집"),
+        ("feature (hub)", "주차 되는 식당"),
+        ("area+feature+menu", f"{area} {menu} 애견 동반"),
+    ]
+
+
+def time_search(retriever: GraphRetriever, query: str, repeat: int) -> float:
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        retriever.search(query)
+        latencies.append(time.perf_counter() - start)
+    return statistics.median(latencies) * 1000
+
+
+def main(args) -> None:
+    import logging
+    logging.getLogger("app").setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.graph:
+            with open(args.graph, "rb") as f:
+                nx_graph = pickle.load(f)
+        else:
+            nx_graph = synthetic_graph(args.restaurants, args.attractions, args.seed)
+        compact_path = Path(tmp) / "knowledge_graph"
+        write_compact_graph(compact_path, nx_graph)
+        graph = CompactKnowledgeGraph(compact_path)
+        doc_node_ids = [node for node in nx_graph.nodes if str(node).startswith(("restaurant_", "attraction_"))]
+        queries = default_queries(nx_graph)
+
+        in_degrees = {}
+        for node, attrs in nx_graph.nodes(data=True):
+            node_type = attrs.get("type")
+            in_degrees[node_type] = max(in_degrees.get(node_type, 0), nx_graph.in_degree(node))
+
+        rows = []
+        for hub_degree in args.hub_degree:
+            limit = hub_degree if hub_degree > 0 else 10 ** 9
+            start = time.perf_counter()
+            cold = GraphRetriever(graph, doc_node_ids, hub_degree=limit, cache_size=0)
+            build_seconds = time.perf_counter() - start
+            cached = GraphRetriever(graph, doc_node_ids, hub_degree=limit)
+            for label, query in queries:
+                seeds = cold.match_seeds(query)
+                _, _, stats = cold.expand(seeds)
+                positions, _ = cold.search(query)
+                cold_ms = time_search(cold, query, args.repeat)
+                cached.search(query)
+                cached_ms = time_search(cached, query, args.repeat)
+                rows.append((hub_degree, label, cold.seed_names(seeds), stats, len(positions), cold_ms, cached_ms))
+
+    print("=" * 110)
+    print(f"노드 {nx_graph.number_of_nodes()}개, 엣지 {nx_graph.number_of_edges()}개, 문서 {len(doc_node_ids)}개, "
+          f"검색기 생성 {build_seconds:.2f}s, 반복 {args.repeat}회 중앙값")
+    print("유형별 최대 진입 차수: " + ", ".join(f"{name}={degree}" for name, degree in sorted(in_degrees.items(), key=lambda x: str(x[0]))))
+    print(f"{'hub cap':>8} {'query':<18} {'expanded':>8} {'edges':>7} {'hubs':>5} {'cands':>6} {'docs':>5} {'cold ms':>8} {'cached ms':>10}  seeds")
+    for hub_degree, label, seeds, stats, num_docs, cold_ms, cached_ms in rows:
+        cap = str(hub_degree) if hub_degree > 0 else "none"
+        print(
+            f"{cap:>8} {label:<18} {stats.expanded_nodes:>8} {stats.visited_edges:>7} {stats.hub_skips:>5} "
+            f"{stats.candidates:>6} {num_docs:>5} {cold_ms:>8.3f} {cached_ms:>10.4f}  {', '.join(seeds)}"
+        )
+    print("=" * 110)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="그래프 다중 홉 검색 탐색 비용 / 허브 팬아웃 측정")
+    parser.add_argument("--graph", default=None, help="측정할 gpickle 경로 (없으면 합성 그래프)")
+    parser.add_argument("--restaurants", type=int, default=50000, help="합성 그래프 식당 수")
+    parser.add_argument("--attractions", type=int, default=2000, help="합성 그래프 관광지 수")
+    parser.add_argument("--hub-degree", type=int, nargs="+", default=[GRAPH_RETRIEVAL_HUB_DEGREE, 0],
+                        help="비교할 허브 제한 (0이면 제한 없음)")
+    parser.add_argument("--repeat", type=int, default=20, help="측정 반복 횟수")
+    parser.add_argument("--seed", type=int, default=0, help="난수 시드")
+    main(parser.parse_args())
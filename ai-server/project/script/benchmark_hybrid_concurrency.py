@@ -0,0 +1,162 @@
+"""
+하이브리드 검색 동시성 / 이벤트 루프 블로킹 벤치마크
+
+- sync : 코루틴 안에서 TMMCC_HybridSearch.search()를 직접 호출 (기존 _aget_relevant_documents 방식)
+- async: TMMCC_HybridSearch.asearch()로 임베딩은 비동기 API, FAISS/BM25는 검색 스레드 풀에서 동시 실행
+
+동시 요청 수만큼 검색을 한꺼번에 실행하면서 5ms 주기 틱 태스크로 이벤트 루프 지연(lag)을 측정합니다.
+sync 방식은 루프가 검색 시간 동안 멈추므로 lag가 검색 시간 합만큼 커지고, async 방식은 lag가 수 ms에 머물러야 합니다.
+
+사용법 (ai-server 컨테이너의 /project 에서 실행):
+    python script/benchmark_hybrid_concurrency.py --index restaurant_finder --concurrency 16
+    python script/benchmark_hybrid_concurrency.py --synthetic 30000 --embed-latency-ms 80   # 벡터 DB/API 키 없이 측정
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from dotenv import load_dotenv
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+load_dotenv()
+
+from langchain_core.embeddings import Embeddings
+from app.utils.hybrid_search import create_hybrid_search
+
+SAMPLE_QUERIES = [
+    "해운대 돼지국밥 맛집",
+    "서면 주차 가능한 고기집",
+    "광안리 바다 전망 카페",
+    "부산역 밀면",
+    "기장 해산물 식당 아이 동반",
+]
+
+
+class SlowHashEmbeddings(Embeddings):
+    """원격 임베딩 API 지연을 흉내 내는 결정적 임베딩 (동기 호출은 sleep, 비동기 호출은 asyncio.sleep)"""
+
+    def __init__(self, dim: int, latency_ms: float):
+        self.dim = dim
+        self.latency = latency_ms / 1000
+
+    def _vector(self, text: str) -> list:
+        rng = np.random.default_rng(abs(hash(text)) % (2 ** 32))
+        return rng.standard_normal(self.dim).astype(np.float32).tolist()
+
+    def embed_documents(self, texts):
+        return [self._vector(t) for t in texts]
+
+    def embed_query(self, text):
+        time.sleep(self.latency)
+        return self._vector(text)
+
+    async def aembed_query(self, text):
+        await asyncio.sleep(self.latency)
+        return self._vector(text)
+
+
+def build_synthetic_vectordb(num_docs: int, dim: int, latency_ms: float):
+    from langchain_community.vectorstores import FAISS
+    sys.path.insert(0, str(Path(__file__).parent))
+    from benchmark_bm25 import synthetic_documents
+
+    docs = synthetic_documents(num_docs)
+    embeddings = SlowHashEmbeddings(dim, latency_ms)
+    vectors = np.random.default_rng(0).standard_normal((num_docs, dim)).astype(np.float32)
+    pairs = [(doc.page_content, vec.tolist()) for doc, vec in zip(docs, vectors)]
+    metadatas = [doc.metadata for doc in docs]
+    return FAISS.from_embeddings(pairs, embeddings, metadatas=metadatas)
+
+
+def load_hybrid_search(args):
+    if args.synthetic:
+        vectordb = build_synthetic_vectordb(args.synthetic, args.dim, args.embed_latency_ms)
+        from app.utils.vectordb import iter_vectordb_documents
+        return create_hybrid_search(vectordb, documents=list(iter_vectordb_documents(vectordb)))
+
+    from app.utils.resource_registry import get_shared_vectordb, get_shared_bm25
+    vectordb = get_shared_vectordb(args.index)
+    return create_hybrid_search(vectordb, keyword_index=get_shared_bm25(args.index, vectordb))
+
+
+async def _elapsed(awaitable) -> float:
+    start = time.perf_counter()
+    await awaitable
+    return (time.perf_counter() - start) * 1000
+
+
+async def measure(search_fn, queries: list) -> dict:
+    """동시 요청을 실행하면서 이벤트 루프 틱 지연을 기록합니다."""
+    lags = []
+    stop = asyncio.Event()
+
+    async def ticker(interval: float = 0.005):
+        while not stop.is_set():
+            expected = time.perf_counter() + interval
+            await asyncio.sleep(interval)
+            lags.append(max(0.0, time.perf_counter() - expected) * 1000)
+
+    async def timed(query):
+        start = time.perf_counter()
+        await search_fn(query)
+        return (time.perf_counter() - start) * 1000
+
+    tick_task = asyncio.create_task(ticker())
+    await asyncio.sleep(0.02)
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(timed(q) for q in queries))
+    wall = (time.perf_counter() - start) * 1000
+    stop.set()
+    await tick_task
+    return {
+        "wall_ms": wall,
+        "p50_ms": statistics.median(latencies),
+        "max_ms": max(latencies),
+        "max_lag_ms": max(lags) if lags else 0.0,
+    }
+
+
+async def main(args) -> None:
+    hybrid = load_hybrid_search(args)
+    queries = [SAMPLE_QUERIES[i % len(SAMPLE_QUERIES)] for i in range(args.concurrency)]
+
+    async def sync_search(query):
+        return hybrid.search(query)
+
+    # 단일 요청 구성 요소별 지연: 하이브리드 ≈ max(벡터, 키워드) 확인용
+    await hybrid.asearch(queries[0])
+    vector_ms = statistics.median(
+        [await _elapsed(hybrid._avector_search(q, hybrid.top_k)) for q in SAMPLE_QUERIES]
+    )
+    keyword_ms = statistics.median(
+        [await _elapsed(asyncio.to_thread(hybrid._keyword_search, q)) for q in SAMPLE_QUERIES]
+    )
+    hybrid_ms = statistics.median([await _elapsed(hybrid.asearch(q)) for q in SAMPLE_QUERIES])
+
+    sync_result = await measure(sync_search, queries)
+    async_result = await measure(hybrid.asearch, queries)
+
+    print("=" * 60)
+    print(f"단일 요청 p50: 벡터={vector_ms:.1f}ms, 키워드={keyword_ms:.1f}ms, 하이브리드(async)={hybrid_ms:.1f}ms")
+    print(f"동시 요청 {args.concurrency}개")
+    print(f"{'':>6} {'wall(ms)':>10} {'p50(ms)':>10} {'max(ms)':>10} {'loop lag max(ms)':>18}")
+    for name, result in (("sync", sync_result), ("async", async_result)):
+        print(
+            f"{name:>6} {result['wall_ms']:>10.1f} {result['p50_ms']:>10.1f} "
+            f"{result['max_ms']:>10.1f} {result['max_lag_ms']:>18.1f}"
+        )
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="하이브리드 검색 동시성 / 이벤트 루프 블로킹 벤치마크")
+    parser.add_argument("--index", default="restaurant_finder", help="벡터 DB 이름")
+    parser.add_argument("--synthetic", type=int, default=0, help="합성 코퍼스 문서 수 (0이면 벡터 DB 사용)")
+    parser.add_argument("--dim", type=int, default=256, help="합성 임베딩 차원")
+    parser.add_argument("--embed-latency-ms", type=float, default=80.0, help="합성 임베딩 API 지연 (ms)")
+    parser.add_argument("--concurrency", type=int, default=16, help="동시 요청 수")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,123 @@
+"""
+ONNX Runtime 리랭커 백엔드 정확도 / 지연 시간 벤치마크
+
+PyTorch CrossEncoder 점수를 기준으로 ONNX fp32, ONNX int8(동적 양자화) 백엔드를 비교합니다.
+- 정확도: 쌍별 최대 절대 오차, 쿼리별 Spearman 순위 상관, 상위 5개 일치율
+- 지연 시간: 요청 1건(쿼리 1개 x 문서 N개) p50 / p95
+- 처리량: 전체 쌍을 배치로 추론할 때 초당 쌍 수
+
+문서는 벡터 DB의 실제 음식점 문서를 사용하고, 벡터 DB가 없으면 내장 샘플 문서를 사용합니다.
+
+사용법 (ai-server 컨테이너의 /project 에서 실행):
+    python script/benchmark_onnx_reranker.py --index restaurant_finder --threads 4
+    python script/benchmark_onnx_reranker.py --model cross-encoder/ms-marco-MiniLM-L-4-v2 --docs 20
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from dotenv import load_dotenv
+from scipy.stats import spearmanr
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+load_dotenv()
+
+from sentence_transformers import CrossEncoder
+from app.utils.onnx_reranker import OnnxCrossEncoder
+
+SAMPLE_QUERIES = [
+    "해운대 근처에 주차 가능한 고기 맛집 추천해줘",
+    "서면에서 혼밥하기 좋은 국밥집 알려줘",
+    "광안리 바다가 보이는 카페 추천해줘",
+    "부산역 근처 돼지국밥 맛집",
+    "기장에서 아이와 함께 갈 만한 해산물 식당",
+]
+
+SAMPLE_DOCS = [
+    "식당명: 해운대 암소갈비집\n지역: 부산 해운대구 중동\n대표메뉴: 생갈비, 양념갈비, 된장찌개\n특징: 주차 가능, 단체석, 예약 가능",
+    "식당명: 쌍둥이돼지국밥\n지역: 부산 남구 대연동\n대표메뉴: 돼지국밥, 수육백반\n특징: 24시간 영업, 혼밥 가능, 현지인 맛집",
+    "식당명: 광안리 오션뷰 카페\n지역: 부산 수영구 광안동\n대표메뉴: 아메리카노, 크로플\n특징: 광안대교 전망, 루프탑, 애견 동반",
+    "식당명: 본전돼지국밥\n지역: 부산 동구 초량동 (부산역 맞은편)\n대표메뉴: 돼지국밥, 순대국밥\n특징: 줄서는 집, 빠른 회전",
+    "식당명: 기장 대게 수산\n지역: 부산 기장군 기장읍\n대표메뉴: 대게, 회, 해물탕\n특징: 키즈존, 넓은 주차장, 바다 전망",
+    "식당명: 개금밀면\n지역: 부산 부산진구 개금동\n대표메뉴: 물밀면, 비빔밀면, 만두\n특징: 여름 대기 필수, 현금 결제 할인",
+    "식당명: 서면 부산갈매기 포차\n지역: 부산 부산진구 부전동\n대표메뉴: 곰장어, 꼼장어볶음, 소주\n특징: 심야 영업, 단체 가능",
+    "식당명: 해운대 소문난 암소갈비\n지역: 부산 해운대구 우동\n대표메뉴: 한우 갈비살, 냉면\n특징: 발렛 주차, 룸 완비, 외국인 손님 많음",
+]
+
+
+def load_documents(index_name: str, num_docs: int) -> list:
+    try:
+        from app.utils.vectordb import load_vectordb, iter_vectordb_documents
+        texts = [doc.page_content for doc in iter_vectordb_documents(load_vectordb(index_name))]
+        if len(texts) >= num_docs:
+            return texts[:num_docs]
+        print(f"벡터 DB 문서 수({len(texts)})가 부족하여 샘플 문서 사용")
+    except Exception as e:
+        print(f"벡터 DB 문서 로드 실패, 샘플 문서 사용: {e}")
+    return [SAMPLE_DOCS[i % len(SAMPLE_DOCS)] for i in range(num_docs)]
+
+
+def time_requests(model, requests: list, repeat: int) -> list:
+    latencies = []
+    for _ in range(repeat):
+        for pairs in requests:
+            start = time.perf_counter()
+            model.predict(pairs, batch_size=len(pairs))
+            latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def main(args) -> None:
+    docs = load_documents(args.index, args.docs)
+    requests = [[[query, doc] for doc in docs] for query in SAMPLE_QUERIES]
+    all_pairs = [pair for pairs in requests for pair in pairs]
+
+    backends = {
+        "torch": CrossEncoder(args.model, max_length=512),
+        "onnx-fp32": OnnxCrossEncoder(args.model, quantize=False, intra_op_threads=args.threads),
+        "onnx-int8": OnnxCrossEncoder(args.model, quantize=True, intra_op_threads=args.threads),
+    }
+    if args.threads > 0:
+        import torch
+        torch.set_num_threads(args.threads)
+
+    reference = [np.asarray(backends["torch"].predict(pairs)) for pairs in requests]
+
+    print("=" * 80)
+    print(f"모델={args.model}, 요청당 문서 {len(docs)}개, 쿼리 {len(requests)}개, 스레드={args.threads or '기본값'}")
+    print(f"{'backend':>10} {'max|diff|':>10} {'spearman':>9} {'top5 일치':>9} {'p50(ms)':>9} {'p95(ms)':>9} {'pairs/s':>9}")
+    for name, model in backends.items():
+        model.predict(requests[0])  # 예열
+        scores = [np.asarray(model.predict(pairs)) for pairs in requests]
+        max_diff = max(float(np.max(np.abs(s - r))) for s, r in zip(scores, reference))
+        rho = statistics.mean(float(spearmanr(s, r).correlation) for s, r in zip(scores, reference))
+        top5 = statistics.mean(
+            len(set(np.argsort(-s)[:5]) & set(np.argsort(-r)[:5])) / 5 for s, r in zip(scores, reference)
+        )
+
+        latencies = sorted(time_requests(model, requests, args.repeat))
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+
+        start = time.perf_counter()
+        model.predict(all_pairs, batch_size=args.batch_size)
+        throughput = len(all_pairs) / (time.perf_counter() - start)
+
+        print(
+            f"{name:>10} {max_diff:>10.2e} {rho:>9.4f} {top5:>9.2f} "
+            f"{statistics.median(latencies):>9.1f} {p95:>9.1f} {throughput:>9.1f}"
+        )
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ONNX Runtime 리랭커 백엔드 정확도 / 지연 시간 벤치마크")
+    parser.add_argument("--model", default="cross-encoder/ms-marco-MiniLM-L-6-v2", help="CrossEncoder 모델 이름 또는 경로")
+    parser.add_argument("--index", default="restaurant_finder", help="문서를 가져올 벡터 DB 이름")
+    parser.add_argument("--docs", type=int, default=20, help="요청당 리랭킹 문서 수")
+    parser.add_argument("--threads", type=int, default=0, help="intra-op 스레드 수 (0이면 기본값)")
+    parser.add_argument("--batch-size", type=int, default=64, help="처리량 측정 배치 크기")
+    parser.add_argument("--repeat", type=int, default=5, help="요청 반복 횟수")
+    main(parser.parse_args())
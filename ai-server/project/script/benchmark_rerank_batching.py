@@ -0,0 +1,109 @@
+"""
+리랭커 요청 간 마이크로 배칭 처리량 벤치마크
+
+- blocking: 코루틴 안에서 CrossEncoder.predict를 직접 호출 (기존 KoreanReranker.rerank 방식)
+- thread  : 요청마다 asyncio.to_thread로 predict를 따로 호출 (배칭 없이 루프만 비움)
+- batched : RerankBatcher로 동시 요청의 쌍을 모아 predict 한 번으로 처리 (현재 방식)
+
+사용법 (ai-server 컨테이너의 /project 에서 실행):
+    python script/benchmark_rerank_batching.py --concurrency 16 --docs 20
+    python script/benchmark_rerank_batching.py --model cross-encoder/ms-marco-MiniLM-L-4-v2 --max-wait-ms 10
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+load_dotenv()
+
+from sentence_transformers import CrossEncoder
+from app.utils.rerank_batcher import RerankBatcher
+
+SAMPLE_QUERIES = [
+    "해운대 근처에 주차 가능한 고기 맛집 추천해줘",
+    "서면에서 혼밥하기 좋은 국밥집 알려줘",
+    "광안리 바다가 보이는 카페 추천해줘",
+    "부산역 근처 돼지국밥 맛집",
+    "기장에서 아이와 함께 갈 만한 해산물 식당",
+]
+
+SAMPLE_DOC = (
+    "식당명: 해운대 암소갈비집\n지역: 부산 해운대구\n대표메뉴: 생갈비, 양념갈비, 된장찌개\n"
+    "특징: 주차 가능, 단체석, 예약 가능. 해운대 해수욕장에서 도보 10분 거리에 있는 노포 갈비집입니다."
+)
+
+
+async def run(mode: str, model, batcher: RerankBatcher, jobs: list) -> dict:
+    lags = []
+    stop = asyncio.Event()
+
+    async def ticker(interval: float = 0.005):
+        while not stop.is_set():
+            expected = time.perf_counter() + interval
+            await asyncio.sleep(interval)
+            lags.append(max(0.0, time.perf_counter() - expected) * 1000)
+
+    async def one(pairs):
+        start = time.perf_counter()
+        if mode == "blocking":
+            model.predict(pairs)
+        elif mode == "thread":
+            await asyncio.to_thread(model.predict, pairs)
+        else:
+            await batcher.apredict(pairs)
+        return (time.perf_counter() - start) * 1000
+
+    tick_task = asyncio.create_task(ticker())
+    await asyncio.sleep(0.02)
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(one(pairs) for pairs in jobs))
+    wall = time.perf_counter() - start
+    stop.set()
+    await tick_task
+    return {
+        "throughput": len(jobs) / wall,
+        "p50_ms": statistics.median(latencies),
+        "max_ms": max(latencies),
+        "max_lag_ms": max(lags) if lags else 0.0,
+    }
+
+
+async def main(args) -> None:
+    model = CrossEncoder(args.model, max_length=512)
+    batcher = RerankBatcher(model, max_batch_pairs=args.max_batch_pairs, max_wait_ms=args.max_wait_ms)
+    jobs = [
+        [[SAMPLE_QUERIES[i % len(SAMPLE_QUERIES)], f"{SAMPLE_DOC} ({d})"] for d in range(args.docs)]
+        for i in range(args.concurrency)
+    ]
+
+    # 예열 (토크나이저/스레드 풀 초기화 비용 제외)
+    model.predict(jobs[0])
+    await batcher.apredict(jobs[0])
+
+    results = {}
+    for mode in ("blocking", "thread", "batched"):
+        results[mode] = await run(mode, model, batcher, jobs)
+
+    print("=" * 70)
+    print(f"모델={args.model}, 동시 요청 {args.concurrency}개 x 문서 {args.docs}개")
+    print(f"{'':>9} {'req/s':>8} {'p50(ms)':>10} {'max(ms)':>10} {'loop lag max(ms)':>18}")
+    for mode, r in results.items():
+        print(f"{mode:>9} {r['throughput']:>8.1f} {r['p50_ms']:>10.1f} {r['max_ms']:>10.1f} {r['max_lag_ms']:>18.1f}")
+    print(f"배치 통계: {batcher.stats()}")
+    print("=" * 70)
+    batcher.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="리랭커 요청 간 마이크로 배칭 처리량 벤치마크")
+    parser.add_argument("--model", default="cross-encoder/ms-marco-MiniLM-L-6-v2", help="CrossEncoder 모델 이름 또는 경로")
+    parser.add_argument("--concurrency", type=int, default=16, help="동시 요청 수")
+    parser.add_argument("--docs", type=int, default=20, help="요청당 리랭킹 문서 수")
+    parser.add_argument("--max-batch-pairs", type=int, default=128, help="배치당 최대 쌍 수")
+    parser.add_argument("--max-wait-ms", type=float, default=5.0, help="배치 최대 대기 시간 (ms)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,114 @@
+"""
+워커 프로세스 수에 따른 벡터 DB 로드 시간 / 메모리 사용량 비교 (heap 로드 vs mmap 로드)
+
+uvicorn 워커처럼 독립 프로세스 N개가 동시에 같은 벡터 DB와 BM25 인덱스를 로드하고 검색한 뒤,
+로드 시간과 /proc/self/smaps_rollup 기준 워커별 메모리를 보고합니다.
+- RSS : 워커가 매핑한 상주 페이지 (공유 페이지 포함, 워커 수만큼 중복 계산됨)
+- PSS : 공유 페이지를 공유 프로세스 수로 나눈 값 (합계가 실제 물리 메모리 사용량)
+- USS : 워커 전용(private) 페이지
+
+검색은 임베딩 API 없이 무작위 벡터와 BM25 쿼리로 실행하므로 어떤 임베딩으로 만든 인덱스든 측정할 수 있습니다.
+큰 인덱스가 필요하면 script/build_offline_index.py --synthetic 50000 으로 먼저 생성하세요.
+
+사용법 (ai-server 컨테이너의 /project 에서 실행):
+    python script/benchmark_worker_memory.py --index restaurant_finder --workers 1 4
+"""
+import argparse
+import multiprocessing as mp
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from dotenv import load_dotenv
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+load_dotenv()
+
+QUERIES = ["해운대 밀면", "서면 돼지국밥 맛집", "광안리 바다 전망 회", "주차 가능 단체석"]
+
+
+def read_memory() -> dict:
+    """/proc/self/smaps_rollup의 Rss / Pss / Private 합계 (MB)"""
+    values = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                values[parts[0][:-1]] = int(parts[1]) / 1024
+    return {
+        "rss": values.get("Rss", 0.0),
+        "pss": values.get("Pss", 0.0),
+        "uss": values.get("Private_Clean", 0.0) + values.get("Private_Dirty", 0.0),
+    }
+
+
+def worker(index_name: str, num_queries: int, loaded: mp.Barrier, measured: mp.Barrier, results: mp.Queue) -> None:
+    from app.utils.resource_registry import get_shared_vectordb, get_shared_bm25
+    import app.utils.vectordb  # noqa: F401  라이브러리 import 시간/메모리는 로드 측정에서 제외
+
+    baseline = read_memory()
+    start = time.perf_counter()
+    vectordb = get_shared_vectordb(index_name)
+    keyword_index = get_shared_bm25(index_name, vectordb)
+    load_seconds = time.perf_counter() - start
+    rng = np.random.default_rng(os.getpid())
+    for i in range(num_queries):
+        vectordb.similarity_search_with_score_by_vector(rng.standard_normal(vectordb.index.d).astype(np.float32).tolist(), k=20)
+        keyword_index.search_documents(QUERIES[i % len(QUERIES)], k=20)
+
+    # 모든 워커가 로드를 마친 상태에서 측정해야 공유 페이지가 PSS에 나뉘어 반영됨
+    loaded.wait()
+    memory = read_memory()
+    memory["loaded_rss"] = memory["rss"] - baseline["rss"]
+    memory["load_seconds"] = load_seconds
+    results.put(memory)
+    measured.wait()
+
+
+def run(index_name: str, num_workers: int, mmap_enabled: bool, num_queries: int) -> list:
+    os.environ["VECTORDB_MMAP"] = "true" if mmap_enabled else "false"
+    ctx = mp.get_context("spawn")
+    loaded, measured, results = ctx.Barrier(num_workers), ctx.Barrier(num_workers), ctx.Queue()
+    processes = [ctx.Process(target=worker, args=(index_name, num_queries, loaded, measured, results)) for _ in range(num_workers)]
+    for process in processes:
+        process.start()
+    memories = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return memories
+
+
+def main(args) -> None:
+    rows = []
+    # 첫 실행에서 docstore / 키워드 인덱스 스냅샷이 생성되도록 mmap 모드로 한 번 예열
+    run(args.index, 1, True, 1)
+    for mmap_enabled in (False, True):
+        for num_workers in args.workers:
+            memories = run(args.index, num_workers, mmap_enabled, args.queries)
+            rows.append((
+                "mmap" if mmap_enabled else "heap", num_workers,
+                statistics.mean(m["load_seconds"] for m in memories),
+                statistics.mean(m["rss"] for m in memories),
+                statistics.mean(m["loaded_rss"] for m in memories),
+                statistics.mean(m["pss"] for m in memories),
+                statistics.mean(m["uss"] for m in memories),
+                sum(m["pss"] for m in memories),
+            ))
+
+    print("=" * 90)
+    print(f"벡터 DB={args.index}, 워커당 검색 {args.queries}회 후 측정 (MB)")
+    print(f"{'mode':>6} {'workers':>8} {'load(s)':>8} {'RSS/worker':>11} {'loaded RSS':>11} {'PSS/worker':>11} {'USS/worker':>11} {'PSS total':>10}")
+    for mode, num_workers, load_seconds, rss, loaded_rss, pss, uss, total in rows:
+        print(f"{mode:>6} {num_workers:>8} {load_seconds:>8.2f} {rss:>11.1f} {loaded_rss:>11.1f} {pss:>11.1f} {uss:>11.1f} {total:>10.1f}")
+    print("=" * 90)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="워커 수에 따른 벡터 DB 로드 시간 / 메모리 사용량 비교 (heap vs mmap)")
+    parser.add_argument("--index", default="restaurant_finder", help="벡터 DB 이름")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4], help="비교할 워커 수")
+    parser.add_argument("--queries", type=int, default=50, help="측정 전 워커당 검색 횟수")
+    main(parser.parse_args())
@@ -0,0 +1,45 @@
+"""
+지식 그래프 엔티티 컨텍스트 스니펫 재생성
+
+graphdb/knowledge_graph/snippets/ 에 Restaurant / Attraction 노드별 그래프 컨텍스트 텍스트를 다시 렌더링하여 저장합니다.
+서버는 시작 시 그래프 체크섬이 바뀐 경우에만 스니펫을 다시 만드므로, 그래프는 그대로인데
+렌더링 로직(GraphRAGEnhancer)만 바꾼 경우 배포 전에 이 스크립트로 미리 재생성하세요.
+(서버 시작 시 재생성하려면 GRAPH_SNIPPETS_REBUILD=true)
+
+사용법 (ai-server 컨테이너의 /project 에서 실행):
+    python script/build_graph_snippets.py
+    python script/build_graph_snippets.py --sample restaurant_1241
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+load_dotenv()
+
+from app.utils.graph_rag_enhancer import GraphRAGEnhancer
+from app.utils.graph_snippets import load_graph_snippets
+from app.utils.knowledge_graph_loader import load_knowledge_graph
+
+
+def main(args) -> None:
+    graph = load_knowledge_graph()
+    if graph is None:
+        raise SystemExit("지식 그래프를 로드하지 못했습니다.")
+    enhancer = GraphRAGEnhancer(graph)
+    start = time.perf_counter()
+    snippets = load_graph_snippets(graph, enhancer._get_entity_snippet, enhancer.snippet_render_settings, rebuild=True)
+    print(f"스니펫 재생성 완료: {type(graph).__name__}, {time.perf_counter() - start:.2f}s, {snippets.nbytes / 1024 / 1024:.1f}MB")
+    for node_id in args.sample:
+        print(f"--- {node_id} ---")
+        snippet = snippets.get(node_id)
+        print(snippet.text() if snippet else "(스니펫 없음)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="지식 그래프 엔티티 컨텍스트 스니펫 재생성")
+    parser.add_argument("--sample", nargs="*", default=[], help="재생성 후 출력해 볼 노드 ID")
+    main(parser.parse_args())
@@ -0,0 +1,88 @@
+"""
+로컬 임베딩으로 오프라인 벡터 DB 생성
+
+OpenAI API 없이 hashing(결정적) 또는 sentence-transformers(로컬 CPU) 임베딩으로
+vectordb/<name>/ 에 FAISS 인덱스, index_meta.json, 키워드 인덱스 / docstore 스냅샷을 만듭니다.
+네트워크 없이 서버 기동, 검색 부하 테스트, CI를 실행할 때 사용합니다.
+
+사용법 (ai-server 컨테이너의 /project 에서 실행):
+    python script/build_offline_index.py --name offline_finder --synthetic 2000
+    python script/build_offline_index.py --name offline_finder --csv data/restaurants.csv --provider sentence-transformers
+    EMBEDDING_PROVIDER=hashing python script/benchmark_hybrid_concurrency.py --index offline_finder
+"""
+import argparse
+import shutil
+import sys
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+load_dotenv()
+
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from app.utils.bm25 import SparseBM25
+from app.utils.docstore import DOC_ID_KEY
+from app.utils.embeddings import create_embeddings, describe_embeddings, write_index_meta
+from app.utils.vectordb import VECTORDB_ROOT, KEYWORD_INDEX_DIRNAME, docstore_checksum, write_docstore_snapshot
+
+
+def csv_documents(csv_path: Path) -> list:
+    """CSV 행마다 "컬럼: 값" 줄로 본문을 만들고 RSTR_ID를 메타데이터로 분리합니다 (ai-preprocessing과 같은 형태)."""
+    import pandas as pd
+
+    docs = []
+    for row in pd.read_csv(csv_path, encoding="utf-8").to_dict(orient="records"):
+        rstr_id = row.pop("RSTR_ID", None)
+        content = "\n".join(f"{key}: {value}" for key, value in row.items())
+        docs.append(Document(page_content=content, metadata={"RSTR_ID": int(rstr_id) if rstr_id is not None else None}))
+    return docs
+
+
+def synthetic_documents(num_docs: int) -> list:
+    from eval_passage_selection import synthetic_corpus
+
+    return [Document(page_content=text, metadata={"RSTR_ID": i}) for i, (text, _, _, _) in enumerate(synthetic_corpus(num_docs))]
+
+
+def main(args) -> None:
+    docs = csv_documents(Path(args.csv)) if args.csv else synthetic_documents(args.synthetic)
+    # 벡터 위치를 정수 문서 ID로 기록 (FAISS / BM25 / docstore 스냅샷이 같은 순서로 저장됨)
+    for position, doc in enumerate(docs):
+        doc.metadata[DOC_ID_KEY] = position
+    output = VECTORDB_ROOT / args.name
+    if output.exists():
+        if not args.overwrite:
+            raise SystemExit(f"이미 존재합니다: {output} (--overwrite로 덮어쓰기)")
+        shutil.rmtree(output)
+
+    embeddings = create_embeddings(args.provider, args.model, args.dim)
+    start = time.perf_counter()
+    vectorstore = FAISS.from_documents(docs, embeddings)
+    print(f"임베딩 + 인덱스 생성: 문서 {len(docs)}개, {time.perf_counter() - start:.1f}s")
+
+    vectorstore.save_local(str(output))
+    info = describe_embeddings(args.provider, embeddings, args.dim)
+    info["dim"] = info["dim"] or vectorstore.index.d
+    write_index_meta(output, {"embedding": info, "num_vectors": vectorstore.index.ntotal})
+
+    keyword_index = SparseBM25.from_documents(docs)
+    checksum = docstore_checksum(output)
+    keyword_index.save(output / KEYWORD_INDEX_DIRNAME, docstore_checksum=checksum)
+    write_docstore_snapshot(output, vectorstore, checksum)
+    print(f"저장 완료: {output} ({info['provider']}/{info['model']}, dim={info['dim']})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="로컬 임베딩으로 오프라인 벡터 DB 생성")
+    parser.add_argument("--name", required=True, help="저장할 벡터 DB 이름")
+    parser.add_argument("--csv", default=None, help="식당 CSV 경로 (없으면 합성 문서 사용)")
+    parser.add_argument("--synthetic", type=int, default=1000, help="합성 문서 수")
+    parser.add_argument("--provider", default="hashing", choices=["hashing", "sentence-transformers"], help="임베딩 제공자")
+    parser.add_argument("--model", default=None, help="sentence-transformers 모델 이름")
+    parser.add_argument("--dim", type=int, default=None, help="hashing 임베딩 차원 (기본값: 384)")
+    parser.add_argument("--overwrite", action="store_true", help="기존 벡터 DB 덮어쓰기")
+    main(parser.parse_args())
@@ -0,0 +1,102 @@
+"""
+벡터 DB를 mmap docstore(VECTORDB_MMAP=true)와 index.pkl(VECTORDB_MMAP=false)로 각각 로드해
+문서 위치별 메타데이터와 지식 그래프 노드 ID(metadata_filter.document_node_ids)가 같은지 확인합니다.
+식별자(RSTR_ID / content_id / UC_SEQ)에 문자열 / 실수 값이 섞여 정수 컬럼으로 저장되지 않은 경우에도
+두 모드의 메타데이터 필터 / 그래프 검색 대상이 같아야 합니다. 다르면 종료 코드 1로 끝납니다.
+
+--synthetic을 주면 정수 / 문자열 / 실수 / None / 누락 식별자를 섞은 임시 벡터 DB(hashing 임베딩)로 확인합니다.
+
+사용법 (ai-server 컨테이너의 /project 에서 실행):
+    python script/check_vectordb_modes.py --index restaurant_finder
+    python script/check_vectordb_modes.py --synthetic 500
+"""
+import argparse
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+load_dotenv()
+
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from app.utils.embeddings import create_embeddings, read_index_meta, resolve_index_embeddings
+from app.utils.metadata_filter import document_node_ids
+from app.utils.vectordb import assign_document_ids, iter_vectordb_documents, load_mmap_vectorstore, resolve_vectordb_path, write_docstore_snapshot
+
+
+def synthetic_documents(num_docs: int, seed: int) -> list:
+    """식별자 타입을 섞은 문서 (attraction_finder의 문자열 content_id, CSV에서 읽은 실수 RSTR_ID 등)"""
+    rng = random.Random(seed)
+    docs = []
+    for i in range(num_docs):
+        kind = rng.choice(["int", "str", "float", "none", "missing", "both"])
+        metadata = {}
+        if kind == "int":
+            metadata["RSTR_ID"] = 1000 + i
+        elif kind == "str":
+            metadata["content_id"] = str(2000 + i)
+        elif kind == "float":
+            metadata["RSTR_ID"] = float(3000 + i)
+        elif kind == "none":
+            metadata["UC_SEQ"] = None
+        elif kind == "both":
+            metadata.update(UC_SEQ=4000 + i, content_id=f"{5000 + i}")
+        metadata["name"] = f"장소{i}"
+        docs.append(Document(page_content=f"부산 장소{i} 설명", metadata=metadata))
+    return docs
+
+
+def build_synthetic_vectordb(directory: Path, num_docs: int, seed: int):
+    """임시 디렉토리에 index.faiss / index.pkl / docstore 스냅샷을 만들고 임베딩 객체를 반환합니다."""
+    embeddings = create_embeddings("hashing", dim=64)
+    vectorstore = FAISS.from_documents(synthetic_documents(num_docs, seed), embeddings)
+    assign_document_ids(vectorstore)
+    vectorstore.save_local(str(directory))
+    write_docstore_snapshot(directory, vectorstore)
+    return embeddings
+
+
+def compare(vectordb_path: Path, embeddings) -> int:
+    """두 모드로 로드해 다른 문서 수를 출력하고 반환합니다."""
+    mmap_store = load_mmap_vectorstore(vectordb_path, embeddings)
+    pickled = FAISS.load_local(str(vectordb_path), embeddings=embeddings, allow_dangerous_deserialization=True)
+    assign_document_ids(pickled)
+
+    mmap_node_ids, pickle_node_ids = document_node_ids(mmap_store), document_node_ids(pickled)
+    mismatches = 0
+    for position, doc in enumerate(iter_vectordb_documents(pickled)):
+        mmap_metadata = mmap_store.docstore.metadata(position)
+        if mmap_node_ids[position] != pickle_node_ids[position] or mmap_metadata != doc.metadata:
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"  위치 {position}: mmap={mmap_node_ids[position]} {mmap_metadata} / pickle={pickle_node_ids[position]} {doc.metadata}")
+    print(
+        f"{vectordb_path}: 문서 {len(pickle_node_ids)}개, 노드 ID 있는 문서 {sum(node_id is not None for node_id in pickle_node_ids)}개, "
+        f"정수 컬럼 {sorted(mmap_store.docstore.columns)}, 불일치 {mismatches}개"
+    )
+    return mismatches
+
+
+def main(args) -> None:
+    if args.synthetic:
+        with tempfile.TemporaryDirectory() as tmp:
+            embeddings = build_synthetic_vectordb(Path(tmp), args.synthetic, args.seed)
+            mismatches = compare(Path(tmp), embeddings)
+    else:
+        vectordb_path = resolve_vectordb_path(args.index)
+        embeddings, _ = resolve_index_embeddings(args.index, read_index_meta(vectordb_path))
+        mismatches = compare(vectordb_path, embeddings)
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="mmap / pickle docstore의 메타데이터와 그래프 노드 ID 비교")
+    parser.add_argument("--index", default="restaurant_finder", help="확인할 벡터 DB 이름")
+    parser.add_argument("--synthetic", type=int, default=0, help="식별자 타입을 섞은 임시 벡터 DB 문서 수 (0이면 --index 사용)")
+    parser.add_argument("--seed", type=int, default=0, help="합성 문서 난수 시드")
+    main(parser.parse_args())
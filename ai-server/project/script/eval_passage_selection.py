@@ -0,0 +1,166 @@
+"""
+리랭킹 전 문서 구간 선택 + 길이 버킷 오프라인 평가
+
+같은 (쿼리, 후보 문서) 집합에 대해 두 가지 리랭커 입력을 비교합니다.
+- full   : 문서 page_content 전체 (max_length=512에서 잘림), 길이 정렬 없이 고정 크기 미니배치
+- passage: PassageSelector로 고른 제목 + 관련 섹션 구간, 길이 버킷 미니배치 (현재 방식)
+
+측정 항목
+- 쌍당 평균 입력 토큰 수, 요청당 패딩 포함 토큰 수 (트랜스포머 연산량 근사치)
+- 요청당 리랭킹 지연 시간
+- 랭킹 품질: 합성 코퍼스는 정답 레이블 기준 nDCG@5 / recall@5, 공통으로 full 랭킹 대비 상위 5개 일치율
+
+사용법 (ai-server 컨테이너의 /project 에서 실행):
+    python script/eval_passage_selection.py --index restaurant_finder --candidates 20
+    python script/eval_passage_selection.py --synthetic --candidates 20   # 정답 레이블이 있는 합성 문서
+"""
+import argparse
+import math
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from dotenv import load_dotenv
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+load_dotenv()
+
+from sentence_transformers import CrossEncoder
+from app.utils.passage_selector import PassageSelector, RERANK_PASSAGE_MAX_TOKENS
+
+AREAS = ["해운대", "서면", "광안리", "부산역", "기장", "남포동"]
+MENUS = ["돼지국밥", "밀면", "암소갈비", "회", "곰장어", "씨앗호떡"]
+FEATURES = ["주차 가능", "단체석", "혼밥 가능", "바다 전망", "아이 동반", "심야 영업"]
+FILLER = "오랜 기간 지역 주민에게 사랑받아 온 곳으로 재료 손질부터 조리까지 직접 합니다. "
+
+
+def synthetic_corpus(num_docs: int, seed: int = 7) -> list:
+    """(문서 본문, 지역, 메뉴, 특징) 목록. 소개/리뷰 섹션 길이를 다양하게 만들어 긴 꼬리를 재현합니다."""
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(num_docs):
+        area, menu, feature = rng.choice(AREAS), rng.choice(MENUS), rng.choice(FEATURES)
+        text = (
+            f'markdown_content: "# {area} {menu} 식당 {i}\n\n'
+            f"## 소개\n{FILLER * rng.randint(2, 25)}\n"
+            f"## 대표 메뉴\n{menu}, 공기밥, 음료\n"
+            f"## 편의 시설\n{feature}\n"
+            f"## 리뷰\n{'맛있고 친절해요. ' * rng.randint(5, 60)}\""
+        )
+        corpus.append((text, area, menu, feature))
+    return corpus
+
+
+def synthetic_requests(corpus: list, num_queries: int, candidates: int, seed: int = 11) -> list:
+    """(쿼리, 후보 문서 리스트, 정답 여부 리스트) 목록"""
+    rng = random.Random(seed)
+    requests = []
+    for _ in range(num_queries):
+        area, menu, feature = rng.choice(AREAS), rng.choice(MENUS), rng.choice(FEATURES)
+        query = f"{area}에서 {feature}한 {menu} 맛집 추천해줘"
+        relevant = [c for c in corpus if c[1] == area and c[2] == menu]
+        others = [c for c in corpus if not (c[1] == area and c[2] == menu)]
+        picked = rng.sample(relevant, min(len(relevant), candidates // 4)) + rng.sample(others, candidates)
+        picked = picked[:candidates]
+        rng.shuffle(picked)
+        labels = [1.0 if (c[1] == area and c[2] == menu) else 0.0 for c in picked]
+        requests.append((query, [c[0] for c in picked], labels))
+    return requests
+
+
+def index_requests(index_name: str, num_queries: int, candidates: int) -> list:
+    """벡터 DB 하이브리드 검색 후보를 사용 (정답 레이블 없음)"""
+    from app.utils.resource_registry import get_shared_vectordb, get_shared_bm25
+    from app.utils.hybrid_search import create_hybrid_search
+
+    vectordb = get_shared_vectordb(index_name)
+    hybrid = create_hybrid_search(vectordb, top_k=candidates, keyword_index=get_shared_bm25(index_name, vectordb))
+    queries = [f"{area} {menu} 맛집" for area in AREAS for menu in MENUS][:num_queries]
+    return [(q, [d.page_content for d in hybrid.search(q, limit=candidates)], None) for q in queries]
+
+
+def padded_tokens(lengths: list, batch_size: int, bucketed: bool) -> int:
+    """미니배치마다 가장 긴 쌍 길이로 패딩했을 때의 총 토큰 수"""
+    order = sorted(lengths) if bucketed else list(lengths)
+    return sum(max(order[i:i + batch_size]) * len(order[i:i + batch_size]) for i in range(0, len(order), batch_size))
+
+
+def ndcg_at_k(scores: np.ndarray, labels: list, k: int = 5) -> float:
+    ranked = np.argsort(-scores)[:k]
+    dcg = sum(labels[i] / math.log2(rank + 2) for rank, i in enumerate(ranked))
+    ideal = sum(1.0 / math.log2(rank + 2) for rank in range(min(k, int(sum(labels)))))
+    return dcg / ideal if ideal else 0.0
+
+
+def recall_at_k(scores: np.ndarray, labels: list, k: int = 5) -> float:
+    total = sum(labels)
+    return sum(labels[i] for i in np.argsort(-scores)[:k]) / total if total else 0.0
+
+
+def main(args) -> None:
+    model = CrossEncoder(args.model, max_length=512)
+    tokenizer = model.tokenizer
+    selector = PassageSelector(tokenizer=tokenizer, max_tokens=args.max_tokens)
+
+    if args.synthetic:
+        requests = synthetic_requests(synthetic_corpus(600), args.queries, args.candidates)
+    else:
+        requests = index_requests(args.index, args.queries, args.candidates)
+
+    stats = {mode: {"tokens": [], "padded": [], "latency": [], "ndcg": [], "recall": []} for mode in ("full", "passage")}
+    agreement = []
+    for query, texts, labels in requests:
+        inputs = {"full": texts, "passage": selector.select_many(query, texts)}
+        scores = {}
+        for mode, docs in inputs.items():
+            pairs = [[query, doc] for doc in docs]
+            lengths = [
+                len(ids) for ids in tokenizer([q for q, _ in pairs], [d for _, d in pairs], truncation=True, max_length=512)["input_ids"]
+            ]
+            bucketed = mode == "passage"
+            start = time.perf_counter()
+            if bucketed:
+                order = np.argsort(lengths, kind="stable")
+                result = np.empty(len(pairs), dtype=np.float32)
+                for i in range(0, len(order), args.batch_size):
+                    bucket = order[i:i + args.batch_size]
+                    result[bucket] = model.predict([pairs[j] for j in bucket], batch_size=len(bucket))
+            else:
+                result = np.asarray(model.predict(pairs, batch_size=args.batch_size))
+            stats[mode]["latency"].append((time.perf_counter() - start) * 1000)
+            stats[mode]["tokens"].append(statistics.mean(lengths))
+            stats[mode]["padded"].append(padded_tokens(lengths, args.batch_size, bucketed))
+            if labels is not None:
+                stats[mode]["ndcg"].append(ndcg_at_k(result, labels))
+                stats[mode]["recall"].append(recall_at_k(result, labels))
+            scores[mode] = result
+        agreement.append(len(set(np.argsort(-scores["full"])[:5]) & set(np.argsort(-scores["passage"])[:5])) / 5)
+
+    print("=" * 80)
+    print(f"모델={args.model}, 요청 {len(requests)}개 x 후보 {args.candidates}개, 구간 예산={args.max_tokens} 토큰")
+    print(f"{'':>8} {'tokens/pair':>12} {'padded/req':>11} {'p50(ms)':>9} {'nDCG@5':>8} {'recall@5':>9}")
+    for mode, s in stats.items():
+        ndcg = f"{statistics.mean(s['ndcg']):.3f}" if s["ndcg"] else "-"
+        recall = f"{statistics.mean(s['recall']):.3f}" if s["recall"] else "-"
+        print(
+            f"{mode:>8} {statistics.mean(s['tokens']):>12.1f} {statistics.mean(s['padded']):>11.0f} "
+            f"{statistics.median(s['latency']):>9.1f} {ndcg:>8} {recall:>9}"
+        )
+    reduction = 1 - statistics.mean(stats["passage"]["padded"]) / statistics.mean(stats["full"]["padded"])
+    print(f"패딩 포함 토큰 감소율: {reduction * 100:.1f}%, full 대비 상위 5개 일치율: {statistics.mean(agreement):.2f}")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="리랭킹 전 문서 구간 선택 + 길이 버킷 오프라인 평가")
+    parser.add_argument("--model", default="cross-encoder/ms-marco-MiniLM-L-6-v2", help="CrossEncoder 모델 이름 또는 경로")
+    parser.add_argument("--index", default="restaurant_finder", help="후보 문서를 검색할 벡터 DB 이름")
+    parser.add_argument("--synthetic", action="store_true", help="정답 레이블이 있는 합성 문서로 평가")
+    parser.add_argument("--queries", type=int, default=20, help="평가 쿼리 수")
+    parser.add_argument("--candidates", type=int, default=20, help="요청당 후보 문서 수")
+    parser.add_argument("--max-tokens", type=int, default=RERANK_PASSAGE_MAX_TOKENS, help="문서 구간 최대 토큰 수")
+    parser.add_argument("--batch-size", type=int, default=8, help="predict 미니배치 크기")
+    main(parser.parse_args())